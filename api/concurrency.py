@@ -0,0 +1,216 @@
+"""Bounded executor and per-route guards for blocking upstream calls.
+
+yfinance, ``requests`` and the pandas-heavy signal code all block, so async
+routes hand that work to one dedicated :class:`BlockingExecutor` instead of
+Starlette's shared threadpool.  Each route family also gets a
+:class:`RouteGuard` that caps how many requests may run at once and how long
+one may take, so a slow upstream symbol answers ``504`` instead of stalling
+every dashboard widget behind it.
+
+Both expose counters (queue depth, in-flight, timeouts) for
+``/api/metrics/executor``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "16"))
+
+# route -> (max concurrent requests, timeout seconds)
+ROUTE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "signals": (4, 25.0),
+    "ticker": (8, 10.0),
+    "history": (8, 10.0),
+    "quote": (8, 8.0),
+    "backtest": (2, 60.0),
+    "haco": (4, 20.0),
+    "quiver": (4, 15.0),
+}
+
+
+class BlockingExecutor:
+    """Fixed-size thread pool that tracks queue depth and run times."""
+
+    def __init__(self, max_workers: int = BLOCKING_WORKERS, name: str = "blocking") -> None:
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+            return result
+
+        return self._pool.submit(run)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+executor = BlockingExecutor()
+
+
+class RouteGuard:
+    """Concurrency limit + timeout for one family of routes."""
+
+    def __init__(self, name: str, limit: int, timeout: float, pool: BlockingExecutor | None = None) -> None:
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+        self.pool = pool or executor
+        # asyncio primitives are loop-bound; keep one semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.waiting = 0
+        self.in_flight = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.calls = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return sem
+
+    async def call_many(self, *thunks: Callable[[], Any]) -> list:
+        """Run zero-arg callables on the executor under one route slot.
+
+        The slot is held until every submitted callable has actually
+        finished, not just until the caller gives up: a request that times
+        out answers ``504`` but its hung threads still count against the
+        route's limit, so one bad upstream cannot take over the executor.
+        """
+
+        sem = self._semaphore()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        deadline = loop.time() + self.timeout
+        try:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(sem.acquire(), timeout=self.timeout)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            futures = [self.pool.submit(thunk) for thunk in thunks]
+            self._release_when_done(loop, sem, futures)
+            return await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in futures)),
+                timeout=max(0.0, deadline - loop.time()),
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail=f"{self.name}_timeout")
+        finally:
+            self.calls += 1
+            self.total_ms += (time.perf_counter() - started) * 1000.0
+
+    def _release_when_done(self, loop: asyncio.AbstractEventLoop, sem: asyncio.Semaphore, futures: list) -> None:
+        remaining = [len(futures)]
+
+        def finish_one() -> None:
+            remaining[0] -= 1
+            if remaining[0] <= 0:
+                self.in_flight -= 1
+                sem.release()
+
+        def on_done(_future: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(finish_one)
+            except RuntimeError:  # loop already closed; its semaphore is gone too
+                pass
+
+        if not futures:
+            finish_one()
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the executor under this guard."""
+
+        (result,) = await self.call_many(lambda: fn(*args, **kwargs))
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "timeout": self.timeout,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "timeouts": self.timeouts,
+            "calls": self.calls,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else None,
+        }
+
+
+_GUARDS: Dict[str, RouteGuard] = {}
+
+
+def route_guard(name: str) -> RouteGuard:
+    """Return the shared guard for ``name`` (configured by ``ROUTE_LIMITS``)."""
+
+    guard = _GUARDS.get(name)
+    if guard is None:
+        limit, timeout = ROUTE_LIMITS.get(name, (8, 15.0))
+        guard = _GUARDS.setdefault(name, RouteGuard(name, limit, timeout))
+    return guard
+
+
+def executor_stats() -> dict:
+    return {
+        "executor": executor.stats(),
+        "routes": {name: guard.stats() for name, guard in sorted(_GUARDS.items())},
+    }
+
+
+__all__ = [
+    "BlockingExecutor",
+    "ROUTE_LIMITS",
+    "RouteGuard",
+    "executor",
+    "executor_stats",
+    "route_guard",
+]
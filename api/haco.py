@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
+import json
+import logging
+import os
 import time
 import math
 import pandas as pd, numpy as np
-import yfinance as yf
-import inspect
-from indicators.haco import compute_haco
+from indicators.common import heikin_ashi_arrays
+from indicators.haco import compute_haco_columns
+from services.bar_store import get_bars, get_bars_many
+from api.concurrency import route_guard
 
 
 router = APIRouter(prefix="/api/signals/haco", tags=["haco"])
@@ -26,17 +31,14 @@ def _parse_timeframe(tf: str) -> tuple[str, str]:
 
 def _heikin_ashi(df: pd.DataFrame) -> pd.DataFrame:
     """Compute basic Heikin-Ashi columns and a simple state."""
-    ha = pd.DataFrame(index=df.index)
-    ha["close"] = (df["Open"] + df["High"] + df["Low"] + df["Close"]) / 4.0
-    ha["open"] = (df["Open"] + df["Close"]) / 2.0
-    # iterative HA open
-    for i in range(1, len(ha)):
-        ha.iloc[i, ha.columns.get_loc("open")] = (
-            ha["open"].iloc[i - 1] + ha["close"].iloc[i - 1]
-        ) / 2.0
-    ha["high"] = pd.concat([df["High"], ha["open"], ha["close"]], axis=1).max(axis=1)
-    ha["low"] = pd.concat([df["Low"], ha["open"], ha["close"]], axis=1).min(axis=1)
-    ha["upbar"] = (ha["close"] > ha["open"]).astype(int)
+    ha_open, ha_high, ha_low, ha_close = heikin_ashi_arrays(
+        *(np.asarray(df[name], dtype=float) for name in ("Open", "High", "Low", "Close"))
+    )
+    ha = pd.DataFrame(
+        {"close": ha_close, "open": ha_open, "high": ha_high, "low": ha_low},
+        index=df.index,
+    )
+    ha["upbar"] = (ha_close > ha_open).astype(int)
     return ha
 
 
@@ -49,12 +51,12 @@ def _consecutive(arr: pd.Series) -> pd.Series:
         out.append(run)
     return pd.Series(out, index=arr.index)
 
-def _scalar(x, default=0.0):
-    if isinstance(x, pd.Series):
-        x = x.iloc[0] if len(x) else default
-    elif isinstance(x, np.ndarray):
-        x = x.item() if x.size else default
-    return float(x) if pd.notna(x) else float(default)
+def _column(df: pd.DataFrame, name: str) -> List[float]:
+    col = df.get(name, df.get(name.lower()))
+    if isinstance(col, pd.DataFrame):  # duplicated / multi-level column
+        col = col.iloc[:, 0]
+    return np.nan_to_num(np.asarray(col, dtype=float)).tolist()
+
 
 def _build_series(
     symbol: str,
@@ -72,53 +74,40 @@ def _build_series(
     """
     interval, period = _parse_timeframe(timeframe)
     try:
-        df = yf.download(
-            symbol, period=period, interval=interval, auto_adjust=False, progress=False
-        )
+        df = get_bars(symbol, interval, period=period)
     except Exception as e:  # pragma: no cover - network
         raise HTTPException(status_code=502, detail=f"download_failed: {e}")
     if df is None or df.empty:
         raise HTTPException(status_code=404, detail="no_data")
 
-    df = df.dropna().tail(max(lookback, 200))
-    # Build raw candles for compute_haco
-    candles: List[Dict[str, Any]] = []
-    for ts, row in df.iterrows():
-        candles.append({
-            "time": int(ts.to_pydatetime().timestamp()),
-            "o": _scalar(row.get("Open", row.get("open", 0.0))),
-            "h": _scalar(row.get("High", row.get("high", 0.0))),
-            "l": _scalar(row.get("Low",  row.get("low",  0.0))),
-            "c": _scalar(row.get("Close",row.get("close", 0.0))),
-        })
+    df = df.dropna(subset=["Open", "High", "Low", "Close"]).tail(max(lookback, 200))
+    # Columns straight from the frame (no per-row iterrows)
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    times = (idx.as_unit("ns").asi8 // 1_000_000_000).tolist()
+    o, h, l, c = (_column(df, name) for name in ("Open", "High", "Low", "Close"))
     # MetaStock logic (already implemented in indicators.haco)
-    out = compute_haco(
-        candles=candles, length_up=len_up, length_down=len_dn, alert_lookback=alert_lb
+    out = compute_haco_columns(
+        times, o, h, l, c, length_up=len_up, length_down=len_dn, alert_lookback=alert_lb
     )
-    series: List[Dict[str, Any]] = out["series"]
-    last: Dict[str, Any] = out["last"]
     # Keep UI semantics: state as bool
-    if series:
-        for i in range(len(series)):
-            series[i]["state"] = bool(series[i].get("state", 0))
-    last["state"] = bool(last.get("state", 0))
+    out = out.with_columns(state=out.column("state").astype(bool))
 
     # Optional: override OHLC with Heikin-Ashi bars for chart display (no math changes)
-    if show_ha and len(series) > 0:
+    if show_ha and out.size > 0:
         ha = _heikin_ashi(df)
         # Align on the same tail length used for series
-        ha = ha.tail(len(series))
-        ha_o = ha["open"].tolist()
-        ha_h = ha["high"].tolist()
-        ha_l = ha["low"].tolist()
-        ha_c = ha["close"].tolist()
-        for i in range(len(series)):
-            series[i]["o"] = float(ha_o[i])
-            series[i]["h"] = float(ha_h[i])
-            series[i]["l"] = float(ha_l[i])
-            series[i]["c"] = float(ha_c[i])
+        ha = ha.tail(out.size)
+        out = out.with_columns(
+            o=ha["open"].tolist(),
+            h=ha["high"].tolist(),
+            l=ha["low"].tolist(),
+            c=ha["close"].tolist(),
+        )
 
-    return {"series": series, "last": last}
+    # series is a lazy per-bar view; callers that only read the last bars
+    # (the scanner) never materialise the rest.
+    return {"series": out.series, "last": out.summary()}
 
 
 def _series_to_candles(series: List[Dict[str, Any]]):
@@ -159,7 +148,7 @@ def _series_to_candles(series: List[Dict[str, Any]]):
 
 
 @router.get("")
-def haco(
+async def haco(
     symbol: str = Query(..., alias="symbol"),
     timeframe: str = Query("Day"),
     lengthUp: int = Query(34, ge=1),
@@ -174,97 +163,147 @@ def haco(
         "timeframe": timeframe,
         "len_up": lengthUp,
         "len_dn": lengthDown,
+        "alert_lb": alertLookback,
         "lookback": lookback,
         "show_ha": bool(showHa),
     }
-    if "alert_lb" in inspect.signature(_build_series).parameters:
-        params["alert_lb"] = alertLookback
-    return _build_series(**params)
+
+    def build():
+        data = _build_series(**params)
+        return {"series": list(data["series"]), "last": data["last"]}
+
+    return await route_guard("haco").call(build)
+
+
+def _chart_for(symbol: str, timeframe: str) -> Dict[str, Any]:
+    data = _build_series(
+        symbol=symbol,
+        timeframe=timeframe,
+        len_up=34,
+        len_dn=34,
+        alert_lb=1,
+        lookback=200,
+        show_ha=False,
+    )
+    candles, markers = _series_to_candles(data["series"])
+    return {"candles": candles, "markers": markers}
+
+
+HACO_SCAN_MAX = int(os.getenv("HACO_SCAN_MAX", "1000"))
+HACO_SCAN_CHUNK = 50
+
+
+def _scan_symbols(symbols: Optional[str]) -> List[str]:
+    syms = list(dict.fromkeys(s.strip().upper() for s in (symbols or "").split(",") if s.strip()))
+    if len(syms) > HACO_SCAN_MAX:
+        raise HTTPException(status_code=400, detail=f"too_many_symbols (max {HACO_SCAN_MAX})")
+    return syms
 
 
 @router.get("/scan")
-def haco_scan(
+async def haco_scan(
     symbols: Optional[str] = Query(None, description="Comma-separated symbols for table output"),
     symbol: Optional[str] = Query(None, description="Single symbol for chart output"),
     timeframe: str = Query("Day"),
+    stream: bool = Query(False, description="Stream table rows as NDJSON while they finish"),
 ):
     """Return HACO scan results: table or chart-friendly output."""
     # If single 'symbol' provided and no 'symbols', return chart data
     if symbol and not symbols:
-        params = {
-            "symbol": symbol.strip().upper(),
-            "timeframe": timeframe,
-            "len_up": 34,
-            "len_dn": 34,
-            "lookback": 200,
-            "show_ha": False,
-        }
-        if "alert_lb" in inspect.signature(_build_series).parameters:
-            params["alert_lb"] = 1
-        data = _build_series(**params)
-        candles, markers = _series_to_candles(data["series"])
-        return {"candles": candles, "markers": markers}
+        return await route_guard("haco").call(_chart_for, symbol.strip().upper(), timeframe)
 
-    syms = [s.strip().upper() for s in (symbols or "").split(",") if s.strip()]
+    syms = _scan_symbols(symbols)
     if not syms:
         return []
-    out = []
-    for s in syms:
+    # one bulk bar fetch, then one guarded call per chunk so the route
+    # timeout bounds a chunk rather than the whole table
+    guard = route_guard("haco")
+    if len(syms) > 1:
+        await guard.call(_prefetch_bars, syms, timeframe)
+    chunks = [syms[i : i + HACO_SCAN_CHUNK] for i in range(0, len(syms), HACO_SCAN_CHUNK)]
+    # the first chunk runs before any response starts, so a full or timed
+    # out guard still answers with its own status code
+    rows = await guard.call(_scan_table, chunks[0], timeframe)
+    if stream:
+        return StreamingResponse(
+            _scan_stream(guard, rows, chunks[1:], timeframe), media_type="application/x-ndjson"
+        )
+    for chunk in chunks[1:]:
+        rows += await guard.call(_scan_table, chunk, timeframe)
+    return rows
+
+
+def _ndjson(rows: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+async def _scan_stream(guard, first: List[Dict[str, Any]], rest: List[List[str]], timeframe: str):
+    """NDJSON rows chunk by chunk; a failed chunk ends the stream with an error line."""
+
+    yield _ndjson(first)
+    for chunk in rest:
         try:
-            params = {
-                "symbol": s,
-                "timeframe": timeframe,
-                "len_up": 34,
-                "len_dn": 34,
-                "lookback": 200,
-                "show_ha": False,
-            }
-            if "alert_lb" in inspect.signature(_build_series).parameters:
-                params["alert_lb"] = 1
-            data = _build_series(**params)
-            ser = data["series"]
-            if not ser:
-                out.append({"symbol": s, "error": "no_data"})
-                continue
-            last = ser[-1]
-            prev = ser[-2] if len(ser) > 1 else None
-            changed = (prev is not None) and (
-                bool(prev.get("state")) != bool(last.get("state"))
-            )
-            out.append(
-                {
-                    "symbol": s,
-                    "upw": last.get("upw", False),
-                    "dnw": last.get("dnw", False),
-                    "state": last.get("state", None),
-                    "changed": changed,
-                    "reason": data["last"].get("reasons", ""),
-                }
-            )
-        except HTTPException as ex:  # pragma: no cover - network errors
-            out.append({"symbol": s, "error": ex.detail})
-        except Exception as e:  # pragma: no cover - defensive
-            out.append({"symbol": s, "error": str(e)})
-    return out
+            rows = await guard.call(_scan_table, chunk, timeframe)
+        except HTTPException as ex:
+            yield _ndjson([{"error": ex.detail}])
+            return
+        yield _ndjson(rows)
 
 
-@router.post("/scan")
-def haco_scan_post(payload: Dict[str, Any] = Body(...)):
-    """Chart compatibility: POST {"symbol": "..."} -> {candles, markers}."""
-    sym = str(payload.get("symbol", "")).strip().upper()
-    if not sym:
-        raise HTTPException(status_code=400, detail="symbol_required")
+def _prefetch_bars(syms: List[str], timeframe: str) -> None:
+    """Load every symbol's bars in one batched download into the bar store."""
+
+    interval, period = _parse_timeframe(timeframe)
+    try:
+        get_bars_many(syms, interval, period=period)
+    except Exception:  # pragma: no cover - network
+        logging.exception("HACO scan prefetch failed for %d symbols", len(syms))
+
+
+def _scan_row(s: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        data = _build_series(symbol=s, **params)
+        ser = data["series"]
+        if not ser:
+            return {"symbol": s, "error": "no_data"}
+        last = ser[-1]
+        prev = ser[-2] if len(ser) > 1 else None
+        changed = (prev is not None) and (
+            bool(prev.get("state")) != bool(last.get("state"))
+        )
+        return {
+            "symbol": s,
+            "upw": last.get("upw", False),
+            "dnw": last.get("dnw", False),
+            "state": last.get("state", None),
+            "changed": changed,
+            "reason": data["last"].get("reasons", ""),
+        }
+    except HTTPException as ex:  # pragma: no cover - network errors
+        return {"symbol": s, "error": ex.detail}
+    except Exception as e:  # pragma: no cover - defensive
+        return {"symbol": s, "error": str(e)}
+
+
+def _scan_table(syms: List[str], timeframe: str) -> List[Dict[str, Any]]:
+    """Rows for one chunk; bars are already in the bar store, so this stays inline."""
+
     params = {
-        "symbol": sym,
-        "timeframe": "Day",
+        "timeframe": timeframe,
         "len_up": 34,
         "len_dn": 34,
+        "alert_lb": 1,
         "lookback": 200,
         "show_ha": False,
     }
-    if "alert_lb" in inspect.signature(_build_series).parameters:
-        params["alert_lb"] = 1
-    data = _build_series(**params)
-    candles, markers = _series_to_candles(data["series"])
-    return {"candles": candles, "markers": markers}
+    return [_scan_row(s, params) for s in syms]
+
+
+@router.post("/scan")
+async def haco_scan_post(payload: Dict[str, Any] = Body(...)):
+    """Chart compatibility: POST {"symbol": "..."} -> {candles, markers}."""
+    sym = str(payload.get("symbol", "")).strip().upper()
+    if not sym:
+        raise HTTPException(status_code=400, detail="symbol_required")
+    return await route_guard("haco").call(_chart_for, sym, "Day")
 
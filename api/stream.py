@@ -0,0 +1,300 @@
+"""Server push for quotes, HACO state flips and trading alerts.
+
+Clients subscribe to symbols over a WebSocket (``/ws/quotes``) or
+Server-Sent Events (``/api/stream/quotes``) instead of polling
+``/api/ticker``/``/api/price``/``/api/signals/alert``.  One
+:class:`QuoteHub` poller per process refreshes the *union* of subscribed
+symbols through the shared quote cache and fans out only what changed, so
+upstream traffic grows with the number of distinct symbols rather than the
+number of connected clients.
+
+Messages are JSON objects with a ``type``:
+
+* ``quotes`` – ``{"data": [{"symbol", "price", "change_percent"}, ...]}``
+  for quotes that changed since the last poll (a snapshot on subscribe);
+* ``haco`` – ``{"symbol", "state", "flip"}`` when a daily HACO state changes;
+* ``alert`` – ``{"alert": {...}}`` whenever ``POST /api/signals/alert`` runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from api.concurrency import executor
+from backend.app.quotes import fetch_quotes
+
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "5"))
+STREAM_HACO_SECONDS = float(os.getenv("STREAM_HACO_SECONDS", "300"))
+STREAM_MAX_SYMBOLS = int(os.getenv("STREAM_MAX_SYMBOLS", "50"))
+STREAM_QUEUE_SIZE = 256
+SSE_KEEPALIVE_SECONDS = 15.0
+
+router = APIRouter(tags=["stream"])
+
+
+def _parse_symbols(symbols: Iterable[str] | str | None) -> List[str]:
+    if symbols is None:
+        return []
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    out: List[str] = []
+    for s in symbols:
+        s = str(s).strip().upper()
+        if s and s not in out:
+            out.append(s)
+    return out[:STREAM_MAX_SYMBOLS]
+
+
+def _haco_states(symbols: List[str]) -> Dict[str, bool]:
+    """Latest daily HACO state per symbol (symbols without data are skipped)."""
+
+    from api.haco import _scan_table  # api.haco imports are heavy; load lazily
+
+    return {
+        row["symbol"]: bool(row["state"])
+        for row in _scan_table(symbols, "day")
+        if "error" not in row and row.get("state") is not None
+    }
+
+
+class Subscriber:
+    """One connected client: its symbols and an outbound message queue."""
+
+    def __init__(self, symbols: Iterable[str] = ()) -> None:
+        self.symbols = set(_parse_symbols(list(symbols)))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.dropped = 0
+
+    def push(self, message: dict) -> None:
+        # a slow client loses its oldest messages rather than growing memory
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class QuoteHub:
+    """Single poller shared by every subscriber in this process."""
+
+    def __init__(
+        self,
+        *,
+        quotes: Callable[[List[str]], Dict[str, dict]] = fetch_quotes,
+        haco: Callable[[List[str]], Dict[str, bool]] = _haco_states,
+        interval: float = STREAM_POLL_SECONDS,
+        haco_interval: float = STREAM_HACO_SECONDS,
+    ) -> None:
+        self.quotes = quotes
+        self.haco = haco
+        self.interval = interval
+        self.haco_interval = haco_interval
+        self._subs: set[Subscriber] = set()
+        self._quotes: Dict[str, dict] = {}
+        self._haco: Dict[str, bool] = {}
+        self._haco_checked: set[str] = set()
+        self._haco_at = 0.0
+        self._alert: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.polls = 0
+        self.symbols_polled = 0
+        self.messages = 0
+
+    # -- subscriptions --------------------------------------------------------
+    def symbols(self) -> List[str]:
+        return sorted(set().union(*(sub.symbols for sub in self._subs))) if self._subs else []
+
+    def subscribe(self, symbols: Iterable[str] = (), *, start: bool = True) -> Subscriber:
+        sub = Subscriber(symbols)
+        self._subs.add(sub)
+        self._snapshot(sub, sub.symbols)
+        if self._alert is not None:
+            sub.push({"type": "alert", "alert": self._alert})
+        if start:
+            self._ensure_running()
+        return sub
+
+    def update(self, sub: Subscriber, add: Iterable[str] = (), remove: Iterable[str] = ()) -> None:
+        added = set(_parse_symbols(list(add))) - sub.symbols
+        sub.symbols |= added
+        sub.symbols -= set(_parse_symbols(list(remove)))
+        self._snapshot(sub, added)
+        if added and self._wake is not None:
+            self._wake.set()
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.discard(sub)
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _snapshot(self, sub: Subscriber, symbols: Iterable[str]) -> None:
+        known = [self._quote_message(s) for s in sorted(symbols) if s in self._quotes]
+        if known:
+            sub.push({"type": "quotes", "data": known})
+        for s in sorted(symbols):
+            if s in self._haco:
+                sub.push({"type": "haco", "symbol": s, "state": self._haco[s], "flip": False})
+
+    # -- fan-out --------------------------------------------------------------
+    def _quote_message(self, symbol: str) -> dict:
+        q = self._quotes[symbol]
+        return {"symbol": symbol, "price": q.get("price"), "change_percent": q.get("change_percent")}
+
+    def _fan_out(self, changed: List[str], flips: Dict[str, bool]) -> None:
+        for sub in list(self._subs):
+            mine = [self._quote_message(s) for s in changed if s in sub.symbols]
+            if mine:
+                sub.push({"type": "quotes", "data": mine})
+                self.messages += 1
+            for s, flip in flips.items():
+                if s in sub.symbols:
+                    sub.push({"type": "haco", "symbol": s, "state": self._haco[s], "flip": flip})
+                    self.messages += 1
+
+    def publish_alert(self, alert: dict) -> None:
+        """Send an alert to every subscriber (must run on the event loop)."""
+
+        self._alert = dict(alert)
+        for sub in list(self._subs):
+            sub.push({"type": "alert", "alert": self._alert})
+            self.messages += 1
+
+    # -- polling --------------------------------------------------------------
+    async def poll_once(self) -> None:
+        symbols = self.symbols()
+        if not symbols:
+            return
+        self.polls += 1
+        self.symbols_polled += len(symbols)
+        fresh = await executor.run(self.quotes, symbols)
+        changed = []
+        for s in symbols:
+            q = fresh.get(s)
+            if q is None:
+                continue
+            old = self._quotes.get(s)
+            if old is None or (old.get("price"), old.get("change_percent")) != (q.get("price"), q.get("change_percent")):
+                changed.append(s)
+            self._quotes[s] = q
+
+        flips: Dict[str, bool] = {}
+        now = time.monotonic()
+        # every symbol on the slow HACO cadence, new symbols right away
+        full = now - self._haco_at >= self.haco_interval
+        due = symbols if full else [s for s in symbols if s not in self._haco_checked]
+        if self.haco is not None and due:
+            if full:
+                self._haco_at = now
+            self._haco_checked.update(due)
+            states = await executor.run(self.haco, due)
+            for s, state in states.items():
+                prev = self._haco.get(s)
+                if prev != state:
+                    flips[s] = prev is not None
+                self._haco[s] = state
+        self._fan_out(changed, flips)
+
+    async def _run(self) -> None:
+        while self._subs:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Quote stream poll failed")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._wake.set()
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subs),
+            "symbols": len(self.symbols()),
+            "polls": self.polls,
+            "symbols_polled": self.symbols_polled,
+            "messages": self.messages,
+            "dropped": sum(sub.dropped for sub in self._subs),
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+hub = QuoteHub()
+
+
+@router.websocket("/ws/quotes")
+async def quotes_ws(websocket: WebSocket, symbols: str = ""):
+    """Push quote/HACO/alert updates; clients send ``{"subscribe": [...]}`` or ``{"unsubscribe": [...]}``."""
+
+    await websocket.accept()
+    sub = hub.subscribe(_parse_symbols(symbols))
+
+    async def reader():
+        while True:
+            msg = await websocket.receive_json()
+            if isinstance(msg, dict):
+                hub.update(sub, add=msg.get("subscribe") or (), remove=msg.get("unsubscribe") or ())
+
+    async def writer():
+        while True:
+            await websocket.send_json(await sub.queue.get())
+
+    tasks = [asyncio.create_task(reader()), asyncio.create_task(writer())]
+    try:
+        done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                logging.warning("Quote stream closed: %s", exc)
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(sub)
+
+
+@router.get("/api/stream/quotes")
+async def quotes_sse(symbols: str = Query("")):
+    """Server-Sent Events variant of ``/ws/quotes`` for ``EventSource`` clients."""
+
+    sub = hub.subscribe(_parse_symbols(symbols))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {msg['type']}\ndata: {json.dumps(msg)}\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/api/metrics/stream")
+def stream_metrics() -> Dict[str, Any]:
+    """Subscriber count and poll/message counters for the push channel."""
+
+    return hub.stats()
+
+
+__all__ = ["QuoteHub", "Subscriber", "hub", "router"]
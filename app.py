@@ -8,9 +8,9 @@ from backend.app import models, crud, schemas
 import backend.app.security as security
 from backend.app import risk
 import pyotp
-from backend.app import signals, backtest, alerts
+from backend.app import signals, backtest, alerts, optimizer
 from backend.app.signals import format_price, fetch_unusual_whales
-from backend.app.quotes import fetch_latest_price
+from backend.app.quotes import fetch_latest_price, fetch_quotes, quote_stats
 from datetime import datetime
 import json
 from fastapi import Request
@@ -20,23 +20,28 @@ import os
 # simple in-memory alert store
 LATEST_ALERT = {"id": 0, "ticker": "AAPL", "price": 0.0}
 
-from fastapi.responses import HTMLResponse, RedirectResponse, Response, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import yfinance as yf
-import requests
 from macmarket import strategy_tester as st
 import pandas as pd
 import asyncio
 import httpx
-from cachetools import TTLCache
+from backend.app.cache import TTLCache, cache_stats
+from backend.app.upstream import upstream
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from api.haco import router as haco_router
+from api.concurrency import executor_stats, route_guard
 from api import qq_routes
+from api import stream
 from apscheduler.schedulers.background import BackgroundScheduler
 from zoneinfo import ZoneInfo
 from api import portfolio_engine
+from backend.app.rankings import RANKINGS_REFRESH_SECONDS
+from services import event_store
 
 load_dotenv()
 
@@ -44,7 +49,18 @@ load_dotenv()
 NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "300"))
 POLITICAL_CACHE_TTL = int(os.getenv("POLITICAL_CACHE_TTL", "300"))
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Keep pooled upstream HTTP clients open for the life of the app."""
+    upstream.open()
+    try:
+        yield
+    finally:
+        await upstream.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # include alerts routes (per-alert CRUD & worker)
 try:
@@ -60,22 +76,43 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     templates = None
 
-# Initialize caches only if TTL > 0 so caching can be disabled via env vars
-political_cache = TTLCache(maxsize=1, ttl=POLITICAL_CACHE_TTL) if POLITICAL_CACHE_TTL > 0 else None
-news_cache = TTLCache(maxsize=2, ttl=NEWS_CACHE_TTL) if NEWS_CACHE_TTL > 0 else None
-quiver_cache = TTLCache(maxsize=10, ttl=300)
+# A TTL <= 0 disables a cache (lookups miss, nothing stored) via env vars
+political_cache = TTLCache(maxsize=1, ttl=POLITICAL_CACHE_TTL, name="political")
+news_cache = TTLCache(maxsize=2, ttl=NEWS_CACHE_TTL, name="news")
+quiver_cache = TTLCache(maxsize=64, ttl=300, name="quiver")
 
 # Scheduler for QuiverQuant tasks
 scheduler = BackgroundScheduler(timezone=ZoneInfo("America/Indiana/Indianapolis"))
 scheduler.add_job(qq_routes.ingest_latest, "cron", day_of_week="mon", hour=9, minute=10)
 scheduler.add_job(portfolio_engine.run_rebalances_for_unprocessed, "cron", day_of_week="mon", hour=9, minute=15)
 scheduler.add_job(portfolio_engine.materialize_nav_positions, "cron", hour=18, minute=30)
+if signals.watchlist_rankings.background:
+    # precompute watchlist rankings off the request path; first run at startup
+    scheduler.add_job(
+        signals.refresh_watchlist_rankings,
+        "interval",
+        seconds=RANKINGS_REFRESH_SECONDS,
+        next_run_time=datetime.now(ZoneInfo("America/Indiana/Indianapolis")),
+        max_instances=1,
+        coalesce=True,
+    )
+if not event_store.EVENT_STORE_OFFLINE:
+    # keep the local Quiver event store current; readers only sync feeds this job left stale
+    scheduler.add_job(
+        event_store.sync_all,
+        "interval",
+        seconds=event_store.EVENT_SYNC_SECONDS,
+        max_instances=1,
+        coalesce=True,
+    )
 scheduler.start()
 
 # Include HACO routes EARLY to avoid shadowing
 app.include_router(haco_router)
 # Other dynamic routes
 app.include_router(qq_routes.router, prefix="")
+# Quote/HACO/alert push channel (/ws/quotes, /api/stream/quotes)
+app.include_router(stream.router)
 
 # Directories for static assets
 FRONTEND_DIR = Path(__file__).resolve().parent / "frontend"
@@ -169,30 +206,33 @@ def index():
 
 
 @app.get("/api/ticker")
+async def ticker(symbols: str):
+    """Return basic market data for given comma separated tickers."""
+    return await route_guard("ticker").call(ticker_data, symbols)
+
+
 def ticker_data(symbols: str):
     """Return basic market data for given comma separated tickers."""
-    tickers = symbols.split(",")
+    tickers = [s.strip() for s in symbols.split(",") if s.strip()]
+    quotes = fetch_quotes(tickers)
     data = []
     for symbol in tickers:
-        try:
-            t = yf.Ticker(symbol)
-            info = t.info
-            price = info.get("regularMarketPrice")
-            change = info.get("regularMarketChangePercent")
-            if price is None or change is None:
-                hist = t.history(period="2d")
-                if not hist.empty:
-                    price = float(hist["Close"].iloc[-1])
-                    prev = float(hist["Close"].iloc[-2]) if len(hist) > 1 else price
-                    change = (price - prev) / prev * 100 if prev else 0
-            price = format_price(price) if price is not None else None
-            data.append({"symbol": symbol, "price": price, "change_percent": change})
-        except Exception:
-            data.append({"symbol": symbol, "price": None, "change_percent": None})
+        quote = quotes.get(symbol.upper()) or {}
+        price = quote.get("price")
+        data.append({
+            "symbol": symbol,
+            "price": format_price(price) if price is not None else None,
+            "change_percent": quote.get("change_percent"),
+        })
     return {"data": data}
 
 
 @app.get("/api/history")
+async def history(symbol: str, period: str = "1mo", interval: str = "1d"):
+    """Return historical close prices for a symbol."""
+    return await route_guard("history").call(price_history, symbol, period, interval)
+
+
 def price_history(symbol: str, period: str = "1mo", interval: str = "1d"):
     """Return historical close prices for a symbol."""
     try:
@@ -219,6 +259,11 @@ def current_price(symbol: str):
 
 
 @app.get("/api/quote/{symbol}")
+async def quote_endpoint(symbol: str):
+    """Return basic quote information for a symbol."""
+    return await route_guard("quote").call(quote, symbol)
+
+
 def quote(symbol: str):
     """Return basic quote information for a symbol."""
     try:
@@ -240,26 +285,26 @@ def quote(symbol: str):
 @app.get("/api/news")
 async def news(age: str = "week"):
     """Fetch finance and world news articles from multiple sources."""
-    if news_cache is not None and age in news_cache:
-        return news_cache[age]
+    return await news_cache.aget_or_compute(age, lambda: _fetch_news(age))
+
 
+async def _fetch_news(age: str) -> dict:
     market: list[dict] = []
     world: list[dict] = []
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        hn_task = client.get(
-            "https://hn.algolia.com/api/v1/search",
-            params={"query": "market", "tags": "story"},
-        )
-        rss_urls = [
-            ("https://feeds.foxnews.com/foxnews/business", market),
-            ("https://www.bloomberg.com/feed/podcast/etf-report.xml", market),
-            ("https://feeds.foxbusiness.com/foxbusiness/markets", market),
-            ("https://rss.nytimes.com/services/xml/rss/nyt/World.xml", world),
-            ("https://feeds.bbci.co.uk/news/world/rss.xml", world),
-        ]
-        rss_tasks = [client.get(url) for url, _ in rss_urls]
-        responses = await asyncio.gather(hn_task, *rss_tasks, return_exceptions=True)
+    hn_task = upstream.aget(
+        "https://hn.algolia.com/api/v1/search",
+        params={"query": "market", "tags": "story"},
+    )
+    rss_urls = [
+        ("https://feeds.foxnews.com/foxnews/business", market),
+        ("https://www.bloomberg.com/feed/podcast/etf-report.xml", market),
+        ("https://feeds.foxbusiness.com/foxbusiness/markets", market),
+        ("https://rss.nytimes.com/services/xml/rss/nyt/World.xml", world),
+        ("https://feeds.bbci.co.uk/news/world/rss.xml", world),
+    ]
+    rss_tasks = [upstream.aget(url) for url, _ in rss_urls]
+    responses = await asyncio.gather(hn_task, *rss_tasks, return_exceptions=True)
 
     hn_resp = responses[0]
     if isinstance(hn_resp, httpx.Response) and hn_resp.status_code == 200:
@@ -317,35 +362,32 @@ async def news(age: str = "week"):
         market[:] = filter_articles(market, days=days)
         world[:] = filter_articles(world, days=days)
 
-    result = {"market": market, "world": world}
-    if news_cache is not None:
-        news_cache[age] = result
-    return result
+    return {"market": market, "world": world}
 
 
 @app.get("/api/political")
 async def political():
     """Fetch trading data from political/congressional sources."""
-    if political_cache is not None and "data" in political_cache:
-        return political_cache["data"]
+    return await political_cache.aget_or_compute("data", _fetch_political)
+
 
+async def _fetch_political() -> dict:
     data = {"quiver": [], "whales": [], "capitol": []}
 
     quiver_headers = {"Authorization": f"Bearer {os.getenv('QUIVER_API_KEY')}"} if os.getenv("QUIVER_API_KEY") else {}
     whales_headers = {"Authorization": f"Bearer {os.getenv('WHALES_API_KEY')}"} if os.getenv("WHALES_API_KEY") else {}
     capitol_headers = {"Authorization": f"Bearer {os.getenv('CAPITOL_API_KEY')}"} if os.getenv("CAPITOL_API_KEY") else {}
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        tasks = [
-            client.get("https://api.quiverquant.com/beta/live/congresstrading", headers=quiver_headers),
-            client.get("https://api.unusualwhales.com/congress/trades", headers=whales_headers),
-            client.get(
-                "https://api.capitoltrades.com/trades",
-                headers=capitol_headers,
-                params={"limit": 5},
-            ),
-        ]
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [
+        upstream.aget("https://api.quiverquant.com/beta/live/congresstrading", headers=quiver_headers),
+        upstream.aget("https://api.unusualwhales.com/congress/trades", headers=whales_headers),
+        upstream.aget(
+            "https://api.capitoltrades.com/trades",
+            headers=capitol_headers,
+            params={"limit": 5},
+        ),
+    ]
+    responses = await asyncio.gather(*tasks, return_exceptions=True)
 
     quiver_resp, whales_resp, capitol_resp = responses
 
@@ -367,9 +409,6 @@ async def political():
         except Exception:
             pass
 
-    if political_cache is not None:
-        political_cache["data"] = data
-
     return data
 
 
@@ -378,10 +417,9 @@ async def quiver_risk(symbols: str):
     """Return Quiver risk factors for the given symbols."""
     syms = [s.strip() for s in symbols.split(",") if s.strip()]
     key = tuple(sorted(syms))
-    if key in quiver_cache:
-        return {"risk": quiver_cache[key]}
-    data = signals.get_risk_factors(syms)
-    quiver_cache[key] = data
+    data = await quiver_cache.aget_or_compute(
+        key, lambda: route_guard("quiver").call(signals.get_risk_factors, syms)
+    )
     return {"risk": data}
 
 
@@ -389,10 +427,9 @@ async def quiver_risk(symbols: str):
 async def quiver_whales(limit: int = 5):
     """Return recent whale moves from Quiver."""
     key = f"whales-{limit}"
-    if key in quiver_cache:
-        return {"whales": quiver_cache[key]}
-    data = signals.get_whale_moves(limit)
-    quiver_cache[key] = data
+    data = await quiver_cache.aget_or_compute(
+        key, lambda: route_guard("quiver").call(signals.get_whale_moves, limit)
+    )
     return {"whales": data}
 
 
@@ -401,10 +438,9 @@ async def quiver_political(symbols: str):
     """Return counts of recent congressional trades for the given symbols."""
     syms = [s.strip() for s in symbols.split(",") if s.strip()]
     key = ("political",) + tuple(sorted(syms))
-    if key in quiver_cache:
-        return {"political": quiver_cache[key]}
-    data = signals.get_political_moves(syms)
-    quiver_cache[key] = data
+    data = await quiver_cache.aget_or_compute(
+        key, lambda: route_guard("quiver").call(signals.get_political_moves, syms)
+    )
     return {"political": data}
 
 
@@ -413,27 +449,26 @@ async def quiver_lobby(symbols: str):
     """Return counts of recent lobbying disclosures for the given symbols."""
     syms = [s.strip() for s in symbols.split(",") if s.strip()]
     key = ("lobby",) + tuple(sorted(syms))
-    if key in quiver_cache:
-        return {"lobby": quiver_cache[key]}
-    data = signals.get_lobby_disclosures(syms)
-    quiver_cache[key] = data
+    data = await quiver_cache.aget_or_compute(
+        key, lambda: route_guard("quiver").call(signals.get_lobby_disclosures, syms)
+    )
     return {"lobby": data}
 
 
 @app.get("/api/panorama")
 async def panorama(symbols: str = "AAPL,MSFT,GOOGL,AMZN,TSLA,SPY,QQQ,GLD,BTC-USD,ETH-USD", limit: int = 5):
     """Return aggregated market data used by the dashboard."""
-    market = ticker_data(symbols)["data"]
-
+    market_task = route_guard("ticker").call(ticker_data, symbols)
     alerts_task = fetch_unusual_whales(limit=limit)
     political_task = political()
     risk_task = quiver_risk(symbols)
     whales_task = quiver_whales(limit=limit)
     news_task = news()
 
-    alerts, political_data, risk_resp, whales_resp, news_data = await asyncio.gather(
-        alerts_task, political_task, risk_task, whales_task, news_task
+    market_resp, alerts, political_data, risk_resp, whales_resp, news_data = await asyncio.gather(
+        market_task, alerts_task, political_task, risk_task, whales_task, news_task
     )
+    market = market_resp["data"]
     risk = risk_resp["risk"]
     whales = whales_resp["whales"]
     return {
@@ -755,9 +790,10 @@ def read_journal(
     """Return journal entries with optional recommendations."""
     entries = crud.get_journal_entries(db, user_id)
     if include_recs:
+        # one coalesced pass over the distinct symbols, not one per entry
+        recs = signals.recommend_symbols([e.symbol for e in entries])
         for e in entries:
-            recs = signals.generate_recommendations([e.symbol])
-            e.recommendation = recs[0] if recs else None
+            e.recommendation = recs.get(e.symbol)
     else:
         for e in entries:
             e.recommendation = None
@@ -800,14 +836,102 @@ def signal_rankings(format: str = "json"):
 def macro_signal(data: dict):
     return signals.macro_llm_signal(data.get("text", ""))
 
+BACKTEST_MAX_SYMBOLS = int(os.getenv("BACKTEST_MAX_SYMBOLS", "1000"))
+
+
+@app.post("/api/backtest")
+async def run_universe_backtest(payload: dict):
+    """Backtest a watchlist (``symbols``) or a mode universe (``mode``) in one vectorized run."""
+    symbols = payload.get("symbols") or signals._mode_universe(payload.get("mode") or "swing")
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols if str(s).strip()))
+    if len(symbols) > BACKTEST_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"at most {BACKTEST_MAX_SYMBOLS} symbols")
+    try:
+        fast = int(payload.get("fast", 20))
+        slow = int(payload.get("slow", 50))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="fast/slow must be integers")
+    if not 0 < fast < slow:
+        raise HTTPException(status_code=400, detail="need 0 < fast < slow")
+    return await route_guard("backtest").call(
+        backtest.universe_backtest,
+        symbols,
+        payload.get("start", "2023-01-01"),
+        payload.get("end"),
+        fast=fast,
+        slow=slow,
+        include_trades=bool(payload.get("include_trades", False)),
+        include_equity=bool(payload.get("include_equity", False)),
+    )
+
+
+OPTIMIZER_MAX_COMBINATIONS = int(os.getenv("OPTIMIZER_MAX_COMBINATIONS", "5000"))
+
+
+@app.post("/api/backtest/sweep", status_code=202)
+async def run_parameter_sweep(payload: dict):
+    """Queue a grid search of ``sma`` or ``haco`` parameters over a watchlist.
+
+    Sweeps can run for minutes, so this answers ``202`` with a job id at
+    once; poll ``GET /api/backtest/sweep/{job_id}`` for the ranked result.
+    """
+    symbols = payload.get("symbols") or signals._mode_universe(payload.get("mode") or "swing")
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols if str(s).strip()))
+    if len(symbols) > BACKTEST_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"at most {BACKTEST_MAX_SYMBOLS} symbols")
+    grid = payload.get("grid") or {}
+    if not isinstance(grid, dict):
+        raise HTTPException(status_code=400, detail="grid must map parameter names to values")
+    try:
+        job = optimizer.jobs.submit(
+            str(payload.get("strategy", "sma")).lower(),
+            grid,
+            symbols,
+            payload.get("start", "2023-01-01"),
+            payload.get("end"),
+            sort=payload.get("sort", "sharpe"),
+            top=int(payload["top"]) if payload.get("top") else None,
+            folds=int(payload.get("folds", 0)),
+            anchored=bool(payload.get("anchored", False)),
+            max_combinations=OPTIMIZER_MAX_COMBINATIONS,
+        )
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return job.to_dict()
+
+
+@app.get("/api/backtest/sweep/{job_id}")
+def get_parameter_sweep(job_id: str):
+    """Status of a queued sweep, with its ranked ``result`` once it is ``done``."""
+    job = optimizer.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="sweep not found")
+    return job.to_dict()
+
+
+@app.delete("/api/backtest/sweep/{job_id}")
+def cancel_parameter_sweep(job_id: str):
+    """Cancel a queued or running sweep; its worker processes stop at the next combination."""
+    job = optimizer.jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="sweep not found")
+    return job.to_dict()
+
+
 @app.get("/api/backtest/{symbol}")
-def run_backtest(symbol: str, start: str = "2023-01-01", end: str | None = None):
+async def run_backtest(symbol: str, start: str = "2023-01-01", end: str | None = None):
     """Run a backtest for the given symbol and return results."""
-    return backtest.sma_crossover_backtest(symbol, start=start, end=end)
+    return await route_guard("backtest").call(backtest.sma_crossover_backtest, symbol, start=start, end=end)
 
 
 @app.post("/api/backtest/{symbol}", response_model=schemas.BacktestRun)
-def save_backtest(
+async def save_backtest(
     symbol: str,
     start: str = "2023-01-01",
     end: str | None = None,
@@ -815,10 +939,15 @@ def save_backtest(
     db: Session = Depends(get_db),
 ):
     """Run a backtest and save the result for later comparison."""
-    res = backtest.sma_crossover_backtest(symbol, start=start, end=end)
-    run = crud.create_backtest_run(db, symbol, start, end or datetime.utcnow().strftime("%Y-%m-%d"), res["metrics"], user_id)
-    run.metrics = res["metrics"]  # convert JSON string back
-    return run
+
+    def run_and_save():
+        res = backtest.sma_crossover_backtest(symbol, start=start, end=end)
+        run = crud.create_backtest_run(db, symbol, start, end or datetime.utcnow().strftime("%Y-%m-%d"), res["metrics"], user_id)
+        run.metrics = res["metrics"]  # convert JSON string back
+        return run
+
+    # the DB write is blocking too; keep it off the event loop with the backtest
+    return await route_guard("backtest").call(run_and_save)
 
 
 @app.get("/api/backtests", response_model=list[schemas.BacktestRun])
@@ -839,13 +968,32 @@ def list_strategy_keys():
 
 @app.post("/strategy-test/run")
 def run_strategy(payload: dict):
+    """Run one ``strategy``, or a batch (``strategies`` list or ``"all"``) over one price matrix."""
     strategy = payload.get("strategy")
+    batch = payload.get("strategies")
     user_id = payload.get("user_id")
-    if not strategy or user_id is None:
+    if not (strategy or batch) or user_id is None:
         raise HTTPException(status_code=400, detail="missing params")
-    metrics = st.run_strategy(strategy)
-    st.record_run(int(user_id), strategy, payload.get("params", {}), metrics)
-    return metrics
+    if batch is None and strategy != "all":
+        try:
+            metrics = st.run_strategy(strategy)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if "error" in metrics:
+            raise HTTPException(status_code=502, detail=metrics["error"])
+        st.record_run(int(user_id), strategy, payload.get("params", {}), metrics)
+        return metrics
+    names = None if batch in (None, "all") else batch
+    try:
+        start = datetime.strptime(payload["start"], "%Y-%m-%d").date() if payload.get("start") else None
+        end = datetime.strptime(payload["end"], "%Y-%m-%d").date() if payload.get("end") else None
+        results = st.run_strategies(names, start=start, end=end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    for name, metrics in results.items():
+        if "error" not in metrics:
+            st.record_run(int(user_id), name, payload.get("params", {}), metrics)
+    return {"results": results}
 
 
 @app.get("/strategy-test/history")
@@ -861,26 +1009,77 @@ async def latest_alert():
 
 
 @app.post("/api/signals/alert")
-def update_alert(alert: dict):
-    """Update the latest trading alert."""
+async def update_alert(alert: dict):
+    """Update the latest trading alert and push it to stream subscribers."""
     global LATEST_ALERT
     LATEST_ALERT = {
         "id": int(alert.get("id", LATEST_ALERT["id"] + 1)),
         "ticker": alert.get("ticker", LATEST_ALERT.get("ticker")),
         "price": float(alert.get("price", LATEST_ALERT.get("price", 0.0))),
     }
+    stream.hub.publish_alert(LATEST_ALERT)
     return {"status": "ok"}
 
 
 @app.get("/api/signals/{symbol}")
-def get_signals(symbol: str, mode: str = "swing"):
+async def get_signals(symbol: str, mode: str = "swing"):
     import re
     if not re.fullmatch(r"[A-Za-z0-9\-.]{1,15}", symbol):
         return {"error": "invalid_symbol"}
-    payload = signals.compute_signals(symbol, mode=mode)
-    payload["news"] = signals.news_sentiment_signal(symbol)
-    payload["technical"] = signals.technical_indicator_signal(symbol)
-    return payload
+    # technical reads the bars compute_signals just loaded, so it runs after it
+    (payload, technical), news_signal = await route_guard("signals").call_many(
+        lambda: (signals.compute_signals(symbol, mode=mode), signals.technical_indicator_signal(symbol)),
+        lambda: signals.news_sentiment_signal(symbol),
+    )
+    payload["news"] = news_signal
+    payload["technical"] = technical
+    # payload is plain Python types already; skip jsonable_encoder's per-item walk
+    return JSONResponse(payload)
+
+
+@app.get("/api/metrics/executor")
+def executor_metrics():
+    """Queue depth of the blocking executor and per-route guard counters."""
+    return executor_stats()
+
+
+@app.get("/api/metrics/cache")
+def cache_metrics():
+    """Hit/miss/eviction counters for the in-process caches."""
+    return cache_stats()
+
+
+@app.get("/api/metrics/upstream")
+def upstream_metrics():
+    """Per-host request, retry, error and latency counters for upstream APIs."""
+    return upstream.stats()
+
+
+@app.get("/api/metrics/quotes")
+def quote_metrics():
+    """Quote cache hit ratio and upstream batch counts."""
+    return quote_stats()
+
+
+@app.get("/api/watchlist/rankings")
+def get_watchlist_rankings(mode: str = "swing"):
+    """Latest precomputed ranking for ``mode`` and how old it is."""
+    canonical_mode, _profile = signals._get_mode_profile(mode)
+    snapshot = signals.watchlist_rankings.get(canonical_mode)
+    return {
+        "mode": canonical_mode,
+        "ranking": snapshot.ranking if snapshot else [],
+        "age_seconds": round(snapshot.age, 1) if snapshot else None,
+        "computed_at": snapshot.computed_at if snapshot else None,
+        "status": signals.watchlist_rankings.status(),
+    }
+
+
+@app.get("/api/watchlist/panels")
+async def get_watchlist_panels(mode: str = "swing", symbols: str | None = None):
+    """Readiness panels for every watchlist symbol from one batched computation."""
+    syms = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+    return await route_guard("signals").call(signals.watchlist_panels, syms, mode)
 
 
 @app.get("/api/watchlist")
@@ -895,7 +1094,7 @@ def crypto(limit: int = 5):
     endpoint = os.getenv("COINGECKO_ENDPOINT", "https://api.coingecko.com/api/v3")
     url = f"{endpoint}/coins/markets"
     try:
-        r = requests.get(
+        r = upstream.get(
             url,
             params={
                 "vs_currency": "usd",
@@ -926,7 +1125,7 @@ def macro():
         "limit": 12,
     }
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = upstream.get(url, params=params, timeout=10)
         if r.ok:
             data = r.json().get("observations", [])
             return {"data": data}
@@ -1,60 +1,328 @@
-"""Very small backtesting utilities."""
+"""Very small backtesting utilities.
+
+:func:`run_backtest` is the engine: it takes a close-price matrix (dates x
+symbols) and a signal matrix of the same shape (1 long, -1 short, 0 flat)
+and computes positions, returns, equity curves, trades and metrics for
+every column at once.  Signals act on the next bar (``position`` is the
+signal shifted one bar), matching the original single-symbol backtest.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
+
+from indicators.common import sma_array
+from services.bar_store import adjust_prices, get_bars, get_bars_many
+
+
+def _metric_arrays(dates: pd.DatetimeIndex, strategy_returns: np.ndarray, equity: np.ndarray, valid: np.ndarray) -> dict:
+    """Total return, CAGR, max drawdown and Sharpe for every column of ``(dates, symbols)`` arrays."""
+
+    n_dates, n_cols = equity.shape
+    if n_dates == 0:
+        empty = np.full(n_cols, np.nan)
+        return {"total_return": empty, "cagr": empty, "max_drawdown": empty, "sharpe": empty,
+                "has_data": np.zeros(n_cols, dtype=bool)}
+    has = valid.any(axis=0)
+    first = np.argmax(valid, axis=0)
+    last = n_dates - 1 - np.argmax(valid[::-1], axis=0)
+    cols = np.arange(n_cols)
+    final = np.where(has, equity[last, cols], np.nan)
+
+    day = dates.values.astype("datetime64[D]").astype(np.int64)
+    days = day[last] - day[first]
+    years = np.where(days > 0, days / 365.25, 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = final ** (1 / years) - 1
+        drawdown = equity / np.fmax.accumulate(np.where(valid, equity, np.nan), axis=0) - 1
+    # the nan-reductions warn on empty columns (errstate does not cover
+    # that), so reduce only over columns with enough rows
+    max_dd = np.full(n_cols, np.nan)
+    max_dd[has] = np.nanmin(np.where(valid, drawdown, np.nan)[:, has], axis=0)
+    masked = np.where(valid, strategy_returns, np.nan)
+    mean = np.full(n_cols, np.nan)
+    mean[has] = np.nanmean(masked[:, has], axis=0)
+    spread = valid.sum(axis=0) > 1
+    std = np.full(n_cols, np.nan)
+    std[spread] = np.nanstd(masked[:, spread], axis=0, ddof=1)
+    sharpe = np.where(np.nan_to_num(std) != 0, np.sqrt(252) * mean / np.where(std != 0, std, 1.0), 0.0)
+    return {
+        "total_return": final - 1,
+        "cagr": cagr,
+        "max_drawdown": max_dd,
+        "sharpe": sharpe,
+        "has_data": has,
+    }
+
+
+def _round_metrics(arrays: dict, col: int) -> dict:
+    if not arrays["has_data"][col]:
+        return {}
+    return {
+        "total_return": round(float(arrays["total_return"][col]), 4),
+        "cagr": round(float(arrays["cagr"][col]), 4),
+        "max_drawdown": round(float(arrays["max_drawdown"][col]), 4),
+        "sharpe": round(float(arrays["sharpe"][col]), 2),
+    }
 
 
 def _performance_metrics(df: pd.DataFrame) -> dict:
     df = df.dropna(subset=["strategy_return"])
-    total_return = df["equity"].iloc[-1] - 1
-    days = (df.index[-1] - df.index[0]).days
-    years = days / 365.25 if days else 1
-    cagr = df["equity"].iloc[-1] ** (1 / years) - 1
-    roll_max = df["equity"].cummax()
-    drawdown = df["equity"] / roll_max - 1
-    max_dd = drawdown.min()
-    sharpe = (
-        np.sqrt(252) * df["strategy_return"].mean() / df["strategy_return"].std()
-        if df["strategy_return"].std() != 0
-        else 0
+    sr = df["strategy_return"].to_numpy(dtype=float)[:, None]
+    eq = df["equity"].to_numpy(dtype=float)[:, None]
+    arrays = _metric_arrays(pd.DatetimeIndex(df.index), sr, eq, np.ones_like(sr, dtype=bool))
+    return _round_metrics(arrays, 0)
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """Per-column positions, returns and equity of one :func:`run_backtest` call."""
+
+    dates: pd.DatetimeIndex
+    symbols: list[str]
+    prices: np.ndarray  # (dates, symbols), NaN outside each symbol's history
+    signals: np.ndarray
+    positions: np.ndarray
+    returns: np.ndarray
+    strategy_returns: np.ndarray
+    equity: np.ndarray
+    valid: np.ndarray
+
+    def metric_arrays(self) -> dict:
+        return _metric_arrays(self.dates, self.strategy_returns, self.equity, self.valid)
+
+    def metrics(self) -> dict[str, dict]:
+        arrays = self.metric_arrays()
+        return {sym: _round_metrics(arrays, j) for j, sym in enumerate(self.symbols)}
+
+    def trades(self) -> dict[str, list[dict]]:
+        """Signal changes to a non-flat state, per symbol (``buy``/``sell`` at that close)."""
+
+        prev = np.vstack([np.zeros((1, self.signals.shape[1])), self.signals[:-1]])
+        change = (self.signals != prev) & (self.signals != 0)
+        cols, rows = np.nonzero(change.T)  # grouped by symbol, in date order
+        labels = self.dates.strftime("%Y-%m-%d")
+        out: dict[str, list[dict]] = {sym: [] for sym in self.symbols}
+        for j, i in zip(cols.tolist(), rows.tolist()):
+            out[self.symbols[j]].append({
+                "date": labels[i],
+                "action": "buy" if self.signals[i, j] > 0 else "sell",
+                "price": float(self.prices[i, j]),
+            })
+        return out
+
+    def trade_counts(self) -> dict[str, int]:
+        return dict(zip(self.symbols, entry_counts(self.signals).tolist()))
+
+    def equity_curves(self) -> dict[str, list[dict]]:
+        labels = self.dates.strftime("%Y-%m-%d").tolist()
+        out = {}
+        for j, sym in enumerate(self.symbols):
+            rows = np.flatnonzero(self.valid[:, j])
+            out[sym] = [{"date": labels[i], "value": v} for i, v in zip(rows.tolist(), self.equity[rows, j].tolist())]
+        return out
+
+    def portfolio_equity(self) -> np.ndarray:
+        """Equal-weight, daily-rebalanced equity over the symbols trading each day."""
+
+        return np.cumprod(1 + portfolio_returns(self.strategy_returns, self.valid))
+
+
+def portfolio_returns(strategy_returns: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Equal-weight daily return over the symbols with a bar on each date."""
+
+    live = valid.sum(axis=-1)
+    return np.where(valid, strategy_returns, 0.0).sum(axis=-1) / np.maximum(live, 1)
+
+
+def entry_counts(signals: np.ndarray) -> np.ndarray:
+    """Signal changes to a non-flat state per column (the rows of :meth:`BacktestResult.trades`)."""
+
+    prev = shift_signals(signals)
+    return ((signals != prev) & (signals != 0)).sum(axis=0)
+
+
+def bar_returns(close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``(valid, returns)`` of a ``(dates, symbols)`` close matrix.
+
+    Returns are close-to-close against the last known price, so gaps inside
+    a history are flat; rows without a bar return 0.
+    """
+
+    valid = ~np.isnan(close)
+    last_px = pd.DataFrame(close).ffill().to_numpy()
+    prev_px = np.vstack([np.full((1, close.shape[1]), np.nan), last_px[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.where(valid, close / prev_px - 1, 0.0)
+    return valid, np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def shift_signals(sig: np.ndarray) -> np.ndarray:
+    """Positions held on each bar: the previous bar's signal (flat on the first)."""
+
+    return np.vstack([np.zeros((1, sig.shape[1])), sig[:-1]]) if len(sig) else sig
+
+
+def run_backtest(
+    prices: pd.DataFrame,
+    signals: pd.DataFrame | np.ndarray,
+) -> BacktestResult:
+    """Backtest every column of ``prices`` (dates x symbols) against ``signals``.
+
+    ``signals`` holds the desired exposure per bar (any real number; 1/-1/0
+    for long/short/flat).  The position on a bar is the previous bar's
+    signal, the bar return is the close-to-close change, and equity
+    compounds the strategy returns from each symbol's first price.
+    """
+
+    close = prices.to_numpy(dtype=float)
+    sig = np.nan_to_num(np.asarray(signals, dtype=float))
+    if sig.shape != close.shape:
+        raise ValueError(f"signals shape {sig.shape} does not match prices {close.shape}")
+    valid, returns = bar_returns(close)
+    positions = shift_signals(sig)
+    strategy_returns = positions * returns
+    equity = np.cumprod(1 + np.where(valid, strategy_returns, 0.0), axis=0)
+    return BacktestResult(
+        dates=pd.DatetimeIndex(prices.index),
+        symbols=[str(c) for c in prices.columns],
+        prices=close,
+        signals=sig,
+        positions=positions,
+        returns=returns,
+        strategy_returns=strategy_returns,
+        equity=equity,
+        valid=valid,
     )
-    return {
-        "total_return": round(float(total_return), 4),
-        "cagr": round(float(cagr), 4),
-        "max_drawdown": round(float(max_dd), 4),
-        "sharpe": round(float(sharpe), 2),
+
+
+def sma_crossover_signals(prices: pd.DataFrame, fast: int = 20, slow: int = 50) -> np.ndarray:
+    """1 where the fast SMA is above the slow one, -1 below, 0 in the warm-up.
+
+    Averages run over each symbol's own bars: the NaN rows a shared calendar
+    adds (another market's trading days) are packed out before the SMA and
+    hold the previous signal afterwards.
+    """
+
+    close = prices.to_numpy(dtype=float)
+    order, valid = own_bar_order(close)
+    packed = pack_own_bars(close, order)
+    fast_ma = sma_array(packed, fast)
+    slow_ma = sma_array(packed, slow)
+    return unpack_signals(crossover(fast_ma, slow_ma), order, valid)
+
+
+def crossover(fast_ma: np.ndarray, slow_ma: np.ndarray) -> np.ndarray:
+    """1 where ``fast_ma`` is above ``slow_ma``, -1 below, 0 otherwise (ties, warm-up)."""
+
+    return np.where(fast_ma > slow_ma, 1.0, np.where(fast_ma < slow_ma, -1.0, 0.0))
+
+
+def own_bar_order(close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Row order packing each column's bars after its NaN rows, and the valid mask.
+
+    The sort is stable, so every symbol keeps its bars in date order.
+    """
+
+    valid = ~np.isnan(close)
+    return np.argsort(valid, axis=0, kind="stable"), valid
+
+
+def pack_own_bars(matrix: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """``(dates, symbols)`` matrix as ``(symbols, bars)`` rows for the kernels."""
+
+    return np.take_along_axis(matrix, order, axis=0).T
+
+
+def unpack_signals(packed: np.ndarray, order: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Scatter ``(symbols, bars)`` signals back to dates; rows without a bar hold the last signal."""
+
+    sig = np.empty(valid.shape)
+    np.put_along_axis(sig, order, packed.T, axis=0)
+    sig = pd.DataFrame(np.where(valid, sig, np.nan)).ffill().fillna(0.0)
+    return sig.to_numpy()
+
+
+def price_matrix(symbols: Iterable[str], start: str, end: str | None = None) -> pd.DataFrame:
+    """Split-/dividend-adjusted daily closes for ``symbols`` from one batched read."""
+
+    symbols = [s.upper() for s in dict.fromkeys(symbols)]
+    frames = get_bars_many(symbols, "1d", start=start, end=end)
+    columns = {}
+    for sym in symbols:
+        frame = frames.get(sym)
+        if frame is None or frame.empty:
+            continue
+        close = frame["Close"]
+        if "Adj Close" in frame and not frame["Adj Close"].isna().all():
+            close = frame["Adj Close"].fillna(close)
+        columns[sym] = close
+    if not columns:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    return pd.DataFrame(columns).sort_index().reindex(columns=symbols)
+
+
+def universe_backtest(
+    symbols: Iterable[str],
+    start: str = "2023-01-01",
+    end: str | None = None,
+    *,
+    fast: int = 20,
+    slow: int = 50,
+    include_trades: bool = False,
+    include_equity: bool = False,
+) -> dict:
+    """SMA-crossover backtest of many symbols in one vectorized run."""
+
+    prices = price_matrix(symbols, start, end)
+    result = run_backtest(prices, sma_crossover_signals(prices, fast, slow))
+    metrics = result.metrics()
+    counts = result.trade_counts()
+    out = {
+        "start": start,
+        "end": end,
+        "params": {"fast": fast, "slow": slow},
+        "symbols": {
+            sym: {"metrics": metrics[sym], "trades": counts[sym]} if metrics[sym] else {"error": "no_data"}
+            for sym in result.symbols
+        },
     }
+    if result.symbols and len(result.dates):
+        eq = result.portfolio_equity()
+        frame = pd.DataFrame(
+            {"strategy_return": np.concatenate(([0.0], eq[1:] / eq[:-1] - 1)), "equity": eq},
+            index=result.dates,
+        )
+        out["portfolio"] = {"metrics": _performance_metrics(frame)}
+        if include_equity:
+            labels = result.dates.strftime("%Y-%m-%d").tolist()
+            out["portfolio"]["equity"] = [{"date": d, "value": v} for d, v in zip(labels, eq.tolist())]
+    if include_trades:
+        for sym, trades in result.trades().items():
+            if "metrics" in out["symbols"][sym]:
+                out["symbols"][sym]["trade_list"] = trades
+    if include_equity:
+        for sym, curve in result.equity_curves().items():
+            if "metrics" in out["symbols"][sym]:
+                out["symbols"][sym]["equity"] = curve
+    return out
 
 
 def sma_crossover_backtest(symbol: str, start: str = "2023-01-01", end: str | None = None) -> dict:
     """Run a simple SMA crossover backtest and return trades and metrics."""
     symbol = symbol.upper()
-    df = yf.download(symbol, start=start, end=end, progress=False)
+    df = adjust_prices(get_bars(symbol, "1d", start=start, end=end))
     if df.empty:
         return {"trades": [], "metrics": {}, "equity": []}
 
-    df["sma_20"] = df["Close"].rolling(20).mean()
-    df["sma_50"] = df["Close"].rolling(50).mean()
-    df["signal"] = 0
-    df.loc[df["sma_20"] > df["sma_50"], "signal"] = 1
-    df.loc[df["sma_20"] < df["sma_50"], "signal"] = -1
-    df["position"] = df["signal"].shift(1).fillna(0)
-    df["ret"] = df["Close"].pct_change().fillna(0)
-    df["strategy_return"] = df["position"] * df["ret"]
-    df["equity"] = (1 + df["strategy_return"]).cumprod()
-
-    trades = []
-    prev = 0.0
-    for date, row in df.iterrows():
-        signal = float(row["signal"])
-        if signal != prev and signal != 0:
-            action = "buy" if signal == 1 else "sell"
-            trades.append({"date": date.strftime("%Y-%m-%d"), "action": action, "price": float(row["Close"])})
-        prev = signal
-
-    metrics = _performance_metrics(df)
-    equity = [
-        {"date": d.strftime("%Y-%m-%d"), "value": float(v)} for d, v in zip(df.index, df["equity"])
-    ]
-    return {"trades": trades, "metrics": metrics, "equity": equity}
+    prices = df[["Close"]].rename(columns={"Close": symbol})
+    result = run_backtest(prices, sma_crossover_signals(prices))
+    return {
+        "trades": result.trades()[symbol],
+        "metrics": result.metrics()[symbol],
+        "equity": result.equity_curves()[symbol],
+    }
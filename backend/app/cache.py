@@ -0,0 +1,222 @@
+"""In-process TTL cache shared by the signal, quote and feed endpoints.
+
+Every entry carries its own expiry, so nothing is thrown away before its
+TTL is up, and the cache holds at most ``maxsize`` entries (least recently
+used entries are evicted first).  ``get_or_compute`` / ``aget_or_compute``
+add single-flight protection: concurrent misses for one key wait for a
+single computation instead of each running it.
+
+Each cache counts hits, misses, evictions, expirations and coalesced
+waiters; :func:`cache_stats` reports them for all named caches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+_MISSING = object()
+_REGISTRY: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+
+
+class _Flight:
+    """One in-progress computation that other threads can wait on."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> Any:
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire ``ttl`` seconds after being set.
+
+    A cache built with ``ttl <= 0`` is disabled: lookups always miss and
+    nothing is stored, but single-flight still applies.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str | None = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = float(ttl)
+        self.name = name or f"cache-{id(self):x}"
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._afutures: Dict[Hashable, asyncio.Future] = {}
+        self.hits = self.misses = self.evictions = self.expirations = self.coalesced = 0
+        _REGISTRY[self.name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # -- mapping-style access -------------------------------------------------
+    def _lookup(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return _MISSING
+            expires, value = item
+            if time.monotonic() >= expires:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and time.monotonic() < item[0]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # -- single-flight --------------------------------------------------------
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: float | None = None) -> Any:
+        """Return the cached value or run ``compute`` once for all concurrent callers."""
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.wait()
+        try:
+            flight.value = compute()
+            self.set(key, flight.value, ttl)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    async def aget_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]], ttl: float | None = None
+    ) -> Any:
+        """Async :meth:`get_or_compute`; ``compute`` returns an awaitable."""
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        future = self._afutures.get(key)
+        if future is not None and not future.done():
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._afutures[key] = future
+        try:
+            value = await compute()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            if self._afutures.get(key) is future:
+                del self._afutures[key]
+        self.set(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    # -- metrics --------------------------------------------------------------
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+        }
+
+
+def cached(ttl: float, maxsize: int = 512, name: str | None = None):
+    """Memoize a function in a :class:`TTLCache` keyed by its arguments.
+
+    The wrapper exposes ``cache`` and ``cache_clear()``.
+    """
+
+    def decorator(fn):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl, name=name or f"{fn.__module__}.{fn.__qualname__}")
+
+        @functools.wraps(fn)
+        def wrapped(*args, **kwargs):
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            return cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        wrapped.cache = cache
+        wrapped.cache_clear = cache.clear
+        return wrapped
+
+    return decorator
+
+
+def cache_stats() -> dict[str, dict]:
+    """Counters for every live named cache."""
+
+    return {name: cache.stats() for name, cache in sorted(_REGISTRY.items())}
+
+
+__all__ = ["TTLCache", "cache_stats", "cached"]
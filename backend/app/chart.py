@@ -0,0 +1,120 @@
+"""Columnar candles and the chart payload serializer for compute_signals.
+
+History frames are converted once into :class:`CandleArrays` (one NumPy
+array per field) and every derived chart series (Heikin-Ashi, SMA20/50,
+HACOLT trend, HACO/HACOLT state strips) is computed on those arrays.  The
+JSON-ready lists are written straight from the arrays with ``tolist()``
+instead of per-row ``iterrows``/``_scalar`` calls.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from indicators import haco_ha
+from indicators.common import sma_array
+
+_FIELDS = (("o", "Open"), ("h", "High"), ("l", "Low"), ("c", "Close"), ("v", "Volume"))
+
+
+def _column(history: pd.DataFrame, name: str) -> np.ndarray:
+    col = history.get(name, history.get(name.lower()))
+    if col is None:
+        return np.zeros(len(history))
+    if isinstance(col, pd.DataFrame):  # duplicated / multi-level column
+        col = col.iloc[:, 0]
+    return np.nan_to_num(np.asarray(col, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+@dataclass(frozen=True)
+class CandleArrays:
+    """OHLCV bars as parallel arrays; ``time`` is UTC epoch seconds."""
+
+    time: np.ndarray
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+    v: np.ndarray
+
+    @classmethod
+    def from_frame(cls, history: pd.DataFrame) -> "CandleArrays":
+        if history is None or history.empty:
+            empty = np.zeros(0)
+            return cls(np.zeros(0, dtype=np.int64), empty, empty, empty, empty, empty)
+        idx = pd.DatetimeIndex(history.index)
+        idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+        time = idx.as_unit("ns").asi8 // 1_000_000_000
+        return cls(time, *(_column(history, name) for _key, name in _FIELDS))
+
+    def __len__(self) -> int:
+        return int(self.time.shape[0])
+
+    def records(self) -> list[dict]:
+        """``[{"time", "o", "h", "l", "c", "v"}, ...]`` as plain Python values."""
+
+        keys = ("time", "o", "h", "l", "c", "v")
+        cols = (self.time.tolist(), self.o.tolist(), self.h.tolist(),
+                self.l.tolist(), self.c.tolist(), self.v.tolist())
+        return [dict(zip(keys, row)) for row in zip(*cols)]
+
+
+def _points(times: list, values: np.ndarray, mask: np.ndarray | None = None, decimals: int | None = 4) -> list[dict]:
+    if mask is not None:
+        times = np.asarray(times)[mask].tolist()
+        values = values[mask]
+    vals = (np.round(values, decimals) if decimals is not None else values).tolist()
+    return [{"time": t, "value": v} for t, v in zip(times, vals)]
+
+
+def state_strip(up: np.ndarray, down: np.ndarray) -> np.ndarray:
+    """Map up/down flags to the 100/0 strip (50 when neither holds)."""
+
+    return np.where(up, 100, np.where(down, 0, 50))
+
+
+def chart_payload(candles: CandleArrays, trend: np.ndarray) -> dict:
+    """Chart JSON (candles, HA, SMA/trend overlays, HACO/HACOLT strips)."""
+
+    if not len(candles):
+        return {"candles": [], "heikin_ashi": [], "indicators": {}, "haco": [], "hacolt": []}
+
+    times = candles.time.tolist()
+    ha_o, ha_h, ha_l, ha_c = haco_ha.project_arrays(candles.o, candles.h, candles.l, candles.c)
+    ha_cols = [np.round(a, 4).tolist() for a in (ha_o, ha_h, ha_l, ha_c)]
+    heikin_ashi = [
+        {"time": t, "o": o, "h": h, "l": l, "c": c}
+        for t, o, h, l, c in zip(times, *ha_cols)
+    ]
+
+    sma20 = sma_array(candles.c, 20)
+    sma50 = sma_array(candles.c, 50)
+    indicators = {
+        "sma20": _points(times, sma20, ~np.isnan(sma20)),
+        "sma50": _points(times, sma50, ~np.isnan(sma50)),
+    }
+    if trend.size:
+        aligned = trend[-len(candles):]
+        indicators["trend"] = _points(times[-aligned.shape[0]:], aligned)
+
+    # HACO strip: Heikin-Ashi bar direction (up=100, down=0, doji=50)
+    haco = state_strip(ha_c > ha_o, ha_c < ha_o)
+    # HACOLT strip: trend rising vs previous bar; the first bar is neutral
+    hacolt = np.zeros(0, dtype=int)
+    if trend.size:
+        hacolt = np.where(trend[1:] >= trend[:-1], 100, 0)
+        hacolt = np.concatenate(([50], hacolt))
+
+    return {
+        "candles": candles.records(),
+        "heikin_ashi": heikin_ashi,
+        "indicators": indicators,
+        "haco": _points(times, haco, decimals=None),
+        "hacolt": _points(times[-hacolt.shape[0]:], hacolt, decimals=None) if hacolt.size else [],
+    }
+
+
+__all__ = ["CandleArrays", "chart_payload", "state_strip"]
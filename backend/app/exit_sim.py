@@ -0,0 +1,200 @@
+"""Vectorized exit simulation for many hypothetical entries at once.
+
+Prices for every symbol are aligned into one :class:`PriceMatrix`
+(symbols x trading days).  :func:`simulate_exits` takes whole arrays of
+entries (symbol, entry date, entry price, target, stop, max hold) and
+gathers each entry's forward window from the matrix in one step.  The
+first bar where the running max reaches the target or the running min
+reaches the stop is found with a cumulative max/min and ``argmax``, so
+thousands of entries are scored without a Python loop per bar.
+
+With ``intrabar=True`` the High/Low of each bar can trigger an exit;
+otherwise only the Close counts.  When one bar touches both levels the
+stop wins (the conservative assumption for daily bars).  Entries that hit
+neither level exit at the last close in their window (``"time"``), and
+entries with no bars on or after the entry date get reason ``"no_data"``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+REASONS = np.array(["no_data", "target", "stop", "time"], dtype=object)
+_NO_DATA, _TARGET, _STOP, _TIME = range(4)
+
+
+def _field(frame: pd.DataFrame, name: str) -> pd.Series | None:
+    col = frame.get(name, frame.get(name.lower()))
+    if isinstance(col, pd.DataFrame):
+        col = col.iloc[:, 0]
+    return col
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """Daily closes (and optionally highs/lows) aligned on a shared calendar."""
+
+    symbols: list[str]
+    dates: np.ndarray  # datetime64[D], ascending
+    close: np.ndarray  # (n_symbols, n_dates), NaN where a symbol has no bar
+    high: np.ndarray | None = None
+    low: np.ndarray | None = None
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame]) -> "PriceMatrix":
+        symbols = list(frames)
+        days = []
+        for frame in frames.values():
+            if frame is not None and not frame.empty:
+                idx = pd.DatetimeIndex(frame.index)
+                if idx.tz is not None:
+                    idx = idx.tz_localize(None)
+                days.append(idx.values.astype("datetime64[D]"))
+        dates = np.unique(np.concatenate(days)) if days else np.array([], dtype="datetime64[D]")
+        shape = (len(symbols), len(dates))
+        close = np.full(shape, np.nan)
+        high = np.full(shape, np.nan)
+        low = np.full(shape, np.nan)
+        for row, sym in enumerate(symbols):
+            frame = frames[sym]
+            if frame is None or frame.empty:
+                continue
+            idx = pd.DatetimeIndex(frame.index)
+            if idx.tz is not None:
+                idx = idx.tz_localize(None)
+            cols = np.searchsorted(dates, idx.values.astype("datetime64[D]"))
+            for out, name in ((close, "Close"), (high, "High"), (low, "Low")):
+                values = _field(frame, name)
+                if values is not None:
+                    out[row, cols] = np.asarray(values, dtype=float)
+        return cls(symbols, dates, close, high, low)
+
+    def rows(self, symbols: Sequence[str]) -> np.ndarray:
+        lookup = {s: i for i, s in enumerate(self.symbols)}
+        return np.array([lookup.get(s, -1) for s in symbols], dtype=np.int64)
+
+    def date_index(self, dates: Sequence) -> np.ndarray:
+        """Position of the first bar on or after each date."""
+
+        days = pd.to_datetime(pd.Series(list(dates))).values.astype("datetime64[D]")
+        return np.searchsorted(self.dates, days, side="left")
+
+
+def first_crossing(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    target: np.ndarray,
+    stop: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """First target/stop crossing per row of ``(n_entries, window)`` arrays.
+
+    Returns ``(exit_offset, reason_code, exit_price, valid_bars)``; windows
+    are NaN-padded past each entry's horizon.
+    """
+
+    up = np.fmax.accumulate(np.where(np.isnan(high), -np.inf, high), axis=1)
+    down = np.fmin.accumulate(np.where(np.isnan(low), np.inf, low), axis=1)
+    hit_target = up >= target[:, None]
+    hit_stop = down <= stop[:, None]
+    any_target = hit_target.any(axis=1)
+    any_stop = hit_stop.any(axis=1)
+    width = close.shape[1]
+    t_idx = np.where(any_target, hit_target.argmax(axis=1), width)
+    s_idx = np.where(any_stop, hit_stop.argmax(axis=1), width)
+
+    valid = ~np.isnan(close)
+    has_bars = valid.any(axis=1)
+    # last valid close for time exits
+    last = np.where(has_bars, width - 1 - valid[:, ::-1].argmax(axis=1), 0)
+    last_close = close[np.arange(close.shape[0]), last]
+
+    stop_first = s_idx <= t_idx
+    offset = np.where(stop_first, s_idx, t_idx)
+    reason = np.where(stop_first, _STOP, _TARGET)
+    price = np.where(stop_first, stop, target)
+    no_hit = offset >= width
+    offset = np.where(no_hit, last, offset)
+    reason = np.where(no_hit, _TIME, reason)
+    price = np.where(no_hit, last_close, price)
+    reason = np.where(has_bars, reason, _NO_DATA)
+    return offset, reason, price, has_bars
+
+
+def simulate_exits(
+    prices: PriceMatrix,
+    symbols: Sequence[str],
+    entry_dates: Sequence,
+    entry_prices: Sequence[float],
+    target: Sequence[float] | float,
+    stop: Sequence[float] | float,
+    max_hold: Sequence[int] | int | None = None,
+    *,
+    intrabar: bool = False,
+) -> pd.DataFrame:
+    """Score every entry against ``prices`` in one pass.
+
+    ``target``/``stop`` are absolute price levels (scalars broadcast);
+    ``max_hold`` caps the window in bars (``None`` = all remaining bars).
+    Returns one row per entry with ``exit_date``, ``exit_price``,
+    ``reason`` (``target``/``stop``/``time``/``no_data``), ``bars_held``
+    and ``return_pct``.
+    """
+
+    n = len(symbols)
+    entry_prices = np.asarray(entry_prices, dtype=float)
+    target = np.broadcast_to(np.asarray(target, dtype=float), (n,))
+    stop = np.broadcast_to(np.asarray(stop, dtype=float), (n,))
+    rows = prices.rows(symbols)
+    starts = prices.date_index(entry_dates) if n else np.zeros(0, dtype=np.int64)
+    n_dates = len(prices.dates)
+    if max_hold is None:
+        holds = np.full(n, n_dates, dtype=np.int64)
+    else:
+        holds = np.broadcast_to(np.asarray(max_hold, dtype=np.int64), (n,))
+    width = int(max(1, min(n_dates, holds.max(initial=1))))
+
+    # gather each entry's forward window: (n_entries, width)
+    cols = starts[:, None] + np.arange(width)[None, :]
+    inside = (cols < n_dates) & (np.arange(width)[None, :] < holds[:, None]) & (rows[:, None] >= 0)
+    safe_rows = np.clip(rows, 0, None)[:, None]
+    safe_cols = np.clip(cols, 0, max(n_dates - 1, 0))
+
+    def window(matrix: np.ndarray | None) -> np.ndarray:
+        if matrix is None or not n_dates or not n:
+            return np.full((n, width), np.nan)
+        return np.where(inside, matrix[safe_rows, safe_cols], np.nan)
+
+    close = window(prices.close)
+    if intrabar:
+        high = np.fmax(window(prices.high), close)
+        low = np.fmin(window(prices.low), close)
+    else:
+        high = low = close
+
+    offset, reason, exit_price, has_bars = first_crossing(close, high, low, target, stop)
+    exit_cols = np.clip(starts + offset, 0, max(n_dates - 1, 0))
+    exit_dates = prices.dates[exit_cols] if n_dates else np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    exit_dates = np.where(has_bars, exit_dates, np.datetime64("NaT"))
+    exit_price = np.where(has_bars, exit_price, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = (exit_price / entry_prices - 1) * 100
+    return pd.DataFrame(
+        {
+            "symbol": list(symbols),
+            "entry_date": pd.to_datetime(pd.Series(list(entry_dates), dtype=object)).values if n else [],
+            "entry_price": entry_prices,
+            "exit_date": pd.to_datetime(exit_dates),
+            "exit_price": exit_price,
+            "reason": REASONS[reason] if n else np.array([], dtype=object),
+            "bars_held": np.where(has_bars, offset, 0),
+            "return_pct": ret,
+        }
+    )
+
+
+__all__ = ["PriceMatrix", "first_crossing", "simulate_exits"]
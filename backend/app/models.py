@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Enum, DECIMAL, ForeignKey, TIMESTAMP, text
+from sqlalchemy import Column, Integer, String, Boolean, Enum, DECIMAL, ForeignKey, TIMESTAMP, Text, text
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
@@ -38,6 +38,7 @@ class HacoAlert(Base):
     sms = Column(String(20), nullable=True)
     last_state = Column(String(10), nullable=True)
     last_checked = Column(TIMESTAMP, nullable=True)
+    haco_state = Column(Text, nullable=True)  # serialized indicators.haco.HacoState
     created_at = Column(
         TIMESTAMP,
         nullable=False,
@@ -0,0 +1,556 @@
+"""Parameter sweeps (grid search) for the SMA-crossover and HACO strategies.
+
+:func:`sweep` loads one OHLC matrix (dates x symbols) for the universe,
+expands a parameter grid and backtests every combination against that same
+matrix with the :mod:`backend.app.backtest` engine.  Each combination is
+scored on its equal-weight portfolio, and the table is ranked by one of the
+``_performance_metrics`` keys (``sharpe``, ``total_return``, ``cagr``,
+``max_drawdown``).
+
+Large sweeps run on a process pool: the parent packs the OHLC matrix into
+per-symbol rows once and copies those arrays into shared memory, every
+worker maps them read-only and writes the daily portfolio returns of its
+combinations into a second shared ``(combos, dates)`` block.  Metrics for any date range are computed from those rows in
+the parent, which is what makes walk-forward splits cheap: the parameters
+that rank best on each training window are scored on the window after it.
+
+A sweep can take minutes, so the API runs them through :class:`SweepQueue`
+(one at a time on a background thread, polled by id); cancelling a job
+stops its workers between combinations and drops the chunks not started.
+
+Signals follow the engine's convention (1 long, -1 short, acting on the
+next bar): SMA is long above the slow average and short below, HACO is long
+while its state is up and short while it is down.  Indicators run over each
+symbol's own bars, exactly as :func:`backtest.sma_crossover_signals` does.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.app.backtest import (
+    _metric_arrays,
+    _round_metrics,
+    bar_returns,
+    crossover,
+    entry_counts,
+    own_bar_order,
+    pack_own_bars,
+    portfolio_returns,
+    shift_signals,
+    unpack_signals,
+)
+from indicators.common import sma_array
+from indicators.haco import haco_arrays
+from services.bar_store import adjust_prices, get_bars_many
+
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", "0"))  # 0 = one per core
+OPTIMIZER_POOL_MIN = int(os.getenv("OPTIMIZER_POOL_MIN", "32"))  # smaller sweeps run in-process
+OPTIMIZER_START_METHOD = os.getenv("OPTIMIZER_START_METHOD", "spawn")
+OPTIMIZER_MAX_JOBS = int(os.getenv("OPTIMIZER_MAX_JOBS", "4"))  # queued + running sweeps
+OPTIMIZER_JOB_TTL = int(os.getenv("OPTIMIZER_JOB_TTL", "3600"))  # seconds a finished sweep is kept
+_SMA_CACHE_SIZE = 64
+
+STRATEGIES: dict[str, dict[str, int]] = {
+    "sma": {"fast": 20, "slow": 50},
+    "haco": {"length_up": 34, "length_down": 34, "alert_lookback": 1},
+}
+# the names the HACO endpoints use for the same parameters
+_ALIASES = {"lengthUp": "length_up", "lengthDown": "length_down", "alertLookback": "alert_lookback",
+            "len_up": "length_up", "len_dn": "length_down", "alert_lb": "alert_lookback"}
+METRICS = ("sharpe", "total_return", "cagr", "max_drawdown")
+_OHLC = ("Open", "High", "Low", "Close")
+
+
+# -- grid ---------------------------------------------------------------------
+def _values(spec) -> list[int]:
+    """One grid axis: a scalar, a list, ``"start:stop[:step]"`` (inclusive) or a dict with those keys."""
+
+    if isinstance(spec, str) and ":" in spec:
+        parts = [int(p) for p in spec.split(":")]
+        spec = dict(zip(("start", "stop", "step"), parts))
+    if isinstance(spec, Mapping):
+        step = int(spec.get("step", 1))
+        if step <= 0:
+            raise ValueError("grid step must be positive")
+        return list(range(int(spec["start"]), int(spec["stop"]) + 1, step))
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    if isinstance(spec, Iterable):
+        return [int(v) for v in spec]
+    return [int(spec)]
+
+
+def expand_grid(strategy: str, grid: Mapping[str, object]) -> list[dict[str, int]]:
+    """Every valid parameter combination of ``grid`` (unset parameters keep their defaults).
+
+    SMA combinations need ``0 < fast < slow``; HACO lengths and the alert
+    lookback must be at least 1.  Other combinations are dropped.
+    """
+
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r} (expected one of {', '.join(STRATEGIES)})")
+    defaults = STRATEGIES[strategy]
+    axes = {name: [value] for name, value in defaults.items()}
+    for name, spec in grid.items():
+        key = _ALIASES.get(name, name)
+        if key not in defaults:
+            raise ValueError(f"unknown {strategy} parameter {name!r}")
+        axes[key] = list(dict.fromkeys(_values(spec)))
+    combos = [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+    if strategy == "sma":
+        return [c for c in combos if 0 < c["fast"] < c["slow"]]
+    return [c for c in combos if min(c.values()) >= 1]
+
+
+# -- data ---------------------------------------------------------------------
+@dataclass(frozen=True)
+class OhlcMatrix:
+    """Adjusted daily OHLC of a universe on its shared calendar."""
+
+    dates: pd.DatetimeIndex
+    symbols: list[str]
+    values: np.ndarray  # (4, dates, symbols): Open/High/Low/Close, NaN outside each history
+
+
+def ohlc_matrix(symbols: Iterable[str], start: str, end: str | None = None) -> OhlcMatrix:
+    """Split-/dividend-adjusted OHLC for ``symbols`` from one batched read."""
+
+    symbols = [s.upper() for s in dict.fromkeys(symbols)]
+    frames = get_bars_many(symbols, "1d", start=start, end=end)
+    adjusted = {sym: adjust_prices(frames[sym]) for sym in symbols
+                if frames.get(sym) is not None and not frames[sym].empty}
+    if not adjusted:
+        return OhlcMatrix(pd.DatetimeIndex([]), symbols, np.empty((len(_OHLC), 0, len(symbols))))
+    fields = [
+        pd.DataFrame({sym: frame[name] for sym, frame in adjusted.items()}).sort_index().reindex(columns=symbols)
+        for name in _OHLC
+    ]
+    return OhlcMatrix(pd.DatetimeIndex(fields[0].index), symbols, np.stack([f.to_numpy(dtype=float) for f in fields]))
+
+
+# -- evaluation ---------------------------------------------------------------
+class SweepCancelled(Exception):
+    """Raised by :func:`evaluate` / :func:`sweep` when their cancel event is set."""
+
+
+class _Evaluator:
+    """Per-process state for scoring combinations against one packed OHLC matrix."""
+
+    def __init__(self, packed: np.ndarray, order: np.ndarray, valid: np.ndarray, returns: np.ndarray) -> None:
+        self.packed = packed  # (4, symbols, bars): each symbol's own bars, NaN rows first
+        self.order = order
+        self.valid = valid
+        self.returns = returns
+        self.first = packed.shape[2] - valid.sum(axis=0)  # first bar of each packed row
+        self._sma: dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "_Evaluator":
+        close = values[3]
+        valid, returns = bar_returns(close)
+        order, _ = own_bar_order(close)
+        return cls(np.stack([pack_own_bars(f, order) for f in values]), order, valid, returns)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"packed": self.packed, "order": self.order, "valid": self.valid, "returns": self.returns}
+
+    def _sma_of(self, period: int) -> np.ndarray:
+        ma = self._sma.get(period)
+        if ma is None:
+            if len(self._sma) >= _SMA_CACHE_SIZE:
+                self._sma.pop(next(iter(self._sma)))
+            ma = self._sma[period] = sma_array(self.packed[3], period)
+        return ma
+
+    def signals(self, strategy: str, params: Mapping[str, int]) -> np.ndarray:
+        if strategy == "sma":
+            packed = crossover(self._sma_of(params["fast"]), self._sma_of(params["slow"]))
+        else:
+            packed = np.zeros(self.packed.shape[1:])
+            for row, first in enumerate(self.first.tolist()):
+                o, h, l, c = self.packed[:, row, first:]
+                if len(c):
+                    state = haco_arrays(o, h, l, c, params["length_up"], params["length_down"],
+                                        params["alert_lookback"])["state"]
+                    packed[row, first:] = np.where(state == 1, 1.0, -1.0)
+        return unpack_signals(packed, self.order, self.valid)
+
+    def run(self, strategy: str, combos: Sequence[Mapping[str, int]], out: np.ndarray, cancel=None) -> list[int]:
+        """Write each combination's daily portfolio return into ``out``; return its trade counts.
+
+        Stops early (returning fewer counts) once ``cancel`` is set.
+        """
+
+        trades = []
+        for i, params in enumerate(combos):
+            if cancel is not None and cancel.is_set():
+                break
+            sig = self.signals(strategy, params)
+            out[i] = portfolio_returns((shift_signals(sig) * self.returns), self.valid)
+            trades.append(int(entry_counts(sig).sum()))
+        return trades
+
+
+_WORKER: dict = {}
+
+
+def _attach(spec: tuple[str, tuple, str]) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(inputs: dict, output: tuple, cancel) -> None:
+    shms, arrays = [], {}
+    for key, spec in inputs.items():
+        shm, arrays[key] = _attach(spec)
+        arrays[key].flags.writeable = False
+        shms.append(shm)
+    shm_out, out = _attach(output)
+    _WORKER.update(shm=(*shms, shm_out), evaluator=_Evaluator(**arrays), out=out, cancel=cancel)
+
+
+def _run_chunk(strategy: str, offset: int, combos: list[dict]) -> tuple[int, list[int]]:
+    out = _WORKER["out"][offset:offset + len(combos)]
+    return offset, _WORKER["evaluator"].run(strategy, combos, out, _WORKER["cancel"])
+
+
+def _shared_copy(array: np.ndarray) -> tuple[shared_memory.SharedMemory, np.ndarray, tuple]:
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, view, (shm.name, array.shape, array.dtype.str)
+
+
+def evaluate(
+    matrix: OhlcMatrix,
+    strategy: str,
+    combos: Sequence[Mapping[str, int]],
+    workers: int | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Daily portfolio returns ``(combos, dates)`` and trade counts of every combination.
+
+    ``workers`` defaults to :data:`OPTIMIZER_WORKERS` (one per core); sweeps
+    below :data:`OPTIMIZER_POOL_MIN` combinations, or with one worker, run
+    in this process.  Setting ``cancel`` stops the workers after their
+    current combination, drops the chunks not started and raises
+    :class:`SweepCancelled`.
+    """
+
+    combos = [dict(c) for c in combos]
+    n_dates = len(matrix.dates)
+    workers = workers or OPTIMIZER_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(combos))
+    evaluator = _Evaluator.from_values(matrix.values)
+    if workers <= 1 or len(combos) < OPTIMIZER_POOL_MIN:
+        out = np.zeros((len(combos), n_dates))
+        trades = evaluator.run(strategy, combos, out, cancel)
+        if len(trades) < len(combos):
+            raise SweepCancelled()
+        return out, np.asarray(trades, dtype=np.int64)
+
+    # pack once here; the workers only map the packed arrays
+    shared = {}
+    for key, array in evaluator.arrays().items():
+        shm, view, spec = _shared_copy(array)
+        shared[key] = (shm, spec)
+    del view  # shared memory cannot close while a view of it is alive
+    shm_out, out, out_spec = _shared_copy(np.zeros((len(combos), n_dates)))
+    trades = np.zeros(len(combos), dtype=np.int64)
+    # a few chunks per worker keeps the pool busy when HACO and SMA combos cost differently
+    size = max(1, math.ceil(len(combos) / (workers * 4)))
+    context = multiprocessing.get_context(OPTIMIZER_START_METHOD)
+    stop = context.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=({key: spec for key, (_, spec) in shared.items()}, out_spec, stop),
+    )
+    try:
+        pending = {pool.submit(_run_chunk, strategy, i, combos[i:i + size]) for i in range(0, len(combos), size)}
+        while pending:
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset, counts = future.result()
+                trades[offset:offset + len(counts)] = counts
+            if cancel is not None and cancel.is_set():
+                raise SweepCancelled()
+        return out.copy(), trades
+    except BaseException:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+        del out
+        for shm in (*(shm for shm, _ in shared.values()), shm_out):
+            shm.close()
+            shm.unlink()
+
+
+# -- ranking ------------------------------------------------------------------
+def window_metrics(dates: pd.DatetimeIndex, daily: np.ndarray) -> dict:
+    """Metric arrays (one entry per combination) of ``(combos, dates)`` daily returns."""
+
+    strategy_returns = daily.T
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    return _metric_arrays(dates, strategy_returns, equity, np.ones_like(strategy_returns, dtype=bool))
+
+
+def _order(arrays: dict, sort: str) -> np.ndarray:
+    """Combination indices, best ``sort`` value first (combinations without data last)."""
+
+    key = np.where(arrays["has_data"], np.nan_to_num(arrays[sort], nan=-np.inf), -np.inf)
+    return np.argsort(-key, kind="stable")
+
+
+def _span(dates: pd.DatetimeIndex, rows: slice) -> dict:
+    labels = dates[rows].strftime("%Y-%m-%d")
+    return {"start": labels[0], "end": labels[-1], "bars": len(labels)}
+
+
+def walk_forward(
+    dates: pd.DatetimeIndex,
+    daily: np.ndarray,
+    combos: Sequence[Mapping[str, int]],
+    folds: int,
+    *,
+    sort: str = "sharpe",
+    anchored: bool = False,
+) -> dict:
+    """Pick the best combination on each training window and score it on the next window.
+
+    The dates are cut into ``folds + 1`` consecutive blocks; fold ``i``
+    trains on block ``i`` (blocks ``0..i`` when ``anchored``) and tests on
+    block ``i + 1``.  ``out_of_sample`` chains the test windows together.
+    """
+
+    bounds = [int(b) for b in np.linspace(0, len(dates), folds + 2)]
+    if any(b == a for a, b in zip(bounds, bounds[1:])):
+        raise ValueError(f"not enough bars for {folds} walk-forward folds")
+    out, picks = [], []
+    for i in range(folds):
+        train = slice(bounds[0] if anchored else bounds[i], bounds[i + 1])
+        test = slice(bounds[i + 1], bounds[i + 2])
+        train_arrays = window_metrics(dates[train], daily[:, train])
+        best = int(_order(train_arrays, sort)[0])
+        test_arrays = window_metrics(dates[test], daily[best:best + 1, test])
+        picks.append(daily[best, test])
+        out.append({
+            "train": _span(dates, train),
+            "test": _span(dates, test),
+            "params": dict(combos[best]),
+            "train_metrics": _round_metrics(train_arrays, best),
+            "test_metrics": _round_metrics(test_arrays, 0),
+        })
+    tested = slice(bounds[1], bounds[-1])
+    stitched = window_metrics(dates[tested], np.concatenate(picks)[None, :])
+    return {"folds": out, "out_of_sample": _round_metrics(stitched, 0)}
+
+
+def check_sweep(
+    strategy: str,
+    grid: Mapping[str, object],
+    *,
+    sort: str = "sharpe",
+    max_combinations: int | None = None,
+) -> list[dict[str, int]]:
+    """The combinations :func:`sweep` would run; raises ``ValueError`` for a bad request."""
+
+    if sort not in METRICS:
+        raise ValueError(f"unknown sort metric {sort!r} (expected one of {', '.join(METRICS)})")
+    combos = expand_grid(strategy, grid)
+    if not combos:
+        raise ValueError("the grid has no valid parameter combinations")
+    if max_combinations is not None and len(combos) > max_combinations:
+        raise ValueError(f"{len(combos)} combinations exceeds the limit of {max_combinations}")
+    return combos
+
+
+def sweep(
+    strategy: str,
+    grid: Mapping[str, object],
+    symbols: Iterable[str],
+    start: str = "2023-01-01",
+    end: str | None = None,
+    *,
+    sort: str = "sharpe",
+    top: int | None = None,
+    folds: int = 0,
+    anchored: bool = False,
+    workers: int | None = None,
+    max_combinations: int | None = None,
+    cancel: threading.Event | None = None,
+) -> dict:
+    """Backtest every ``grid`` combination of ``strategy`` on ``symbols`` and rank them."""
+
+    combos = check_sweep(strategy, grid, sort=sort, max_combinations=max_combinations)
+    matrix = ohlc_matrix(symbols, start, end)
+    out = {
+        "strategy": strategy,
+        "start": start,
+        "end": end,
+        "symbols": matrix.symbols,
+        "combinations": len(combos),
+        "sort": sort,
+        "results": [],
+    }
+    if not len(matrix.dates):
+        return out
+    daily, trades = evaluate(matrix, strategy, combos, workers, cancel)
+    arrays = window_metrics(matrix.dates, daily)
+    ranked = [int(i) for i in _order(arrays, sort)][:top]
+    out["results"] = [
+        {"rank": rank, "params": combos[i], "metrics": _round_metrics(arrays, i), "trades": int(trades[i])}
+        for rank, i in enumerate(ranked, start=1)
+    ]
+    if folds:
+        out["walk_forward"] = walk_forward(matrix.dates, daily, combos, folds, sort=sort, anchored=anchored)
+    return out
+
+
+# -- background jobs ----------------------------------------------------------
+@dataclass
+class SweepJob:
+    """One queued :func:`sweep` and, once it has run, its result or error."""
+
+    id: str
+    params: dict
+    combinations: int
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    result: dict | None = None
+    error: str | None = None
+    cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict:
+        out = {
+            "id": self.id,
+            "status": self.status,
+            "strategy": self.params["strategy"],
+            "combinations": self.combinations,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.result is not None:
+            out["result"] = self.result
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class SweepQueue:
+    """Runs sweeps one at a time on a background thread; callers poll by job id.
+
+    Only one sweep (and so one process pool) runs at once, at most
+    ``max_jobs`` may be queued or running, and finished jobs are forgotten
+    ``ttl`` seconds after they end.
+    """
+
+    def __init__(self, max_jobs: int = OPTIMIZER_MAX_JOBS, ttl: float = OPTIMIZER_JOB_TTL) -> None:
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sweep")
+        self._jobs: dict[str, SweepJob] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, strategy: str, grid: Mapping[str, object], symbols: Iterable[str], start: str = "2023-01-01",
+               end: str | None = None, **options) -> SweepJob:
+        """Validate and queue a sweep; raises ``ValueError`` for a bad request, ``RuntimeError`` when full."""
+
+        combos = check_sweep(strategy, grid, sort=options.get("sort", "sharpe"),
+                             max_combinations=options.get("max_combinations"))
+        params = dict(strategy=strategy, grid=dict(grid), symbols=list(symbols), start=start, end=end, **options)
+        with self._lock:
+            self._prune()
+            if sum(j.active for j in self._jobs.values()) >= self.max_jobs:
+                raise RuntimeError(f"{self.max_jobs} sweeps are already queued or running")
+            job = SweepJob(uuid.uuid4().hex, params, len(combos))
+            self._jobs[job.id] = job
+        self._runner.submit(self._run, job)
+        return job
+
+    def _run(self, job: SweepJob) -> None:
+        if job.cancel.is_set():
+            return
+        job.status, job.started = "running", time.time()
+        try:
+            job.result = sweep(**job.params, cancel=job.cancel)
+            job.status = "done"
+        except SweepCancelled:
+            job.status = "cancelled"
+        except Exception as exc:
+            logging.exception("Parameter sweep %s failed", job.id)
+            job.status, job.error = "failed", str(exc)
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> SweepJob | None:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> SweepJob | None:
+        """Stop a queued or running sweep (a running one ends at its next check)."""
+
+        job = self.get(job_id)
+        if job is not None and job.active:
+            job.cancel.set()
+            if job.status == "queued":
+                job.status, job.finished = "cancelled", time.time()
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [j.status for j in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed", "cancelled")}
+
+
+jobs = SweepQueue()
+
+
+__all__ = [
+    "METRICS",
+    "OhlcMatrix",
+    "STRATEGIES",
+    "SweepCancelled",
+    "SweepJob",
+    "SweepQueue",
+    "check_sweep",
+    "evaluate",
+    "expand_grid",
+    "jobs",
+    "ohlc_matrix",
+    "sweep",
+    "walk_forward",
+    "window_metrics",
+]
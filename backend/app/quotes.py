@@ -1,59 +1,86 @@
+"""Batched quote service backed by a per-symbol TTL cache.
+
+Every quote (last close, previous close, change percent) comes from one
+``yf.download`` call for all symbols that need it, and is stored per symbol
+in ``_CACHE``.  ``fetch_latest_prices`` and ``/api/ticker`` read the same
+entries, so a dashboard load costs at most one upstream batch per
+``QUOTE_TTL_SECONDS``.
+
+Entries older than the TTL but younger than ``QUOTE_STALE_SECONDS`` are
+returned immediately and refreshed in the background (stale-while-
+revalidate); only symbols with no usable entry are fetched inline.
+Fetches are single-flight per symbol: a symbol already being downloaded,
+inline or in the background, is waited on rather than fetched again,
+while other symbols go ahead in their own batch.
+"""
+
+import logging
 import os
+import threading
 import time
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import yfinance as yf
 import pandas as pd
 
-# Simple TTL cache (symbol -> (expires_epoch, price_float))
-_CACHE: Dict[str, Tuple[float, float]] = {}
+from .cache import TTLCache, _Flight
+
+# Fresh window per quote; after it a quote is served stale and refreshed.
 _TTL = int(os.getenv("QUOTE_TTL_SECONDS", "60"))
+# Hard expiry: quotes older than this are dropped and fetched inline.
+_STALE = max(_TTL, int(os.getenv("QUOTE_STALE_SECONDS", "600")))
+_CACHE = TTLCache(maxsize=int(os.getenv("QUOTE_CACHE_SIZE", "4096")), ttl=_STALE, name="quotes")
+# Set to 0 to refresh stale quotes inline instead of on a background thread.
+QUOTE_BACKGROUND = os.getenv("QUOTE_BACKGROUND", "1") != "0"
+
+# Guards _FLIGHTS and _STATS.
+_LOCK = threading.Lock()
+# symbol -> the batch currently downloading it
+_FLIGHTS: Dict[str, _Flight] = {}
+_STATS = {"batches": 0, "symbols_fetched": 0, "stale_served": 0, "background_refreshes": 0}
+
+
+def _count(**deltas: int) -> None:
+    with _LOCK:
+        for key, delta in deltas.items():
+            _STATS[key] += delta
 
-def _now() -> float:
-    return time.time()
 
-def _get_cached(sym: str) -> Optional[float]:
-    v = _CACHE.get(sym)
-    if not v:
+def _normalize(symbols: Iterable[str]) -> List[str]:
+    seen: Dict[str, None] = {}
+    for s in symbols:
+        if s and s.strip():
+            seen.setdefault(s.strip().upper())
+    return list(seen)
+
+
+def _close_series(df: pd.DataFrame, sym: str) -> Optional[pd.Series]:
+    if isinstance(df.columns, pd.MultiIndex):
+        for field in ("Close", "Adj Close"):
+            if (sym, field) in df.columns:
+                return df[(sym, field)]
         return None
-    exp, price = v
-    if _now() <= exp:
-        return price
-    try:
-        del _CACHE[sym]
-    except KeyError:
-        pass
+    for field in ("Close", "Adj Close"):
+        if field in df.columns:
+            return df[field]
     return None
 
-def _set_cached(sym: str, price: float) -> None:
-    _CACHE[sym] = (_now() + _TTL, float(price))
 
-def _last_valid_close(series: pd.Series) -> Optional[float]:
-    if series is None or series.empty:
-        return None
-    s = series.dropna()
-    if s.empty:
-        return None
-    return float(s.iloc[-1])
+def _quote_from_series(series: Optional[pd.Series]) -> dict:
+    closes = series.dropna() if series is not None else pd.Series(dtype=float)
+    price = float(closes.iloc[-1]) if len(closes) else None
+    prev = float(closes.iloc[-2]) if len(closes) > 1 else price
+    change = (price - prev) / prev * 100 if price is not None and prev else (0.0 if price is not None else None)
+    return {"price": price, "prev_close": prev, "change_percent": change, "fetched_at": time.time()}
 
-def fetch_latest_prices(symbols: List[str]) -> Dict[str, Optional[float]]:
-    """Return latest (most recent valid) daily close for each symbol.
-    Uses cache per symbol; batch-fetches missing ones via yfinance once.
-    """
-    symbols = [s.strip().upper() for s in symbols if s and s.strip()]
-    out: Dict[str, Optional[float]] = {}
-    need: List[str] = []
 
-    for s in symbols:
-        cached = _get_cached(s)
-        if cached is not None:
-            out[s] = cached
-        else:
-            need.append(s)
+def _download(symbols: List[str]) -> Dict[str, dict]:
+    """One upstream batch for ``symbols``; caches and returns their quotes."""
 
-    if need:
+    _count(batches=1, symbols_fetched=len(symbols))
+    try:
         df = yf.download(
-            need,
+            symbols,
             period="5d",
             interval="1d",
             auto_adjust=False,
@@ -61,30 +88,121 @@ def fetch_latest_prices(symbols: List[str]) -> Dict[str, Optional[float]]:
             threads=True,
             group_by="ticker",
         )
+    except Exception:
+        logging.exception("Quote batch failed for %d symbols", len(symbols))
+        return {}
+    if df is None or df.empty:
+        # upstream failure: do not pin "no data" for a whole TTL window
+        return {s: _quote_from_series(None) for s in symbols}
+    quotes: Dict[str, dict] = {}
+    for s in symbols:
+        try:
+            quote = _quote_from_series(_close_series(df, s))
+        except Exception:
+            quote = _quote_from_series(None)
+        quotes[s] = quote
+        _CACHE.set(s, quote)
+    return quotes
+
+
+def _claim(symbols: List[str]) -> Tuple[List[str], Dict[str, _Flight]]:
+    """Split ``symbols`` into ones this caller now owns and flights already running."""
+
+    mine: List[str] = []
+    running: Dict[str, _Flight] = {}
+    with _LOCK:
+        for s in symbols:
+            flight = _FLIGHTS.get(s)
+            if flight is None:
+                _FLIGHTS[s] = _Flight()
+                mine.append(s)
+            else:
+                running[s] = flight
+    return mine, running
+
+
+def _fetch(symbols: List[str], known: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+    """Download claimed ``symbols`` (less ``known``) and release their waiters."""
+
+    quotes = {s: q for s, q in (known or {}).items() if q is not None}
+    try:
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            quotes.update(_download(missing))
+    finally:
+        with _LOCK:
+            flights = [(s, _FLIGHTS.pop(s)) for s in symbols]
+        for s, flight in flights:
+            flight.value = quotes.get(s)
+            flight.event.set()
+    return quotes
+
+
+def _refresh(symbols: List[str]) -> None:
+    _count(background_refreshes=1)
+    _fetch(symbols)
+
+
+def _refresh_async(symbols: List[str]) -> None:
+    todo, _running = _claim(symbols)
+    if not todo:
+        return
+    if not QUOTE_BACKGROUND:
+        _refresh(todo)
+        return
+    threading.Thread(target=_refresh, args=(todo,), name="quotes-refresh", daemon=True).start()
+
+
+def fetch_quotes(symbols: Iterable[str]) -> Dict[str, dict]:
+    """Return ``{symbol: {"price", "prev_close", "change_percent", "fetched_at"}}``.
+
+    Fresh and stale cached quotes are returned as-is (stale ones are queued
+    for a background refresh); missing symbols are fetched in one batch.
+    """
+
+    symbols = _normalize(symbols)
+    out: Dict[str, dict] = {}
+    need: List[str] = []
+    stale: List[str] = []
+    now = time.time()
+    for s in symbols:
+        quote = _CACHE.get(s)
+        if quote is None:
+            need.append(s)
+            continue
+        out[s] = quote
+        if now - quote["fetched_at"] >= _TTL:
+            stale.append(s)
+
+    if need:
+        # fetch what nobody else is fetching, then wait for the rest
+        mine, running = _claim(need)
+        # a batch that finished since the lookup above may have filled some
+        filled = {s: _CACHE.get(s) for s in mine if s in _CACHE}
+        fetched = _fetch(mine, filled) if mine else {}
+        fetched.update((s, flight.wait()) for s, flight in running.items())
         for s in need:
-            price: Optional[float] = None
-            try:
-                if isinstance(df.columns, pd.MultiIndex):
-                    if (s, "Close") in df.columns:
-                        series = df[(s, "Close")]
-                    elif (s, "Adj Close") in df.columns:
-                        series = df[(s, "Adj Close")]
-                    else:
-                        series = None
-                else:
-                    if "Close" in df.columns:
-                        series = df["Close"]
-                    elif "Adj Close" in df.columns:
-                        series = df["Adj Close"]
-                    else:
-                        series = None
-                price = _last_valid_close(series)
-            except Exception:
-                price = None
-            out[s] = price
-            if price is not None:
-                _set_cached(s, price)
-    return out
+            out[s] = fetched.get(s) or _quote_from_series(None)
+    # stale entries are served now and refreshed in one background batch
+    if stale:
+        _count(stale_served=len(stale))
+        _refresh_async(stale)
+    return {s: out[s] for s in symbols}
+
+
+def fetch_latest_prices(symbols: List[str]) -> Dict[str, Optional[float]]:
+    """Return latest (most recent valid) daily close for each symbol."""
+
+    return {s: q["price"] for s, q in fetch_quotes(symbols).items()}
+
 
 def fetch_latest_price(symbol: str) -> Optional[float]:
-    return fetch_latest_prices([symbol]).get(symbol)
+    return fetch_latest_prices([symbol]).get(symbol.strip().upper())
+
+
+def quote_stats() -> dict:
+    """Cache counters plus upstream batch/refresh counts."""
+
+    with _LOCK:
+        counters = dict(_STATS)
+    return {**_CACHE.stats(), "fresh_ttl": _TTL, **counters}
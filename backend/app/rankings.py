@@ -0,0 +1,127 @@
+"""Precomputed watchlist rankings served stale-while-revalidate.
+
+Scoring a mode's universe is far too slow for the request path, so each
+mode keeps its latest ranking as a snapshot.  Readers get the snapshot
+immediately; a snapshot older than ``stale_after`` seconds schedules one
+background refresh for that mode.  The app scheduler also refreshes every
+mode on a fixed interval so snapshots rarely go stale in the first place.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+RANKINGS_REFRESH_SECONDS = int(os.getenv("RANKINGS_REFRESH_SECONDS", "300"))
+RANKINGS_STALE_SECONDS = int(os.getenv("RANKINGS_STALE_SECONDS", "120"))
+RANKINGS_LIMIT = int(os.getenv("RANKINGS_LIMIT", "10"))
+# Set to 0 to disable background refreshes (tests, one-off scripts).
+RANKINGS_BACKGROUND = os.getenv("RANKINGS_BACKGROUND", "1") != "0"
+
+
+@dataclass
+class RankingSnapshot:
+    mode: str
+    ranking: list[dict]
+    computed_at: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.computed_at)
+
+
+class RankingService:
+    """Latest ranking per mode plus the machinery to keep it fresh."""
+
+    def __init__(
+        self,
+        compute: Callable[..., list[dict]],
+        *,
+        stale_after: float = RANKINGS_STALE_SECONDS,
+        limit: int = RANKINGS_LIMIT,
+        background: bool = RANKINGS_BACKGROUND,
+    ) -> None:
+        self.compute = compute
+        self.stale_after = stale_after
+        self.limit = limit
+        self.background = background
+        self._snapshots: dict[str, RankingSnapshot] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, mode: str) -> RankingSnapshot | None:
+        """Return the current snapshot (maybe ``None``) without ever scoring inline."""
+
+        snap = self._snapshots.get(mode)
+        if snap is None or snap.age > self.stale_after:
+            self.refresh_async(mode)
+        return snap
+
+    def refresh(self, mode: str) -> RankingSnapshot | None:
+        """Score ``mode`` now and publish the result; failures keep the old snapshot."""
+
+        started = time.perf_counter()
+        try:
+            ranking = self.compute(mode, limit=self.limit)
+        except Exception:
+            logging.exception("Ranking refresh failed for %s", mode)
+            return self._snapshots.get(mode)
+        finally:
+            with self._lock:
+                self._refreshing.discard(mode)
+        snap = RankingSnapshot(
+            mode=mode,
+            ranking=list(ranking),
+            duration_ms=round((time.perf_counter() - started) * 1000.0, 1),
+        )
+        self._snapshots[mode] = snap
+        return snap
+
+    def refresh_async(self, mode: str) -> bool:
+        """Start a background refresh unless one is already running for ``mode``."""
+
+        if not self.background:
+            return False
+        with self._lock:
+            if mode in self._refreshing:
+                return False
+            self._refreshing.add(mode)
+        threading.Thread(
+            target=self.refresh, args=(mode,), name=f"rankings-{mode}", daemon=True
+        ).start()
+        return True
+
+    def refresh_all(self, modes: Iterable[str]) -> None:
+        """Refresh each mode inline, skipping any a background thread already owns."""
+
+        for mode in modes:
+            with self._lock:
+                if mode in self._refreshing:
+                    continue
+                self._refreshing.add(mode)
+            self.refresh(mode)
+
+    def status(self) -> dict[str, dict]:
+        return {
+            mode: {
+                "age_seconds": round(snap.age, 1),
+                "computed_at": snap.computed_at,
+                "duration_ms": snap.duration_ms,
+                "size": len(snap.ranking),
+                "refreshing": mode in self._refreshing,
+            }
+            for mode, snap in self._snapshots.items()
+        }
+
+
+__all__ = [
+    "RANKINGS_BACKGROUND",
+    "RANKINGS_REFRESH_SECONDS",
+    "RankingService",
+    "RankingSnapshot",
+]
@@ -50,6 +50,7 @@ class HacoAlertUpdate(BaseModel):
     sms: Optional[str] = None
     last_state: Optional[str] = None
     last_checked: Optional[datetime] = None
+    haco_state: Optional[str] = None
 
 
 class HacoAlert(HacoAlertBase):
@@ -6,18 +6,25 @@ import os
 import logging
 import datetime
 import math
-import requests
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from functools import lru_cache
 import time
+from concurrent.futures import ThreadPoolExecutor
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from typing import Iterable
-from indicators import haco as haco_indicator, haco_ha, hacolt, common as indicator_common
+from indicators import hacolt, common as indicator_common
 
+from services import event_store
+from services.bar_store import get_bars, get_bars_many
+
+from .cache import TTLCache, cached
+from .chart import CandleArrays, chart_payload
+from .exit_sim import PriceMatrix, simulate_exits
 from .mode_profiles import MODE_PROFILES
 from .quotes import fetch_latest_prices
+from .rankings import RankingService
+from .technicals import panel_from_frames
+from .upstream import upstream
 
 try:
     import openai  # optional
@@ -31,6 +38,8 @@ NEGATIVE_WORDS = {"loss", "drop", "bear", "pessimistic", "down"}
 EXIT_PROFIT_TARGET_PCT = 0.05  # 5% profit target
 EXIT_STOP_LOSS_PCT = 0.02     # 2% stop-loss
 EXIT_MAX_HOLD_DAYS = 30       # time-based exit after 30 trading days
+# window for the "recent" congress/lobbying counts served from the event store
+QUIVER_RECENT_DAYS = int(os.getenv("QUIVER_RECENT_DAYS", "90"))
 # Back-compat default used by get_watchlist()
 DEFAULT_WATCHLIST = ["SPY", "QQQ", "DIA", "IWM", "AAPL", "MSFT", "NVDA"]
 # Default content for the "Advanced Tabs" section if a mode doesn't provide its own
@@ -108,23 +117,7 @@ def _mode_universe(mode_key: str) -> list[str]:
     return UNIVERSE_SWING[:]
 
 
-# poor-man's TTL wrapper around lru_cache
-def _ttl_cache(seconds: int):
-    def decorator(fn):
-        cache = lru_cache(maxsize=512)(fn)
-        last = {"t": 0}
-        def wrapped(*a, **k):
-            now = int(time.time())
-            # reset the cache once per TTL window
-            if now - last["t"] >= seconds:
-                cache.cache_clear()
-                last["t"] = now
-            return cache(*a, **k)
-        wrapped.cache_clear = cache.cache_clear  # expose if you need it
-        return wrapped
-    return decorator
-
-@_ttl_cache(60)
+@cached(60, maxsize=512, name="readiness")
 def _compute_readiness_only(symbol: str, mode: str = "swing") -> float:
     """
     Fast readiness scorer reusing your component logic (cached ~60s).
@@ -141,6 +134,142 @@ def _compute_readiness_only(symbol: str, mode: str = "swing") -> float:
         return 0.0
 
 
+READINESS_WORKERS = int(os.getenv("READINESS_WORKERS", "8"))
+
+
+_COMPONENT_IDS = ("trend", "momentum", "volatility", "volume")
+
+
+def _normalise_scores(values: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    return (np.clip(values, lower, upper) - lower) / (upper - lower) * 100
+
+
+def _readiness_parts(bars: np.ndarray, trend_window: int, momentum_window: int, volume_window: int) -> np.ndarray:
+    """Trend/momentum/volatility/volume scores for a ``(symbols, bars, OHLCV)`` block.
+
+    Column-wise twin of :func:`_component_scores`: same components, same
+    bounds, but one array op per step for every symbol of an equal-length
+    block.  Returns a ``(symbols, 4)`` array in ``_COMPONENT_IDS`` order.
+    Only gap-free blocks match the scalar path; :func:`_block_parts` keeps
+    histories with NaN out.
+    """
+    k, n, _ = bars.shape
+    o, h, l, c = (np.nan_to_num(bars[..., i]) for i in range(4))
+    closes = bars[..., 3]
+    volumes = bars[..., 4]
+
+    # Trend: HACOLT zero-lag TEMA of the Heikin-Ashi close
+    trend = indicator_common.tema_array((o + h + l + c) / 4, trend_window)
+    lookback = min(n - 1, max(3, trend_window // 4))
+    trend_delta = trend[:, -1] - trend[:, -lookback - 1]
+
+    # Momentum
+    ref = closes[:, -momentum_window] if n > max(1, momentum_window) else closes[:, 0]
+    ref = np.nan_to_num(ref)
+    last_close = np.nan_to_num(closes[:, -1])
+    momentum = np.where(ref != 0.0, last_close / np.where(ref != 0.0, ref, 1.0) - 1.0, 0.0)
+
+    # Realized vol proxy over the trailing window of returns
+    volatility = np.zeros(k)
+    if n > 1:
+        returns = closes[:, 1:] / closes[:, :-1] - 1.0
+        window = min(n - 1, max(5, momentum_window))
+        if window > 1:
+            volatility = np.nan_to_num(returns[:, -window:].std(axis=1, ddof=1))
+
+    # Volume ratio vs trailing mean
+    volume_ratio = np.zeros(k)
+    if n >= volume_window:
+        avg_volume = np.nan_to_num(volumes[:, -volume_window:].mean(axis=1))
+        last_volume = np.nan_to_num(volumes[:, -1])
+        safe_avg = np.where(avg_volume != 0.0, avg_volume, 1.0)
+        volume_ratio = np.where(avg_volume != 0.0, (last_volume - avg_volume) / safe_avg, 0.0)
+
+    return np.stack([
+        _normalise_scores(trend_delta, -5.0, 5.0),
+        _normalise_scores(momentum, -0.08, 0.08),
+        _normalise_scores(0.06 - volatility, -0.06, 0.06),
+        _normalise_scores(volume_ratio, -1.0, 1.0),
+    ], axis=1)
+
+
+def _readiness_block(bars: np.ndarray, trend_window: int, momentum_window: int, volume_window: int) -> list[float]:
+    """Readiness for a block of equal-length histories (same rounding as the scalar path)."""
+    parts = _readiness_parts(bars, trend_window, momentum_window, volume_window)
+    return [_readiness_from_parts(row) for row in parts]
+
+
+def _universe_frames(symbols: list[str], profile: dict, label: str) -> dict[str, pd.DataFrame]:
+    """One batched bar read for ``symbols``, trimmed like :func:`_load_history`."""
+    keep = max(120, profile.get("lookback_days", 120))
+    try:
+        frames = get_bars_many(
+            symbols, profile.get("interval", "1d"), period=profile.get("period", "6mo")
+        )
+    except Exception:
+        logging.exception("Batch history load failed for %s universe", label)
+        frames = {}
+    out: dict[str, pd.DataFrame] = {}
+    for sym in symbols:
+        frame = frames.get(str(sym).upper())
+        if frame is None or frame.empty:
+            continue
+        out[sym] = frame.dropna(how="all").tail(keep)
+    return out
+
+
+def _block_parts(frames: dict[str, pd.DataFrame], profile: dict) -> dict[str, np.ndarray]:
+    """Component scores per symbol; symbols with equal, gap-free history share one block."""
+    chart_cfg = profile.get("chart", {})
+    windows = (
+        chart_cfg.get("trend_window", 34),
+        chart_cfg.get("momentum_window", 14),
+        chart_cfg.get("volume_window", 20),
+    )
+    blocks: dict[int, list[tuple[str, np.ndarray]]] = {}
+    for sym, frame in frames.items():
+        values = frame.reindex(columns=["Open", "High", "Low", "Close", "Volume"]).to_numpy(dtype=float)
+        if np.isnan(values).any():
+            # pct_change().dropna() and the NaN-skipping SMA have no cheap
+            # column-wise equivalent; these go to the per-symbol scorer
+            continue
+        blocks.setdefault(len(values), []).append((sym, values))
+
+    parts: dict[str, np.ndarray] = {}
+    for members in blocks.values():
+        try:
+            block = np.stack([values for _, values in members])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                block_parts = _readiness_parts(block, *windows)
+        except Exception:
+            logging.exception("Vectorized readiness failed; scoring per symbol")
+            continue
+        parts.update({sym: row for (sym, _), row in zip(members, block_parts)})
+    return parts
+
+
+def _readiness_from_parts(parts: np.ndarray) -> float:
+    return round(sum(round(float(p), 1) for p in parts) / 4, 1)
+
+
+def _batch_readiness(symbols: list[str], mode: str = "swing") -> dict[str, float]:
+    """
+    Readiness for a whole universe from one batched bar read.
+    Symbols with equal history length are scored together as one block;
+    anything the batch could not serve falls back to the per-symbol scorer
+    on a small worker pool.
+    """
+    canonical_mode, profile = _get_mode_profile(mode)
+    frames = _universe_frames(symbols, profile, canonical_mode)
+    scores = {sym: _readiness_from_parts(row) for sym, row in _block_parts(frames, profile).items()}
+
+    missing = [sym for sym in symbols if sym not in scores]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(READINESS_WORKERS, len(missing)))) as pool:
+            scores.update(zip(missing, pool.map(lambda sym: _compute_readiness_only(sym, mode), missing)))
+    return scores
+
+
 def get_dynamic_watchlist(mode: str, limit: int = 10, extra: list[str] | None = None) -> list[dict]:
     """
     Rank the mode's universe by current readiness and return
@@ -155,15 +284,22 @@ def get_dynamic_watchlist(mode: str, limit: int = 10, extra: list[str] | None =
                 seen.add(u); merged.append(u)
         universe = merged
 
-    ranked: list[tuple[str, float]] = []
-    for sym in universe:
-        sc = _compute_readiness_only(sym, mode)
-        ranked.append((sym, sc))
+    scores = _batch_readiness(universe, mode)
+    ranked = [(sym, scores.get(sym, 0.0)) for sym in universe]
 
     ranked.sort(key=lambda x: x[1], reverse=True)
     return [{"symbol": s, "score": round(float(sc), 1)} for s, sc in ranked[:max(1, limit)]]
 
 
+# Per-mode ranking snapshots; compute_signals only ever reads these.
+watchlist_rankings = RankingService(get_dynamic_watchlist)
+
+
+def refresh_watchlist_rankings() -> None:
+    """Recompute every mode's ranking snapshot (scheduler job)."""
+    watchlist_rankings.refresh_all(sorted(MODE_PROFILES.keys()))
+
+
 def _fallback_watchlist_for_mode(mode_key: str) -> list[str]:
     # use your mode universe helper if you added it; otherwise handle crypto directly
     mk = (mode_key or "swing").lower()
@@ -236,21 +372,16 @@ def _fallback_history() -> pd.DataFrame:
         "Close": closes,
         "Volume": volume,
     }
-    return pd.DataFrame(data, index=idx)
+    frame = pd.DataFrame(data, index=idx)
+    frame.attrs["fallback"] = True
+    return frame
 
 
 def _load_history(symbol: str, profile: dict) -> pd.DataFrame:
     period = profile.get("period", "6mo")
     interval = profile.get("interval", "1d")
     try:
-        history = yf.download(
-            symbol,
-            period=period,
-            interval=interval,
-            auto_adjust=False,
-            progress=False,
-            threads=True,
-        )
+        history = get_bars(symbol, interval, period=period)
     except Exception:
         logging.exception("Failed to download price history for %s", symbol)
         history = pd.DataFrame()
@@ -263,30 +394,57 @@ def _load_history(symbol: str, profile: dict) -> pd.DataFrame:
     return history.tail(max(120, profile.get("lookback_days", 120)))
 
 
-def _prepare_candles(history: pd.DataFrame) -> list[dict]:
-    candles: list[dict] = []
-    for ts, row in history.iterrows():
-        timestamp = pd.Timestamp(ts)
-        if timestamp.tzinfo is None:
-            timestamp = timestamp.tz_localize("UTC")
-        else:
-            timestamp = timestamp.tz_convert("UTC")
-        try:
-            epoch = int(timestamp.timestamp())
-        except Exception:
-            epoch = int(pd.Timestamp.utcnow().timestamp())
-        candles.append({
-            "time": epoch,
-            "o": _scalar(row.get("Open", row.get("open", 0.0))),
-            "h": _scalar(row.get("High", row.get("high", 0.0))),
-            "l": _scalar(row.get("Low",  row.get("low",  0.0))),
-            "c": _scalar(row.get("Close",row.get("close", 0.0))),
-            "v": _scalar(row.get("Volume",row.get("volume", 0.0))),
-        })
-    return candles
-
-
-def _component_scores(history: pd.DataFrame, profile: dict, candles: list[dict]) -> tuple[list[dict], float, dict]:
+def _daily_view(symbol: str, history: pd.DataFrame, profile: dict) -> pd.DataFrame:
+    """Daily bars for exits and the MA crossover, derived from ``history``.
+
+    Daily profiles reuse the frame as-is and intraday profiles resample it;
+    only when that leaves too few sessions (the 5-day ``day`` profile) is a
+    daily frame read from the bar store.
+    """
+    if history.attrs.get("fallback"):
+        return pd.DataFrame()
+    interval = str(profile.get("interval", "1d")).lower()
+    if interval in {"1d", "1wk", "1mo", "5d", "3mo"}:
+        return history
+    daily = history.resample("1D").agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    ).dropna(subset=["Close"])
+    if len(daily) >= 50:
+        return daily
+    try:
+        return get_bars(symbol, "1d", period="3mo")
+    except Exception:
+        logging.exception("Failed to load daily bars for %s", symbol)
+        return daily
+
+
+class _StageTimer:
+    """Wall-clock milliseconds spent in each compute_signals stage."""
+
+    def __init__(self) -> None:
+        self.start = self._last = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings[stage] = round((now - self._last) * 1000.0, 2)
+        self._last = now
+
+    def finish(self) -> dict[str, float]:
+        self.timings["total"] = round((time.perf_counter() - self.start) * 1000.0, 2)
+        return self.timings
+
+
+def _prepare_candles(history: pd.DataFrame) -> CandleArrays:
+    return CandleArrays.from_frame(history)
+
+
+def _component_scores(
+    history: pd.DataFrame,
+    profile: dict,
+    candles: CandleArrays,
+    trend_series: np.ndarray | None = None,
+) -> tuple[list[dict], float, dict]:
     chart_cfg = profile.get("chart", {})
     closes_raw = history.get("Close", pd.Series(dtype=float))
     closes = _ensure_series_1d(closes_raw)
@@ -296,11 +454,11 @@ def _component_scores(history: pd.DataFrame, profile: dict, candles: list[dict])
     volume_window = chart_cfg.get("volume_window", 20)
 
     # Trend (HACOLT delta over a small lookback)
-    core_candles = [{"o": c["o"], "h": c["h"], "l": c["l"], "c": c["c"]} for c in candles]
-    trend_series = hacolt.compute_trend(core_candles, period=trend_window) if candles else []
-    if trend_series:
+    if trend_series is None:
+        trend_series = hacolt.compute_trend_arrays(candles.o, candles.h, candles.l, candles.c, period=trend_window)
+    if len(trend_series):
         lookback = min(len(trend_series) - 1, max(3, trend_window // 4))
-        trend_delta = trend_series[-1] - trend_series[-lookback - 1]
+        trend_delta = float(trend_series[-1] - trend_series[-lookback - 1])
     else:
         trend_delta = 0.0
     trend_score = indicator_common.normalise_score(trend_delta, lower=-5.0, upper=5.0)
@@ -321,8 +479,8 @@ def _component_scores(history: pd.DataFrame, profile: dict, candles: list[dict])
     returns = closes.pct_change().dropna()
     if not returns.empty:
         vol_window = min(len(returns), max(5, momentum_window))
-        vol_value = returns.rolling(vol_window).std().dropna()
-        volatility = _scalar(vol_value.iloc[-1]) if not vol_value.empty else _scalar(returns.std())
+        vol_value = indicator_common.rolling_std(returns.to_numpy(), vol_window)
+        volatility = _scalar(vol_value[-1]) if not np.isnan(vol_value[-1]) else _scalar(returns.std())
     else:
         volatility = 0.0
     volatility_score = indicator_common.normalise_score(0.06 - volatility, lower=-0.06, upper=0.06)
@@ -330,7 +488,7 @@ def _component_scores(history: pd.DataFrame, profile: dict, candles: list[dict])
 
     # Volume ratio & multiple
     if volumes is not None and not volumes.dropna().empty:
-        avg_volume  = _scalar(volumes.rolling(volume_window).mean().iloc[-1])
+        avg_volume  = _scalar(indicator_common.sma_array(_ensure_series_1d(volumes).to_numpy(), volume_window)[-1])
         last_volume = _scalar(volumes.iloc[-1])
         volume_ratio = (last_volume - avg_volume) / avg_volume if avg_volume != 0.0 else 0.0
         vol_mult = (last_volume / avg_volume) if avg_volume != 0.0 else 0.0
@@ -352,54 +510,6 @@ def _component_scores(history: pd.DataFrame, profile: dict, candles: list[dict])
     return components, readiness_score, meta
 
 
-def _chart_payload(candles: list[dict], trend_series: list[float]) -> dict:
-    if not candles:
-        return {"candles": [], "heikin_ashi": [], "indicators": {}}
-
-    ha_input = [{"o": c["o"], "h": c["h"], "l": c["l"], "c": c["c"]} for c in candles]
-    ha = haco_ha.project(ha_input)
-    ha_payload = [
-        {
-            "time": candles[idx]["time"],
-            "o": round(item["o"], 4),
-            "h": round(item["h"], 4),
-            "l": round(item["l"], 4),
-            "c": round(item["c"], 4),
-        }
-        for idx, item in enumerate(ha)
-    ]
-
-    closes = [c["c"] for c in candles]
-    sma20 = indicator_common.sma(closes, 20)
-    sma50 = indicator_common.sma(closes, 50)
-
-    indicators = {
-        "sma20": [
-            {"time": candles[i]["time"], "value": round(val, 4)}
-            for i, val in enumerate(sma20)
-            if val is not None
-        ],
-        "sma50": [
-            {"time": candles[i]["time"], "value": round(val, 4)}
-            for i, val in enumerate(sma50)
-            if val is not None
-        ],
-    }
-
-    if trend_series:
-        aligned = trend_series[-len(candles) :]
-        indicators["trend"] = [
-            {"time": candles[-len(aligned) + idx]["time"], "value": round(value, 4)}
-            for idx, value in enumerate(aligned)
-        ]
-
-    return {
-        "candles": candles,
-        "heikin_ashi": ha_payload,
-        "indicators": indicators,
-    }
-
-
 def _ensure_series_1d(obj) -> pd.Series:
     """Return a 1-D float Series, even if input is a DataFrame or (N,1) array."""
     if isinstance(obj, pd.DataFrame):
@@ -408,97 +518,58 @@ def _ensure_series_1d(obj) -> pd.Series:
     return pd.Series(arr)
 
 
-def _adx_from_hlc(high: pd.Series, low: pd.Series, close: pd.Series, length: int = 14) -> float:
-    """Wilder's ADX (scalar latest). Safe for ragged inputs."""
-    h = _ensure_series_1d(high)
-    l = _ensure_series_1d(low)
-    c = _ensure_series_1d(close)
-    n = min(len(h), len(l), len(c))
-    if n < length + 2:
-        return 0.0
-
-    h = h.iloc[-n:].reset_index(drop=True)
-    l = l.iloc[-n:].reset_index(drop=True)
-    c = c.iloc[-n:].reset_index(drop=True)
-
-    up_move = h.diff()
-    down_move = -l.diff()
-
-    plus_dm  = up_move.where((up_move > down_move) & (up_move > 0.0), 0.0)
-    minus_dm = down_move.where((down_move > up_move) & (down_move > 0.0), 0.0)
-
-    tr = pd.concat([
-        (h - l),
-        (h - c.shift()).abs(),
-        (l - c.shift()).abs()
-    ], axis=1).max(axis=1)
-
-    # Wilder’s smoothing via EMA with alpha = 1/length
-    alpha = 1.0 / float(length)
-    atr      = tr.ewm(alpha=alpha, adjust=False, min_periods=length).mean()
-    plus_di  = 100.0 * plus_dm.ewm(alpha=alpha, adjust=False, min_periods=length).mean()  / atr.replace(0.0, np.nan)
-    minus_di = 100.0 * minus_dm.ewm(alpha=alpha, adjust=False, min_periods=length).mean() / atr.replace(0.0, np.nan)
-
-    dx = (100.0 * (plus_di - minus_di).abs() / (plus_di + minus_di)).replace([np.inf, -np.inf], np.nan)
-    adx = dx.ewm(alpha=alpha, adjust=False, min_periods=length).mean()
-
-    val = adx.iloc[-1]
-    return float(val) if pd.notna(val) else 0.0
-
-
-def _compute_haco_states(core_candles: list[dict]) -> list[int]:
-    """
-    Return a per-bar HACO state series mapped to [0,50,100] (down/flat/up).
-    We try to use the haco module if it exposes a function; otherwise fall back
-    to a simple HA-direction proxy so the strip is still meaningful.
-    """
-    # 1) Try to use indicators.haco if it has a usable function
-    for name in ("compute_states", "project_states", "states", "project"):
-        fn = getattr(haco_indicator, name, None)
-        if callable(fn):
-            try:
-                out = fn(core_candles)  # whatever your module returns
-                states: list[int] = []
-                for item in out:
-                    # normalize a variety of shapes to 0/50/100
-                    # Accept dicts with 'state'/'score' or direct ints/bools
-                    if isinstance(item, dict):
-                        s = item.get("state", item.get("score", item.get("value")))
-                    else:
-                        s = item
-                    if s is None:
-                        states.append(50)
-                        continue
-                    # common mappings
-                    if isinstance(s, (int, float)):
-                        if s > 0:   states.append(100)
-                        elif s < 0: states.append(0)
-                        else:       states.append(50)
-                    elif isinstance(s, str):
-                        ss = s.lower()
-                        if "up" in ss or "long" in ss or "bull" in ss: states.append(100)
-                        elif "down" in ss or "short" in ss or "bear" in ss: states.append(0)
-                        else: states.append(50)
-                    else:
-                        states.append(50)
-                if states:
-                    return states
-            except Exception:
-                pass  # fall through to HA proxy
-
-    # 2) Fallback: HA direction proxy (green if HA close > HA open)
-    try:
-        ha = haco_ha.project({"o": c["o"], "h": c["h"], "l": c["l"], "c": c["c"]} for c in core_candles)
-        states = []
-        for bar in ha:
-            o = float(bar.get("o", 0.0))
-            c = float(bar.get("c", 0.0))
-            if c > o:   states.append(100)
-            elif c < o: states.append(0)
-            else:       states.append(50)
-        return states
-    except Exception:
-        return [50] * len(core_candles)
+def _build_panels(goals: dict, scores: dict[str, float], tech: dict, vol_mult: float) -> tuple[list[dict], bool]:
+    """The four PASS/FAIL readiness panels from component scores and a technical row."""
+    price = _scalar(tech["close"])
+    ema50 = _scalar(tech["ema50"])
+    ema200 = _scalar(tech["ema200"])
+    trend_pass = (price > ema50 > ema200) or (ema50 > ema200)
+    last_rsi = tech["rsi"]
+    rising = last_rsi >= tech["rsi_prev"]
+    adx = tech["adx"]
+    panels = [
+        {
+            "id": "trend",
+            "title": "Trend",
+            "status": "PASS" if trend_pass else "FAIL",
+            "score": scores["trend"],
+            "goal": "Close > EMA50 > EMA200",
+            "goal_pct": 70,
+            "reason": f"Close {price:.2f} vs EMA50 {ema50:.2f} / EMA200 {ema200:.2f}",
+            "summary": f"Trend is {'aligned' if trend_pass else 'mixed'}.",
+        },
+        {
+            "id": "momentum",
+            "title": "Momentum",
+            "status": "PASS" if (last_rsi >= goals["rsi"] and rising) else "FAIL",
+            "score": scores["momentum"],
+            "goal": f"RSI ≥ {goals['rsi']} & rising",
+            "goal_pct": _to_pct(goals["rsi"], 40, 70),
+            "reason": f"RSI14={last_rsi:.1f} ({'↑' if rising else '↓'})",
+            "summary": f"RSI {last_rsi:.1f} {'rising' if rising else 'falling'}; goal ≥ {goals['rsi']}.",
+        },
+        {
+            "id": "volatility",
+            "title": "Volatility/Trend Strength (ADX)",
+            "status": "PASS" if adx >= goals["adx"] else "FAIL",
+            "score": scores["volatility"],
+            "goal": f"ADX ≥ {goals['adx']}",
+            "goal_pct": _to_pct(goals["adx"], 10, 40),
+            "reason": f"ADX14={adx:.1f}",
+            "summary": f"ADX {adx:.1f} vs {goals['adx']}.",
+        },
+        {
+            "id": "volume",
+            "title": "Volume",
+            "status": "PASS" if (vol_mult >= goals["vol_mult"]) else "FAIL",
+            "score": scores["volume"],
+            "goal": f"Vol ≥ {goals['vol_mult']:.2f}× avg",
+            "goal_pct": _to_pct(goals["vol_mult"], 0.8, 1.3),
+            "reason": f"Vol={vol_mult:.2f}× avg",
+            "summary": f"Volume {vol_mult:.2f}× avg; goal {goals['vol_mult']:.2f}×.",
+        },
+    ]
+    return panels, trend_pass
 
 
 def compute_signals(symbol: str, mode: str = "swing") -> dict:
@@ -506,18 +577,25 @@ def compute_signals(symbol: str, mode: str = "swing") -> dict:
     mode_key = canonical_mode
     goals = _goal_lines_for_mode(mode_key)
 
+    timer = _StageTimer()
     history = _load_history(symbol, profile)
+    daily = _daily_view(symbol, history, profile)
+    timer.mark("load")
     candles = _prepare_candles(history)
+    timer.mark("candles")
 
-    # compute trend ONCE for chart & HACOLT meta
-    trend_series = hacolt.compute_trend(
-        ({"o": c["o"], "h": c["h"], "l": c["l"], "c": c["c"]} for c in candles),
+    # compute trend ONCE for readiness, chart & HACOLT meta
+    trend_series = hacolt.compute_trend_arrays(
+        candles.o, candles.h, candles.l, candles.c,
         period=profile.get("chart", {}).get("trend_window", 34),
-    ) if candles else []
+    )
 
-    components, readiness_score, comps_meta = _component_scores(history, profile, candles)
+    components, readiness_score, comps_meta = _component_scores(history, profile, candles, trend_series)
     vol_mult = float(comps_meta.get("volume_mult", 0.0))
-    chart = _chart_payload(candles, trend_series)
+    timer.mark("components")
+    # candles, HA, overlays and the HACO/HACOLT strips straight from the arrays
+    chart = chart_payload(candles, trend_series)
+    timer.mark("chart")
 
     last_close = _scalar(history["Close"].iloc[-1]) if not history.empty else None
     action_bias = "long" if readiness_score >= 55 else "short" if readiness_score <= 40 else "neutral"
@@ -536,117 +614,23 @@ def compute_signals(symbol: str, mode: str = "swing") -> dict:
     panels = []  # will fill if we can compute display stats
 
     if last_close is not None:
-        exits_payload, exit_reason = _exit_levels(symbol, "buy" if action_bias != "short" else "sell", float(last_close))
-
-        closes_raw = history.get("Close", pd.Series(dtype=float))
-        closes = _ensure_series_1d(closes_raw)
-
-        def _rsi(series_like, length: int = 14) -> float:
-            arr = np.ravel(np.asarray(series_like, dtype=float))  # force 1-D
-            if arr.size < 2:
-                return 0.0
-        
-            s = pd.Series(arr)
-            delta = s.diff()
-            up = delta.clip(lower=0.0)
-            down = -delta.clip(upper=0.0)
-        
-            roll_up = up.ewm(span=length, adjust=False).mean()
-            roll_down = down.ewm(span=length, adjust=False).mean()
-        
-            rs = roll_up / roll_down.replace(0.0, np.nan)
-            rsi_series = 100 - (100 / (1 + rs))
-            val = rsi_series.iloc[-1]
-            return float(val) if not pd.isna(val) else 0.0
-
-        last_rsi = _rsi(closes, 14)
-        prev_rsi = _rsi(closes.iloc[:-1], 14) if len(closes) > 15 else last_rsi
-        rising = last_rsi >= prev_rsi
-        
-        high_raw = history.get("High", pd.Series(dtype=float))
-        low_raw  = history.get("Low",  pd.Series(dtype=float))
-        closes_raw = history.get("Close", pd.Series(dtype=float))
-        
-        high   = _ensure_series_1d(high_raw)
-        low    = _ensure_series_1d(low_raw)
-        closes = _ensure_series_1d(closes_raw)
-
-        _last_adx = _adx_from_hlc(high, low, closes, 14)
-
-        price  = _scalar(history["Close"].iloc[-1]) if not history.empty else 0.0
-        ema50  = _scalar(history["Close"].ewm(span=50,  adjust=False).mean().iloc[-1]) if len(history) else 0.0
-        ema200 = _scalar(history["Close"].ewm(span=200, adjust=False).mean().iloc[-1]) if len(history) else 0.0
-        trend_pass = (price > ema50 > ema200) or (ema50 > ema200)
-
-        panels = [
-            {
-                "id": "trend",
-                "title": "Trend",
-                "status": "PASS" if trend_pass else "FAIL",
-                "score": next(c["score"] for c in components if c["id"] == "trend"),
-                "goal": "Close > EMA50 > EMA200",
-                "goal_pct": 70,
-                "reason": f"Close {price:.2f} vs EMA50 {ema50:.2f} / EMA200 {ema200:.2f}",
-                "summary": f"Trend is {'aligned' if trend_pass else 'mixed'}.",
-            },
-            {
-                "id": "momentum",
-                "title": "Momentum",
-                "status": "PASS" if (last_rsi >= goals["rsi"] and rising) else "FAIL",
-                "score": next(c["score"] for c in components if c["id"] == "momentum"),
-                "goal": f"RSI ≥ {goals['rsi']} & rising",
-                "goal_pct": _to_pct(goals["rsi"], 40, 70),
-                "reason": f"RSI14={last_rsi:.1f} ({'↑' if rising else '↓'})",
-                "summary": f"RSI {last_rsi:.1f} {'rising' if rising else 'falling'}; goal ≥ {goals['rsi']}.",
-            },
-            {
-                "id": "volatility",
-                "title": "Volatility/Trend Strength (ADX)",
-                "status": "PASS" if _last_adx >= goals["adx"] else "FAIL",
-                "score": next(c["score"] for c in components if c["id"] == "volatility"),
-                "goal": f"ADX ≥ {goals['adx']}",
-                "goal_pct": _to_pct(goals["adx"], 10, 40),
-                "reason": f"ADX14={_last_adx:.1f}",
-                "summary": f"ADX {_last_adx:.1f} vs {goals['adx']}.",
-            },
-            {
-                "id": "volume",
-                "title": "Volume",
-                "status": "PASS" if (vol_mult >= goals["vol_mult"]) else "FAIL",
-                "score": next(c["score"] for c in components if c["id"] == "volume"),
-                "goal": f"Vol ≥ {goals['vol_mult']:.2f}× avg",
-                "goal_pct": _to_pct(goals["vol_mult"], 0.8, 1.3),
-                "reason": f"Vol={vol_mult:.2f}× avg",
-                "summary": f"Volume {vol_mult:.2f}× avg; goal {goals['vol_mult']:.2f}×.",
-            },
-        ]
-    # HACO state series (0/50/100), aligned to candles
-    core_candles = [{"o": c["o"], "h": c["h"], "l": c["l"], "c": c["c"]} for c in candles]
-    haco_state_series = _compute_haco_states(core_candles)
-    chart["haco"] = [
-        {"time": candles[i]["time"], "value": int(haco_state_series[i])}
-        for i in range(min(len(candles), len(haco_state_series)))
-    ]
+        # RSI/ADX/EMAs (and the exit ATR/levels for daily profiles) in one pass
+        tech = panel_from_frames({symbol: history}).row(symbol)
+        action = "buy" if action_bias != "short" else "sell"
+        if daily is history:
+            exits_payload, exit_reason = _exit_levels_from_row(tech, action, float(last_close))
+        else:
+            exits_payload, exit_reason = _exit_levels_from_frame(daily, action, float(last_close))
 
-    # HACOLT mini-bars (0/50/100)
-    hacolt_state_series = []
-    if trend_series:
-        for i in range(len(trend_series)):
-            if i == 0:
-                hacolt_state_series.append(50)
-            else:
-                up = trend_series[i] >= trend_series[i - 1]
-                hacolt_state_series.append(100 if up else 0)
-    chart["hacolt"] = (
-        [{"time": c["time"], "value": int(hacolt_state_series[idx])}
-         for idx, c in enumerate(chart["candles"][-len(hacolt_state_series):])]
-        if chart["candles"] else []
-    )
+        _last_adx = tech["adx"]
+        scores = {c["id"]: c["score"] for c in components}
+        panels, trend_pass = _build_panels(goals, scores, tech, vol_mult)
+    timer.mark("panels")
 
     payload_meta = {
         "trend_pass": bool(trend_pass),
         "adx": float(_last_adx),
-        "hacolt_now": int(hacolt_state_series[-1] if hacolt_state_series else 50),
+        "hacolt_now": int(chart["hacolt"][-1]["value"] if chart["hacolt"] else 50),
     }
 
     # Advanced tabs (merge profile + defaults, no duplicates by id)
@@ -661,11 +645,16 @@ def compute_signals(symbol: str, mode: str = "swing") -> dict:
 
     readiness = {"score": readiness_score, "components": components}
         # --- never let the ranked list crash the endpoint ---
+    # precomputed in the background; a stale snapshot schedules a refresh
     ranked_watchlist: list[dict] = []
-    try:
-        ranked_watchlist = get_dynamic_watchlist(canonical_mode, limit=10)
-    except Exception:
-        ranked_watchlist = []
+    ranked_age = None
+    snapshot = watchlist_rankings.get(canonical_mode)
+    if snapshot is not None:
+        ranked_watchlist = snapshot.ranking
+        ranked_age = round(snapshot.age, 1)
+    timer.mark("watchlist")
+    timings = timer.finish()
+    logging.debug("compute_signals %s/%s timings (ms): %s", symbol, canonical_mode, timings)
     return {
         "symbol": symbol.upper(),
         "mode": canonical_mode,
@@ -682,11 +671,43 @@ def compute_signals(symbol: str, mode: str = "swing") -> dict:
         "available_modes": sorted(MODE_PROFILES.keys()),
                 "watchlist": profile.get("watchlist") or _fallback_watchlist_for_mode(canonical_mode),
         "ranked_watchlist": ranked_watchlist,
+        "ranked_watchlist_age": ranked_age,
         "mindset": profile.get("mindset", {}),
         "meta": payload_meta,
+        "timings": timings,
     }
 
 
+def watchlist_panels(symbols: list[str] | None = None, mode: str = "swing") -> dict:
+    """
+    Readiness score and PASS/FAIL panels for a whole watchlist.
+    One batched bar read, one technical panel over every symbol and the
+    block readiness scorer; no per-symbol compute_signals calls.
+    """
+    canonical_mode, profile = _get_mode_profile(mode)
+    goals = _goal_lines_for_mode(canonical_mode)
+    symbols = [str(s).upper() for s in (symbols or get_watchlist(canonical_mode))]
+    frames = _universe_frames(symbols, profile, canonical_mode)
+    parts = _block_parts(frames, profile)
+    volume_window = profile.get("chart", {}).get("volume_window", 20)
+    tech = panel_from_frames(frames, volume_window=volume_window) if frames else None
+
+    out: dict[str, dict] = {}
+    for sym in symbols:
+        if sym not in parts or tech is None:
+            out[sym] = {"error": "no_data"}
+            continue
+        row = tech.row(sym)
+        scores = {cid: round(float(p), 1) for cid, p in zip(_COMPONENT_IDS, parts[sym])}
+        panels, trend_pass = _build_panels(goals, scores, row, row["volume_mult"])
+        out[sym] = {
+            "readiness": _readiness_from_parts(parts[sym]),
+            "panels": panels,
+            "meta": {"trend_pass": bool(trend_pass), "adx": row["adx"], "rsi": row["rsi"]},
+        }
+    return {"mode": canonical_mode, "symbols": out}
+
+
 def get_watchlist(mode: str | None = None) -> list[str]:
     """Return the configured watchlist for ``mode`` or the default list."""
 
@@ -708,69 +729,34 @@ def format_price(value: float | None) -> float | None:
 
 def get_risk_factors(symbols: list[str]) -> dict:
     """Return a mapping of symbol to Quiver risk score."""
-    key = os.getenv("QUIVER_API_KEY")
-    headers = {"Authorization": f"Bearer {key}"} if key else {}
     try:
-        r = requests.get(
-            "https://api.quiverquant.com/beta/live/riskfactors",
-            headers=headers,
-            params={"tickers": ",".join(symbols)},
-            timeout=10,
-        )
-        if r.ok:
-            data = r.json()
-            if isinstance(data, list):
-                scores = {}
-                for item in data:
-                    sym = item.get("Ticker") or item.get("ticker")
-                    if sym:
-                        score = item.get("RiskScore") or item.get("Score")
-                        try:
-                            scores[sym] = float(score)
-                        except (TypeError, ValueError):
-                            pass
-                return scores
+        return event_store.default_store().latest_scores("risk", symbols)
     except Exception:
-        pass
-    return {}
+        logging.exception("Risk factor lookup failed")
+        return {}
 
 
 def get_whale_moves(limit: int = 5) -> list[dict]:
     """Return recent whale moves from Quiver."""
-    key = os.getenv("QUIVER_API_KEY")
-    headers = {"Authorization": f"Bearer {key}"} if key else {}
     try:
-        r = requests.get(
-            "https://api.quiverquant.com/beta/live/whalemoves",
-            headers=headers,
-            timeout=10,
-        )
-        if r.ok:
-            data = r.json()
-            if isinstance(data, list):
-                return data[:limit]
+        return event_store.default_store().records("whales", limit=limit)
     except Exception:
-        pass
-    return []
+        logging.exception("Whale move lookup failed")
+        return []
 
 
 async def fetch_unusual_whales(limit: int = 5) -> list[dict]:
     """Fetch latest unusual whale alerts."""
-    import httpx
-
     key = os.getenv("WHALES_API_KEY")
     headers = {"Authorization": f"Bearer {key}"} if key else {}
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(
-                "https://api.unusualwhales.com/alerts", headers=headers
-            )
-            if r.status_code == 200:
-                data = r.json()
-                if isinstance(data, dict):
-                    data = data.get("results", data)
-                if isinstance(data, list):
-                    return data[:limit]
+        r = await upstream.aget("https://api.unusualwhales.com/alerts", headers=headers)
+        if r.status_code == 200:
+            data = r.json()
+            if isinstance(data, dict):
+                data = data.get("results", data)
+            if isinstance(data, list):
+                return data[:limit]
     except Exception:
         pass
     return []
@@ -778,52 +764,20 @@ async def fetch_unusual_whales(limit: int = 5) -> list[dict]:
 
 def get_political_moves(symbols: list[str]) -> dict:
     """Return counts of recent congressional trades for each symbol."""
-    key = os.getenv("QUIVER_API_KEY")
-    headers = {"Authorization": f"Bearer {key}"} if key else {}
     try:
-        r = requests.get(
-            "https://api.quiverquant.com/beta/live/congresstrading",
-            headers=headers,
-            params={"tickers": ",".join(symbols)},
-            timeout=10,
-        )
-        if r.ok:
-            data = r.json()
-            counts: dict[str, int] = {}
-            if isinstance(data, list):
-                for item in data:
-                    sym = item.get("Ticker") or item.get("ticker")
-                    if sym and sym in symbols:
-                        counts[sym] = counts.get(sym, 0) + 1
-            return counts
+        return event_store.default_store().counts("congress", symbols, days=QUIVER_RECENT_DAYS)
     except Exception:
-        pass
-    return {}
+        logging.exception("Congress trade lookup failed")
+        return {}
 
 
 def get_lobby_disclosures(symbols: list[str]) -> dict:
     """Return counts of recent lobbying disclosures for each symbol."""
-    key = os.getenv("QUIVER_API_KEY")
-    headers = {"Authorization": f"Bearer {key}"} if key else {}
     try:
-        r = requests.get(
-            "https://api.quiverquant.com/beta/live/lobbying",
-            headers=headers,
-            params={"tickers": ",".join(symbols)},
-            timeout=10,
-        )
-        if r.ok:
-            data = r.json()
-            counts: dict[str, int] = {}
-            if isinstance(data, list):
-                for item in data:
-                    sym = item.get("Ticker") or item.get("ticker")
-                    if sym and sym in symbols:
-                        counts[sym] = counts.get(sym, 0) + 1
-            return counts
+        return event_store.default_store().counts("lobbying", symbols, days=QUIVER_RECENT_DAYS)
     except Exception:
-        pass
-    return {}
+        logging.exception("Lobbying lookup failed")
+        return {}
 
 
 def news_sentiment_signal(symbol: str) -> dict:
@@ -834,7 +788,7 @@ def news_sentiment_signal(symbol: str) -> dict:
         params["apiKey"] = key
     articles: list[str] = []
     try:
-        resp = requests.get(
+        resp = upstream.get(
             "https://newsapi.org/v2/everything",
             params=params,
             timeout=5,
@@ -855,24 +809,21 @@ def news_sentiment_signal(symbol: str) -> dict:
     }
 
 
-def technical_indicator_signal(symbol: str) -> dict:
-    """Generate a simple moving-average crossover signal."""
-    data = yf.download(
-        symbol,
-        period="3mo",
-        interval="1d",
-        auto_adjust=False,
-        progress=False,
-        threads=True,
-    )
-    # Guard: yfinance may return None/empty
+def _ma_crossover_signal(data: pd.DataFrame | None) -> str:
+    """Return bullish/bearish from the 20/50-bar SMA cross of ``data``."""
+    # Guard: no bars stored or downloadable
     if data is None or data.empty:
-        return {"type": "technical", "symbol": symbol, "signal": "none"}
+        return "none"
+    close = _ensure_series_1d(data["Close"]).to_numpy()
+    ma_short = indicator_common.sma_array(close, 20)
+    ma_long = indicator_common.sma_array(close, 50)
+    return "bullish" if ma_short[-1] > ma_long[-1] else "bearish"
+
 
-    data["ma_short"] = data["Close"].rolling(20).mean()
-    data["ma_long"]  = data["Close"].rolling(50).mean()
-    signal = "bullish" if data["ma_short"].iloc[-1] > data["ma_long"].iloc[-1] else "bearish"
-    return {"type": "technical", "symbol": symbol, "signal": signal}
+def technical_indicator_signal(symbol: str) -> dict:
+    """Generate a simple moving-average crossover signal."""
+    data = get_bars(symbol, "1d", period="3mo")
+    return {"type": "technical", "symbol": symbol, "signal": _ma_crossover_signal(data)}
 
 
 def macro_llm_signal(text: str) -> dict:
@@ -931,141 +882,204 @@ def _calculate_exit(symbol, data, entry_price, take_profit_pct=0.02, stop_loss_p
     return {"rec": "hold", "reason": "Within band"}
 
 
+def _exit_dates(
+    entries: dict[str, float], entry_date: datetime.date
+) -> dict[str, tuple[datetime.date, float]]:
+    """Exit date and price per symbol entered at ``entry_date``.
+
+    Forward bars for every symbol are loaded in one batch and scored in one
+    vectorized pass (fixed profit target and stop on closes; otherwise the
+    close after ``EXIT_MAX_HOLD_DAYS`` bars, or the last available close if
+    fewer).  Symbols without forward bars fall back to the time limit at the
+    entry price.
+    """
+    symbols = list(entries)
+    out: dict[str, tuple[datetime.date, float]] = {}
+    try:
+        frames = get_bars_many(symbols, "1d", start=entry_date)
+        prices = PriceMatrix.from_frames(frames)
+        entry = np.array([_scalar(entries[sym]) for sym in symbols], dtype=float)
+        result = simulate_exits(
+            prices,
+            symbols,
+            [entry_date] * len(symbols),
+            entry,
+            target=entry * (1 + EXIT_PROFIT_TARGET_PCT),
+            stop=entry * (1 - EXIT_STOP_LOSS_PCT),
+            max_hold=EXIT_MAX_HOLD_DAYS,
+        )
+        for sym, reason, exit_date, exit_price in zip(
+            result["symbol"], result["reason"], result["exit_date"], result["exit_price"]
+        ):
+            if reason != "no_data":
+                out[sym] = (exit_date.date(), float(exit_price))
+    except Exception:
+        logging.exception("Exit calculation failed for %s", ",".join(symbols))
+    for sym in symbols:
+        if sym not in out:
+            out[sym] = (
+                entry_date + datetime.timedelta(days=EXIT_MAX_HOLD_DAYS),
+                float(_scalar(entries[sym])),
+            )
+    return out
+
+
 def _calculate_exit_date(
     symbol: str, entry_price: float, entry_date: datetime.date
 ) -> tuple[datetime.date, float]:
     """Return exit date and price based on fixed target, stop and time limit."""
-    forward = None
-    exit_date = None
-    exit_price = None
-    try:
-        forward = yf.download(
-            symbol,
-            start=entry_date,
-            period=f"{EXIT_MAX_HOLD_DAYS}d",
-            interval="1d",
-            auto_adjust=False,
-            progress=False,
-            threads=True,
-        )
-        profit_target = _scalar(entry_price) * (1 + EXIT_PROFIT_TARGET_PCT)
-        stop_loss = _scalar(entry_price) * (1 - EXIT_STOP_LOSS_PCT)
-        for date, row in forward.iterrows():
-            price = _scalar(row["Close"])
-            if price is None:
-                continue
-            if price >= profit_target:
-                exit_date, exit_price = date.date(), profit_target
-                break
-            if price <= stop_loss:
-                exit_date, exit_price = date.date(), stop_loss
-                break
-        if exit_date is None and forward is not None and not forward.empty:
-            last_date = forward.index[-1].date()
-            exit_date = last_date
-            exit_price = _scalar(forward.iloc[-1]["Close"])
-    except Exception:
-        logging.exception("Exit calculation failed for %s", symbol)
-    if exit_date is None:
-        exit_date = entry_date + datetime.timedelta(days=EXIT_MAX_HOLD_DAYS)
-        exit_price = _scalar(entry_price)
-    return exit_date, float(exit_price)
+    return _exit_dates({symbol: entry_price}, entry_date)[symbol]
 
 
 def _exit_levels(symbol: str, action: str, price: float) -> tuple[dict | None, str]:
     """Return low/medium/high risk exit levels and an explanation."""
     try:
-        data = yf.download(
-            symbol, period="2mo", interval="1d",
-            auto_adjust=False, progress=False, threads=True,
-        )
-        if data is None or data.empty:
-            return None, "No historical data for exits"
-
-        high = data["High"].astype(float)
-        low  = data["Low"].astype(float)
-        close = data["Close"].astype(float)
-
-        # Need enough bars; otherwise, bail early with a friendly reason.
-        n = len(close)
-        if n < 20:
-            return None, "Not enough history for exits"
-
-        tr = pd.concat([
-            high - low,
-            (high - close.shift()).abs(),
-            (low  - close.shift()).abs(),
-        ], axis=1).max(axis=1)
-
-        atr_val = _scalar(tr.rolling(14, min_periods=14).mean().iloc[-1])
-        sup_val = _scalar(low.rolling(20,  min_periods=20).min().iloc[-1])
-        res_val = _scalar(high.rolling(20, min_periods=20).max().iloc[-1])
-
-        # Guard NaNs
-        if any(math.isnan(v) for v in (atr_val, sup_val, res_val)):
-            return None, "Insufficient data quality for exits"
-
-        if action == "buy":
-            exits = {
-                "low":    format_price(price + atr_val),
-                "medium": format_price(price + 2 * atr_val),
-                "high":   format_price(max(res_val, price + 3 * atr_val)),
-            }
-        else:
-            exits = {
-                "low":    format_price(price - atr_val),
-                "medium": format_price(price - 2 * atr_val),
-                "high":   format_price(min(sup_val, price - 3 * atr_val)),
-            }
-
-        reason = f"ATR {atr_val:.2f}, support {sup_val:.2f}, resistance {res_val:.2f}."
-        return exits, reason
+        data = get_bars(symbol, "1d", period="2mo")
     except Exception:
         return None, "Exit calculation failed"
+    return _exit_levels_from_frame(data, action, price)
+
+
+def _exit_levels_from_frame(data: pd.DataFrame | None, action: str, price: float) -> tuple[dict | None, str]:
+    """ATR/support/resistance exit levels from already-loaded daily bars."""
+    if data is None or data.empty:
+        return None, "No historical data for exits"
+    try:
+        tech = panel_from_frames({"_": data}).row("_")
+    except Exception:
+        return None, "Exit calculation failed"
+    return _exit_levels_from_row(tech, action, price)
+
+
+def _exit_levels_from_row(tech: dict, action: str, price: float) -> tuple[dict | None, str]:
+    """Exit levels from a :class:`TechnicalPanel` row of daily bars."""
+    # Need enough bars; otherwise, bail early with a friendly reason.
+    if tech["bars"] < 20:
+        return None, "Not enough history for exits"
+    atr_val, sup_val, res_val = tech["atr"], tech["support"], tech["resistance"]
+
+    # Guard NaNs
+    if any(math.isnan(v) for v in (atr_val, sup_val, res_val)):
+        return None, "Insufficient data quality for exits"
+
+    if action == "buy":
+        exits = {
+            "low":    format_price(price + atr_val),
+            "medium": format_price(price + 2 * atr_val),
+            "high":   format_price(max(res_val, price + 3 * atr_val)),
+        }
+    else:
+        exits = {
+            "low":    format_price(price - atr_val),
+            "medium": format_price(price - 2 * atr_val),
+            "high":   format_price(min(sup_val, price - 3 * atr_val)),
+        }
+
+    reason = f"ATR {atr_val:.2f}, support {sup_val:.2f}, resistance {res_val:.2f}."
+    return exits, reason
+
+
+RECOMMENDATION_TTL = int(os.getenv("RECOMMENDATION_TTL", "3600"))
+RECOMMENDATION_WORKERS = int(os.getenv("RECOMMENDATION_WORKERS", "8"))
+# (symbol, day) -> recommendation; a new trading day never reuses yesterday's
+_RECOMMENDATIONS = TTLCache(maxsize=2048, ttl=RECOMMENDATION_TTL, name="recommendations")
+
+
+def _build_recommendation(
+    sym: str,
+    news: dict,
+    tech: dict,
+    price: float | None,
+    risk: float,
+    pol: int,
+    lob: int,
+    entry_date: datetime.date,
+    exit: tuple[datetime.date, float] | None,
+) -> dict:
+    base_score = news.get("score", 0) + (1 if tech.get("signal") == "bullish" else -1)
+    score = base_score - risk + 0.2 * pol + 0.1 * lob
+    action = "buy" if score >= 0 else "sell"
+    entry_price = price
+    exit_date, exit_price = exit if entry_price is not None and exit else (None, None)
+    probability = round(min(0.9, 0.5 + min(abs(score) / 10, 0.4)), 2)
+    parts = [
+        f"News score {news.get('score')} and {tech.get('signal')} MA signal",
+        f"risk {risk}"
+    ]
+    if pol:
+        parts.append(f"{pol} political moves")
+    if lob:
+        parts.append(f"{lob} lobby disclosures")
+    reason = " ".join(parts) + f" suggest {action}."
+    return {
+        "symbol": sym,
+        "action": action,
+        "entry_date": entry_date.isoformat(),
+        "entry_price": format_price(entry_price),
+        "exit_date": exit_date.isoformat() if exit_date else None,
+        "exit_price": format_price(exit_price),
+        "probability": probability,
+        "reason": reason,
+    }
+
+
+def recommend_symbols(symbols: Iterable[str]) -> dict[str, dict]:
+    """Return one recommendation per distinct symbol, cached per (symbol, day).
+
+    Uncached symbols share a single fan-out: the three Quiver endpoints, the
+    latest-price batch, one batched daily-bar load and the per-symbol news
+    lookups all run concurrently.  The bar load warms the bar store, so the
+    MA signal and the batched exit simulation both read that one frame per
+    symbol.
+    """
+    unique = list(dict.fromkeys(s for s in symbols if s))
+    today = datetime.date.today()
+    out: dict[str, dict] = {}
+    need = []
+    for sym in unique:
+        rec = _RECOMMENDATIONS.get((sym, today))
+        if rec is None:
+            need.append(sym)
+        else:
+            out[sym] = rec
+    if need:
+        workers = max(1, min(RECOMMENDATION_WORKERS, 5 + len(need)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            bars_f = pool.submit(get_bars_many, need, "1d", period="3mo")
+            risk_f = pool.submit(get_risk_factors, need)
+            pol_f = pool.submit(get_political_moves, need)
+            lob_f = pool.submit(get_lobby_disclosures, need)
+            prices_f = pool.submit(fetch_latest_prices, need)
+            news_fs = {sym: pool.submit(news_sentiment_signal, sym) for sym in need}
+            try:
+                bars_f.result()
+            except Exception:
+                logging.exception("Batched bar load failed for recommendations")
+            tech_fs = {sym: pool.submit(technical_indicator_signal, sym) for sym in need}
+            risk_scores, political, lobby = risk_f.result(), pol_f.result(), lob_f.result()
+            prices = prices_f.result()
+            news = {sym: fut.result() for sym, fut in news_fs.items()}
+            tech = {sym: fut.result() for sym, fut in tech_fs.items()}
+        priced = {sym: prices[sym] for sym in need if prices.get(sym) is not None}
+        exits = _exit_dates(priced, today) if priced else {}
+        for sym in need:
+            out[sym] = _build_recommendation(
+                sym,
+                news[sym],
+                tech[sym],
+                prices.get(sym),
+                risk_scores.get(sym, 0),
+                political.get(sym, 0),
+                lobby.get(sym, 0),
+                today,
+                exits.get(sym),
+            )
+            _RECOMMENDATIONS.set((sym, today), out[sym])
+    return {sym: dict(out[sym]) for sym in unique}
 
 
 def generate_recommendations(symbols: list[str]) -> list[dict]:
     """Return simple trade recommendations based on sentiment, technicals, and risk."""
-    recs = []
-    risk_scores = get_risk_factors(symbols)
-    political = get_political_moves(symbols)
-    lobby = get_lobby_disclosures(symbols)
-    prices = fetch_latest_prices(symbols)
-    for sym in symbols:
-        news = news_sentiment_signal(sym)
-        tech = technical_indicator_signal(sym)
-        price = prices.get(sym)
-        base_score = news.get("score", 0) + (1 if tech.get("signal") == "bullish" else -1)
-        risk = risk_scores.get(sym, 0)
-        pol = political.get(sym, 0)
-        lob = lobby.get(sym, 0)
-        score = base_score - risk + 0.2 * pol + 0.1 * lob
-        action = "buy" if score >= 0 else "sell"
-        entry_date = datetime.date.today()
-        entry_price = price
-        exit_date = None
-        exit_price = None
-        if entry_price is not None:
-            exit_date, exit_price = _calculate_exit_date(sym, entry_price, entry_date)
-        probability = round(min(0.9, 0.5 + min(abs(score) / 10, 0.4)), 2)
-        parts = [
-            f"News score {news.get('score')} and {tech.get('signal')} MA signal",
-            f"risk {risk}"
-        ]
-        if pol:
-            parts.append(f"{pol} political moves")
-        if lob:
-            parts.append(f"{lob} lobby disclosures")
-        reason = " ".join(parts) + f" suggest {action}."
-        recs.append({
-            "symbol": sym,
-            "action": action,
-            "entry_date": entry_date.isoformat(),
-            "entry_price": format_price(entry_price),
-            "exit_date": exit_date.isoformat() if exit_date else None,
-            "exit_price": format_price(exit_price),
-            "probability": probability,
-            "reason": reason,
-        })
+    recs = list(recommend_symbols(symbols).values())
     recs.sort(key=lambda x: x["probability"], reverse=True)
     return recs[:3]
@@ -0,0 +1,210 @@
+"""Vectorized technical panel (RSI, ADX, ATR, levels, EMAs) for many symbols.
+
+Histories are stacked into ``(symbols, bars)`` arrays, right-aligned on the
+last bar and NaN-padded on the left for shorter histories.  Every indicator
+is then one kernel call from :mod:`indicators.common` over the whole stack;
+the kernels start each row at its first finite value, so a padded row gives
+the same numbers as scoring that symbol on its own.
+
+Definitions match the per-symbol helpers they replace in ``signals``:
+
+* RSI – EMA (``span=length``) of up/down closes; ``rsi_prev`` is the
+  reading one bar earlier (the last reading when there are too few bars);
+* ADX – Wilder smoothing of TR/+DM/-DM and of DX, 0 with too few bars;
+* ATR – simple mean of the true range over ``atr_length`` bars;
+* support/resistance – ``level_window``-bar low/high;
+* EMA50/EMA200 of the close, and the last-volume multiple of its
+  ``volume_window`` average when volumes are given.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from indicators import common
+
+_FIELDS = ("High", "Low", "Close", "Volume")
+
+
+def _field(frame: pd.DataFrame, name: str) -> np.ndarray:
+    col = frame.get(name, frame.get(name.lower()))
+    if col is None:
+        return np.full(len(frame), np.nan)
+    if isinstance(col, pd.DataFrame):  # duplicated / multi-level column
+        col = col.iloc[:, 0]
+    return np.asarray(col, dtype=float)
+
+
+def stack_frames(
+    frames: Mapping[str, pd.DataFrame | None], keep: int | None = None
+) -> tuple[list[str], np.ndarray]:
+    """Right-align ``frames`` into one ``(symbols, bars, H/L/C/V)`` array."""
+
+    symbols = list(frames)
+    columns = []
+    for sym in symbols:
+        frame = frames[sym]
+        if frame is None or frame.empty:
+            columns.append(np.empty((0, len(_FIELDS))))
+            continue
+        if keep is not None:
+            frame = frame.tail(keep)
+        columns.append(np.column_stack([_field(frame, name) for name in _FIELDS]))
+    width = max((len(c) for c in columns), default=0)
+    out = np.full((len(symbols), width, len(_FIELDS)), np.nan)
+    for row, values in enumerate(columns):
+        if len(values):
+            out[row, width - len(values):] = values
+    return symbols, out
+
+
+@dataclass(frozen=True)
+class TechnicalPanel:
+    """Latest indicator readings, one array entry per symbol."""
+
+    symbols: list[str]
+    bars: np.ndarray
+    close: np.ndarray
+    rsi: np.ndarray
+    rsi_prev: np.ndarray
+    adx: np.ndarray
+    atr: np.ndarray
+    support: np.ndarray
+    resistance: np.ndarray
+    ema50: np.ndarray
+    ema200: np.ndarray
+    volume_mult: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def row(self, symbol: str) -> dict:
+        """Readings for ``symbol`` as plain Python values (NaN kept as NaN)."""
+
+        i = self.symbols.index(symbol)
+        return {
+            "symbol": symbol,
+            "bars": int(self.bars[i]),
+            **{
+                name: float(getattr(self, name)[i])
+                for name in ("close", "rsi", "rsi_prev", "adx", "atr", "support",
+                             "resistance", "ema50", "ema200", "volume_mult")
+            },
+        }
+
+    def rows(self) -> dict[str, dict]:
+        return {sym: self.row(sym) for sym in self.symbols}
+
+
+def _last(x: np.ndarray) -> np.ndarray:
+    return x[:, -1] if x.shape[1] else np.full(x.shape[0], np.nan)
+
+
+def rsi_matrix(close: np.ndarray, length: int = 14) -> np.ndarray:
+    """RSI for every bar of a ``(symbols, bars)`` close matrix."""
+
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+    roll = common.ema_array(
+        np.stack([np.clip(delta, 0.0, None), -np.clip(delta, None, 0.0)]), length
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = roll[0] / np.where(roll[1] == 0.0, np.nan, roll[1])
+    return 100 - (100 / (1 + rs))
+
+
+def adx_matrix(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    """Wilder ADX for every bar (NaN during the warm-up)."""
+
+    tr = common.true_range(high, low, close)
+    up_move = np.diff(high, axis=-1, prepend=np.nan)
+    down_move = -np.diff(low, axis=-1, prepend=np.nan)
+    pad = np.isnan(tr)  # left padding of shorter histories
+    plus_dm = np.where(pad, np.nan, np.where((up_move > down_move) & (up_move > 0.0), up_move, 0.0))
+    minus_dm = np.where(pad, np.nan, np.where((down_move > up_move) & (down_move > 0.0), down_move, 0.0))
+
+    atr, plus_sm, minus_sm = common.wilder_array(np.stack([tr, plus_dm, minus_dm]), length, min_periods=length)
+    safe_atr = np.where(atr == 0.0, np.nan, atr)
+    plus_di = 100.0 * plus_sm / safe_atr
+    minus_di = 100.0 * minus_sm / safe_atr
+    di_sum = plus_di + minus_di
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(di_sum > 0.0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    # warm-up stays NaN; bars with no directional movement read as zero
+    dx = np.where(np.isnan(atr), np.nan, dx)
+    return common.wilder_array(dx, length, min_periods=length)
+
+
+def technical_panel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    symbols: Sequence[str],
+    volume: np.ndarray | None = None,
+    *,
+    rsi_length: int = 14,
+    adx_length: int = 14,
+    atr_length: int = 14,
+    level_window: int = 20,
+    volume_window: int = 20,
+) -> TechnicalPanel:
+    """Score aligned ``(symbols, bars)`` H/L/C(/V) arrays in one pass."""
+
+    high, low, close = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (high, low, close))
+    bars = np.sum(~np.isnan(close), axis=1)
+
+    rsi = rsi_matrix(close, rsi_length)
+    rsi_last = np.nan_to_num(_last(rsi))
+    rsi_prev = np.nan_to_num(rsi[:, -2]) if rsi.shape[1] > 1 else rsi_last
+    rsi_prev = np.where(bars > rsi_length + 1, rsi_prev, rsi_last)
+
+    adx = np.nan_to_num(_last(adx_matrix(high, low, close, adx_length)))
+    adx = np.where(bars >= adx_length + 2, adx, 0.0)
+
+    tr = common.true_range(high, low, close)
+
+    volume_mult = np.zeros(len(symbols))
+    if volume is not None:
+        volume = np.atleast_2d(np.asarray(volume, dtype=float))
+        avg = _last(common.sma_array(volume, volume_window))
+        last_volume = _last(volume)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volume_mult = np.nan_to_num(np.where(avg != 0.0, last_volume / avg, 0.0))
+
+    return TechnicalPanel(
+        symbols=list(symbols),
+        bars=bars,
+        close=_last(close),
+        rsi=rsi_last,
+        rsi_prev=rsi_prev,
+        adx=adx,
+        atr=_last(common.sma_array(tr, atr_length)),
+        support=_last(common.rolling_min(low, level_window)),
+        resistance=_last(common.rolling_max(high, level_window)),
+        ema50=_last(common.ema_array(close, 50)),
+        ema200=_last(common.ema_array(close, 200)),
+        volume_mult=volume_mult,
+    )
+
+
+def panel_from_frames(
+    frames: Mapping[str, pd.DataFrame | None], keep: int | None = None, **kwargs
+) -> TechnicalPanel:
+    """:func:`technical_panel` over OHLCV frames keyed by symbol."""
+
+    symbols, stacked = stack_frames(frames, keep)
+    h, l, c, v = (stacked[..., i] for i in range(len(_FIELDS)))
+    return technical_panel(h, l, c, symbols, v, **kwargs)
+
+
+__all__ = [
+    "TechnicalPanel",
+    "adx_matrix",
+    "panel_from_frames",
+    "rsi_matrix",
+    "stack_frames",
+    "technical_panel",
+]
@@ -0,0 +1,267 @@
+"""Pooled HTTP clients for upstream market, news and political APIs.
+
+One process-wide :data:`upstream` owns a keep-alive ``requests.Session``
+for sync callers and one ``httpx.AsyncClient`` per event loop for async
+callers (HTTP/2 when the optional ``h2`` package is installed).  Both cap
+connections per host, retry idempotent requests on connection errors and
+429/5xx answers with exponential backoff plus jitter, and record per-host
+latency and error counters for ``/api/metrics/upstream``.
+
+The FastAPI lifespan calls :meth:`UpstreamClients.open` and
+:meth:`UpstreamClients.aclose`; scripts and tests that never run the
+lifespan get the clients lazily on first use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.25"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def backoff_delay(attempt: int, base: float = HTTP_BACKOFF, cap: float = HTTP_BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (0-based)."""
+
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HostStats:
+    """Request, retry, error and latency counters for one upstream host."""
+
+    __slots__ = ("requests", "retries", "errors", "total_ms", "max_ms", "last_status")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_status: Optional[int] = None
+
+    def record(self, elapsed_ms: float, status: Optional[int]) -> None:
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_status = status
+        if status is None or status >= 500:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "error_ratio": round(self.errors / self.requests, 4) if self.requests else None,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "max_ms": round(self.max_ms, 1),
+            "last_status": self.last_status,
+        }
+
+
+class _LoopState:
+    """Async client and per-host semaphores bound to one event loop."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, host: str, limit: int) -> asyncio.Semaphore:
+        sem = self.hosts.get(host)
+        if sem is None:
+            sem = self.hosts[host] = asyncio.Semaphore(limit)
+        return sem
+
+
+class UpstreamClients:
+    """Shared sync/async HTTP clients with retries and per-host metrics."""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = HTTP_TIMEOUT,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_per_host: int = HTTP_MAX_PER_HOST,
+        retries: int = HTTP_RETRIES,
+        http2: bool = HTTP2_AVAILABLE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.http2 = http2
+        self.transport = transport
+        self._session: Optional[requests.Session] = None
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._stats: Dict[str, HostStats] = {}
+
+    # -- lifecycle ------------------------------------------------------------
+    def open(self) -> None:
+        """Create the sync session (async clients are created per loop on use)."""
+
+        self.session()
+
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                # pool_block caps concurrent connections per host instead of
+                # opening (and discarding) extra ones under load
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_connections,
+                    pool_maxsize=self.max_per_host,
+                    pool_block=True,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            state = self._loops[loop] = _LoopState(client)
+        return state
+
+    def async_client(self) -> httpx.AsyncClient:
+        return self._loop_state().client
+
+    def close(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    async def aclose(self) -> None:
+        """Close the current loop's async client and the sync session."""
+
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+        self.close()
+
+    # -- metrics --------------------------------------------------------------
+    def _host(self, url: str) -> HostStats:
+        host = urlsplit(str(url)).netloc or "unknown"
+        stats = self._stats.get(host)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(host, HostStats())
+        return stats
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "max_per_host": self.max_per_host,
+            "open_loops": len(self._loops),
+            "hosts": {host: s.as_dict() for host, s in sorted(self._stats.items())},
+        }
+
+    # -- requests -------------------------------------------------------------
+    def _attempts(self, method: str) -> int:
+        return 1 + (self.retries if method.upper() in _IDEMPOTENT else 0)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Sync request through the pooled session, retrying transient failures."""
+
+        kwargs.setdefault("timeout", self.timeout)
+        stats = self._host(url)
+        attempts = self._attempts(method)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                resp = self.session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                stats.record((time.perf_counter() - started) * 1000.0, None)
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                stats.record((time.perf_counter() - started) * 1000.0, resp.status_code)
+                if resp.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    return resp
+                resp.close()
+            stats.retries += 1
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Async request on this loop's pooled client, retrying transient failures."""
+
+        state = self._loop_state()
+        host = urlsplit(str(url)).netloc
+        stats = self._host(url)
+        attempts = self._attempts(method)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with state.semaphore(host, self.max_per_host):
+                    resp = await state.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                stats.record((time.perf_counter() - started) * 1000.0, None)
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                stats.record((time.perf_counter() - started) * 1000.0, resp.status_code)
+                if resp.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    return resp
+            stats.retries += 1
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def aget(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+
+upstream = UpstreamClients()
+
+
+__all__ = [
+    "HTTP2_AVAILABLE",
+    "HostStats",
+    "UpstreamClients",
+    "backoff_delay",
+    "upstream",
+]
@@ -0,0 +1,7 @@
+-- Serialized indicators.haco.HacoState so alert workers resume HACO
+-- incrementally instead of recomputing full history every tick.
+ALTER TABLE haco_alerts
+  ADD COLUMN haco_state TEXT NULL;
+
+ALTER TABLE alert_state
+  ADD COLUMN haco_state TEXT NULL;
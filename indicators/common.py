@@ -5,51 +5,297 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Iterable, List, Sequence
 
+import numpy as np
 
-def sma(values: Sequence[float], period: int) -> List[float | None]:
-    """Simple moving average that mirrors the lightweight-chart behaviour.
 
-    The helper intentionally returns ``None`` for the warmup window so callers
-    can easily drop the missing values when constructing chart payloads.
+# Largest exponent ``beta ** -j`` is allowed to reach inside one block of the
+# closed-form EMA solve; keeps the intermediate products inside float64 range.
+_EMA_MAX_GROWTH = 300.0
+
+
+# -- array kernels ------------------------------------------------------------
+#
+# Every kernel works along the last axis, so the same call handles one series
+# of shape ``(bars,)`` or a ``(symbols, bars)`` panel.  Warm-up positions are
+# NaN.  The recursive filters skip leading NaNs per row (each row starts at
+# its first finite value, like ``pandas.Series.ewm(adjust=False)``), so
+# panels of symbols with different history lengths can be stacked with NaN
+# padding on the left; interior gaps carry the last value, as ``ewm`` does.
+
+
+def _left_align(x: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+    """Shift each row so its first finite value sits at position 0."""
+
+    first = np.argmax(~np.isnan(x), axis=-1)
+    if not first.any():
+        return x, None
+    n = x.shape[-1]
+    idx = np.arange(n) + first[..., None]
+    aligned = np.take_along_axis(x, np.minimum(idx, n - 1), axis=-1)
+    return np.where(idx < n, aligned, np.nan), first
+
+
+def _restore(aligned: np.ndarray, first: np.ndarray | None) -> np.ndarray:
+    if first is None:
+        return aligned
+    idx = np.arange(aligned.shape[-1]) - first[..., None]
+    out = np.take_along_axis(aligned, np.maximum(idx, 0), axis=-1)
+    return np.where(idx >= 0, out, np.nan)
+
+
+def _gap_steps(gaps: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """Per-bar ``(decay, weight)`` of the recursion over ``gaps``.
+
+    A gap bar keeps the state (no decay, no weight).  An observation after
+    ``k`` gap bars follows ``pandas.Series.ewm(adjust=False)``: the state
+    weight decays ``k + 1`` times and is renormalised against ``alpha``
+    (``com == 1``, i.e. ``alpha = 0.5``, hands the new value the whole decayed
+    weight instead, as pandas does).
     """
 
+    beta = 1.0 - alpha
+    n = gaps.shape[-1]
+    pos = np.arange(n)
+    last = np.maximum.accumulate(np.where(gaps, -1, pos), axis=-1)
+    prev = np.concatenate((np.full(gaps.shape[:-1] + (1,), -1), last[..., :-1]), axis=-1)
+    kept = beta ** (pos - np.maximum(prev, 0)).astype(float)  # beta ** (k + 1)
+    if alpha == 0.5:
+        step_beta, weight = kept, 1.0 - kept
+    else:
+        step_beta, weight = kept / (kept + alpha), alpha / (kept + alpha)
+    # past e**-36 the old state is below float64 resolution; capping keeps
+    # long gaps from overflowing the block solve
+    with np.errstate(divide="ignore"):
+        decay = np.where(gaps, 0.0, np.minimum(-np.log(step_beta), 36.0))
+    return decay, np.where(gaps, 0.0, weight)
+
+
+def _linear_filter(
+    x: np.ndarray, alpha: float, seed: float | np.ndarray | None, gaps: np.ndarray | None = None
+) -> np.ndarray:
+    out = np.empty_like(x)
+    n = x.shape[-1]
+    if n == 0:
+        return out
+    out[..., 0] = x[..., 0] if seed is None else seed
+    beta = 1.0 - alpha
+    if n == 1:
+        return out
+    if beta <= 0.0:
+        out[..., 1:] = x[..., 1:]
+        if gaps is not None:
+            last = np.maximum.accumulate(np.where(gaps, 0, np.arange(n)), axis=-1)
+            out = np.take_along_axis(out, last, axis=-1)
+        return out
+    decay = -np.log(beta)
+    block = n - 1 if decay == 0.0 else max(1, min(n - 1, int(_EMA_MAX_GROWTH / decay)))
+    base = out[..., :1]
+    carry = np.zeros_like(base)
+    if gaps is None:
+        steps = np.arange(block, dtype=float)
+        grow = np.exp(decay * steps)  # beta ** -j
+        shrink = np.exp(-decay * steps)  # beta ** j
+        for s in range(1, n, block):
+            m = min(block, n - s)
+            acc = np.cumsum((x[..., s : s + m] - base) * grow[:m], axis=-1)
+            seg = shrink[:m] * (beta * carry + alpha * acc)
+            out[..., s : s + m] = seg + base
+            carry = seg[..., -1:]
+        return out
+    # gap bars carry the state and stretch the next step's decay; a step never
+    # decays more than ``decay`` per position it spans (capped), so the same
+    # block size is safe
+    step_decay, weight = _gap_steps(gaps, alpha)
+    for s in range(1, n, block):
+        m = min(block, n - s)
+        level = np.cumsum(step_decay[..., s : s + m], axis=-1)
+        inputs = np.where(gaps[..., s : s + m], 0.0, x[..., s : s + m] - base)
+        acc = np.cumsum(weight[..., s : s + m] * inputs * np.exp(level), axis=-1)
+        seg = np.exp(-level) * (carry + acc)
+        out[..., s : s + m] = seg + base
+        carry = seg[..., -1:]
+    return out
+
+
+def ema_filter(
+    x: Sequence[float] | np.ndarray,
+    alpha: float,
+    seed: float | np.ndarray | None = None,
+    *,
+    min_periods: int = 0,
+) -> np.ndarray:
+    """Recursive filter ``y[i] = alpha * x[i] + (1 - alpha) * y[i - 1]``.
+
+    ``y[0]`` is ``seed`` (the first finite value when omitted).  The
+    recursion is solved in closed form one block at a time, so the cost is a
+    few array operations per block instead of one Python step per bar.  It
+    runs on offsets from ``y[0]`` so a flat input stays exactly flat, like
+    the scalar loop.  NaNs after the first value carry the previous output
+    forward and the next value is weighted for the skipped bars, matching
+    ``pandas.Series.ewm(adjust=False)``.  Outputs before a row's
+    ``min_periods``-th finite value are NaN.
+    """
+
+    x = np.asarray(x, dtype=float)
+    first = None
+    if seed is None and x.size:
+        x, first = _left_align(x)
+    gaps = np.isnan(x)
+    if seed is not None and x.size:
+        gaps[..., 0] = False
+    out = _linear_filter(x, alpha, seed, gaps if gaps[..., 1:].any() else None)
+    if min_periods > 1:
+        out[np.cumsum(~gaps, axis=-1) < min_periods] = np.nan
+    return _restore(out, first)
+
+
+def ema_array(x: Sequence[float] | np.ndarray, period: int, *, min_periods: int = 0) -> np.ndarray:
+    """Exponential moving average with ``alpha = 2 / (period + 1)``."""
+
     if period <= 0:
         raise ValueError("period must be positive")
+    return ema_filter(x, 2 / (period + 1), min_periods=min_periods)
 
-    acc: float = 0.0
-    window: list[float] = []
-    result: list[float | None] = []
 
-    for value in values:
-        window.append(value)
-        acc += value
-        if len(window) > period:
-            acc -= window.pop(0)
-        if len(window) == period:
-            result.append(acc / period)
-        else:
-            result.append(None)
-    return result
+def dema_array(x: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Double EMA: ``2 * ema - ema(ema)``."""
 
+    e1 = ema_array(x, period)
+    return 2 * e1 - ema_array(e1, period)
+
+
+def tema_array(x: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Triple EMA: ``3 * e1 - 3 * e2 + e3``."""
+
+    e1 = ema_array(x, period)
+    e2 = ema_array(e1, period)
+    e3 = ema_array(e2, period)
+    return 3 * e1 - 3 * e2 + e3
 
-def ema(values: Sequence[float], period: int) -> List[float]:
-    """Exponential moving average.
 
-    The implementation mirrors the existing HACO calculation so that the
-    migrated Codex helpers can share behaviour without pulling in an external
-    dependency.
+def wilder_array(x: Sequence[float] | np.ndarray, period: int, *, min_periods: int = 0) -> np.ndarray:
+    """Wilder smoothing (RMA): an EMA with ``alpha = 1 / period``."""
+
+    if period <= 0:
+        raise ValueError("period must be positive")
+    return ema_filter(x, 1 / period, min_periods=min_periods)
+
+
+def sma_array(x: Sequence[float] | np.ndarray, period: int, *, min_periods: int | None = None) -> np.ndarray:
+    """Trailing simple moving average in O(n) via cumulative sums.
+
+    NaNs are left out of the window; a position needs ``min_periods``
+    finite values (default ``period``) or it is NaN, like
+    ``pandas.Series.rolling(period, min_periods).mean()``.
     """
 
     if period <= 0:
         raise ValueError("period must be positive")
-    values = list(values)
-    if not values:
-        return []
-    k = 2 / (period + 1)
-    result = [values[0]]
-    for price in values[1:]:
-        result.append(price * k + result[-1] * (1 - k))
-    return result
+    x = np.asarray(x, dtype=float)
+    valid = ~np.isnan(x)
+    pad = np.zeros(x.shape[:-1] + (1,))
+    csum = np.concatenate((pad, np.cumsum(np.where(valid, x, 0.0), axis=-1)), axis=-1)
+    ccount = np.concatenate((pad, np.cumsum(valid, axis=-1)), axis=-1)
+    n = x.shape[-1]
+    lo = np.maximum(np.arange(1, n + 1) - period, 0)
+    total = csum[..., 1:] - csum[..., lo]
+    count = ccount[..., 1:] - ccount[..., lo]
+    need = period if min_periods is None else max(1, min_periods)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count >= need, total / np.maximum(count, 1), np.nan)
+
+
+def _windows(x: Sequence[float] | np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray]:
+    if period <= 0:
+        raise ValueError("period must be positive")
+    x = np.asarray(x, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < period:
+        return out, np.empty(x.shape[:-1] + (0, period))
+    return out, np.lib.stride_tricks.sliding_window_view(x, period, axis=-1)
+
+
+def rolling_std(x: Sequence[float] | np.ndarray, period: int, *, ddof: int = 1) -> np.ndarray:
+    """Trailing standard deviation (NaN when the window holds a NaN)."""
+
+    out, win = _windows(x, period)
+    if win.shape[-2] and period > ddof:
+        out[..., period - 1 :] = win.std(axis=-1, ddof=ddof)
+    return out
+
+
+def rolling_min(x: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Trailing minimum (NaN when the window holds a NaN)."""
+
+    out, win = _windows(x, period)
+    if win.shape[-2]:
+        out[..., period - 1 :] = win.min(axis=-1)
+    return out
+
+
+def rolling_max(x: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Trailing maximum (NaN when the window holds a NaN)."""
+
+    out, win = _windows(x, period)
+    if win.shape[-2]:
+        out[..., period - 1 :] = win.max(axis=-1)
+    return out
+
+
+def true_range(
+    high: Sequence[float] | np.ndarray,
+    low: Sequence[float] | np.ndarray,
+    close: Sequence[float] | np.ndarray,
+) -> np.ndarray:
+    """``max(h - l, |h - prev_c|, |l - prev_c|)``; the first bar is ``h - l``."""
+
+    h, l, c = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev = np.concatenate((c[..., :1] * np.nan, c[..., :-1]), axis=-1)
+    return np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+
+
+def heikin_ashi_arrays(
+    o: Sequence[float] | np.ndarray,
+    h: Sequence[float] | np.ndarray,
+    l: Sequence[float] | np.ndarray,
+    c: Sequence[float] | np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Heikin-Ashi bars along the last axis: ``(ha_open, ha_high, ha_low, ha_close)``.
+
+    ``ha_open[i] = (ha_open[i - 1] + ha_close[i - 1]) / 2`` is a first-order
+    linear filter over the previous HA close (:func:`ema_filter` with
+    ``alpha=0.5``), seeded with ``(o[0] + c[0]) / 2``.
+    """
+
+    o, h, l, c = (np.asarray(a, dtype=float) for a in (o, h, l, c))
+    ha_close = (o + h + l + c) / 4
+    if ha_close.shape[-1] == 0:
+        return ha_close, ha_close.copy(), ha_close.copy(), ha_close.copy()
+    prev_close = np.concatenate((ha_close[..., :1], ha_close[..., :-1]), axis=-1)
+    ha_open = ema_filter(prev_close, 0.5, seed=(o[..., 0] + c[..., 0]) / 2)
+    ha_high = np.maximum(h, np.maximum(ha_open, ha_close))
+    ha_low = np.minimum(l, np.minimum(ha_open, ha_close))
+    return ha_open, ha_high, ha_low, ha_close
+
+
+# -- list helpers -------------------------------------------------------------
+
+
+def sma(values: Sequence[float], period: int) -> List[float | None]:
+    """Simple moving average that mirrors the lightweight-chart behaviour.
+
+    The helper intentionally returns ``None`` for the warmup window so callers
+    can easily drop the missing values when constructing chart payloads.
+    """
+
+    out = sma_array(list(values), period)
+    return [None if np.isnan(v) else v for v in out.tolist()]
+
+
+def ema(values: Sequence[float], period: int) -> List[float]:
+    """Exponential moving average (list form of :func:`ema_array`)."""
+
+    return ema_array(list(values), period).tolist()
 
 
 def heikin_ashi(candles: Iterable[dict[str, float]]) -> list[dict[str, float]]:
@@ -60,24 +306,12 @@ def heikin_ashi(candles: Iterable[dict[str, float]]) -> list[dict[str, float]]:
     keys so downstream code can work with the result without any conversion.
     """
 
-    ha_candles: list[dict[str, float]] = []
-    prev_open: float | None = None
-    prev_close: float | None = None
-    for candle in candles:
-        open_ = float(candle["o"])
-        high = float(candle["h"])
-        low = float(candle["l"])
-        close = float(candle["c"])
-
-        ha_close = (open_ + high + low + close) / 4
-        ha_open = (open_ + close) / 2 if prev_open is None else (prev_open + prev_close) / 2
-        ha_high = max(high, ha_open, ha_close)
-        ha_low = min(low, ha_open, ha_close)
-
-        ha_candles.append({"o": ha_open, "h": ha_high, "l": ha_low, "c": ha_close})
-        prev_open = ha_open
-        prev_close = ha_close
-    return ha_candles
+    rows = [(float(c["o"]), float(c["h"]), float(c["l"]), float(c["c"])) for c in candles]
+    if not rows:
+        return []
+    o, h, l, c = np.array(rows).T
+    cols = [a.tolist() for a in heikin_ashi_arrays(o, h, l, c)]
+    return [{"o": o_, "h": h_, "l": l_, "c": c_} for o_, h_, l_, c_ in zip(*cols)]
 
 
 @dataclass(slots=True)
@@ -97,4 +331,21 @@ def normalise_score(value: float, *, lower: float = -1.0, upper: float = 1.0) ->
     return (value - lower) / (upper - lower) * 100
 
 
-__all__ = ["TrendSnapshot", "ema", "heikin_ashi", "normalise_score", "sma"]
+__all__ = [
+    "TrendSnapshot",
+    "dema_array",
+    "ema",
+    "ema_array",
+    "ema_filter",
+    "heikin_ashi",
+    "heikin_ashi_arrays",
+    "normalise_score",
+    "rolling_max",
+    "rolling_min",
+    "rolling_std",
+    "sma",
+    "sma_array",
+    "tema_array",
+    "true_range",
+    "wilder_array",
+]
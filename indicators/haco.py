@@ -1,240 +1,664 @@
 from __future__ import annotations
 
+import json
+from collections.abc import Mapping, Sequence as SequenceABC
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Any, Iterator, List, Dict, Sequence
+
+import numpy as np
+
+from . import common
+from .common import heikin_ashi_arrays, tema_array
 
 
 def ema(series: List[float], length: int) -> List[float]:
-    if not series:
-        return []
-    k = 2 / (length + 1)
-    result = [series[0]]
-    for price in series[1:]:
-        result.append(price * k + result[-1] * (1 - k))
-    return result
+    return common.ema(series, length)
 
 
 def tema(series: List[float], length: int) -> List[float]:
     """Triple EMA."""
-    if not series:
-        return []
-    e1 = ema(series, length)
-    e2 = ema(e1, length)
-    e3 = ema(e2, length)
-    return [3 * a - 3 * b + c for a, b, c in zip(e1, e2, e3)]
+    return tema_array(series, length).tolist()
 
 
 def zero_lag_from_tema(tema1: List[float], tema2: List[float]) -> List[float]:
     return [a + (a - b) for a, b in zip(tema1, tema2)]
 
 
-def _alert(cond: List[bool], idx: int, lookback: int) -> bool:
-    start = max(0, idx - lookback)
-    for j in range(start, idx + 1):
-        if cond[j]:
-            return True
-    return False
+# --- NumPy engine -----------------------------------------------------------
 
+def _zero_lag_pass(ha_c: np.ndarray, mid: np.ndarray, length: int) -> tuple[np.ndarray, ...]:
+    """Return the TEMA/zero-lag lines of one HACO pass (up or down)."""
 
-def compute_haco(
-    candles: List[Dict[str, float]],
+    tma1 = tema_array(ha_c, length)
+    tma2 = tema_array(tma1, length)
+    zl_ha = tma1 + (tma1 - tma2)
+    tma1c = tema_array(mid, length)
+    tma2c = tema_array(tma1c, length)
+    zl_cl = tma1c + (tma1c - tma2c)
+    return tma1, tma2, zl_ha, tma1c, tma2c, zl_cl, zl_cl - zl_ha
+
+
+def _prev(arr: np.ndarray) -> np.ndarray:
+    """Shift ``arr`` one bar back; the first bar is its own predecessor."""
+
+    return np.concatenate((arr[:1], arr[:-1]))
+
+
+def _window_any(cond: np.ndarray, lookback: int) -> np.ndarray:
+    """True where ``cond`` held on any of the last ``lookback + 1`` bars."""
+
+    n = cond.shape[0]
+    if lookback < 0:
+        return np.zeros(n, dtype=bool)
+    hits = np.cumsum(cond, dtype=np.int64)
+    width = lookback + 1
+    if width < n:
+        hits[width:] = hits[width:] - hits[:-width]
+    return hits > 0
+
+
+def _latch(on: np.ndarray, off: np.ndarray, seed: bool) -> np.ndarray:
+    """Return a 1/0 state that flips on ``on``/``off`` bars and holds otherwise."""
+
+    n = on.shape[0]
+    event = on | off
+    event[0] = True
+    values = on.astype(np.int64)
+    values[0] = int(seed)
+    idx = np.where(event, np.arange(n), 0)
+    np.maximum.accumulate(idx, out=idx)
+    return values[idx]
+
+
+def haco_arrays(
+    o: Sequence[float] | np.ndarray,
+    h: Sequence[float] | np.ndarray,
+    l: Sequence[float] | np.ndarray,
+    c: Sequence[float] | np.ndarray,
     length_up: int = 34,
     length_down: int = 34,
     alert_lookback: int = 1,
-) -> Dict[str, List[Dict[str, float]]]:
-    n = len(candles)
+) -> Dict[str, np.ndarray]:
+    """Array-backed HACO engine.
+
+    Takes aligned OHLC arrays and returns one NumPy column per series field
+    (same names as the per-bar dicts of :func:`compute_haco`, without
+    ``time``/OHLC/``reason``).  The up and down passes share their work when
+    ``length_up == length_down``.
+    """
+
+    o = np.asarray(o, dtype=float)
+    h = np.asarray(h, dtype=float)
+    l = np.asarray(l, dtype=float)
+    c = np.asarray(c, dtype=float)
+    n = o.shape[0]
     if n == 0:
-        return {"series": [], "last": {}}
-
-    o = [c["o"] for c in candles]
-    h = [c["h"] for c in candles]
-    l = [c["l"] for c in candles]
-    c = [c["c"] for c in candles]
-    t = [c.get("time") for c in candles]
-
-    ha_close_raw = [(o[i] + h[i] + l[i] + c[i]) / 4 for i in range(n)]
-    ha_open = [0.0] * n
-    ha_open[0] = (o[0] + c[0]) / 2
-    for i in range(1, n):
-        ha_open[i] = (ha_open[i - 1] + ha_close_raw[i - 1]) / 2
-    ha_c = [
-        (ha_close_raw[i] + ha_open[i] + max(h[i], ha_open[i]) + min(l[i], ha_open[i])) / 4
-        for i in range(n)
-    ]
-    mid = [(h[i] + l[i]) / 2 for i in range(n)]
-
-    # Up pass zero lag lines
-    tma1_u = tema(ha_c, length_up)
-    tma2_u = tema(tma1_u, length_up)
-    zl_ha_u = zero_lag_from_tema(tma1_u, tma2_u)
-
-    tma1c_u = tema(mid, length_up)
-    tma2c_u = tema(tma1c_u, length_up)
-    zl_cl_u = zero_lag_from_tema(tma1c_u, tma2c_u)
-    zl_dif_u = [a - b for a, b in zip(zl_cl_u, zl_ha_u)]
-
-    # Down pass zero lag lines
-    tma1_d = tema(ha_c, length_down)
-    tma2_d = tema(tma1_d, length_down)
-    zl_ha_d = zero_lag_from_tema(tma1_d, tma2_d)
-
-    tma1c_d = tema(mid, length_down)
-    tma2c_d = tema(tma1c_d, length_down)
-    zl_cl_d = zero_lag_from_tema(tma1c_d, tma2c_d)
-    zl_dif_d = [a - b for a, b in zip(zl_cl_d, zl_ha_d)]
-
-    keep1u_alert_raw = [ha_c[i] >= ha_open[i] for i in range(n)]
-    keep1d_raw = [ha_c[i] < ha_open[i] for i in range(n)]
-
-    state = [0] * n
-    state[0] = 1 if c[0] >= o[0] else 0
-    reasons = [""] * n
-
-    keep1u_alert = [False] * n
-    keep1u_price = [False] * n
-    keep2u = [False] * n
-    keepingu = [False] * n
-    keepallu = [False] * n
-    keep3u = [False] * n
-    utr = [False] * n
-
-    keep1d = [False] * n
-    keep2d = [False] * n
-    keepingd = [False] * n
-    keepalld = [False] * n
-    keep3d = [False] * n
-    dtr = [False] * n
-
-    upw = [False] * n
-    dnw = [False] * n
-
-    for i in range(n):
-        prev = i - 1
-        prev_h = h[prev] if prev >= 0 else h[0]
-        prev_l = l[prev] if prev >= 0 else l[0]
-        prev_c = c[prev] if prev >= 0 else c[0]
-        prev_o = o[prev] if prev >= 0 else o[0]
-
-        keep1u_alert[i] = _alert(keep1u_alert_raw, i, alert_lookback)
-        keep1u_price[i] = (
-            c[i] >= ha_c[i]
-            or h[i] > prev_h
-            or l[i] > prev_l
-        )
-        keep2u[i] = zl_dif_u[i] >= 0 if i < len(zl_dif_u) else False
-        keepingu[i] = keep1u_alert[i] or keep1u_price[i] or keep2u[i]
-        prev_keepingu = keepingu[prev] if prev >= 0 else keepingu[0]
-        keepallu[i] = (
-            keepingu[i]
-            or (prev_keepingu and (c[i] >= o[i]))
-            or (c[i] >= prev_c)
-        )
-        keep3u[i] = False
-        if h[i] != l[i]:
-            keep3u[i] = abs(c[i] - o[i]) < (h[i] - l[i]) * 0.35 and h[i] >= prev_l
-        prev_keepallu = keepallu[prev] if prev >= 0 else keepallu[0]
-        utr[i] = keepallu[i] or (prev_keepallu and keep3u[i])
-
-        keep1d[i] = _alert(keep1d_raw, i, alert_lookback)
-        keep2d[i] = zl_dif_d[i] < 0 if i < len(zl_dif_d) else False
-        keep3d[i] = False
-        if h[i] != l[i]:
-            keep3d[i] = abs(c[i] - o[i]) < (h[i] - l[i]) * 0.35 and l[i] <= prev_h
-        keepingd[i] = keep1d[i] or keep2d[i]
-        prev_keepingd = keepingd[prev] if prev >= 0 else keepingd[0]
-        keepalld[i] = (
-            keepingd[i]
-            or (prev_keepingd and (c[i] < o[i]))
-            or (c[i] < prev_c)
+        empty = np.empty(0)
+        return {key: empty for key in _ENGINE_KEYS}
+
+    ha_open, _, _, ha_close_raw = heikin_ashi_arrays(o, h, l, c)
+    ha_c = (ha_close_raw + ha_open + np.maximum(h, ha_open) + np.minimum(l, ha_open)) / 4
+    mid = (h + l) / 2
+
+    up = _zero_lag_pass(ha_c, mid, length_up)
+    down = up if length_down == length_up else _zero_lag_pass(ha_c, mid, length_down)
+    zl_dif_u = up[-1]
+    zl_dif_d = down[-1]
+
+    prev_h = _prev(h)
+    prev_l = _prev(l)
+    prev_c = _prev(c)
+    small_body = (h != l) & (np.abs(c - o) < (h - l) * 0.35)
+
+    keep1u_alert = _window_any(ha_c >= ha_open, alert_lookback)
+    keep1u_price = (c >= ha_c) | (h > prev_h) | (l > prev_l)
+    keep2u = zl_dif_u >= 0
+    keepingu = keep1u_alert | keep1u_price | keep2u
+    keepallu = keepingu | (_prev(keepingu) & (c >= o)) | (c >= prev_c)
+    keep3u = small_body & (h >= prev_l)
+    utr = keepallu | (_prev(keepallu) & keep3u)
+
+    keep1d = _window_any(ha_c < ha_open, alert_lookback)
+    keep2d = zl_dif_d < 0
+    keep3d = small_body & (l <= prev_h)
+    keepingd = keep1d | keep2d
+    keepalld = keepingd | (_prev(keepingd) & (c < o)) | (c < prev_c)
+    dtr = keepalld | (_prev(keepalld) & keep3d)
+
+    upw = ~dtr & _prev(dtr) & utr
+    dnw = ~utr & _prev(utr) & dtr
+    state = _latch(upw, dnw, bool(c[0] >= o[0]))
+
+    return {
+        "haOpen": ha_open,
+        "haC": ha_c,
+        "mid": mid,
+        "TMA1U": up[0],
+        "TMA2U": up[1],
+        "ZlHaU": up[2],
+        "TMA1CU": up[3],
+        "TMA2CU": up[4],
+        "ZlClU": up[5],
+        "ZlDifU": zl_dif_u,
+        "TMA1D": down[0],
+        "TMA2D": down[1],
+        "ZlHaD": down[2],
+        "TMA1CD": down[3],
+        "TMA2CD": down[4],
+        "ZlClD": down[5],
+        "ZlDifD": zl_dif_d,
+        "keep1U_alert": keep1u_alert,
+        "keep1U_price": keep1u_price,
+        "keep2U": keep2u,
+        "keepingU": keepingu,
+        "keepallU": keepallu,
+        "keep3U": keep3u,
+        "utr": utr,
+        "keep1D": keep1d,
+        "keep2D": keep2d,
+        "keepingD": keepingd,
+        "keepallD": keepalld,
+        "keep3D": keep3d,
+        "dtr": dtr,
+        "upw": upw,
+        "dnw": dnw,
+        "state": state,
+    }
+
+
+_ENGINE_KEYS = (
+    "haOpen", "haC", "mid",
+    "TMA1U", "TMA2U", "ZlHaU", "TMA1CU", "TMA2CU", "ZlClU", "ZlDifU",
+    "TMA1D", "TMA2D", "ZlHaD", "TMA1CD", "TMA2CD", "ZlClD", "ZlDifD",
+    "keep1U_alert", "keep1U_price", "keep2U", "keepingU", "keepallU", "keep3U", "utr",
+    "keep1D", "keep2D", "keepingD", "keepallD", "keep3D", "dtr",
+    "upw", "dnw", "state",
+)
+_SERIES_KEYS = ("time", "o", "h", "l", "c", *_ENGINE_KEYS, "reason")
+
+
+def _reason(
+    upw: bool,
+    dnw: bool,
+    keepingu: bool,
+    keepingd: bool,
+    utr: bool,
+    dtr: bool,
+    keep1_alert: bool,
+    keep1_price: bool,
+    keep1_trend: bool,
+    zl_dif_u: float,
+    zl_dif_d: float,
+) -> str:
+    parts = []
+    if upw:
+        parts.append("upw")
+    if dnw:
+        parts.append("dnw")
+    if keepingu:
+        parts.append("keepingU")
+    if keepingd:
+        parts.append("keepingD")
+    if utr:
+        parts.append("utr")
+    if dtr:
+        parts.append("dtr")
+    parts.append(
+        f"keep1={keep1_alert}/{keep1_price}/{keep1_trend} "
+        f"ZlDifU={zl_dif_u:.2f} ZlDifD={zl_dif_d:.2f}"
+    )
+    return ", ".join(parts)
+
+
+class HacoSeries(SequenceABC):
+    """Read-only per-bar view over a :class:`HacoResult`.
+
+    Indexing builds the dict for that bar on demand, so ``series[-1]`` on a
+    3-year scan costs one dict rather than one per bar.
+    """
+
+    __slots__ = ("_result",)
+
+    def __init__(self, result: "HacoResult") -> None:
+        self._result = result
+
+    def __len__(self) -> int:
+        return self._result.size
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._result.bar(i) for i in range(*idx.indices(self._result.size))]
+        return self._result.bar(idx)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_list())
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return self._result.to_list()
+
+
+class HacoResult(Mapping):
+    """Columnar HACO output.
+
+    Columns are kept as arrays; per-bar dicts and reason strings are only
+    built when asked for.  The object still reads like the historic
+    ``{"series": [...], "last": {...}}`` payload, and :meth:`last` is the fast
+    path for callers that only care about the newest bar.
+    """
+
+    __slots__ = ("base", "columns", "size", "_rows")
+
+    def __init__(self, base: Dict[str, Sequence[Any]], columns: Dict[str, np.ndarray]) -> None:
+        self.base = base
+        self.columns = columns
+        self.size = len(base["c"])
+        self._rows: List[Dict[str, Any]] | None = None
+
+    # -- Mapping interface (back-compat with the dict payload) --------------
+    def __getitem__(self, key: str) -> Any:
+        if key == "series":
+            return self.series
+        if key == "last":
+            return self.summary()
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("series", "last"))
+
+    def __len__(self) -> int:
+        return 2
+
+    # -- columnar access ----------------------------------------------------
+    def column(self, name: str) -> np.ndarray:
+        if name in self.columns:
+            return self.columns[name]
+        return np.asarray(self.base[name])
+
+    def with_columns(self, **overrides: Sequence[Any]) -> "HacoResult":
+        """Return a copy with some columns (engine or ``time``/OHLC) replaced."""
+
+        base = dict(self.base)
+        columns = dict(self.columns)
+        for name, values in overrides.items():
+            if name in base:
+                base[name] = values
+            else:
+                columns[name] = np.asarray(values)
+        return HacoResult(base, columns)
+
+    # -- per-bar views ------------------------------------------------------
+    @property
+    def series(self) -> HacoSeries:
+        return HacoSeries(self)
+
+    def reason(self, idx: int) -> str:
+        col = self.columns
+        return _reason(
+            bool(col["upw"][idx]),
+            bool(col["dnw"][idx]),
+            bool(col["keepingU"][idx]),
+            bool(col["keepingD"][idx]),
+            bool(col["utr"][idx]),
+            bool(col["dtr"][idx]),
+            bool(col["keep1U_alert"][idx]),
+            bool(col["keep1U_price"][idx]),
+            bool(col["keep2U"][idx]),
+            float(col["ZlDifU"][idx]),
+            float(col["ZlDifD"][idx]),
         )
-        prev_keepalld = keepalld[prev] if prev >= 0 else keepalld[0]
-        dtr[i] = keepalld[i] or (prev_keepalld and keep3d[i])
 
-        prev_dtr = dtr[prev] if prev >= 0 else dtr[0]
-        prev_utr = utr[prev] if prev >= 0 else utr[0]
+    def bar(self, idx: int) -> Dict[str, Any]:
+        if self._rows is not None:
+            return self._rows[idx]
+        if not -self.size <= idx < self.size:
+            raise IndexError("bar index out of range")
+        values = [self.base[key][idx] for key in _SERIES_KEYS[:5]]
+        values.extend(self.columns[key][idx].item() for key in _ENGINE_KEYS)
+        values.append(self.reason(idx))
+        return dict(zip(_SERIES_KEYS, values))
+
+    def last(self) -> Dict[str, Any]:
+        """Return the newest bar without materialising the rest of the series."""
+
+        return self.bar(-1) if self.size else {}
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the ``last`` block of the legacy payload."""
+
+        if not self.size:
+            return {}
+        state = self.columns["state"]
+        return {
+            "upw": self.columns["upw"][-1].item(),
+            "dnw": self.columns["dnw"][-1].item(),
+            "state": state[-1].item(),
+            "changed": bool(state[-1] != state[-2]) if self.size > 1 else False,
+            "reasons": self.reason(-1),
+        }
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialise every bar (used for full JSON responses)."""
+
+        if self._rows is None:
+            lists = {key: self.columns[key].tolist() for key in _ENGINE_KEYS}
+            reasons = list(
+                map(
+                    _reason,
+                    lists["upw"],
+                    lists["dnw"],
+                    lists["keepingU"],
+                    lists["keepingD"],
+                    lists["utr"],
+                    lists["dtr"],
+                    lists["keep1U_alert"],
+                    lists["keep1U_price"],
+                    lists["keep2U"],
+                    lists["ZlDifU"],
+                    lists["ZlDifD"],
+                )
+            )
+            rows = zip(
+                *(self.base[key] for key in _SERIES_KEYS[:5]),
+                *(lists[key] for key in _ENGINE_KEYS),
+                reasons,
+            )
+            self._rows = [dict(zip(_SERIES_KEYS, row)) for row in rows]
+        return self._rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"series": self.to_list(), "last": self.summary()}
+
+
+def compute_haco_columns(
+    time: Sequence[Any],
+    o: Sequence[float],
+    h: Sequence[float],
+    l: Sequence[float],
+    c: Sequence[float],
+    length_up: int = 34,
+    length_down: int = 34,
+    alert_lookback: int = 1,
+) -> HacoResult:
+    """Run the HACO engine on parallel columns and wrap the output lazily."""
+
+    cols = haco_arrays(o, h, l, c, length_up, length_down, alert_lookback)
+    return HacoResult({"time": time, "o": o, "h": h, "l": l, "c": c}, cols)
 
-        upw[i] = (not dtr[i]) and prev_dtr and utr[i]
-        dnw[i] = (not utr[i]) and prev_utr and dtr[i]
 
-        if upw[i]:
-            state[i] = 1
-        elif dnw[i]:
-            state[i] = 0
-        else:
-            state[i] = state[prev] if prev >= 0 else state[0]
-
-        reason_i = []
-        if upw[i]:
-            reason_i.append("upw")
-        if dnw[i]:
-            reason_i.append("dnw")
-        if keepingu[i]:
-            reason_i.append("keepingU")
-        if keepingd[i]:
-            reason_i.append("keepingD")
-        if utr[i]:
-            reason_i.append("utr")
-        if dtr[i]:
-            reason_i.append("dtr")
-        keep1_alert = keep1u_alert[i]
-        keep1_price = keep1u_price[i]
-        keep1_trend = keep2u[i]
-        reason_i.append(
-            f"keep1={keep1_alert}/{keep1_price}/{keep1_trend} "
-            f"ZlDifU={zl_dif_u[i]:.2f} ZlDifD={zl_dif_d[i]:.2f}"
-        )
-        reasons[i] = ", ".join(reason_i)
-
-    series = []
-    for i in range(n):
-        series.append({
-            "time": t[i],
-            "o": o[i],
-            "h": h[i],
-            "l": l[i],
-            "c": c[i],
-            "haOpen": ha_open[i],
-            "haC": ha_c[i],
-            "mid": mid[i],
-            "TMA1U": tma1_u[i],
-            "TMA2U": tma2_u[i],
-            "ZlHaU": zl_ha_u[i],
-            "TMA1CU": tma1c_u[i],
-            "TMA2CU": tma2c_u[i],
-            "ZlClU": zl_cl_u[i],
-            "ZlDifU": zl_dif_u[i],
-            "TMA1D": tma1_d[i],
-            "TMA2D": tma2_d[i],
-            "ZlHaD": zl_ha_d[i],
-            "TMA1CD": tma1c_d[i],
-            "TMA2CD": tma2c_d[i],
-            "ZlClD": zl_cl_d[i],
-            "ZlDifD": zl_dif_d[i],
-            "keep1U_alert": keep1u_alert[i],
-            "keep1U_price": keep1u_price[i],
-            "keep2U": keep2u[i],
-            "keepingU": keepingu[i],
-            "keepallU": keepallu[i],
-            "keep3U": keep3u[i],
-            "utr": utr[i],
-            "keep1D": keep1d[i],
-            "keep2D": keep2d[i],
-            "keepingD": keepingd[i],
-            "keepallD": keepalld[i],
-            "keep3D": keep3d[i],
-            "dtr": dtr[i],
-            "upw": upw[i],
-            "dnw": dnw[i],
-            "state": state[i],
-            "reason": reasons[i],
-        })
-
-    last = {
-        "upw": upw[-1],
-        "dnw": dnw[-1],
-        "state": state[-1],
-        "changed": state[-1] != state[-2] if n > 1 else False,
-        "reasons": reasons[-1],
-    }
+def compute_haco(
+    candles: List[Dict[str, float]],
+    length_up: int = 34,
+    length_down: int = 34,
+    alert_lookback: int = 1,
+) -> HacoResult:
+    """Return HACO output for candle dicts (``time``/``o``/``h``/``l``/``c``)."""
+
+    return compute_haco_columns(
+        [cd.get("time") for cd in candles],
+        [cd["o"] for cd in candles],
+        [cd["h"] for cd in candles],
+        [cd["l"] for cd in candles],
+        [cd["c"] for cd in candles],
+        length_up,
+        length_down,
+        alert_lookback,
+    )
+
 
-    return {"series": series[-n:], "last": last}
+# --- Streaming state ----------------------------------------------------------
+
+_STATE_VERSION = 1
+
+
+def _ema_step(prev: float | None, x: float, k: float) -> float:
+    return x if prev is None else x * k + prev * (1 - k)
+
+
+def _zero_lag_step(
+    emas: List[float] | None, ha_c: float, mid: float, length: int
+) -> tuple[List[float], tuple[float, ...]]:
+    """Advance the 12 EMA accumulators of one HACO pass by one bar.
+
+    Accumulators are laid out as four EMA chains of three (TEMA of ``haC``,
+    TEMA of that TEMA, TEMA of ``mid``, TEMA of that TEMA).  Returns the new
+    accumulators and the pass lines in :func:`_zero_lag_pass` order.
+    """
+
+    k = 2 / (length + 1)
+    new: List[float] = [0.0] * 12
+    tema_out: List[float] = []
+    inputs = (ha_c, None, mid, None)
+    for chain in range(4):
+        x = inputs[chain] if inputs[chain] is not None else tema_out[-1]
+        base = chain * 3
+        e1 = _ema_step(emas[base] if emas else None, x, k)
+        e2 = _ema_step(emas[base + 1] if emas else None, e1, k)
+        e3 = _ema_step(emas[base + 2] if emas else None, e2, k)
+        new[base : base + 3] = (e1, e2, e3)
+        tema_out.append(3 * e1 - 3 * e2 + e3)
+    tma1, tma2, tma1c, tma2c = tema_out
+    zl_ha = tma1 + (tma1 - tma2)
+    zl_cl = tma1c + (tma1c - tma2c)
+    return new, (tma1, tma2, zl_ha, tma1c, tma2c, zl_cl, zl_cl - zl_ha)
+
+
+class HacoState:
+    """Incremental HACO for live bars.
+
+    Holds the EMA/TEMA accumulators, the Heikin-Ashi open/close and the
+    previous keep/utr/dtr flags, so :meth:`update` costs O(1) per candle.  A
+    candle with the same ``time`` as the newest bar revises that bar instead
+    of appending.  :meth:`to_dict`/:meth:`from_dict` round-trip through JSON
+    so workers can persist the state between ticks.
+    """
+
+    def __init__(self, length_up: int = 34, length_down: int = 34, alert_lookback: int = 1) -> None:
+        self.length_up = int(length_up)
+        self.length_down = int(length_down)
+        self.alert_lookback = int(alert_lookback)
+        self._core: Dict[str, Any] | None = None  # after the newest bar
+        self._prior: Dict[str, Any] | None = None  # before the newest bar
+
+    @classmethod
+    def from_candles(
+        cls,
+        candles: Sequence[Dict[str, float]],
+        length_up: int = 34,
+        length_down: int = 34,
+        alert_lookback: int = 1,
+    ) -> "HacoState":
+        state = cls(length_up, length_down, alert_lookback)
+        for candle in candles:
+            state.update(candle)
+        return state
+
+    @property
+    def params(self) -> tuple[int, int, int]:
+        return self.length_up, self.length_down, self.alert_lookback
+
+    @property
+    def bars(self) -> int:
+        return self._core["bars"] if self._core else 0
+
+    @property
+    def time(self) -> Any:
+        return self._core["time"] if self._core else None
+
+    @property
+    def last(self) -> Dict[str, Any]:
+        """The newest bar, shaped like an entry of ``compute_haco(...)["series"]``."""
+
+        return self._core["bar"] if self._core else {}
+
+    def update(self, candle: Dict[str, float]) -> Dict[str, Any]:
+        """Apply one new (or revised newest) candle and return the updated bar."""
+
+        core = self._core
+        t = candle.get("time")
+        base = core
+        if core is not None and t is not None and core["time"] is not None:
+            if t < core["time"]:
+                return core["bar"]
+            if t == core["time"]:
+                base = self._prior
+        self._prior, self._core = base, self._step(base, candle)
+        return self._core["bar"]
+
+    def catch_up(self, candles: Sequence[Dict[str, float]]) -> bool:
+        """Feed a recent window of candles into the state.
+
+        Bars older than the newest one are skipped and the newest one is
+        revised.  Returns False, leaving the state untouched, when the window
+        starts after the newest bar (there is a gap to fill from history) or
+        when either side has no ``time`` to line the window up by; callers
+        then rebuild from full history.
+        """
+
+        if not candles or not self.bars:
+            return False
+        first = candles[0].get("time")
+        if first is None or self.time is None or first > self.time:
+            return False
+        for candle in candles:
+            self.update(candle)
+        return True
+
+    def _step(self, base: Dict[str, Any] | None, candle: Dict[str, float]) -> Dict[str, Any]:
+        o = float(candle["o"])
+        h = float(candle["h"])
+        l = float(candle["l"])
+        c = float(candle["c"])
+        if base is None:
+            ha_open = (o + c) / 2
+            prev_h, prev_l, prev_c = h, l, c
+        else:
+            ha_open = (base["ha_open"] + base["ha_close_raw"]) / 2
+            prev_h, prev_l, prev_c = base["h"], base["l"], base["c"]
+        ha_close_raw = (o + h + l + c) / 4
+        ha_c = (ha_close_raw + ha_open + max(h, ha_open) + min(l, ha_open)) / 4
+        mid = (h + l) / 2
+
+        ema_up, up = _zero_lag_step(base["ema_up"] if base else None, ha_c, mid, self.length_up)
+        if self.length_down == self.length_up:
+            ema_down, down = ema_up, up
+        else:
+            ema_down, down = _zero_lag_step(
+                base["ema_down"] if base else None, ha_c, mid, self.length_down
+            )
+
+        lookback = self.alert_lookback
+        up_raw = ha_c >= ha_open
+        dn_raw = ha_c < ha_open
+        up_hist = (base["up_hist"] if base else []) + [up_raw]
+        dn_hist = (base["dn_hist"] if base else []) + [dn_raw]
+        keep1u_alert = lookback >= 0 and any(up_hist[-(lookback + 1):])
+        keep1d = lookback >= 0 and any(dn_hist[-(lookback + 1):])
+        up_hist = up_hist[-lookback:] if lookback > 0 else []
+        dn_hist = dn_hist[-lookback:] if lookback > 0 else []
+
+        small_body = h != l and abs(c - o) < (h - l) * 0.35
+        keep1u_price = c >= ha_c or h > prev_h or l > prev_l
+        keep2u = up[-1] >= 0
+        keepingu = keep1u_alert or keep1u_price or keep2u
+        prev_keepingu = base["keepingu"] if base else keepingu
+        keepallu = keepingu or (prev_keepingu and c >= o) or c >= prev_c
+        keep3u = small_body and h >= prev_l
+        prev_keepallu = base["keepallu"] if base else keepallu
+        utr = keepallu or (prev_keepallu and keep3u)
+
+        keep2d = down[-1] < 0
+        keep3d = small_body and l <= prev_h
+        keepingd = keep1d or keep2d
+        prev_keepingd = base["keepingd"] if base else keepingd
+        keepalld = keepingd or (prev_keepingd and c < o) or c < prev_c
+        prev_keepalld = base["keepalld"] if base else keepalld
+        dtr = keepalld or (prev_keepalld and keep3d)
+
+        prev_dtr = base["dtr"] if base else dtr
+        prev_utr = base["utr"] if base else utr
+        upw = (not dtr) and prev_dtr and utr
+        dnw = (not utr) and prev_utr and dtr
+        if upw:
+            state = 1
+        elif dnw:
+            state = 0
+        else:
+            state = base["state"] if base else (1 if c >= o else 0)
+
+        values = [
+            candle.get("time"), candle["o"], candle["h"], candle["l"], candle["c"],
+            ha_open, ha_c, mid, *up, *down,
+            keep1u_alert, keep1u_price, keep2u, keepingu, keepallu, keep3u, utr,
+            keep1d, keep2d, keepingd, keepalld, keep3d, dtr,
+            upw, dnw, state,
+            _reason(upw, dnw, keepingu, keepingd, utr, dtr,
+                    keep1u_alert, keep1u_price, keep2u, up[-1], down[-1]),
+        ]
+        return {
+            "time": candle.get("time"),
+            "bars": (base["bars"] if base else 0) + 1,
+            "o": o,
+            "h": h,
+            "l": l,
+            "c": c,
+            "ha_open": ha_open,
+            "ha_close_raw": ha_close_raw,
+            "ema_up": ema_up,
+            "ema_down": ema_down,
+            "up_hist": up_hist,
+            "dn_hist": dn_hist,
+            "keepingu": keepingu,
+            "keepallu": keepallu,
+            "utr": utr,
+            "keepingd": keepingd,
+            "keepalld": keepalld,
+            "dtr": dtr,
+            "state": state,
+            "bar": dict(zip(_SERIES_KEYS, values)),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe snapshot of the state."""
+
+        return {
+            "version": _STATE_VERSION,
+            "params": list(self.params),
+            "core": self._core,
+            "prior": self._prior,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HacoState":
+        if not isinstance(data, dict) or data.get("version") != _STATE_VERSION:
+            raise ValueError("unsupported HACO state snapshot")
+        state = cls(*data["params"])
+        state._core = data.get("core")
+        state._prior = data.get("prior")
+        return state
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(
+        cls,
+        raw: str | None,
+        length_up: int = 34,
+        length_down: int = 34,
+        alert_lookback: int = 1,
+    ) -> "HacoState | None":
+        """Restore a saved snapshot.
+
+        Returns None when ``raw`` is empty, unreadable, empty of bars or was
+        built with different parameters, so callers can rebuild from history.
+        """
+
+        if not raw:
+            return None
+        try:
+            state = cls.from_dict(json.loads(raw))
+        except (ValueError, KeyError, TypeError):
+            return None
+        if state.params != (length_up, length_down, alert_lookback) or not state.bars:
+            return None
+        return state
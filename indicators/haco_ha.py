@@ -7,9 +7,11 @@ with Heikin-Ashi candles.
 
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Tuple
 
-from .common import heikin_ashi
+import numpy as np
+
+from .common import heikin_ashi, heikin_ashi_arrays
 
 
 def project(candles: Iterable[dict[str, float]]) -> list[dict[str, float]]:
@@ -18,4 +20,12 @@ def project(candles: Iterable[dict[str, float]]) -> list[dict[str, float]]:
     return heikin_ashi(candles)
 
 
-__all__ = ["project"]
+def project_arrays(
+    o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Array form of :func:`project`: returns ``(ha_open, ha_high, ha_low, ha_close)``."""
+
+    return heikin_ashi_arrays(o, h, l, c)
+
+
+__all__ = ["project", "project_arrays"]
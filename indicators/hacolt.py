@@ -4,19 +4,28 @@ from __future__ import annotations
 
 from typing import Iterable, List
 
-from .common import ema, heikin_ashi
+import numpy as np
+
+from .common import heikin_ashi, tema_array
 
 
 def compute_trend(candles: Iterable[dict[str, float]], period: int = 34) -> List[float]:
     """Return a zero-lag trend estimate using a Heikin-Ashi projection."""
 
     ha = heikin_ashi(candles)
-    closes = [c["c"] for c in ha]
-    tema1 = ema(closes, period)
-    tema2 = ema(tema1, period)
-    tema3 = ema(tema2, period)
     # classic zero-lag triple EMA projection
-    return [3 * a - 3 * b + c for a, b, c in zip(tema1, tema2, tema3)]
+    return tema_array([c["c"] for c in ha], period).tolist()
+
+
+def compute_trend_arrays(
+    o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, period: int = 34
+) -> np.ndarray:
+    """Array form of :func:`compute_trend` (only the HA close feeds the TEMA)."""
+
+    ha_close = (np.asarray(o, float) + np.asarray(h, float) + np.asarray(l, float) + np.asarray(c, float)) / 4
+    if ha_close.size == 0:
+        return ha_close
+    return tema_array(ha_close, period)
 
 
 def trend_direction(trend: List[float]) -> str:
@@ -31,4 +40,4 @@ def trend_direction(trend: List[float]) -> str:
     return "flat"
 
 
-__all__ = ["compute_trend", "trend_direction"]
+__all__ = ["compute_trend", "compute_trend_arrays", "trend_direction"]
@@ -1,49 +1,200 @@
+"""Paper trading engine for backtests, backed by NumPy arrays.
+
+Positions live in a float array indexed by a symbol table that grows as new
+symbols appear; :meth:`PaperTrader.rebalance` applies a whole target-weight
+vector in one step and :meth:`PaperTrader.target_weights` keeps the original
+dict API on top of it.  Fills and equity marks are appended to a columnar
+:class:`FillBuffer` and only turned into a DataFrame by ``history_df()``.
+
+``positions`` and ``history`` used to be plain attributes; they are now
+read-only snapshots built from those arrays (writing to them raises), so
+trade through :meth:`PaperTrader.target_weights` / :meth:`~PaperTrader.rebalance`.
+"""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+import numpy as np
 import pandas as pd
 
+_MIN_QTY = 1e-8
+_HISTORY_COLUMNS = ("date", "symbol", "action", "quantity", "price", "equity")
+
+
+def _day(date) -> np.datetime64:
+    return np.datetime64(pd.to_datetime(date).date(), "D")
+
+
+class FillBuffer:
+    """Preallocated columns of fills (``symbol >= 0``) and equity marks (``symbol == -1``)."""
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.size = 0
+        self.date = np.empty(capacity, dtype="datetime64[D]")
+        self.symbol = np.empty(capacity, dtype=np.int64)
+        self.quantity = np.empty(capacity)  # signed: > 0 bought, < 0 sold
+        self.price = np.empty(capacity)
+        self.equity = np.empty(capacity)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, extra: int) -> None:
+        need = self.size + extra
+        if need <= len(self.date):
+            return
+        capacity = max(need, 2 * len(self.date))
+        for name in ("date", "symbol", "quantity", "price", "equity"):
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[: self.size] = old[: self.size]
+            setattr(self, name, grown)
+
+    def fills(self, date, symbols: np.ndarray, quantity: np.ndarray, price: np.ndarray) -> None:
+        n = len(symbols)
+        self._reserve(n)
+        end = self.size + n
+        self.date[self.size:end] = _day(date)
+        self.symbol[self.size:end] = symbols
+        self.quantity[self.size:end] = quantity
+        self.price[self.size:end] = price
+        self.equity[self.size:end] = np.nan
+        self.size = end
+
+    def mark(self, date, equity: float) -> None:
+        self._reserve(1)
+        self.date[self.size] = _day(date)
+        self.symbol[self.size] = -1
+        self.quantity[self.size] = self.price[self.size] = np.nan
+        self.equity[self.size] = equity
+        self.size += 1
+
+    def frame(self, names: np.ndarray) -> pd.DataFrame:
+        n = self.size
+        sym = self.symbol[:n]
+        fill = sym >= 0
+        qty = self.quantity[:n]
+        return pd.DataFrame({
+            "date": self.date[:n].astype(object),  # datetime.date values, like the dict history
+            "symbol": np.where(fill, names[np.where(fill, sym, 0)] if len(names) else None, None),
+            "action": np.where(fill, np.where(qty > 0, "buy", "sell"), None),
+            "quantity": np.abs(qty),
+            "price": self.price[:n],
+            "equity": self.equity[:n],
+        }, columns=list(_HISTORY_COLUMNS))
+
+
 class PaperTrader:
     """Very simple paper trading engine for backtesting."""
-    def __init__(self, initial_capital: float = 100000.0):
+
+    def __init__(self, initial_capital: float = 100000.0, symbols: Iterable[str] = ()):
         self.initial_capital = initial_capital
-        self.cash = initial_capital
-        self.positions: dict[str, float] = {}
-        self.history: list[dict] = []
+        self.cash = float(initial_capital)
+        self.symbols: list[str] = []
+        self._index: dict[str, int] = {}
+        self._qty = np.zeros(0)
+        self._traded = np.zeros(0, dtype=bool)
+        self.fills = FillBuffer()
+        self.symbol_index(symbols)
 
-    def _record(self, date, **fields):
-        rec = {"date": pd.to_datetime(date).date(), **fields}
-        self.history.append(rec)
+    # -- symbol table -----------------------------------------------------------
+    def symbol_index(self, symbols: Iterable[str]) -> np.ndarray:
+        """Positions of ``symbols`` in the symbol table, adding new ones."""
+
+        out = []
+        for sym in symbols:
+            i = self._index.get(sym)
+            if i is None:
+                i = self._index[sym] = len(self.symbols)
+                self.symbols.append(sym)
+            out.append(i)
+        if len(self.symbols) > len(self._qty):
+            grow = len(self.symbols) - len(self._qty)
+            self._qty = np.concatenate([self._qty, np.zeros(grow)])
+            self._traded = np.concatenate([self._traded, np.zeros(grow, dtype=bool)])
+        return np.asarray(out, dtype=np.int64)
+
+    def _price_vector(self, prices: Mapping[str, float | None]) -> np.ndarray:
+        """Prices over the symbol table; symbols missing from ``prices`` are NaN."""
+
+        px = np.full(len(self.symbols), np.nan)
+        for sym, price in prices.items():
+            i = self._index.get(sym)
+            if i is not None and price is not None:
+                px[i] = price
+        return px
+
+    @property
+    def positions(self) -> Mapping[str, float]:
+        """Read-only quantity per symbol that has traded (flat positions stay listed at 0)."""
+
+        held = np.flatnonzero(self._traded)
+        return MappingProxyType({self.symbols[i]: float(self._qty[i]) for i in held})
+
+    @property
+    def quantities(self) -> np.ndarray:
+        """Position sizes over the symbol table (read-only view)."""
+
+        view = self._qty.view()
+        view.flags.writeable = False
+        return view
+
+    # -- valuation ----------------------------------------------------------------
+    def value(self, prices: np.ndarray) -> float:
+        """Cash plus positions valued at ``prices`` (NaN prices count as zero)."""
+
+        return float(self.cash + np.nansum(self._qty * prices))
+
+    def portfolio_value(self, prices: Mapping[str, float | None]) -> float:
+        return self.value(self._price_vector(prices))
+
+    # -- execution ----------------------------------------------------------------
+    def _execute(self, rows: np.ndarray, weights: np.ndarray, prices: np.ndarray, equity: float, date) -> None:
+        tradable = ~np.isnan(prices[rows]) & (prices[rows] > 0)
+        rows, weights = rows[tradable], weights[tradable]
+        px = prices[rows]
+        delta = equity * weights / px - self._qty[rows]
+        moved = np.abs(delta) >= _MIN_QTY
+        rows, delta, px = rows[moved], delta[moved], px[moved]
+        self.cash -= float(delta @ px)
+        self._qty[rows] += delta
+        self._traded[rows] = True
+        self.fills.fills(date, rows, delta, px)
+
+    def rebalance(self, weights: np.ndarray, prices: np.ndarray, date) -> None:
+        """Trade the whole symbol table to ``weights`` at ``prices`` (both aligned with :attr:`symbols`).
+
+        Symbols without a positive price are left as they are.
+        """
+
+        weights = np.asarray(weights, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        self._execute(np.arange(len(self.symbols)), weights, prices, self.value(prices), date)
+        self.fills.mark(date, self.value(prices))
 
     def target_weights(self, weights: dict[str, float], prices: dict[str, float], date) -> None:
         """Adjust holdings to match the target weights at given prices."""
-        equity = self.portfolio_value(prices)
-        for sym, target_w in weights.items():
-            price = prices.get(sym)
-            if price is None or price <= 0:
-                continue
-            target_dollar = equity * target_w
-            target_qty = target_dollar / price
-            current_qty = self.positions.get(sym, 0.0)
-            delta = target_qty - current_qty
-            if abs(delta) < 1e-8:
-                continue
-            action = "buy" if delta > 0 else "sell"
-            self.cash -= delta * price
-            self.positions[sym] = current_qty + delta
-            self._record(date, symbol=sym, action=action, quantity=abs(delta), price=float(price))
-        self._record(date, equity=self.portfolio_value(prices))
-
-    def portfolio_value(self, prices: dict[str, float]) -> float:
-        value = self.cash
-        for sym, qty in self.positions.items():
-            price = prices.get(sym)
-            if price is not None:
-                value += qty * price
-        return float(value)
+        rows = self.symbol_index(weights)
+        px = self._price_vector(prices)
+        self._execute(rows, np.fromiter(weights.values(), dtype=float, count=len(rows)), px,
+                      self.value(px), date)
+        self.fills.mark(date, self.value(px))
 
     def finalize(self, prices: dict[str, float], date) -> float:
         """Record final equity value."""
         equity = self.portfolio_value(prices)
-        self._record(date, equity=equity)
+        self.fills.mark(date, equity)
         return equity
 
+    # -- history ------------------------------------------------------------------
     def history_df(self) -> pd.DataFrame:
-        return pd.DataFrame(self.history)
+        return self.fills.frame(np.asarray(self.symbols, dtype=object))
+
+    @property
+    def history(self) -> tuple[Mapping, ...]:
+        """Fills and equity marks as read-only rows (only the fields each row has)."""
+
+        return tuple(MappingProxyType({k: v for k, v in row.items() if v is not None and v == v})
+                     for row in self.history_df().to_dict("records"))
@@ -0,0 +1,263 @@
+"""Vectorized portfolio backtest for trade-driven weight strategies.
+
+Prices for every symbol are aligned once on a trading calendar (the union
+of their bar dates, forward-filled).  Signal events (``date``, ``symbol``,
+``size``, ``signal``) are assigned to every rebalance window they fall in
+with one ``searchsorted`` pass and summed into ``(rebalance, symbol)``
+matrices (:func:`window_sums`) over the events in ``(rebalance - lookback,
+rebalance]``; :func:`window_weights` and :func:`normalize_rows` turn those
+sums into target weights.
+
+:func:`backtest_weights` then trades to each row of target weights at the
+close on or before its rebalance date.  Holdings keep their share counts
+between rebalances, so the daily equity inside a period is one
+matrix-vector product of weights and price relatives.  Commission and
+slippage are fractions of traded notional; because they depend on the
+drifted holdings they are chained with a short loop over rebalances, not
+over days or symbols.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from backend.app.backtest import _performance_metrics
+from services.bar_store import adjust_prices, get_bars_many
+
+
+def _days(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(list(values), dtype=object)).values.astype("datetime64[D]")
+
+
+def rebalance_schedule(start: datetime.date, end: datetime.date, every_days: int) -> list[datetime.date]:
+    """Calendar dates from ``start`` every ``every_days`` days, strictly before ``end``."""
+
+    if every_days <= 0:
+        raise ValueError("rebalance frequency must be positive")
+    count = max(0, -(-(end - start).days // every_days))
+    return [start + datetime.timedelta(days=every_days * i) for i in range(count)]
+
+
+def price_frame(symbols: Iterable[str], start: datetime.date, end: datetime.date) -> pd.DataFrame:
+    """Adjusted closes (trading days x symbols), forward-filled, from one batched read.
+
+    A failed read is logged and yields an empty frame (the backtest then
+    holds cash), as the per-tester price loader did.
+    """
+
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame(dtype=float)
+    try:
+        frames = get_bars_many(symbols, "1d", start=start, end=end + datetime.timedelta(days=1))
+    except Exception:
+        logging.exception("Price load failed for %d symbols", len(symbols))
+        return pd.DataFrame(dtype=float)
+    columns = {}
+    for sym in symbols:
+        frame = frames.get(sym)
+        if frame is None or frame.empty:
+            continue
+        close = adjust_prices(frame)["Close"]
+        if close.index.tz is not None:
+            close.index = close.index.tz_localize(None)
+        columns[sym] = close
+    if not columns:
+        return pd.DataFrame(dtype=float)
+    return pd.DataFrame(columns).sort_index().ffill()
+
+
+def window_sums(
+    events: pd.DataFrame,
+    rebalance_dates: Iterable,
+    symbols: list[str],
+    lookback_days: int,
+    values: np.ndarray | pd.Series,
+) -> np.ndarray:
+    """``(rebalance, symbol)`` sums of ``values`` over the events in each lookback window.
+
+    Event ``i`` counts towards every rebalance ``r`` with
+    ``r - lookback < date_i <= r``; events on other symbols are ignored.
+    """
+
+    reb = _days(rebalance_dates)
+    out = np.zeros((len(reb), len(symbols)))
+    if events.empty or not len(reb):
+        return out
+    lookup = {s: i for i, s in enumerate(symbols)}
+    col = events["symbol"].map(lookup).to_numpy(dtype=float)
+    keep = ~np.isnan(col)
+    col = col[keep].astype(np.int64)
+    values = np.asarray(values, dtype=float)[keep]
+    day = _days(events["date"])[keep]
+    first = np.searchsorted(reb, day, side="left")
+    stop = np.searchsorted(reb, day + np.timedelta64(int(lookback_days), "D"), side="left")
+    n = np.maximum(stop - first, 0)
+    # one (rebalance, event) pair per window an event falls in
+    which = np.repeat(np.arange(len(day)), n)
+    rows = np.repeat(first, n) + (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n))
+    np.add.at(out, (rows, col[which]), values[which])
+    return out
+
+
+def _signals(events: pd.DataFrame) -> np.ndarray:
+    return events["signal"].to_numpy(dtype=float) if not events.empty else np.zeros(0)
+
+
+def window_weights(
+    events: pd.DataFrame,
+    rebalance_dates: Iterable,
+    symbols: list[str],
+    lookback_days: int,
+) -> np.ndarray:
+    """Long/short weights: ``(long size - short size) / total size`` in each window."""
+
+    sig = _signals(events)
+    size = events["size"].to_numpy(dtype=float) if not events.empty else sig
+    longs = window_sums(events, rebalance_dates, symbols, lookback_days, np.where(sig > 0, size, 0.0))
+    shorts = window_sums(events, rebalance_dates, symbols, lookback_days, np.where(sig < 0, size, 0.0))
+    total = (longs + shorts).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total != 0, (longs - shorts) / total, 0.0)
+
+
+def normalize_rows(scores: np.ndarray, top_n: int | None = None) -> np.ndarray:
+    """Scale each row to unit gross (``sum |w| = 1``) after keeping its ``top_n`` largest ``|score|``.
+
+    Rows that are all zero stay flat.
+    """
+
+    scores = np.nan_to_num(np.asarray(scores, dtype=float))
+    if top_n is not None and 0 < top_n < scores.shape[1]:
+        cutoff = -np.partition(-np.abs(scores), top_n - 1, axis=1)[:, top_n - 1 : top_n]
+        scores = np.where(np.abs(scores) >= cutoff, scores, 0.0)
+    total = np.abs(scores).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total != 0, scores / total, 0.0)
+
+
+@dataclass(frozen=True)
+class PortfolioBacktest:
+    """Daily equity, trades and weights of one :func:`backtest_weights` run."""
+
+    dates: pd.DatetimeIndex
+    symbols: list[str]
+    rebalance_dates: list
+    weights: np.ndarray  # (rebalance, symbol) weights actually traded
+    equity: np.ndarray  # (dates,), after costs
+    trades: pd.DataFrame  # date, symbol, action, quantity, price, cost
+    rebalance_equity: np.ndarray  # (rebalance,), after trading
+    initial_capital: float = 100000.0
+
+    def equity_frame(self) -> pd.DataFrame:
+        """Daily equity as a multiple of the initial capital, with its returns."""
+
+        eq = pd.DataFrame({"equity": self.equity / self.initial_capital}, index=self.dates)
+        eq["strategy_return"] = eq["equity"].pct_change().fillna(0)
+        return eq
+
+    def metrics(self) -> dict:
+        if not len(self.dates):
+            return {}
+        return _performance_metrics(self.equity_frame())
+
+    def history_df(self) -> pd.DataFrame:
+        """Trades and post-rebalance equity, in the layout of ``PaperTrader.history_df``."""
+
+        marks = pd.DataFrame({"date": self.rebalance_dates, "equity": self.rebalance_equity})
+        frame = pd.concat([self.trades, marks], ignore_index=True)
+        order = np.lexsort((frame["equity"].notna().to_numpy(), _days(frame["date"])))
+        return frame.iloc[order].reset_index(drop=True)
+
+
+def backtest_weights(
+    prices: pd.DataFrame,
+    rebalance_dates: list,
+    weights: np.ndarray,
+    *,
+    initial_capital: float = 100000.0,
+    commission: float = 0.0,
+    slippage: float = 0.0,
+    end: datetime.date | None = None,
+) -> PortfolioBacktest:
+    """Trade to ``weights`` (one row per rebalance date) over the ``prices`` calendar.
+
+    Each rebalance trades at the last close on or before its date; a symbol
+    without a price there is left out of that rebalance.  Commission and
+    slippage are both charged as a fraction of traded notional.
+    """
+
+    if end is not None:
+        prices = prices.loc[: pd.Timestamp(end)]
+    symbols = [str(c) for c in prices.columns]
+    px = prices.to_numpy(dtype=float)
+    dates = pd.DatetimeIndex(prices.index)
+    n_days = len(dates)
+    rate = float(commission) + float(slippage)
+    rows = np.searchsorted(dates.values.astype("datetime64[D]"), _days(rebalance_dates), side="right") - 1
+    live = rows >= 0
+    reb_dates = [d for d, ok in zip(rebalance_dates, live) if ok]
+    rows = rows[live]
+    anchor = px[rows] if n_days else np.empty((0, len(symbols)))
+    w = np.where(np.isnan(anchor), 0.0, np.asarray(weights, dtype=float)[live])
+    if not len(rows):
+        equity = np.full(n_days, float(initial_capital))
+        empty = pd.DataFrame(columns=["date", "symbol", "action", "quantity", "price", "cost"])
+        return PortfolioBacktest(dates, symbols, [], w, equity, empty, np.empty(0), float(initial_capital))
+
+    # price relative from each rebalance to the next one (the last runs to the final bar)
+    nxt = px[np.append(rows[1:], n_days - 1)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_next = np.nan_to_num(nxt / anchor, nan=1.0)
+    cost = np.zeros(len(rows))
+    growth = np.ones(len(rows))
+    drift = np.zeros_like(w)  # holdings as a fraction of equity just before each rebalance
+    held = np.zeros(len(symbols))
+    for r in range(len(rows)):
+        drift[r] = held
+        cost[r] = rate * np.abs(w[r] - held).sum()
+        growth[r] = 1.0 - cost[r] + w[r] @ (rel_next[r] - 1.0)
+        held = w[r] * rel_next[r] / growth[r] if growth[r] > 0 else np.zeros_like(held)
+    start_equity = initial_capital * np.concatenate(([1.0], np.cumprod(growth)[:-1]))
+
+    # daily equity: the period's weights times each day's price relative
+    seg = np.searchsorted(rows, np.arange(n_days), side="right") - 1
+    inside = seg >= 0
+    s = np.clip(seg, 0, None)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel = np.nan_to_num(px / anchor[s], nan=1.0)
+    factor = 1.0 - cost[s] + np.einsum("ij,ij->i", w[s], rel - 1.0)
+    equity = np.where(inside, start_equity[s] * factor, float(initial_capital))
+
+    notional = start_equity[:, None] * (w - drift)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        qty = np.nan_to_num(notional / anchor)
+    r_idx, c_idx = np.nonzero(np.abs(qty) >= 1e-8)
+    trades = pd.DataFrame({
+        "date": [reb_dates[i] for i in r_idx],
+        "symbol": [symbols[j] for j in c_idx],
+        "action": np.where(qty[r_idx, c_idx] > 0, "buy", "sell"),
+        "quantity": np.abs(qty[r_idx, c_idx]),
+        "price": anchor[r_idx, c_idx],
+        "cost": rate * np.abs(notional[r_idx, c_idx]),
+    })
+    return PortfolioBacktest(
+        dates, symbols, reb_dates, w, equity, trades, start_equity * (1.0 - cost), float(initial_capital)
+    )
+
+
+__all__ = [
+    "PortfolioBacktest",
+    "backtest_weights",
+    "price_frame",
+    "rebalance_schedule",
+    "normalize_rows",
+    "window_sums",
+    "window_weights",
+]
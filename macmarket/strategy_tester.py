@@ -1,13 +1,21 @@
 import os
+import numpy as np
 import pandas as pd
 import datetime
 import json
-import requests
-import yfinance as yf
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List
-from .paper_trader import PaperTrader
-from backend.app.backtest import _performance_metrics
+from services import event_store
+from .portfolio_backtest import (
+    PortfolioBacktest,
+    backtest_weights,
+    normalize_rows,
+    price_frame,
+    rebalance_schedule,
+    window_sums,
+    window_weights,
+)
 
 CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
 DATA_DIR = Path("data/backtests")
@@ -71,19 +79,215 @@ def get_history(user_id: int) -> dict:
     return _load_history().get(str(user_id), {})
 
 
+EVENT_COLUMNS = ["date", "symbol", "size", "signal"]
+_SYMBOL_COLUMNS = ["Ticker", "ticker", "Symbol", "symbol"]
+_DATE_COLUMNS = ["Date", "TransactionDate", "TradeDate", "date", "ReportDate"]
+_ACTION_COLUMNS = ["Transaction", "Action", "Type", "action", "type"]
+_SIZE_COLUMNS = ["Range", "Size", "amount", "Amount", "Value", "value"]
+
+
+def parse_size(val) -> float:
+    """Dollar size of a trade: numbers as-is, ``"$1,001 - $15,000"`` ranges at their midpoint."""
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        parts = val.replace("$", "").replace(",", "").split("-")
+        nums = []
+        for p in parts:
+            try:
+                nums.append(float(p))
+            except ValueError:
+                continue
+        if nums:
+            return sum(nums) / len(nums)
+    return 1.0
+
+
+def fetch_feed(feed: str, api_token: str | None = None) -> list[dict]:
+    """Records of one Quiver feed (``congress``, ``lobbying`` or ``whales``) from the event store."""
+    return event_store.default_store().records(feed, api_token=api_token)
+
+
+def event_table(records: list[dict] | pd.DataFrame, default_signal: int = 0) -> pd.DataFrame:
+    """Normalize feed records into sparse ``date``/``symbol``/``size``/``signal`` events.
+
+    ``signal`` is 1 for buys/purchases, -1 for sells/sales and
+    ``default_signal`` for records without an action (lobbying filings).
+    """
+    df = pd.DataFrame(records)
+
+    def pick(names: list[str]) -> str | None:
+        return next((c for c in names if c in df.columns), None)
+
+    sym_col, date_col = pick(_SYMBOL_COLUMNS), pick(_DATE_COLUMNS)
+    if df.empty or sym_col is None or date_col is None:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    action_col, size_col = pick(_ACTION_COLUMNS), pick(_SIZE_COLUMNS)
+    out = pd.DataFrame({
+        "date": pd.to_datetime(df[date_col], errors="coerce").dt.date,
+        "symbol": df[sym_col].astype("string").str.strip().str.upper(),
+    })
+    out["size"] = df[size_col].map(parse_size) if size_col else 1.0
+    if action_col:
+        action = df[action_col].astype("string").fillna("")
+        out["signal"] = np.where(action.str.contains("buy|purchase", case=False), 1,
+                                 np.where(action.str.contains("sell|sale", case=False), -1, 0))
+    else:
+        out["signal"] = default_signal
+    out = out.dropna(subset=["date", "symbol"])
+    return out[out["symbol"] != ""].reset_index(drop=True)
+
+
+def _between(events: pd.DataFrame, start: datetime.date, end: datetime.date) -> pd.DataFrame:
+    return events[(events["date"] >= start) & (events["date"] <= end)]
+
+
+@dataclass(frozen=True)
+class EventStrategy:
+    """How a strategy turns one Quiver feed into ``(rebalance, symbol)`` target weights.
+
+    ``weighting`` is one of:
+
+    * ``long_short`` – ``(long size - short size) / total size`` per window;
+    * ``net_long`` – net bought dollars, long-only, scaled to a fully invested book;
+    * ``spend`` – disclosed lobbying spend, long-only, scaled the same way;
+    * ``net_count`` – buys minus sells by count, long/short, unit gross exposure.
+
+    ``top_n`` keeps the largest scores of each rebalance.
+    """
+
+    name: str
+    feed: str
+    weighting: str
+    lookback_days: int
+    rebalance_days: int = 7
+    top_n: int | None = None
+
+    def weights(self, events: pd.DataFrame, schedule: list, symbols: list[str]) -> np.ndarray:
+        if self.weighting == "long_short":
+            weights = window_weights(events, schedule, symbols, self.lookback_days)
+            return normalize_rows(weights, self.top_n) if self.top_n else weights
+        signal = events["signal"].to_numpy(dtype=float)
+        size = events["size"].to_numpy(dtype=float)
+        if self.weighting == "net_long":
+            scores = np.clip(window_sums(events, schedule, symbols, self.lookback_days, signal * size), 0.0, None)
+        elif self.weighting == "spend":
+            scores = window_sums(events, schedule, symbols, self.lookback_days, size)
+        elif self.weighting == "net_count":
+            scores = window_sums(events, schedule, symbols, self.lookback_days, signal)
+        else:
+            raise ValueError(f"unknown weighting {self.weighting!r}")
+        return normalize_rows(scores, self.top_n)
+
+
+_DEFAULT_STRATEGIES = {
+    "congress_long_short": {"feed": "congress", "weighting": "long_short", "lookback_days": 7},
+    "political_alpha": {"feed": "congress", "weighting": "net_long", "lookback_days": 30, "top_n": 20},
+    "lobby_power": {"feed": "lobbying", "weighting": "spend", "lookback_days": 90, "rebalance_days": 30,
+                    "top_n": 20},
+    "whale_watcher": {"feed": "whales", "weighting": "net_count", "lookback_days": 14, "top_n": 20},
+}
+_DEFAULT_SIGNALS = {"lobbying": 1}
+
+
+def strategy_specs() -> dict[str, EventStrategy]:
+    """Strategy definitions, with ``strategy_tester.strategies.<name>`` overrides from the config."""
+    cfg = _load_config().get("strategy_tester", {})
+    overrides = cfg.get("strategies") or {}
+    specs = {}
+    for name, defaults in _DEFAULT_STRATEGIES.items():
+        fields = dict(defaults)
+        if name == "congress_long_short":
+            fields["lookback_days"] = cfg.get("lookback_days", fields["lookback_days"])
+            fields["rebalance_days"] = cfg.get("rebalance_frequency_days", 7)
+        fields.update(overrides.get(name) or {})
+        specs[name] = EventStrategy(name=name, **fields)
+    return specs
+
+
+def _run_spec(
+    spec: EventStrategy,
+    events: pd.DataFrame,
+    prices: pd.DataFrame,
+    start: datetime.date,
+    end: datetime.date,
+    cfg: dict,
+) -> PortfolioBacktest:
+    symbols = sorted(events["symbol"].unique())
+    schedule = rebalance_schedule(start, end, spec.rebalance_days)
+    # symbols without bars keep their share of the weights but are never traded
+    weights = spec.weights(events, schedule, symbols)
+    return backtest_weights(
+        prices.reindex(columns=symbols),
+        schedule,
+        weights,
+        initial_capital=cfg.get("initial_capital", 100000.0),
+        commission=cfg.get("commission", 0.0),
+        slippage=cfg.get("slippage", 0.0),
+        end=end,
+    )
+
+
+def run_strategies(
+    strategies: list[str] | None = None,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+) -> dict[str, dict]:
+    """Backtest several strategies over one window; metrics (or ``{"error": ...}``) per strategy.
+
+    Each feed is fetched once and every strategy trades off one price matrix
+    covering the symbols of all the feeds involved.  Defaults to every
+    strategy over the last ``strategy_tester.backtest_days`` (365) days.
+    """
+    config = _load_config()
+    cfg = config.get("strategy_tester", {})
+    specs = strategy_specs()
+    names = list(strategies or list_strategies())
+    unknown = [n for n in names if n not in specs]
+    if unknown:
+        raise ValueError(f"unknown strategy: {', '.join(unknown)}")
+    end = end or datetime.date.today()
+    start = start or end - datetime.timedelta(days=cfg.get("backtest_days", 365))
+    chosen = [specs[n] for n in names]
+    warmup = datetime.timedelta(days=max(s.lookback_days for s in chosen))
+    token = config.get("quiver_api_token") or os.getenv("QUIVER_API_KEY")
+
+    events: dict[str, pd.DataFrame] = {}
+    errors: dict[str, str] = {}
+    for feed in dict.fromkeys(s.feed for s in chosen):
+        try:
+            table = event_table(fetch_feed(feed, token), _DEFAULT_SIGNALS.get(feed, 0))
+        except Exception as exc:
+            errors[feed] = str(exc)
+            continue
+        events[feed] = _between(table, start - warmup, end)
+    universe = sorted(set().union(*(set(e["symbol"]) for e in events.values())))
+    prices = price_frame(universe, start - warmup, end)
+
+    out = {}
+    for spec in chosen:
+        if spec.feed in errors:
+            out[spec.name] = {"error": errors[spec.feed]}
+            continue
+        result = _run_spec(spec, events[spec.feed], prices, start, end, cfg)
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        result.history_df().to_csv(DATA_DIR / f"{spec.name}.csv", index=False)
+        out[spec.name] = result.metrics()
+    return out
+
+
 def run_strategy(strategy: str) -> dict:
-    if strategy == "congress_long_short":
-        tester = CongressLongShortTester()
-        return tester.run_backtest()
-    if strategy in {"political_alpha", "lobby_power", "whale_watcher"}:
-        # Placeholder metrics for additional strategies
-        return {
-            "total_return": 0.0,
-            "cagr": 0.0,
-            "max_drawdown": 0.0,
-            "sharpe": 0.0,
-        }
-    raise ValueError("unknown strategy")
+    """Backtest one strategy over its last ``rebalance_days + lookback_days`` days.
+
+    That is the window a single run has always covered (batches default to
+    ``backtest_days``); a failed feed comes back as ``{"error": ...}``.
+    """
+    spec = strategy_specs().get(strategy)
+    if spec is None:
+        raise ValueError(f"unknown strategy: {strategy}")
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=spec.rebalance_days + spec.lookback_days)
+    return run_strategies([strategy], start=start, end=end)[strategy]
 
 
 class CongressLongShortTester:
@@ -96,110 +300,31 @@ class CongressLongShortTester:
         self.initial_capital = strat_cfg.get("initial_capital", 100000.0)
         self.lookback_days = strat_cfg.get("lookback_days", 7)
         self.rebalance_freq = strat_cfg.get("rebalance_frequency_days", 7)
-        self.output_csv = Path("data/backtests/congress_long_short.csv")
+        self.commission = strat_cfg.get("commission", 0.0)
+        self.slippage = strat_cfg.get("slippage", 0.0)
+        self.output_csv = DATA_DIR / "congress_long_short.csv"
         self.output_csv.parent.mkdir(parents=True, exist_ok=True)
 
     def _fetch_trades(self, start: datetime.date, end: datetime.date) -> pd.DataFrame:
-        headers = {"Authorization": f"Bearer {self.api_token}"} if self.api_token else {}
-        url = "https://api.quiverquant.com/beta/live/congresstrading"
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        if isinstance(data, dict):
-            data = data.get("data", data)
-        df = pd.DataFrame(data)
-        if df.empty:
-            return pd.DataFrame(columns=["date", "symbol", "size", "signal"])
-        sym_col = next((c for c in ["Ticker", "ticker", "Symbol", "symbol"] if c in df.columns), None)
-        date_col = next((c for c in ["Date", "TransactionDate", "TradeDate", "date"] if c in df.columns), None)
-        action_col = next((c for c in ["Transaction", "Action", "Type"] if c in df.columns), None)
-        size_col = next((c for c in ["Range", "Size", "amount", "Amount"] if c in df.columns), None)
-        df = df.rename(columns={sym_col: "symbol", date_col: "date", action_col: "action", size_col: "size"})
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        df["signal"] = df["action"].str.contains("buy", case=False).astype(int)
-        df.loc[df["action"].str.contains("sell|sale", case=False), "signal"] = -1
-        df["size"] = df["size"].apply(self._parse_size)
-        df = df[(df["date"] >= start) & (df["date"] <= end)]
-        return df[["date", "symbol", "size", "signal"]]
-
-    @staticmethod
-    def _parse_size(val) -> float:
-        if isinstance(val, (int, float)):
-            return float(val)
-        if isinstance(val, str):
-            parts = val.replace("$", "").replace(",", "").split("-")
-            nums = []
-            for p in parts:
-                try:
-                    nums.append(float(p))
-                except ValueError:
-                    continue
-            if nums:
-                return sum(nums) / len(nums)
-        return 1.0
-
-    def _weights_from_trades(self, trades: pd.DataFrame) -> dict[str, float]:
-        if trades.empty:
-            return {}
-        longs = trades[trades["signal"] == 1].groupby("symbol")["size"].sum()
-        shorts = trades[trades["signal"] == -1].groupby("symbol")["size"].sum()
-        total = longs.sum() + shorts.sum()
-        weights: dict[str, float] = {}
-        if total == 0:
-            return weights
-        for sym, val in longs.items():
-            weights[sym] = weights.get(sym, 0.0) + val / total
-        for sym, val in shorts.items():
-            weights[sym] = weights.get(sym, 0.0) - val / total
-        return weights
-
-    def _price_series(self, symbols: list[str], start: datetime.date, end: datetime.date) -> dict[str, pd.Series]:
-        data = {}
-        for sym in symbols:
-            try:
-                df = yf.download(sym, start=start, end=end + datetime.timedelta(days=1), progress=False)
-                if not df.empty:
-                    data[sym] = df["Close"].ffill()
-            except Exception:
-                pass
-        return data
-
-    @staticmethod
-    def _nearest(series: pd.Series, date: datetime.date) -> float | None:
-        if series.empty:
-            return None
-        dt = pd.to_datetime(date)
-        if dt in series.index:
-            return float(series.loc[dt])
-        before = series.loc[:dt]
-        if not before.empty:
-            return float(before.iloc[-1])
-        return float(series.iloc[0])
-
-    def run_backtest(self) -> dict:
-        today = datetime.date.today()
-        start_date = today - datetime.timedelta(days=self.rebalance_freq + self.lookback_days)
-        trades = self._fetch_trades(start_date - datetime.timedelta(days=self.lookback_days), today)
-        symbols = sorted(trades["symbol"].unique())
-        prices = self._price_series(symbols, start_date, today)
-        rebalance_date = start_date
-        pt = PaperTrader(self.initial_capital)
-        equity_curve = []
-        while rebalance_date < today:
-            lb_start = rebalance_date - datetime.timedelta(days=self.lookback_days)
-            subset = trades[(trades["date"] > lb_start) & (trades["date"] <= rebalance_date)]
-            weights = self._weights_from_trades(subset)
-            price_map = {s: self._nearest(prices.get(s, pd.Series(dtype=float)), rebalance_date) for s in weights}
-            pt.target_weights(weights, price_map, rebalance_date)
-            equity = pt.portfolio_value({s: self._nearest(prices.get(s, pd.Series(dtype=float)), rebalance_date) for s in pt.positions})
-            equity_curve.append({"date": rebalance_date, "equity": equity})
-            rebalance_date += datetime.timedelta(days=self.rebalance_freq)
-        final_prices = {s: self._nearest(prices.get(s, pd.Series(dtype=float)), today) for s in pt.positions}
-        final_equity = pt.finalize(final_prices, today)
-        equity_curve.append({"date": today, "equity": final_equity})
-        hist_df = pt.history_df()
-        hist_df.to_csv(self.output_csv, index=False)
-        eq_df = pd.DataFrame(equity_curve).set_index("date")
-        eq_df["strategy_return"] = eq_df["equity"].pct_change().fillna(0)
-        metrics = _performance_metrics(eq_df)
-        return metrics
+        records = event_store.default_store().records("congress", start=start, end=end, api_token=self.api_token)
+        return _between(event_table(records), start, end)
+
+    _parse_size = staticmethod(parse_size)
+
+    def run_backtest(self, start: datetime.date | None = None, end: datetime.date | None = None) -> dict:
+        """Rebalance into the congress long/short weights from ``start`` until ``end``.
+
+        Defaults to the last ``rebalance_frequency_days + lookback_days`` days.
+        """
+        end = end or datetime.date.today()
+        start = start or end - datetime.timedelta(days=self.rebalance_freq + self.lookback_days)
+        lookback = datetime.timedelta(days=self.lookback_days)
+        spec = EventStrategy("congress_long_short", "congress", "long_short", self.lookback_days,
+                             self.rebalance_freq)
+        trades = self._fetch_trades(start - lookback, end)
+        # a lookback of bars so the first rebalance has a close to trade at
+        prices = price_frame(sorted(trades["symbol"].unique()), start - lookback, end)
+        cfg = {"initial_capital": self.initial_capital, "commission": self.commission, "slippage": self.slippage}
+        result = _run_spec(spec, trades, prices, start, end, cfg)
+        result.history_df().to_csv(self.output_csv, index=False)
+        return result.metrics()
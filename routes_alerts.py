@@ -3,9 +3,10 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional, List
 
-import yfinance as yf
 from fastapi import APIRouter, Request, HTTPException, Query, Body
-from indicators.haco import compute_haco
+from indicators.common import ema_array
+from indicators.haco import HacoState
+from services.bar_store import get_bars
 from backend.app import alerts as mm_alerts
 from backend.app import signals as signal_engine
 from backend.app.database import connect_to_db
@@ -93,6 +94,33 @@ def _build_signal_preview(
     }
 
 
+# Download windows used once a HACO snapshot exists: they only have to reach
+# back to the snapshot's newest bar, which is revised in place.
+_HACO_TAIL_PERIOD = {"5m": "5d", "15m": "5d", "1h": "5d", "1d": "1mo"}
+
+
+def _download_candles(sym: str, period: str, interval: str) -> tuple[pd.DataFrame, list[dict]]:
+    df = get_bars(sym, interval, period=period).dropna(subset=["Open", "High", "Low", "Close"])
+    candles = [
+        {
+            "time": int(ts.to_pydatetime().timestamp()),
+            "o": _scalar(row.get("Open", row.get("open", 0.0))),
+             "h": _scalar(row.get("High", row.get("high", 0.0))),
+             "l": _scalar(row.get("Low",  row.get("low",  0.0))),
+             "c": _scalar(row.get("Close",row.get("close", 0.0))),
+        }
+        for ts, row in df.iterrows()
+    ]
+    return df, candles
+
+
+def _save_alert_state(cur, alert_id: int, last_state, haco_state: str | None = None) -> None:
+    cur.execute(
+        "REPLACE INTO alert_state (alert_id,last_state,last_checked,haco_state) VALUES (%s,%s,UTC_TIMESTAMP(),%s)",
+        (alert_id, last_state, haco_state),
+    )
+
+
 async def _alerts_worker() -> None:  # pragma: no cover - background task
     while True:
         try:
@@ -109,10 +137,10 @@ async def _alerts_worker() -> None:  # pragma: no cover - background task
                 freq = (a["frequency"] or "15m").lower()
                 # throttle by alert_state
                 cur.execute(
-                    "SELECT last_state, last_checked FROM alert_state WHERE alert_id=%s",
+                    "SELECT last_state, last_checked, haco_state FROM alert_state WHERE alert_id=%s",
                     (alert_id,),
                 )
-                st = cur.fetchone() or {"last_state": None, "last_checked": None}
+                st = cur.fetchone() or {"last_state": None, "last_checked": None, "haco_state": None}
                 secs = {"5m": 300, "15m": 900, "1h": 3600, "1d": 86400}.get(freq, 900)
                 if st["last_checked"] is not None:
                     dt = _to_utc(st["last_checked"])
@@ -129,75 +157,56 @@ async def _alerts_worker() -> None:  # pragma: no cover - background task
                     if freq == "1h"
                     else ("1d", "3y")
                 )
-                df = (
-                    yf.download(
-                        sym,
-                        period=period,
-                        interval=interval,
-                        auto_adjust=False,
-                        progress=False,
-                    ).dropna()
-                )
+                is_haco = (a["strategy"] or "HACO") == "HACO"
+                # HACO alerts resume from the saved snapshot and only fetch the
+                # recent tail; full history is pulled when there is no usable one.
+                snapshot = HacoState.from_json(st.get("haco_state")) if is_haco else None
+                hstate = None
+                if snapshot is not None:
+                    df, candles = _download_candles(sym, _HACO_TAIL_PERIOD.get(freq, period), interval)
+                    if snapshot.catch_up(candles):
+                        hstate = snapshot
+                if hstate is None:
+                    df, candles = _download_candles(sym, period, interval)
                 if df.empty:
-                    cur.execute(
-                        "REPLACE INTO alert_state (alert_id,last_state,last_checked) VALUES (%s,%s,UTC_TIMESTAMP())",
-                        (alert_id, st["last_state"]),
-                    )
+                    _save_alert_state(cur, alert_id, st["last_state"], st.get("haco_state"))
                     conn.commit()
                     continue
-                candles = [
-                    {
-                        "time": int(ts.to_pydatetime().timestamp()),
-                        "o": _scalar(row.get("Open", row.get("open", 0.0))),
-                         "h": _scalar(row.get("High", row.get("high", 0.0))),
-                         "l": _scalar(row.get("Low",  row.get("low",  0.0))),
-                         "c": _scalar(row.get("Close",row.get("close", 0.0))),
-                    }
-                    for ts, row in df.iterrows()
-                ]
                 # compute strategy state (HACO or MACD)
-                if (a["strategy"] or "HACO") == "HACO":
-                    out = compute_haco(candles)
-                    ser = out.get("series") or []
-                    if not ser:
+                haco_snapshot = None
+                if is_haco:
+                    if hstate is None:
+                        hstate = HacoState.from_candles(candles)
+                    if not hstate.bars:
                         continue
-                    last = ser[-1]
+                    last = hstate.last
                     state_now = "UP" if bool(last.get("state")) else "DOWN"
-                    reason = last.get("reason", "") if isinstance(last, dict) else ""
+                    reason = last.get("reason", "")
                     px = float(last.get("c", 0.0))
+                    haco_snapshot = hstate.to_json()
                     extra = {}
                 else:
                     # ---- MACD implementation (12,26,9) on closes — ALERT ONLY ON CROSSOVER ----
-                    closes = [float(row.at["Close"]) for _, row in df.iterrows()]
+                    closes = np.asarray(df["Close"], dtype=float).ravel()
                     if len(closes) < 35:
-                        cur.execute("REPLACE INTO alert_state (alert_id,last_state,last_checked) VALUES (%s,%s,UTC_TIMESTAMP())",
-                                    (alert_id, st["last_state"]))
+                        _save_alert_state(cur, alert_id, st["last_state"])
                         conn.commit(); continue
-                    def ema_series(vals, length):
-                        alpha = 2.0/(length+1.0)
-                        out=[vals[0]]
-                        for v in vals[1:]:
-                            out.append(alpha*v + (1.0-alpha)*out[-1])
-                        return out
-                    ema12  = ema_series(closes, 12)
-                    ema26  = ema_series(closes, 26)
-                    macd   = [ema12[i] - ema26[i] for i in range(len(closes))]
-                    signal = ema_series(macd, 9)
-                    hist   = [macd[i] - signal[i] for i in range(len(macd))]
-                    m_prev, s_prev = macd[-2], signal[-2]
-                    m, s, h        = macd[-1],  signal[-1], hist[-1]
+                    macd   = ema_array(closes, 12) - ema_array(closes, 26)
+                    signal = ema_array(macd, 9)
+                    hist   = macd - signal
+                    m_prev, s_prev = float(macd[-2]), float(signal[-2])
+                    m, s, h        = float(macd[-1]), float(signal[-1]), float(hist[-1])
                     cross_up   = (m_prev <= s_prev) and (m > s)
                     cross_down = (m_prev >= s_prev) and (m < s)
                     if not (cross_up or cross_down):
                         # No crossover: just advance throttle window; do NOT send, do NOT flip last_state.
-                        cur.execute("REPLACE INTO alert_state (alert_id,last_state,last_checked) VALUES (%s,%s,UTC_TIMESTAMP())",
-                                    (alert_id, st["last_state"]))
+                        _save_alert_state(cur, alert_id, st["last_state"])
                         conn.commit(); continue
                     # Crossover happened on this bar -> send
                     state_now = "UP" if cross_up else "DOWN"
                     cross_lbl = "BULLISH_CROSS" if cross_up else "BEARISH_CROSS"
                     reason = f"MACD {('▲' if cross_up else '▼')} cross: {m:.2f} vs {s:.2f} (hist {h:.2f})"
-                    px = closes[-1]
+                    px = float(closes[-1])
                     extra = {"macd": f"{m:.2f}", "signal": f"{s:.2f}", "hist": f"{h:.2f}", "cross": cross_lbl}
                 # on change -> notify
                 if state_now is not None and state_now != st["last_state"]:
@@ -226,8 +235,7 @@ async def _alerts_worker() -> None:  # pragma: no cover - background task
                     if a.get("sms"):
                         mm_alerts.send_sms(a["sms"], sms)
                 # upsert state (HACO on flip, MACD on crossover)
-                cur.execute("REPLACE INTO alert_state (alert_id,last_state,last_checked) VALUES (%s,%s,UTC_TIMESTAMP())",
-                            (alert_id, state_now))
+                _save_alert_state(cur, alert_id, state_now, haco_snapshot)
                 conn.commit()
             cur.close()
             conn.close()
@@ -32,6 +32,7 @@ CREATE TABLE haco_alerts (
     sms VARCHAR(20) DEFAULT NULL,
     last_state VARCHAR(10) DEFAULT NULL,
     last_checked TIMESTAMP NULL DEFAULT NULL,
+    haco_state TEXT DEFAULT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
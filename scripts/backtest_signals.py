@@ -6,7 +6,9 @@ import numpy as np
 import pandas as pd
 import requests
 import matplotlib.pyplot as plt
-import yfinance as yf
+
+from services import event_store
+from services.bar_store import adjust_prices, get_bars
 
 
 def _parse_action(val: str) -> int:
@@ -24,32 +26,15 @@ def _parse_action(val: str) -> int:
 def load_quiver_trades(
     symbol: str, start: str, end: str, source: str, limit: int = 100
 ) -> pd.DataFrame:
-    """Fetch trades from the QuiverQuant API."""
-    key = os.getenv("QUIVER_API_KEY")
-    headers = {"Authorization": f"Bearer {key}"} if key else {}
-    if source == "whales":
-        url = "https://api.quiverquant.com/beta/live/whalemoves"
-        params = {}
-    else:
-        url = "https://api.quiverquant.com/beta/live/congresstrading"
-        params = {"tickers": symbol}
-    resp = requests.get(url, headers=headers, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    if isinstance(data, dict):
-        data = data.get("data", [])
-    df = pd.DataFrame(data)
+    """Load trades for ``symbol`` from the local Quiver event store (synced on demand)."""
+    feed = "whales" if source == "whales" else "congress"
+    records = event_store.default_store().records(
+        feed, symbols=[symbol], start=start, end=end, api_token=os.getenv("QUIVER_API_KEY")
+    )
+    df = pd.DataFrame(records)
     if df.empty:
         return pd.DataFrame(columns=["date", "signal"])
 
-    sym_col = None
-    for c in ["Ticker", "ticker", "Symbol", "symbol"]:
-        if c in df.columns:
-            sym_col = c
-            break
-    if sym_col:
-        df = df[df[sym_col].str.upper() == symbol.upper()]
-
     date_col = None
     for c in [
         "Date",
@@ -86,14 +71,14 @@ def load_quiver_trades(
 
 def download_prices(symbol: str, start: str, end: str) -> pd.DataFrame:
     """Fetch daily OHLCV prices for the given symbol."""
-    df = yf.download(symbol, start=start, end=end, progress=False)
+    df = adjust_prices(get_bars(symbol, "1d", start=start, end=end))
     if df.empty:
         raise ValueError("No price data returned")
     df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
     df.reset_index(inplace=True)
     df.rename(columns={'Date': 'date', 'Open': 'open', 'High': 'high',
                        'Low': 'low', 'Close': 'close', 'Volume': 'volume'}, inplace=True)
-    df['date'] = pd.to_datetime(df['date'])
+    df['date'] = pd.to_datetime(df['date']).dt.tz_localize(None)
     return df
 
 
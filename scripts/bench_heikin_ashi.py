@@ -0,0 +1,73 @@
+"""Time the Heikin-Ashi kernel against the per-bar pandas loop it replaced.
+
+Usage: ``python -m scripts.bench_heikin_ashi [--bars 10000] [--repeat 5]``
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.haco import _heikin_ashi
+
+
+def _legacy_heikin_ashi(df: pd.DataFrame) -> pd.DataFrame:
+    """The old ``api.haco._heikin_ashi`` (HA open written one ``iloc`` at a time)."""
+    ha = pd.DataFrame(index=df.index)
+    ha["close"] = (df["Open"] + df["High"] + df["Low"] + df["Close"]) / 4.0
+    ha["open"] = (df["Open"] + df["Close"]) / 2.0
+    for i in range(1, len(ha)):
+        ha.iloc[i, ha.columns.get_loc("open")] = (
+            ha["open"].iloc[i - 1] + ha["close"].iloc[i - 1]
+        ) / 2.0
+    ha["high"] = pd.concat([df["High"], ha["open"], ha["close"]], axis=1).max(axis=1)
+    ha["low"] = pd.concat([df["Low"], ha["open"], ha["close"]], axis=1).min(axis=1)
+    ha["upbar"] = (ha["close"] > ha["open"]).astype(int)
+    return ha
+
+
+def _bars(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.5, (2, n)))
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread[0],
+            "Low": np.minimum(open_, close) - spread[1],
+            "Close": close,
+        },
+        index=pd.date_range("2000-01-03", periods=n, freq="B"),
+    )
+
+
+def _best(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = _bars(args.bars)
+    new, old = _heikin_ashi(df), _legacy_heikin_ashi(df)
+    err = float(np.max(np.abs(new[["open", "high", "low", "close"]].values - old[["open", "high", "low", "close"]].values)))
+    legacy = _best(_legacy_heikin_ashi, df, max(1, args.repeat // 5))
+    kernel = _best(_heikin_ashi, df, args.repeat)
+    print(f"bars={args.bars} max_abs_diff={err:.2e}")
+    print(f"legacy loop: {legacy * 1000:9.2f} ms")
+    print(f"kernel:      {kernel * 1000:9.2f} ms")
+    print(f"speedup:     {legacy / kernel:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
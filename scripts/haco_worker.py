@@ -2,10 +2,21 @@ import time
 from datetime import datetime
 from backend.app.database import SessionLocal
 from backend.app import crud, alerts, schemas
-from indicators.haco import compute_haco
+from indicators.haco import HacoState
 from services.data import get_candles
 
 
+def _haco_state(alert) -> HacoState | None:
+    """Resume the alert's saved HACO state, or rebuild it from full history."""
+    state = HacoState.from_json(alert.haco_state)
+    if state is not None and state.catch_up(get_candles(alert.symbol, "Day", 30, period="3mo")):
+        return state
+    candles = get_candles(alert.symbol, "Day", 500)
+    if not candles:
+        return None
+    return HacoState.from_candles(candles)
+
+
 def check_alerts():
     db = SessionLocal()
     try:
@@ -13,20 +24,21 @@ def check_alerts():
             now = datetime.utcnow()
             if alert.last_checked and (now - alert.last_checked).total_seconds() < alert.frequency * 60:
                 continue
-            candles = get_candles(alert.symbol, "Day", 500)
-            if not candles:
-                continue
-            data = compute_haco(candles)
-            if not data.get("series"):
+            haco = _haco_state(alert)
+            if haco is None:
                 continue
-            state = data["series"][-1].get("state")
+            state = haco.last["state"]
             if state != alert.last_state:
                 msg = f"HACO state for {alert.symbol} changed to {state}"
                 if alert.email:
                     alerts.send_email(alert.email, f"{alert.symbol} HACO Alert", msg)
                 if alert.sms:
                     alerts.send_sms(alert.sms, msg)
-            crud.update_haco_alert(db, alert, schemas.HacoAlertUpdate(last_state=state, last_checked=now))
+            crud.update_haco_alert(
+                db,
+                alert,
+                schemas.HacoAlertUpdate(last_state=state, last_checked=now, haco_state=haco.to_json()),
+            )
     finally:
         db.close()
 
@@ -0,0 +1,87 @@
+"""Grid-search SMA-crossover or HACO parameters over a list of symbols.
+
+Usage::
+
+    python -m scripts.sweep --strategy sma --symbols AAPL,MSFT,NVDA \\
+        --grid fast=5:50:5 --grid slow=20:200:20 --start 2015-01-01 --folds 4
+    python -m scripts.sweep --strategy haco --symbols SPY,QQQ \\
+        --grid lengthUp=20:60:2 --grid lengthDown=20:60:2 --grid alertLookback=1,2,3
+
+Grid values are comma lists or inclusive ``start:stop[:step]`` ranges.
+"""
+
+import argparse
+import json
+import time
+
+from backend.app.optimizer import METRICS, STRATEGIES, sweep
+
+
+def _grid(items):
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if not values:
+            raise argparse.ArgumentTypeError(f"expected NAME=VALUES, got {item!r}")
+        grid[name.strip()] = values.strip()
+    return grid
+
+
+def _print_table(result: dict) -> None:
+    print(f"{result['combinations']} combinations of {result['strategy']} on {len(result['symbols'])} symbols,"
+          f" ranked by {result['sort']}")
+    print(f"{'rank':>4}  {'params':<44} {'sharpe':>7} {'total':>8} {'cagr':>7} {'maxdd':>7} {'trades':>7}")
+    for row in result["results"]:
+        params = " ".join(f"{k}={v}" for k, v in row["params"].items())
+        m = row["metrics"]
+        print(f"{row['rank']:>4}  {params:<44} {m.get('sharpe', float('nan')):>7.2f}"
+              f" {m.get('total_return', float('nan')):>8.2%} {m.get('cagr', float('nan')):>7.2%}"
+              f" {m.get('max_drawdown', float('nan')):>7.2%} {row['trades']:>7}")
+    wf = result.get("walk_forward")
+    if wf:
+        print("\nwalk-forward")
+        for fold in wf["folds"]:
+            params = " ".join(f"{k}={v}" for k, v in fold["params"].items())
+            print(f"  test {fold['test']['start']}..{fold['test']['end']}  {params:<44}"
+                  f" train sharpe {fold['train_metrics'].get('sharpe')}"
+                  f"  test sharpe {fold['test_metrics'].get('sharpe')}")
+        print(f"  out of sample: {wf['out_of_sample']}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="sma")
+    parser.add_argument("--symbols", required=True, help="comma-separated symbols")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=VALUES")
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--end")
+    parser.add_argument("--sort", choices=METRICS, default="sharpe")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--folds", type=int, default=0, help="walk-forward folds (0 = none)")
+    parser.add_argument("--anchored", action="store_true", help="expanding instead of rolling training windows")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--json", action="store_true", help="print the raw result instead of a table")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    result = sweep(
+        args.strategy,
+        _grid(args.grid),
+        [s.strip() for s in args.symbols.split(",") if s.strip()],
+        args.start,
+        args.end,
+        sort=args.sort,
+        top=args.top,
+        folds=args.folds,
+        anchored=args.anchored,
+        workers=args.workers,
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_table(result)
+        print(f"\n{time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
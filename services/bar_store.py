@@ -0,0 +1,443 @@
+"""Local OHLCV bar store shared by the signal, HACO, alert and backtest code.
+
+Bars are kept per ``(symbol, interval)`` in memory and in one columnar
+``.npz`` file per key under ``data/bars/<interval>/``.  A request only
+downloads the date ranges the store does not cover yet (older history in
+front, fresh bars at the end), concurrent callers for the same key wait for
+the one download in flight, and multi-symbol requests are fetched in a single
+batched call.
+
+The download itself goes through a pluggable *fetcher* so tests (or an
+offline deployment) can serve bars from a local fixture instead of Yahoo
+Finance::
+
+    store = BarStore(root=tmp_path, fetcher=my_fetcher)
+    df = store.get("SPY", "1d", period="1y")
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+_FILE_KEYS = ("open", "high", "low", "close", "adj_close", "volume")
+
+DEFAULT_ROOT = Path(
+    os.getenv("BAR_STORE_DIR", Path(__file__).resolve().parent.parent / "data" / "bars")
+)
+
+# fetcher(symbols, interval, start, end) -> {symbol: frame}; ``start=None``
+# means "all available history", ``end=None`` means "up to now".
+Fetcher = Callable[
+    [List[str], str, Optional[pd.Timestamp], Optional[pd.Timestamp]],
+    Dict[str, pd.DataFrame],
+]
+
+_INTERVAL_ALIASES = {"60m": "1h", "1wk": "1wk", "1mo": "1mo"}
+# Yahoo only serves recent intraday bars; requests are clamped to these windows.
+_INTRADAY_LIMIT_DAYS = {"1m": 7, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "90m": 59, "1h": 729}
+# How long the newest bars are considered fresh before the tail is re-fetched.
+_INTRADAY_TTL = int(os.getenv("BAR_STORE_INTRADAY_TTL", "60"))
+_DAILY_TTL = int(os.getenv("BAR_STORE_DAILY_TTL", "900"))
+_NO_START = np.iinfo(np.int64).min
+
+
+def _canonical_interval(interval: str) -> str:
+    iv = (interval or "1d").strip().lower()
+    return _INTERVAL_ALIASES.get(iv, iv)
+
+
+def _is_intraday(interval: str) -> bool:
+    return interval in _INTRADAY_LIMIT_DAYS
+
+
+def _to_utc(value) -> pd.Timestamp | None:
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _period_offset(period: str) -> pd.DateOffset | pd.Timedelta | None:
+    """Translate a yfinance ``period`` string (``5d``, ``3mo``, ``2y``...)."""
+
+    p = (period or "").strip().lower()
+    if p in {"", "max"}:
+        return None
+    m = re.fullmatch(r"(\d+)\s*(d|wk|mo|y)", p)
+    if not m:
+        raise ValueError(f"unsupported period: {period!r}")
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        return pd.Timedelta(days=n)
+    if unit == "wk":
+        return pd.Timedelta(weeks=n)
+    if unit == "mo":
+        return pd.DateOffset(months=n)
+    return pd.DateOffset(years=n)
+
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {col: pd.Series(dtype=float) for col in COLUMNS},
+        index=pd.DatetimeIndex([], tz="UTC", name="Date").as_unit("ns"),
+    )
+
+
+def normalize_frame(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Coerce a downloaded frame to the store layout.
+
+    Flat ``COLUMNS`` of floats, a sorted, de-duplicated UTC ``DatetimeIndex``
+    and no all-NaN price rows.
+    """
+
+    if df is None or df.empty:
+        return empty_frame()
+    if isinstance(df.columns, pd.MultiIndex):
+        # single-ticker yfinance frames come back as (Price, Ticker)
+        for lvl in range(df.columns.nlevels):
+            if set(COLUMNS) & set(df.columns.get_level_values(lvl)):
+                df = df.droplevel([i for i in range(df.columns.nlevels) if i != lvl], axis=1)
+                break
+    out = df.reindex(columns=list(COLUMNS)).astype(float)
+    idx = pd.DatetimeIndex(pd.to_datetime(out.index))
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    out.index = idx.as_unit("ns").rename("Date")
+    out = out.dropna(how="all", subset=["Open", "High", "Low", "Close"])
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index()
+
+
+def split_frame(df: pd.DataFrame | None, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """Split a (possibly multi-ticker) download into one frame per symbol."""
+
+    if df is None or df.empty:
+        return {}
+    if isinstance(df.columns, pd.MultiIndex):
+        for lvl in range(df.columns.nlevels):
+            names = set(df.columns.get_level_values(lvl))
+            if names & set(symbols):
+                return {
+                    sym: df.xs(sym, axis=1, level=lvl)
+                    for sym in symbols
+                    if sym in names
+                }
+    if len(symbols) == 1:
+        return {symbols[0]: df}
+    return {}
+
+
+def yfinance_fetcher(
+    symbols: List[str],
+    interval: str,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> Dict[str, pd.DataFrame]:
+    """Default fetcher: one ``yf.download`` call for all ``symbols``."""
+
+    kwargs = {
+        "interval": interval,
+        "auto_adjust": False,
+        "progress": False,
+        "threads": True,
+        "group_by": "ticker",
+    }
+    if start is None:
+        kwargs["period"] = "max"
+    else:
+        kwargs["start"] = start.to_pydatetime()
+    if end is not None:
+        kwargs["end"] = end.to_pydatetime()
+    tickers = symbols[0] if len(symbols) == 1 else symbols
+    return split_frame(yf.download(tickers, **kwargs), symbols)
+
+
+def adjust_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """Return OHLC scaled by ``Adj Close / Close`` (what ``auto_adjust=True`` gives)."""
+
+    out = df.copy()
+    if "Adj Close" not in out or out["Adj Close"].isna().all():
+        return out.drop(columns=["Adj Close"], errors="ignore")
+    ratio = (out["Adj Close"] / out["Close"]).fillna(1.0)
+    for col in ("Open", "High", "Low", "Close"):
+        out[col] = out[col] * ratio
+    return out.drop(columns=["Adj Close"])
+
+
+@dataclass
+class _Entry:
+    frame: pd.DataFrame
+    start: pd.Timestamp | None  # earliest covered request start (None = full history)
+    end: pd.Timestamp  # bars are complete up to here (exclusive)
+    fetched_at: float  # epoch seconds of the last open-ended (up to now) fetch
+
+
+class BarStore:
+    """Per-``(symbol, interval)`` OHLCV cache backed by columnar files."""
+
+    def __init__(
+        self,
+        root: Path | str | None = DEFAULT_ROOT,
+        fetcher: Fetcher | None = None,
+        persist: bool = True,
+    ) -> None:
+        self.root = Path(root) if root is not None else None
+        self.fetcher: Fetcher = fetcher or yfinance_fetcher
+        self.persist = persist and self.root is not None
+        self._entries: Dict[tuple[str, str], _Entry] = {}
+        self._locks: Dict[tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # -- public API -----------------------------------------------------------
+    def get(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        *,
+        period: str | None = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Return bars for one symbol (an empty frame when nothing is available)."""
+
+        sym = symbol.strip().upper()
+        frame = self.get_many([sym], interval, period=period, start=start, end=end).get(sym)
+        return empty_frame() if frame is None else frame
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        interval: str = "1d",
+        *,
+        period: str | None = None,
+        start=None,
+        end=None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Return bars for several symbols, batching whatever has to be downloaded."""
+
+        syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        iv = _canonical_interval(interval)
+        start_ts, end_ts = self._window(iv, period, start, end)
+        keys = sorted((sym, iv) for sym in syms)
+        locks = [self._lock(key) for key in keys]
+        for lock in locks:
+            lock.acquire()
+        try:
+            now = time.time()
+            plans: Dict[tuple, List[str]] = {}
+            for sym in syms:
+                for window in self._missing(self._entry((sym, iv)), iv, start_ts, end_ts, now):
+                    plans.setdefault(window, []).append(sym)
+            for (fetch_start, fetch_end), batch in plans.items():
+                try:
+                    fetched = self.fetcher(batch, iv, fetch_start, fetch_end)
+                except Exception:
+                    logging.exception("Bar fetch failed for %s (%s)", ",".join(batch), iv)
+                    continue
+                for sym in batch:
+                    self._merge((sym, iv), fetched.get(sym), fetch_start, fetch_end, now)
+            out: Dict[str, pd.DataFrame] = {}
+            for sym in syms:
+                entry = self._entries.get((sym, iv))
+                if entry is not None and len(entry.frame):
+                    out[sym] = self._slice(entry.frame, start_ts, end_ts)
+            return out
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def invalidate(self, symbol: str | None = None, interval: str | None = None) -> None:
+        """Forget cached bars (memory and disk) for matching keys."""
+
+        iv = _canonical_interval(interval) if interval else None
+        sym = symbol.strip().upper() if symbol else None
+        for key in list(self._entries):
+            if (sym is None or key[0] == sym) and (iv is None or key[1] == iv):
+                self._entries.pop(key, None)
+        if self.persist:
+            pattern = f"{self._file_stem(sym)}.npz" if sym else "*.npz"
+            for path in self.root.glob(f"{iv or '*'}/{pattern}"):
+                path.unlink(missing_ok=True)
+
+    # -- planning -------------------------------------------------------------
+    @staticmethod
+    def _window(interval: str, period, start, end) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        now = pd.Timestamp.now(tz="UTC")
+        start_ts = _to_utc(start)
+        end_ts = _to_utc(end)
+        if start_ts is None and period:
+            offset = _period_offset(period)
+            if offset is not None:
+                start_ts = now - offset
+        limit = _INTRADAY_LIMIT_DAYS.get(interval)
+        if limit is not None:
+            floor = now - pd.Timedelta(days=limit)
+            start_ts = floor if start_ts is None else max(start_ts, floor)
+        elif start_ts is not None:
+            start_ts = start_ts.floor("D")
+        return start_ts, end_ts
+
+    @staticmethod
+    def _missing(entry: _Entry | None, interval: str, start, end, now: float) -> list[tuple]:
+        if entry is None:
+            return [(start, end)]
+        windows = []
+        if entry.start is not None and (start is None or start < entry.start):
+            windows.append((start, entry.start))
+        want_until = end if end is not None else pd.Timestamp(now, unit="s", tz="UTC")
+        if want_until > entry.end:
+            ttl = _INTRADAY_TTL if _is_intraday(interval) else _DAILY_TTL
+            fresh = end is None and now - entry.fetched_at <= ttl
+            if not fresh:
+                tail_start = entry.frame.index[-1] if len(entry.frame) else entry.end
+                windows.append((tail_start, end))
+        return windows
+
+    @staticmethod
+    def _slice(frame: pd.DataFrame, start, end) -> pd.DataFrame:
+        # the index is sorted, so positional slicing beats boolean masks
+        lo = frame.index.searchsorted(start, side="left") if start is not None else 0
+        hi = frame.index.searchsorted(end, side="left") if end is not None else len(frame)
+        return frame.iloc[lo:hi].copy()
+
+    def _merge(self, key, frame, fetch_start, fetch_end, now: float) -> None:
+        new = normalize_frame(frame)
+        covered_until = fetch_end if fetch_end is not None else pd.Timestamp(now, unit="s", tz="UTC")
+        entry = self._entries.get(key)
+        if entry is None:
+            # an empty answer is recorded too, so the TTL (not every caller)
+            # decides when a delisted or mistyped symbol is asked for again
+            entry = _Entry(new, fetch_start, covered_until, now if fetch_end is None else 0.0)
+        else:
+            if not new.empty:
+                old = entry.frame
+                entry.frame = pd.concat([old[~old.index.isin(new.index)], new]).sort_index()
+            if entry.start is not None and (fetch_start is None or fetch_start < entry.start):
+                entry.start = fetch_start
+            entry.end = max(entry.end, covered_until)
+            if fetch_end is None:
+                entry.fetched_at = now
+        self._entries[key] = entry
+        self._save(key, entry)
+
+    # -- persistence ----------------------------------------------------------
+    def _lock(self, key) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _file_stem(symbol: str) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+
+    def _path(self, key) -> Path:
+        sym, iv = key
+        return self.root / iv / f"{self._file_stem(sym)}.npz"
+
+    def _entry(self, key) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None and self.persist:
+            entry = self._load(key)
+            if entry is not None:
+                self._entries[key] = entry
+        return entry
+
+    def _load(self, key) -> _Entry | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            with np.load(path) as data:
+                idx = pd.DatetimeIndex(data["time"].astype("datetime64[ns]"), name="Date").tz_localize("UTC")
+                frame = pd.DataFrame(
+                    {col: data[fk] for col, fk in zip(COLUMNS, _FILE_KEYS)}, index=idx
+                )
+                start = int(data["start"])
+                return _Entry(
+                    frame,
+                    None if start == _NO_START else pd.Timestamp(start, tz="UTC"),
+                    pd.Timestamp(int(data["end"]), tz="UTC"),
+                    float(data["fetched_at"]),
+                )
+        except Exception:
+            logging.exception("Ignoring unreadable bar file %s", path)
+            return None
+
+    def _save(self, key, entry: _Entry) -> None:
+        if not self.persist:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as fh:
+                np.savez(
+                    fh,
+                    time=entry.frame.index.as_unit("ns").asi8,
+                    start=np.int64(_NO_START if entry.start is None else entry.start.value),
+                    end=np.int64(entry.end.value),
+                    fetched_at=np.float64(entry.fetched_at),
+                    **{fk: entry.frame[col].to_numpy() for col, fk in zip(COLUMNS, _FILE_KEYS)},
+                )
+            os.replace(tmp, path)
+        except OSError:
+            logging.exception("Could not persist bars to %s", path)
+
+
+_default_store = BarStore()
+
+
+def default_store() -> BarStore:
+    return _default_store
+
+
+def set_default_store(store: BarStore) -> None:
+    global _default_store
+    _default_store = store
+
+
+def set_fetcher(fetcher: Fetcher | None) -> None:
+    """Swap the default store's fetcher (``None`` restores yfinance)."""
+
+    _default_store.fetcher = fetcher or yfinance_fetcher
+
+
+def get_bars(symbol: str, interval: str = "1d", **window) -> pd.DataFrame:
+    """Shortcut for ``default_store().get(...)``."""
+
+    return _default_store.get(symbol, interval, **window)
+
+
+def get_bars_many(symbols: Iterable[str], interval: str = "1d", **window) -> Dict[str, pd.DataFrame]:
+    """Shortcut for ``default_store().get_many(...)``."""
+
+    return _default_store.get_many(symbols, interval, **window)
+
+
+__all__ = [
+    "BarStore",
+    "COLUMNS",
+    "adjust_prices",
+    "default_store",
+    "empty_frame",
+    "get_bars",
+    "get_bars_many",
+    "normalize_frame",
+    "set_default_store",
+    "set_fetcher",
+    "split_frame",
+    "yfinance_fetcher",
+]
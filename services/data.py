@@ -38,12 +38,15 @@ def _timeframe_to_interval(timeframe: str) -> str:
     return "1d"
 
 
-def get_candles(symbol: str, timeframe: str, lookback: int) -> List[Dict[str, float]]:
+def get_candles(
+    symbol: str, timeframe: str, lookback: int, period: str = "max"
+) -> List[Dict[str, float]]:
     """Return candle data for ``symbol`` and ``timeframe``.
 
     Tries to read from ``data/{symbol}_{timeframe}.csv`` with columns
     ``time,o,h,l,c``. If the file is missing or does not contain enough rows,
-    data is fetched from Yahoo Finance using :mod:`yfinance`.
+    data is fetched from Yahoo Finance using :mod:`yfinance`; ``period`` caps
+    that download when only recent bars are needed.
     """
     fname = Path(__file__).resolve().parent.parent / "data" / f"{symbol}_{timeframe}.csv"
     candles: List[Dict[str, float]] = []
@@ -73,7 +76,7 @@ def get_candles(symbol: str, timeframe: str, lookback: int) -> List[Dict[str, fl
         try:
             interval = _timeframe_to_interval(timeframe)
             ticker = yf.Ticker(symbol)
-            hist = ticker.history(interval=interval, period="max")
+            hist = ticker.history(interval=interval, period=period)
             if not hist.empty:
                 hist = hist.tail(lookback).reset_index()
                 candles = []
@@ -0,0 +1,361 @@
+"""Local store for Quiver event feeds (congress, lobbying, whales, risk).
+
+Records live in one SQLite table indexed by ``(feed, symbol, date)``.  A
+sync downloads the live feed once and upserts it: each row is keyed by the
+event's identity (feed, symbol, date and the feed's natural key fields such
+as representative/transaction/range), so a record whose prices or scores
+changed since the last sync replaces its payload instead of being counted
+twice, and history keeps accumulating past the window the live endpoints
+return.  Readers trigger a
+sync when a feed is older than ``EVENT_SYNC_SECONDS`` (concurrent readers
+wait for the one download in flight) and then answer per-symbol counts,
+date ranges and latest scores from the indexes.  With
+``EVENT_STORE_OFFLINE=1`` nothing is downloaded and everything is served
+from the local file.
+
+The download goes through a pluggable *fetcher* so tests (or an offline
+deployment) can serve records from a fixture::
+
+    store = EventStore(":memory:", fetcher=lambda feed, token=None: records[feed])
+    store.counts("congress", ["AAPL", "MSFT"], days=30)
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from backend.app.upstream import upstream
+
+FEEDS = {
+    "congress": "https://api.quiverquant.com/beta/live/congresstrading",
+    "lobbying": "https://api.quiverquant.com/beta/live/lobbying",
+    "whales": "https://api.quiverquant.com/beta/live/whalemoves",
+    "risk": "https://api.quiverquant.com/beta/live/riskfactors",
+}
+
+DEFAULT_PATH = Path(
+    os.getenv("EVENT_STORE_PATH", Path(__file__).resolve().parent.parent / "data" / "events.sqlite3")
+)
+EVENT_SYNC_SECONDS = int(os.getenv("EVENT_SYNC_SECONDS", "900"))
+EVENT_STORE_OFFLINE = os.getenv("EVENT_STORE_OFFLINE", "0") == "1"
+
+# fetcher(feed, api_token) -> raw records of the live feed
+Fetcher = Callable[[str, Optional[str]], List[dict]]
+
+_SYMBOL_KEYS = ("Ticker", "ticker", "Symbol", "symbol")
+_DATE_KEYS = ("Date", "TransactionDate", "TradeDate", "date", "ReportDate", "Filed")
+_SCORE_KEYS = ("RiskScore", "Score")
+# fields that identify one event besides its symbol and date; anything else
+# (prices, excess returns, updated scores) may change between syncs
+_IDENTITY_KEYS = {
+    "congress": ("Representative", "Name", "House", "Transaction", "Type", "Range", "Amount"),
+    "lobbying": ("Client", "Registrant", "Issue", "Amount"),
+    "whales": ("Fund", "Holder", "Name", "Action", "action", "Type", "Shares", "shares"),
+    "risk": (),
+}
+_SCHEMA_VERSION = 1  # 1: identity keys (0 keyed rows on their whole payload)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT NOT NULL UNIQUE,
+    feed TEXT NOT NULL,
+    symbol TEXT,
+    date TEXT,
+    score REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_feed_symbol_date ON events (feed, symbol, date);
+CREATE INDEX IF NOT EXISTS events_feed_date ON events (feed, date);
+CREATE TABLE IF NOT EXISTS syncs (
+    feed TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    fetched INTEGER NOT NULL,
+    added INTEGER NOT NULL
+);
+"""
+
+
+def quiver_fetcher(feed: str, api_token: Optional[str] = None) -> List[dict]:
+    """Download the live Quiver ``feed`` through the pooled upstream client."""
+
+    token = api_token or os.getenv("QUIVER_API_KEY")
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    resp = upstream.get(FEEDS[feed], headers=headers, timeout=10)
+    resp.raise_for_status()
+    data = resp.json()
+    if isinstance(data, dict):
+        data = data.get("data", data)
+    return data if isinstance(data, list) else []
+
+
+def _first(record: dict, keys: Iterable[str]):
+    return next((record[k] for k in keys if record.get(k) not in (None, "")), None)
+
+
+def _iso_day(value) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _row(feed: str, record: dict) -> tuple:
+    payload = json.dumps(record, sort_keys=True, default=str)
+    symbol = _first(record, _SYMBOL_KEYS)
+    symbol = str(symbol).strip().upper() if symbol is not None else None
+    day = _iso_day(_first(record, _DATE_KEYS))
+    score = _first(record, _SCORE_KEYS)
+    try:
+        score = float(score) if score is not None else None
+    except (TypeError, ValueError):
+        score = None
+    identity = [feed, symbol, day] + [record.get(k) for k in _IDENTITY_KEYS.get(feed, ())]
+    return (
+        hashlib.sha1(json.dumps(identity, default=str).encode()).hexdigest(),
+        feed,
+        symbol,
+        day,
+        score,
+        payload,
+    )
+
+
+_UPSERT = (
+    "INSERT INTO events (id, feed, symbol, date, score, payload) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET score = excluded.score, payload = excluded.payload"
+)
+
+
+def _day(value) -> Optional[str]:
+    return None if value is None else _iso_day(value.isoformat() if hasattr(value, "isoformat") else value)
+
+
+class EventStore:
+    """SQLite-backed Quiver records with incremental, rate-limited sync."""
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_PATH,
+        fetcher: Fetcher | None = None,
+        *,
+        sync_seconds: float = EVENT_SYNC_SECONDS,
+        offline: bool = EVENT_STORE_OFFLINE,
+    ) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.fetcher: Fetcher = fetcher or quiver_fetcher
+        self.sync_seconds = sync_seconds
+        self.offline = offline
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        self._db_lock = threading.Lock()
+        self._sync_locks = {feed: threading.Lock() for feed in FEEDS}
+        self._attempted: Dict[str, float] = {}  # failed syncs wait out the interval too
+
+    def _migrate(self) -> None:
+        """Re-key rows written under an older id scheme (later payloads win)."""
+
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        with self._db:
+            rows = self._db.execute("SELECT feed, payload FROM events ORDER BY rowid").fetchall()
+            self._db.execute("DELETE FROM events")
+            self._db.executemany(_UPSERT, [_row(feed, json.loads(payload)) for feed, payload in rows])
+            self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    # -- sync -----------------------------------------------------------------
+    def _execute(self, sql: str, params: Iterable = ()) -> list[tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, tuple(params)).fetchall()
+
+    def synced_at(self, feed: str) -> Optional[float]:
+        rows = self._execute("SELECT synced_at FROM syncs WHERE feed = ?", (feed,))
+        return rows[0][0] if rows else None
+
+    def sync(self, feed: str, *, api_token: Optional[str] = None) -> int:
+        """Download ``feed`` now and upsert its records; returns how many events are new."""
+
+        if feed not in FEEDS:
+            raise ValueError(f"unknown feed {feed!r}")
+        records = [r for r in self.fetcher(feed, api_token) if isinstance(r, dict)]
+        rows = [_row(feed, r) for r in records]
+        count = "SELECT COUNT(*) FROM events WHERE feed = ?"
+        with self._db_lock, self._db:
+            before = self._db.execute(count, (feed,)).fetchone()[0]
+            self._db.executemany(_UPSERT, rows)
+            added = self._db.execute(count, (feed,)).fetchone()[0] - before
+            self._db.execute(
+                "INSERT OR REPLACE INTO syncs (feed, synced_at, fetched, added) VALUES (?, ?, ?, ?)",
+                (feed, time.time(), len(rows), added),
+            )
+        return added
+
+    def ensure(self, feed: str, *, api_token: Optional[str] = None) -> None:
+        """Sync ``feed`` if it is stale; failures are logged and the stored records served."""
+
+        if self.offline:
+            return
+        with self._sync_locks[feed]:
+            last = max(self.synced_at(feed) or 0.0, self._attempted.get(feed, 0.0))
+            if time.time() - last < self.sync_seconds:
+                return
+            self._attempted[feed] = time.time()
+            try:
+                self.sync(feed, api_token=api_token)
+            except Exception:
+                logging.exception("Event sync failed for %s", feed)
+
+    def sync_all(self) -> Dict[str, int]:
+        """Sync every feed now; feeds that fail report -1."""
+
+        out = {}
+        for feed in FEEDS:
+            try:
+                out[feed] = self.sync(feed)
+            except Exception:
+                logging.exception("Event sync failed for %s", feed)
+                out[feed] = -1
+        return out
+
+    # -- queries --------------------------------------------------------------
+    @staticmethod
+    def _where(feed: str, symbols, start, end) -> tuple[str, list]:
+        clauses, params = ["feed = ?"], [feed]
+        if symbols is not None:
+            symbols = [str(s).strip().upper() for s in symbols]
+            clauses.append(f"symbol IN ({','.join('?' * len(symbols))})")
+            params += symbols
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_day(start))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(_day(end))
+        return " AND ".join(clauses), params
+
+    def records(
+        self,
+        feed: str,
+        symbols: Iterable[str] | None = None,
+        start=None,
+        end=None,
+        *,
+        limit: int | None = None,
+        api_token: Optional[str] = None,
+    ) -> List[dict]:
+        """Stored records of ``feed``, newest date first (ties in feed order)."""
+
+        symbols = None if symbols is None else list(symbols)
+        if symbols == []:
+            return []
+        self.ensure(feed, api_token=api_token)
+        where, params = self._where(feed, symbols, start, end)
+        sql = f"SELECT payload FROM events WHERE {where} ORDER BY date DESC, rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [json.loads(p) for (p,) in self._execute(sql, params)]
+
+    def counts(self, feed: str, symbols: Iterable[str], *, days: int | None = None, start=None, end=None) -> Dict[str, int]:
+        """Records per symbol (only symbols that have any), optionally over the last ``days``."""
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        self.ensure(feed)
+        if days is not None:
+            start = datetime.date.today() - datetime.timedelta(days=days)
+        where, params = self._where(feed, symbols, start, end)
+        rows = self._execute(f"SELECT symbol, COUNT(*) FROM events WHERE {where} GROUP BY symbol", params)
+        found = dict(rows)
+        return {s: found[s.strip().upper()] for s in symbols if s.strip().upper() in found}
+
+    def latest_scores(self, feed: str, symbols: Iterable[str]) -> Dict[str, float]:
+        """The ``score`` of each symbol's latest event (by date, then by when it was first stored)."""
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        self.ensure(feed)
+        where, params = self._where(feed, symbols, None, None)
+        rows = self._execute(
+            f"SELECT symbol, score FROM (SELECT symbol, score, ROW_NUMBER() OVER "
+            f"(PARTITION BY symbol ORDER BY date DESC, rowid DESC) AS n "
+            f"FROM events WHERE {where} AND score IS NOT NULL) WHERE n = 1",
+            params,
+        )
+        found = dict(rows)
+        return {s: found[s.strip().upper()] for s in symbols if s.strip().upper() in found}
+
+    def stats(self) -> dict:
+        rows = self._execute("SELECT feed, COUNT(*), MIN(date), MAX(date) FROM events GROUP BY feed")
+        syncs = {feed: (at, fetched, added) for feed, at, fetched, added in
+                 self._execute("SELECT feed, synced_at, fetched, added FROM syncs")}
+        out = {}
+        for feed in FEEDS:
+            row = next((r for r in rows if r[0] == feed), (feed, 0, None, None))
+            at, fetched, added = syncs.get(feed, (None, 0, 0))
+            out[feed] = {"records": row[1], "first": row[2], "last": row[3], "synced_at": at,
+                         "last_fetched": fetched, "last_added": added}
+        return {"offline": self.offline, "feeds": out}
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
+
+
+_default_store: EventStore | None = None
+_default_guard = threading.Lock()
+
+
+def default_store() -> EventStore:
+    """The process-wide store (opened on first use)."""
+
+    global _default_store
+    with _default_guard:
+        if _default_store is None:
+            _default_store = EventStore()
+        return _default_store
+
+
+def set_default_store(store: EventStore | None) -> None:
+    global _default_store
+    _default_store = store
+
+
+def set_fetcher(fetcher: Fetcher | None) -> None:
+    """Swap the default store's fetcher (``None`` restores the Quiver download)."""
+
+    default_store().fetcher = fetcher or quiver_fetcher
+
+
+def sync_all() -> Dict[str, int]:
+    """Sync every feed of the default store (the scheduler job)."""
+
+    return default_store().sync_all()
+
+
+__all__ = [
+    "EVENT_SYNC_SECONDS",
+    "EventStore",
+    "FEEDS",
+    "default_store",
+    "quiver_fetcher",
+    "set_default_store",
+    "set_fetcher",
+    "sync_all",
+]
@@ -1,2 +1,21 @@
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+# no background ranking refreshes racing the tests
+os.environ.setdefault("RANKINGS_BACKGROUND", "0")
+
+import pytest
+
+from services import bar_store, event_store
+
+
+@pytest.fixture(autouse=True)
+def _isolated_bar_store(tmp_path, monkeypatch):
+    """Give every test an empty bar store so cached bars never leak between tests."""
+    monkeypatch.setattr(bar_store, "_default_store", bar_store.BarStore(root=tmp_path / "bars"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_event_store(monkeypatch):
+    """Keep Quiver records in memory and never download them (tests opt in with ``set_fetcher``)."""
+    store = event_store.EventStore(":memory:", fetcher=lambda feed, token=None: [])
+    monkeypatch.setattr(event_store, "_default_store", store)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app import app
+from backend.app import backtest
+from services import bar_store
+
+
+def _closes(n, seed):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.015, n)))
+
+
+def _reference(close: pd.Series) -> dict:
+    """The original single-symbol pandas backtest, used as the parity oracle."""
+    df = pd.DataFrame({"Close": close})
+    df["sma_20"] = df["Close"].rolling(20).mean()
+    df["sma_50"] = df["Close"].rolling(50).mean()
+    df["signal"] = 0
+    df.loc[df["sma_20"] > df["sma_50"], "signal"] = 1
+    df.loc[df["sma_20"] < df["sma_50"], "signal"] = -1
+    df["position"] = df["signal"].shift(1).fillna(0)
+    df["strategy_return"] = df["position"] * df["Close"].pct_change().fillna(0)
+    df["equity"] = (1 + df["strategy_return"]).cumprod()
+    trades, prev = [], 0.0
+    for date, row in df.iterrows():
+        if row["signal"] != prev and row["signal"] != 0:
+            trades.append({"date": date.strftime("%Y-%m-%d"),
+                           "action": "buy" if row["signal"] == 1 else "sell",
+                           "price": float(row["Close"])})
+        prev = row["signal"]
+    return {"metrics": backtest._performance_metrics(df), "trades": trades}
+
+
+def test_engine_matches_per_symbol_loop_for_ragged_columns():
+    idx = pd.bdate_range("2018-01-01", periods=900)
+    columns = {f"S{i}": pd.Series(_closes(900 - 150 * i, i), index=idx[150 * i:]) for i in range(4)}
+    prices = pd.DataFrame(columns)
+
+    result = backtest.run_backtest(prices, backtest.sma_crossover_signals(prices))
+    metrics, trades = result.metrics(), result.trades()
+    for sym, close in columns.items():
+        ref = _reference(close)
+        assert metrics[sym] == ref["metrics"], sym
+        assert trades[sym] == ref["trades"], sym
+    assert result.trade_counts() == {sym: len(t) for sym, t in trades.items()}
+
+
+def test_signals_skip_rows_from_other_calendars():
+    idx = pd.date_range("2021-01-01", periods=500, freq="D")
+    crypto = pd.Series(_closes(500, 9), index=idx)
+    stock = crypto[idx.dayofweek < 5]
+    mixed = backtest.sma_crossover_signals(pd.DataFrame({"C": crypto, "S": stock}))
+    alone = backtest.sma_crossover_signals(stock.to_frame("S"))
+    assert np.array_equal(mixed[idx.dayofweek < 5, 1], alone[:, 0])
+    # weekend rows hold Friday's signal, so Monday's position is Friday's signal
+    assert np.array_equal(mixed[idx.dayofweek == 5, 1], mixed[idx.dayofweek == 4, 1][: (idx.dayofweek == 5).sum()])
+
+
+def test_universe_endpoint_backtests_watchlist_from_one_read():
+    idx = pd.bdate_range("2020-01-01", periods=600)
+    calls = []
+
+    def fetcher(symbols, interval, start, end):
+        calls.append(tuple(symbols))
+        return {
+            s: pd.DataFrame({"Open": c, "High": c, "Low": c, "Close": c, "Volume": 1e6}, index=idx)
+            for i, s in enumerate(symbols) if s != "GONE"
+            for c in [_closes(len(idx), i)]
+        }
+
+    bar_store.set_fetcher(fetcher)
+    client = TestClient(app)
+    res = client.post("/api/backtest", json={
+        "symbols": "aaa,BBB,GONE", "start": "2020-01-01", "end": "2022-06-30", "include_trades": True,
+    })
+    assert res.status_code == 200
+    body = res.json()
+    assert calls == [("AAA", "BBB", "GONE")]
+    assert body["symbols"]["GONE"] == {"error": "no_data"}
+    single = backtest.sma_crossover_backtest("AAA", start="2020-01-01", end="2022-06-30")
+    assert body["symbols"]["AAA"]["metrics"] == single["metrics"]
+    assert body["symbols"]["AAA"]["trade_list"] == single["trades"]
+    assert set(body["portfolio"]["metrics"]) == {"total_return", "cagr", "max_drawdown", "sharpe"}
+
+    assert client.post("/api/backtest", json={"symbols": ["AAA"], "fast": 50, "slow": 20}).status_code == 400
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.bar_store import BarStore, adjust_prices
+
+
+def _daily(start="2024-01-01", periods=300, seed=3):
+    idx = pd.date_range(start, periods=periods, freq="D")
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame(
+        {
+            "Open": close - 0.5,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Adj Close": close * 0.5,
+            "Volume": np.full(periods, 1_000.0),
+        },
+        index=idx,
+    )
+
+
+class FixtureFetcher:
+    """Serve bars from a local frame and record every requested window."""
+
+    def __init__(self, frame, delay=0.0):
+        self.frame = frame
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, symbols, interval, start, end):
+        self.calls.append((tuple(symbols), interval, start, end))
+        time.sleep(self.delay)
+        df = self.frame.copy()
+        df.index = df.index.tz_localize("UTC")
+        if start is not None:
+            df = df[df.index >= start]
+        if end is not None:
+            df = df[df.index < end]
+        return {sym: df for sym in symbols}
+
+
+def test_bar_store_fetches_only_missing_ranges(tmp_path):
+    fetcher = FixtureFetcher(_daily())
+    store = BarStore(root=tmp_path, fetcher=fetcher)
+
+    first = store.get("spy", "1d", start="2024-03-01", end="2024-04-01")
+    assert len(first) == 31
+    assert first.index[0] == pd.Timestamp("2024-03-01", tz="UTC")
+
+    # a window inside the covered range is served from the store
+    inner = store.get("SPY", "1d", start="2024-03-10", end="2024-03-20")
+    assert len(inner) == 10
+    assert len(fetcher.calls) == 1
+
+    # extending backwards only downloads the missing head
+    wider = store.get("SPY", "1d", start="2024-02-01", end="2024-04-01")
+    assert len(wider) == 60
+    assert fetcher.calls[-1][2:] == (
+        pd.Timestamp("2024-02-01", tz="UTC"),
+        pd.Timestamp("2024-03-01", tz="UTC"),
+    )
+
+    # a fresh store over the same directory reads the columnar file back
+    reloaded = BarStore(root=tmp_path, fetcher=FixtureFetcher(_daily()))
+    again = reloaded.get("SPY", "1d", start="2024-02-01", end="2024-04-01")
+    pd.testing.assert_frame_equal(again, wider)
+    assert reloaded.fetcher.calls == []
+
+
+def test_bar_store_batches_symbols_and_shares_inflight_fetches(tmp_path):
+    fetcher = FixtureFetcher(_daily(), delay=0.1)
+    store = BarStore(root=tmp_path, fetcher=fetcher, persist=False)
+
+    frames = store.get_many(["AAA", "BBB", "AAA"], "1d", start="2024-01-01", end="2024-02-01")
+    assert set(frames) == {"AAA", "BBB"}
+    assert fetcher.calls == [
+        (("AAA", "BBB"), "1d", pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-02-01", tz="UTC"))
+    ]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.get("CCC", "1d", start="2024-01-01", end="2024-02-01")))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 4 and all(len(r) == 31 for r in results)
+    assert sum(1 for call in fetcher.calls if call[0] == ("CCC",)) == 1
+
+
+def test_bar_store_remembers_symbols_without_data(tmp_path):
+    calls = []
+
+    def fetcher(symbols, interval, start, end):
+        calls.append(tuple(symbols))
+        return {}
+
+    store = BarStore(root=tmp_path, fetcher=fetcher)
+    assert store.get("NOPE", "1d", period="1y").empty
+    assert store.get("NOPE", "1d", period="6mo").empty
+    assert store.get_many(["NOPE"], "1d", period="1y") == {}
+    assert calls == [("NOPE",)]
+
+    reloaded = BarStore(root=tmp_path, fetcher=fetcher)
+    assert reloaded.get("NOPE", "1d", period="1y").empty
+    assert calls == [("NOPE",)]
+
+
+def test_adjust_prices_scales_ohlc():
+    df = adjust_prices(_daily(periods=5).tz_localize("UTC"))
+    assert "Adj Close" not in df
+    raw = _daily(periods=5)
+    np.testing.assert_allclose(df["Close"].to_numpy(), raw["Adj Close"].to_numpy())
+    np.testing.assert_allclose(df["High"].to_numpy(), raw["High"].to_numpy() * 0.5)
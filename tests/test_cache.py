@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.app.cache import TTLCache, cache_stats, cached
+
+
+def test_entries_expire_individually_and_lru_evicts():
+    cache = TTLCache(maxsize=2, ttl=0.2, name="test-expiry")
+    cache.set("a", 1)
+    time.sleep(0.12)
+    cache.set("b", 2)
+    time.sleep(0.12)
+    # "a" is past its own TTL, "b" is not
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.set("c", 3)
+    cache.set("d", 4)  # evicts the least recently used ("b")
+    assert "b" not in cache and cache["d"] == 4
+    stats = cache_stats()["test-expiry"]
+    assert stats["expirations"] == 1 and stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_disabled_cache_never_stores():
+    cache = TTLCache(ttl=0, name="test-disabled")
+    cache["k"] = 1
+    assert cache.get("k") is None and len(cache) == 0
+
+
+def test_concurrent_misses_run_one_computation():
+    cache = TTLCache(ttl=60, name="test-flight")
+    runs = []
+
+    def compute():
+        runs.append(1)
+        time.sleep(0.1)
+        return "v"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["v"] * 20 and len(runs) == 1
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_async_single_flight_and_errors_are_not_cached():
+    cache = TTLCache(ttl=60, name="test-async")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return len(runs)
+
+    async def boom():
+        raise RuntimeError("upstream down")
+
+    async def main():
+        values = await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(10)))
+        with pytest.raises(RuntimeError):
+            await cache.aget_or_compute("bad", boom)
+        return values
+
+    assert asyncio.run(main()) == [1] * 10
+    assert "bad" not in cache
+
+
+def test_cached_decorator_keys_on_arguments():
+    calls = []
+
+    @cached(60, name="test-decorator")
+    def square(x, scale=1):
+        calls.append(x)
+        return x * x * scale
+
+    assert square(3) == 9 and square(3) == 9 and square(3, scale=2) == 18
+    assert calls == [3, 3]
+    square.cache_clear()
+    assert square(3) == 9 and calls == [3, 3, 3]
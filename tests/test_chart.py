@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from backend.app.chart import CandleArrays, chart_payload
+from indicators import common, haco_ha, hacolt
+
+
+def _history(n=240, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    idx = pd.date_range("2024-01-01", periods=n, freq="h", tz="America/New_York")
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.003, n)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1_000, 5_000, n).astype(float),
+        },
+        index=idx,
+    )
+
+
+def test_candle_arrays_match_row_conversion():
+    history = _history()
+    history.iloc[5, history.columns.get_loc("Volume")] = np.nan
+    candles = CandleArrays.from_frame(history)
+    records = candles.records()
+
+    assert len(records) == len(history)
+    first = history.iloc[0]
+    assert records[0] == {
+        "time": int(history.index[0].timestamp()),
+        "o": float(first["Open"]),
+        "h": float(first["High"]),
+        "l": float(first["Low"]),
+        "c": float(first["Close"]),
+        "v": float(first["Volume"]),
+    }
+    assert records[5]["v"] == 0.0  # NaN -> 0 like _scalar()
+    assert all(isinstance(r["time"], int) for r in records)
+
+
+def test_chart_payload_matches_list_helpers():
+    candles = CandleArrays.from_frame(_history())
+    records = candles.records()
+    core = [{k: r[k] for k in "ohlc"} for r in records]
+    trend = hacolt.compute_trend_arrays(candles.o, candles.h, candles.l, candles.c, 34)
+    chart = chart_payload(candles, trend)
+
+    ha = haco_ha.project(core)
+    assert chart["heikin_ashi"] == [
+        {"time": r["time"], **{k: round(bar[k], 4) for k in "ohlc"}} for r, bar in zip(records, ha)
+    ]
+    sma20 = common.sma([r["c"] for r in records], 20)
+    assert [p["time"] for p in chart["indicators"]["sma20"]] == [
+        r["time"] for r, v in zip(records, sma20) if v is not None
+    ]
+    np.testing.assert_allclose(
+        [p["value"] for p in chart["indicators"]["sma20"]],
+        [round(v, 4) for v in sma20 if v is not None],
+        atol=1e-4,
+    )
+    ref_trend = hacolt.compute_trend(core, 34)
+    np.testing.assert_allclose([p["value"] for p in chart["indicators"]["trend"]], ref_trend, atol=1e-4)
+    assert [p["value"] for p in chart["haco"]] == [
+        100 if b["c"] > b["o"] else 0 if b["c"] < b["o"] else 50 for b in ha
+    ]
+    assert chart["hacolt"][0]["value"] == 50
+    assert [p["value"] for p in chart["hacolt"][1:]] == [
+        100 if b >= a else 0 for a, b in zip(ref_trend, ref_trend[1:])
+    ]
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from api.concurrency import BlockingExecutor, RouteGuard
+
+
+def test_route_guard_limits_concurrency_and_reports_queue_depth():
+    pool = BlockingExecutor(max_workers=4)
+    guard = RouteGuard("test", limit=2, timeout=5.0, pool=pool)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(*(guard.call(work) for _ in range(6)))
+
+    assert asyncio.run(main()) == ["ok"] * 6
+    assert peak[0] == 2
+    stats = guard.stats()
+    assert stats["calls"] == 6 and stats["in_flight"] == 0 and stats["timeouts"] == 0
+    assert pool.stats()["completed"] == 6 and pool.stats()["queue_depth"] == 0
+
+
+def test_route_guard_times_out_slow_upstreams():
+    guard = RouteGuard("slow", limit=1, timeout=0.05, pool=BlockingExecutor(max_workers=1))
+
+    async def main():
+        with pytest.raises(HTTPException) as exc:
+            await guard.call(time.sleep, 0.3)
+        return exc.value
+
+    err = asyncio.run(main())
+    assert err.status_code == 504 and err.detail == "slow_timeout"
+    assert guard.stats()["timeouts"] == 1
+
+
+def test_route_guard_holds_slot_until_timed_out_work_finishes():
+    pool = BlockingExecutor(max_workers=4)
+    guard = RouteGuard("hung", limit=1, timeout=0.05, pool=pool)
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(HTTPException):
+            await guard.call(release.wait, 5)
+        # the hung call still owns the only slot, so the next one times out waiting
+        assert guard.stats()["in_flight"] == 1
+        with pytest.raises(HTTPException):
+            await guard.call(lambda: "ok")
+        assert pool.stats()["active"] == 1
+        release.set()
+        for _ in range(100):
+            if guard.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        return await guard.call(lambda: "ok")
+
+    assert asyncio.run(main()) == "ok"
+    assert guard.stats()["timeouts"] == 2
@@ -0,0 +1,131 @@
+import datetime
+import json
+import sqlite3
+
+import backend.app.signals as signals
+from services import event_store
+from services.event_store import EventStore
+
+
+def _fixture_fetcher(data, calls=None):
+    def fetch(feed, token=None):
+        if calls is not None:
+            calls.append(feed)
+        return list(data.get(feed, []))
+    return fetch
+
+
+def _days_ago(n):
+    return (datetime.date.today() - datetime.timedelta(days=n)).isoformat()
+
+
+def test_sync_is_incremental(tmp_path):
+    data = {"congress": [
+        {"Ticker": "AAPL", "TransactionDate": "2024-01-02", "Transaction": "Purchase"},
+        {"Ticker": "MSFT", "TransactionDate": "2024-01-03", "Transaction": "Sale"},
+    ]}
+    store = EventStore(tmp_path / "events.sqlite3", fetcher=_fixture_fetcher(data))
+    assert store.sync("congress") == 2
+    assert store.sync("congress") == 0
+    # the live window moves on: the old record drops out, a new one appears
+    data["congress"] = data["congress"][1:] + [
+        {"Ticker": "AAPL", "TransactionDate": "2024-02-01", "Transaction": "Sale"},
+    ]
+    assert store.sync("congress") == 1
+    store.close()
+
+    reopened = EventStore(tmp_path / "events.sqlite3", fetcher=_fixture_fetcher({}), offline=True)
+    assert [r["TransactionDate"] for r in reopened.records("congress")] == ["2024-02-01", "2024-01-03", "2024-01-02"]
+    assert reopened.stats()["feeds"]["congress"]["records"] == 3
+
+
+def test_resync_updates_changed_fields_instead_of_duplicating():
+    trade = {"Representative": "Jane Doe", "Ticker": "AAPL", "TransactionDate": _days_ago(3),
+             "Transaction": "Purchase", "Range": "$1,001 - $15,000", "ExcessReturn": 1.5}
+    data = {"congress": [trade, dict(trade, Representative="John Roe")],
+            "risk": [{"Ticker": "AAPL", "RiskScore": 0.2}]}
+    store = EventStore(":memory:", fetcher=_fixture_fetcher(data))
+    assert store.sync("congress") == 2 and store.sync("risk") == 1
+    data["congress"] = [dict(trade, ExcessReturn=2.5, Price=190.1)]
+    data["risk"] = [{"Ticker": "AAPL", "RiskScore": 0.9}]
+    assert store.sync("congress") == 0 and store.sync("risk") == 0
+    assert store.counts("congress", ["AAPL"]) == {"AAPL": 2}
+    assert store.records("congress", symbols=["AAPL"])[0]["ExcessReturn"] == 2.5
+    assert store.latest_scores("risk", ["AAPL"]) == {"AAPL": 0.9}
+
+
+def test_payload_keyed_rows_are_rekeyed(tmp_path):
+    path = tmp_path / "events.sqlite3"
+    db = sqlite3.connect(path)
+    db.executescript(event_store._SCHEMA)
+    old = {"Ticker": "AAPL", "TransactionDate": "2024-01-02", "Transaction": "Purchase", "Price": 180.0}
+    new = dict(old, Price=185.0)
+    db.executemany("INSERT INTO events (id, feed, symbol, date, score, payload) VALUES (?, 'congress', 'AAPL', "
+                   "'2024-01-02', NULL, ?)", [(str(i), json.dumps(r)) for i, r in enumerate((old, new))])
+    db.commit()
+    db.close()
+    store = EventStore(path, fetcher=_fixture_fetcher({}), offline=True)
+    assert store.records("congress") == [new]
+
+
+def test_queries_by_symbol_and_date():
+    data = {
+        "congress": [
+            {"Ticker": "AAPL", "TransactionDate": _days_ago(5)},
+            {"Ticker": "aapl", "TransactionDate": _days_ago(20)},
+            {"Ticker": "AAPL", "TransactionDate": _days_ago(200)},
+            {"Ticker": "MSFT", "TransactionDate": _days_ago(1)},
+        ],
+        "risk": [
+            {"Ticker": "AAPL", "RiskScore": 0.4},
+            {"Ticker": "AAPL", "RiskScore": 0.7},
+            {"Ticker": "MSFT", "RiskScore": "n/a"},
+        ],
+    }
+    store = EventStore(":memory:", fetcher=_fixture_fetcher(data))
+    assert store.counts("congress", ["AAPL", "MSFT", "TSLA"]) == {"AAPL": 3, "MSFT": 1}
+    assert store.counts("congress", ["AAPL", "MSFT"], days=30) == {"AAPL": 2, "MSFT": 1}
+    assert store.counts("congress", ["aapl"], start=_days_ago(10)) == {"aapl": 1}
+    assert store.latest_scores("risk", ["AAPL", "MSFT"]) == {"AAPL": 0.7}
+
+    newest = store.records("congress", symbols=["AAPL"], limit=2)
+    assert [r["TransactionDate"] for r in newest] == [_days_ago(5), _days_ago(20)]
+    assert store.records("congress", symbols=[]) == []
+
+
+def test_sync_only_when_stale_and_failures_served_from_store():
+    calls = []
+    data = {"whales": [{"Ticker": "NVDA", "Date": "2024-01-02"}]}
+    store = EventStore(":memory:", fetcher=_fixture_fetcher(data, calls), sync_seconds=3600)
+    store.records("whales")
+    store.records("whales")
+    assert calls == ["whales"]
+
+    def broken(feed, token=None):
+        raise RuntimeError("quiver down")
+
+    store.fetcher = broken
+    store.sync_seconds = 0
+    assert len(store.records("whales")) == 1
+    assert store.sync_all()["whales"] == -1
+
+
+def test_offline_store_never_downloads():
+    calls = []
+    store = EventStore(":memory:", fetcher=_fixture_fetcher({"lobbying": [{"Ticker": "AAPL"}]}, calls), offline=True)
+    assert store.counts("lobbying", ["AAPL"]) == {}
+    assert calls == []
+
+
+def test_signals_read_from_event_store():
+    data = {
+        "congress": [{"Ticker": "AAPL", "TransactionDate": _days_ago(3)}],
+        "lobbying": [{"Ticker": "AAPL", "Date": _days_ago(10)}, {"Ticker": "AAPL", "Date": _days_ago(400)}],
+        "risk": [{"Ticker": "AAPL", "RiskScore": 0.3}],
+        "whales": [{"Ticker": "NVDA", "Date": _days_ago(1)}, {"Ticker": "TSLA", "Date": _days_ago(2)}],
+    }
+    event_store.set_fetcher(_fixture_fetcher(data))
+    assert signals.get_political_moves(["AAPL", "MSFT"]) == {"AAPL": 1}
+    assert signals.get_lobby_disclosures(["AAPL"]) == {"AAPL": 1}
+    assert signals.get_risk_factors(["AAPL"]) == {"AAPL": 0.3}
+    assert [m["Ticker"] for m in signals.get_whale_moves(limit=1)] == ["NVDA"]
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from backend.app.exit_sim import PriceMatrix, simulate_exits
+
+
+def _frames(n_syms=4, n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n_syms):
+        idx = pd.date_range("2024-01-01", periods=n - 10 * i, freq="B", tz="UTC")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx))))
+        frames[f"S{i}"] = pd.DataFrame(
+            {"Open": close, "High": close * 1.015, "Low": close * 0.985, "Close": close}, index=idx
+        )
+    return frames
+
+
+def _reference(frame, entry_date, entry, target, stop, max_hold, intrabar):
+    """Bar-by-bar loop the simulator replaces."""
+    fwd = frame[frame.index.tz_localize(None) >= pd.Timestamp(entry_date)].head(max_hold)
+    if fwd.empty:
+        return None, None, "no_data"
+    for ts, row in fwd.iterrows():
+        hi, lo = (row["High"], row["Low"]) if intrabar else (row["Close"], row["Close"])
+        if lo <= stop:
+            return ts.date(), stop, "stop"
+        if hi >= target:
+            return ts.date(), target, "target"
+    return fwd.index[-1].date(), fwd["Close"].iloc[-1], "time"
+
+
+def test_simulate_exits_matches_bar_loop():
+    frames = _frames()
+    prices = PriceMatrix.from_frames(frames)
+    rng = np.random.default_rng(7)
+    n = 400
+    syms = rng.choice(list(frames) + ["MISSING"], n)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 190, n), unit="D")
+    entry = rng.uniform(80, 120, n)
+    target, stop = entry * 1.05, entry * 0.97
+    holds = rng.integers(1, 40, n)
+
+    for intrabar in (False, True):
+        res = simulate_exits(prices, syms, dates, entry, target, stop, holds, intrabar=intrabar)
+        for i, row in res.iterrows():
+            if syms[i] == "MISSING":
+                assert row["reason"] == "no_data"
+                continue
+            exp_date, exp_price, exp_reason = _reference(
+                frames[syms[i]], dates[i], entry[i], target[i], stop[i], holds[i], intrabar
+            )
+            assert row["reason"] == exp_reason
+            if exp_date is not None:
+                assert row["exit_date"].date() == exp_date
+                assert np.isclose(row["exit_price"], exp_price)
+
+
+def test_calculate_exit_date_uses_vectorized_path():
+    from backend.app import signals
+    from services import bar_store
+
+    idx = pd.date_range("2024-03-01", periods=5, freq="D", tz="UTC")
+    frame = pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": [100, 102, 106, 90, 95]}, index=idx)
+    bar_store.set_fetcher(lambda symbols, interval, start, end: {s: frame for s in symbols})
+
+    exit_date, exit_price = signals._calculate_exit_date("EXT", 100.0, idx[0].date())
+    assert exit_date == idx[2].date() and exit_price == 105.0
+
+
+def test_calculate_exit_date_enforces_time_limit():
+    from backend.app import signals
+    from services import bar_store
+
+    idx = pd.date_range("2024-03-01", periods=60, freq="D", tz="UTC")
+    frame = pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 100.0 + np.arange(60) * 0.01}, index=idx)
+    bar_store.set_fetcher(lambda symbols, interval, start, end: {s: frame for s in symbols})
+
+    exit_date, exit_price = signals._calculate_exit_date("FLAT", 100.0, idx[0].date())
+    last = signals.EXIT_MAX_HOLD_DAYS - 1
+    assert exit_date == idx[last].date() and np.isclose(exit_price, frame["Close"].iloc[last])
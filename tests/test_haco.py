@@ -30,3 +30,222 @@ def test_compute_haco_transitions():
     assert s[4]["dnw"] is True
     assert s[7]["upw"] is True
     assert res["last"]["state"] == 1
+
+
+def _alert(cond, idx, lookback):
+    return any(cond[max(0, idx - lookback) : idx + 1])
+
+
+def _reference_haco(candles, length_up=34, length_down=34, alert_lookback=1):
+    """Bar-by-bar HACO loop the array engine replaced (kept as the parity oracle)."""
+    n = len(candles)
+    o = [x["o"] for x in candles]
+    h = [x["h"] for x in candles]
+    l = [x["l"] for x in candles]
+    c = [x["c"] for x in candles]
+    ha_close_raw = [(o[i] + h[i] + l[i] + c[i]) / 4 for i in range(n)]
+    ha_open = [(o[0] + c[0]) / 2] * n
+    for i in range(1, n):
+        ha_open[i] = (ha_open[i - 1] + ha_close_raw[i - 1]) / 2
+    ha_c = [
+        (ha_close_raw[i] + ha_open[i] + max(h[i], ha_open[i]) + min(l[i], ha_open[i])) / 4
+        for i in range(n)
+    ]
+    mid = [(h[i] + l[i]) / 2 for i in range(n)]
+
+    def zl_dif(length):
+        t1 = tema(ha_c, length)
+        t1c = tema(mid, length)
+        zl_ha = zero_lag_from_tema(t1, tema(t1, length))
+        zl_cl = zero_lag_from_tema(t1c, tema(t1c, length))
+        return [a - b for a, b in zip(zl_cl, zl_ha)]
+
+    dif_u, dif_d = zl_dif(length_up), zl_dif(length_down)
+    up_raw = [ha_c[i] >= ha_open[i] for i in range(n)]
+    dn_raw = [ha_c[i] < ha_open[i] for i in range(n)]
+    out = {k: [None] * n for k in ("keepingU", "keepallU", "utr", "keepingD", "keepallD", "dtr", "upw", "dnw", "state")}
+    for i in range(n):
+        p = max(i - 1, 0)
+        small = h[i] != l[i] and abs(c[i] - o[i]) < (h[i] - l[i]) * 0.35
+        out["keepingU"][i] = (
+            _alert(up_raw, i, alert_lookback)
+            or (c[i] >= ha_c[i] or h[i] > h[p] or l[i] > l[p])
+            or dif_u[i] >= 0
+        )
+        kp = out["keepingU"][p] if i else out["keepingU"][0]
+        out["keepallU"][i] = out["keepingU"][i] or (kp and c[i] >= o[i]) or c[i] >= c[p]
+        ka = out["keepallU"][p] if i else out["keepallU"][0]
+        out["utr"][i] = out["keepallU"][i] or (ka and small and h[i] >= l[p])
+        out["keepingD"][i] = _alert(dn_raw, i, alert_lookback) or dif_d[i] < 0
+        kp = out["keepingD"][p] if i else out["keepingD"][0]
+        out["keepallD"][i] = out["keepingD"][i] or (kp and c[i] < o[i]) or c[i] < c[p]
+        ka = out["keepallD"][p] if i else out["keepallD"][0]
+        out["dtr"][i] = out["keepallD"][i] or (ka and small and l[i] <= h[p])
+        pd_, pu = (out["dtr"][p], out["utr"][p]) if i else (out["dtr"][0], out["utr"][0])
+        out["upw"][i] = (not out["dtr"][i]) and pd_ and out["utr"][i]
+        out["dnw"][i] = (not out["utr"][i]) and pu and out["dtr"][i]
+        prev_state = out["state"][p] if i else (1 if c[0] >= o[0] else 0)
+        out["state"][i] = 1 if out["upw"][i] else 0 if out["dnw"][i] else prev_state
+    out["haOpen"], out["haC"], out["ZlDifU"], out["ZlDifD"] = ha_open, ha_c, dif_u, dif_d
+    return out
+
+
+def _random_candles(n, seed=7):
+    import random
+
+    rnd = random.Random(seed)
+    price = 100.0
+    candles = []
+    for i in range(n):
+        o = price
+        price = max(1.0, price + rnd.gauss(0, 1.5))
+        hi = max(o, price) + abs(rnd.gauss(0, 0.6))
+        lo = min(o, price) - abs(rnd.gauss(0, 0.6))
+        candles.append({"time": i, "o": o, "h": hi, "l": lo, "c": price})
+    return candles
+
+
+def test_compute_haco_matches_reference_loop():
+    import math
+
+    candles = _random_candles(1500)
+    for lengths in ((34, 34), (8, 21)):
+        ref = _reference_haco(candles, *lengths, alert_lookback=2)
+        res = compute_haco(candles, *lengths, alert_lookback=2)["series"]
+        for key in ("keepingU", "keepallU", "utr", "keepingD", "keepallD", "dtr", "upw", "dnw", "state"):
+            assert [bar[key] for bar in res] == ref[key], key
+        for key in ("haOpen", "haC", "ZlDifU", "ZlDifD"):
+            for bar, expected in zip(res, ref[key]):
+                assert math.isclose(bar[key], expected, rel_tol=1e-9, abs_tol=1e-9), key
+
+
+def test_compute_haco_flat_bars_stay_exact():
+    candles = [{"time": i, "o": 100.0, "h": 100.0, "l": 100.0, "c": 100.0} for i in range(120)]
+    series = compute_haco(candles, length_up=34, length_down=34)["series"]
+    assert all(bar["ZlDifU"] == 0.0 and bar["keep2U"] for bar in series)
+
+
+def test_haco_result_is_lazy_and_matches_full_series():
+    res = compute_haco(_random_candles(300), length_up=5, length_down=8)
+    assert res._rows is None
+    last = res.last()
+    assert res._rows is None  # last() does not materialise the series
+    assert res["series"][-1] == last
+    assert res["last"]["state"] == last["state"]
+    assert res["last"]["reasons"] == last["reason"]
+    full = res.to_dict()
+    assert len(full["series"]) == 300
+    assert full["series"][-1] == last
+    assert len(compute_haco([])["series"]) == 0
+    assert compute_haco([])["last"] == {}
+
+
+def test_haco_state_streams_like_batch_and_revises_last_bar():
+    import json
+    import math
+
+    from indicators.haco import HacoState
+
+    candles = _random_candles(400, seed=11)
+    batch = compute_haco(candles, length_up=5, length_down=9, alert_lookback=2).to_list()
+    state = HacoState(5, 9, 2)
+    for i, candle in enumerate(candles):
+        # a partial bar first, then the final one with the same timestamp
+        state.update({**candle, "c": candle["o"]})
+        bar = state.update(candle)
+        if i % 100 == 0:
+            state = HacoState.from_json(state.to_json(), 5, 9, 2)
+        assert bar["state"] == batch[i]["state"]
+        assert bar["reason"] == batch[i]["reason"]
+        assert math.isclose(bar["ZlDifU"], batch[i]["ZlDifU"], rel_tol=1e-9, abs_tol=1e-9)
+    assert state.bars == 400
+    assert HacoState.from_json(state.to_json()) is None  # different params
+    assert HacoState.from_json("not json") is None
+    assert json.loads(state.to_json())["version"] == 1
+
+
+def test_haco_state_catch_up_detects_gaps():
+    from indicators.haco import HacoState
+
+    candles = _random_candles(120)
+    full = HacoState.from_candles(candles)
+    state = HacoState.from_candles(candles[:100])
+    assert state.catch_up(candles[95:])
+    assert state.last == full.last
+    gap = HacoState.from_candles(candles[:50])
+    assert not gap.catch_up(candles[60:])
+    assert gap.bars == 50
+
+
+def test_haco_state_catch_up_without_times_asks_for_a_rebuild():
+    from indicators.haco import HacoState
+
+    candles = _random_candles(120)
+    untimed = [{k: v for k, v in c.items() if k != "time"} for c in candles]
+    state = HacoState.from_candles(candles[:100])
+    assert not state.catch_up(untimed[95:])
+    assert state.bars == 100
+    bare = HacoState.from_candles(untimed[:100])
+    assert not bare.catch_up(candles[95:])
+
+
+def _reference_heikin_ashi(candles):
+    """Per-bar HA loop (the recursion the array kernel solves in closed form)."""
+
+    out, prev = [], None
+    for x in candles:
+        close = (x["o"] + x["h"] + x["l"] + x["c"]) / 4
+        open_ = (x["o"] + x["c"]) / 2 if prev is None else (prev["o"] + prev["c"]) / 2
+        prev = {"o": open_, "h": max(x["h"], open_, close), "l": min(x["l"], open_, close), "c": close}
+        out.append(prev)
+    return out
+
+
+def test_heikin_ashi_kernel_matches_reference_loop_at_every_call_site():
+    import math
+
+    import numpy as np
+    import pandas as pd
+
+    from api.haco import _heikin_ashi
+    from indicators.common import heikin_ashi
+    from indicators.common import heikin_ashi_arrays
+
+    candles = _random_candles(2000, seed=11)
+    ref = _reference_heikin_ashi(candles)
+    cols = {k: np.array([x[k] for x in candles]) for k in "ohlc"}
+
+    def close_to(values, key):
+        return all(math.isclose(v, r[key], rel_tol=1e-9, abs_tol=1e-9) for v, r in zip(values, ref))
+
+    kernel = heikin_ashi_arrays(cols["o"], cols["h"], cols["l"], cols["c"])
+    for arr, key in zip(kernel, "ohlc"):
+        assert close_to(arr.tolist(), key), key
+
+    dicts = heikin_ashi(candles)
+    for key in "ohlc":
+        assert close_to([x[key] for x in dicts], key), key
+
+    frame = pd.DataFrame({"Open": cols["o"], "High": cols["h"], "Low": cols["l"], "Close": cols["c"]})
+    ha = _heikin_ashi(frame)
+    for name, key in (("open", "o"), ("high", "h"), ("low", "l"), ("close", "c")):
+        assert close_to(ha[name].tolist(), key), name
+    assert ha["upbar"].tolist() == [int(r["c"] > r["o"]) for r in ref]
+
+    haco_open = compute_haco(candles)["series"]
+    assert close_to([bar["haOpen"] for bar in haco_open], "o")
+
+
+def test_heikin_ashi_kernel_runs_row_wise_on_a_panel():
+    import numpy as np
+
+    from indicators.common import heikin_ashi_arrays
+
+    rows = [_random_candles(300, seed=s) for s in (1, 2, 3)]
+    panel = [np.array([[x[k] for x in r] for r in rows]) for k in "ohlc"]
+    stacked = heikin_ashi_arrays(*panel)
+    for i in range(len(rows)):
+        single = heikin_ashi_arrays(*(p[i] for p in panel))
+        for got, want in zip(stacked, single):
+            np.testing.assert_allclose(got[i], want, rtol=1e-12, atol=1e-12)
+    assert all(a.shape == (3, 0) for a in heikin_ashi_arrays(*(np.zeros((3, 0)),) * 4))
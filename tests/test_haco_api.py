@@ -8,11 +8,12 @@ client = TestClient(app)
 
 
 def test_haco_endpoint(monkeypatch):
-    def fake_build(symbol, timeframe, len_up, len_dn, lookback, show_ha):
+    def fake_build(symbol, timeframe, len_up, len_dn, alert_lb, lookback, show_ha):
         assert symbol == "AAPL"
         assert timeframe == "Day"
         assert len_up == 3
         assert len_dn == 4
+        assert alert_lb == 2
         assert lookback == 200
         assert show_ha is True
         return {
@@ -38,7 +39,8 @@ def test_haco_endpoint(monkeypatch):
     monkeypatch.setattr(haco, "_build_series", fake_build)
 
     resp = client.get(
-        "/api/signals/haco?symbol=AAPL&timeframe=Day&lengthUp=3&lengthDown=4&lookback=200&showHa=true"
+        "/api/signals/haco?symbol=AAPL&timeframe=Day&lengthUp=3&lengthDown=4&alertLookback=2"
+        "&lookback=200&showHa=true"
     )
     assert resp.status_code == 200
     data = resp.json()
@@ -47,7 +49,7 @@ def test_haco_endpoint(monkeypatch):
 
 
 def test_haco_scan(monkeypatch):
-    def fake_build(symbol, timeframe, len_up, len_dn, lookback, show_ha):
+    def fake_build(symbol, timeframe, len_up, len_dn, alert_lb, lookback, show_ha):
         if symbol == "AAPL":
             series = [
                 {"state": False, "upw": False, "dnw": False},
@@ -75,3 +77,97 @@ def test_haco_scan(monkeypatch):
     assert aapl["upw"] is True
     assert msft["upw"] is False
 
+
+
+def _fixture_fetcher(calls):
+    import numpy as np
+    import pandas as pd
+
+    def fetcher(symbols, interval, start, end):
+        calls.append(tuple(symbols))
+        out = {}
+        for i, sym in enumerate(symbols):
+            rng = np.random.default_rng(abs(hash(sym)) % 2**32)
+            idx = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=300, freq="D")
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx))))
+            out[sym] = pd.DataFrame(
+                {
+                    "Open": close * (1 + rng.normal(0, 0.005, len(idx))),
+                    "High": close * 1.01,
+                    "Low": close * 0.99,
+                    "Close": close,
+                    "Volume": 1e6,
+                },
+                index=idx,
+            )
+        return out
+
+    return fetcher
+
+
+def test_build_series_matches_row_candles():
+    from indicators.haco import compute_haco
+    from services import bar_store
+
+    bar_store.set_fetcher(_fixture_fetcher([]))
+    data = haco._build_series("HX", "Day", 34, 34, 1, 200, False)
+    df = bar_store.get_bars("HX", "1d", period="3y").tail(200)
+    candles = [
+        {"time": int(ts.timestamp()), "o": r.Open, "h": r.High, "l": r.Low, "c": r.Close}
+        for ts, r in zip(df.index, df.itertuples())
+    ]
+    ref = compute_haco(candles)
+    assert data["series"].to_list()[-5:] == [
+        {**bar, "state": bool(bar["state"])} for bar in ref.series.to_list()[-5:]
+    ]
+    assert data["last"] == {**ref.summary(), "state": bool(ref.summary()["state"])}
+
+
+def test_haco_scan_streams_ndjson_from_one_bulk_fetch():
+    import json
+    from services import bar_store
+
+    calls = []
+    bar_store.set_fetcher(_fixture_fetcher(calls))
+    syms = [f"H{i:03d}" for i in range(120)]
+
+    resp = client.get("/api/signals/haco/scan", params={"symbols": ",".join(syms), "stream": "true"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["symbol"] for r in rows] == syms
+    assert all("state" in r and "error" not in r for r in rows)
+    assert calls == [tuple(syms)]  # every symbol's bars from one batched download
+
+    table = client.get("/api/signals/haco/scan", params={"symbols": ",".join(syms[:10])}).json()
+    assert table == rows[:10]
+    assert len(calls) == 1
+
+
+def test_haco_scan_guard_failures_keep_their_status(monkeypatch):
+    import json
+    from fastapi import HTTPException
+    from services import bar_store
+
+    bar_store.set_fetcher(_fixture_fetcher([]))
+    syms = [f"E{i:03d}" for i in range(2 * haco.HACO_SCAN_CHUNK + 1)]
+    scan_table = haco._scan_table
+    failing = {syms[0]}
+
+    def flaky(chunk, timeframe):
+        if chunk[0] in failing:
+            raise HTTPException(status_code=504, detail="haco_timeout")
+        return scan_table(chunk, timeframe)
+
+    monkeypatch.setattr(haco, "_scan_table", flaky)
+    params = {"symbols": ",".join(syms), "stream": "true"}
+    # nothing streamed yet: the client sees the real status, not a 200
+    resp = client.get("/api/signals/haco/scan", params=params)
+    assert resp.status_code == 504
+
+    failing = {syms[haco.HACO_SCAN_CHUNK]}
+    resp = client.get("/api/signals/haco/scan", params=params)
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert resp.status_code == 200
+    assert [r["symbol"] for r in rows[:-1]] == syms[: haco.HACO_SCAN_CHUNK]
+    assert rows[-1] == {"error": "haco_timeout"}
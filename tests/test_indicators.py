@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import common
+
+
+def _walk(n, seed=0):
+    return 100 + np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+def test_kernels_match_pandas_with_leading_nans():
+    x = _walk(400)
+    x[:9] = np.nan
+    s = pd.Series(x)
+    cases = [
+        (common.ema_array(x, 20), s.ewm(span=20, adjust=False).mean()),
+        (common.ema_array(x, 20, min_periods=14), s.ewm(span=20, adjust=False, min_periods=14).mean()),
+        (common.wilder_array(x, 14, min_periods=14), s.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()),
+        (common.sma_array(x, 20), s.rolling(20).mean()),
+        (common.sma_array(x, 20, min_periods=5), s.rolling(20, min_periods=5).mean()),
+        (common.rolling_std(x, 20), s.rolling(20).std()),
+        (common.rolling_min(x, 20), s.rolling(20).min()),
+        (common.rolling_max(x, 20), s.rolling(20).max()),
+    ]
+    for got, want in cases:
+        np.testing.assert_allclose(got, want.to_numpy(), rtol=1e-10, atol=1e-10)
+
+
+def test_recursive_filters_carry_state_across_interior_gaps():
+    np.testing.assert_allclose(
+        common.ema_array([1, 2, np.nan, 4, 5, 6], 3),
+        pd.Series([1, 2, np.nan, 4, 5, 6]).ewm(span=3, adjust=False).mean().to_numpy(),
+    )
+    x = _walk(600, seed=3)
+    x[:5] = np.nan
+    x[np.random.default_rng(4).random(600) < 0.15] = np.nan
+    x[300:340] = np.nan
+    panel = np.stack([x, _walk(600, seed=5)])
+    s = pd.Series(x)
+    cases = [
+        (common.ema_array(x, 20), s.ewm(span=20, adjust=False).mean()),
+        (common.ema_array(x, 3, min_periods=10), s.ewm(span=3, adjust=False, min_periods=10).mean()),
+        (common.wilder_array(panel, 14, min_periods=14)[0], s.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()),
+    ]
+    for got, want in cases:
+        np.testing.assert_allclose(got, want.to_numpy(), rtol=1e-10, atol=1e-10)
+
+
+def test_dema_tema_follow_their_definitions():
+    x = _walk(300, seed=1)
+    e1 = x.copy()
+    ems = []
+    for _ in range(3):
+        e1 = pd.Series(e1).ewm(span=10, adjust=False).mean().to_numpy()
+        ems.append(e1)
+    np.testing.assert_allclose(common.dema_array(x, 10), 2 * ems[0] - ems[1], rtol=1e-10)
+    np.testing.assert_allclose(common.tema_array(x, 10), 3 * ems[0] - 3 * ems[1] + ems[2], rtol=1e-10)
+
+
+def test_panel_rows_match_single_series():
+    rows = [_walk(250, seed=s) for s in range(4)]
+    rows[2][:40] = np.nan  # shorter history, NaN-padded on the left
+    panel = np.vstack(rows)
+    for fn in (
+        lambda a: common.ema_array(a, 12),
+        lambda a: common.tema_array(a, 12),
+        lambda a: common.wilder_array(a, 14, min_periods=14),
+        lambda a: common.sma_array(a, 20),
+        lambda a: common.rolling_std(a, 20),
+        lambda a: common.rolling_max(a, 20),
+    ):
+        stacked = fn(panel)
+        for i, row in enumerate(rows):
+            np.testing.assert_allclose(stacked[i], fn(row), rtol=1e-12, atol=1e-12)
+
+
+def test_list_helpers_keep_their_shape():
+    assert common.sma([1.0, 2.0, 3.0, 4.0], 2) == [None, 1.5, 2.5, 3.5]
+    assert common.ema([], 5) == []
+    assert common.ema([2.0] * 4, 3) == [2.0] * 4
+    with pytest.raises(ValueError):
+        common.sma([1.0], 0)
+    with pytest.raises(ValueError):
+        common.ema([1.0], 0)
+
+
+def test_true_range_uses_previous_close():
+    h = np.array([10.0, 12.0, 11.0])
+    l = np.array([9.0, 11.5, 8.0])
+    c = np.array([9.5, 11.8, 8.5])
+    np.testing.assert_allclose(common.true_range(h, l, c), [1.0, 2.5, 3.8])
@@ -63,7 +63,7 @@ def test_signal_endpoint(monkeypatch):
             return {"articles": [{"title": "good"}, {"title": "good"}]}
 
     monkeypatch.setattr(
-        "backend.app.signals.requests.get",
+        "backend.app.signals.upstream.get",
         lambda *a, **k: DummyResp(),
     )
 
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from backend.app import backtest, optimizer
+from services import bar_store
+
+IDX = pd.bdate_range("2018-01-01", periods=700)
+
+
+def _bars(symbols, interval, start, end):
+    out = {}
+    for i, sym in enumerate(symbols):
+        rng = np.random.default_rng(i)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(IDX))))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.5, (2, len(IDX))))
+        # later symbols list later, so the matrix is ragged
+        out[sym] = pd.DataFrame({
+            "Open": open_, "High": np.maximum(open_, close) + spread[0],
+            "Low": np.minimum(open_, close) - spread[1], "Close": close, "Volume": 1e6,
+        }, index=IDX).iloc[60 * i:]
+    return out
+
+
+def test_expand_grid_ranges_aliases_and_validity():
+    combos = optimizer.expand_grid("sma", {"fast": "10:30:10", "slow": [20, 50]})
+    assert combos == [{"fast": 10, "slow": 20}, {"fast": 10, "slow": 50}, {"fast": 20, "slow": 50},
+                      {"fast": 30, "slow": 50}]
+    haco = optimizer.expand_grid("haco", {"lengthUp": [20, 34], "alertLookback": "1,2"})
+    assert len(haco) == 4 and all(c["length_down"] == 34 for c in haco)
+    with pytest.raises(ValueError):
+        optimizer.expand_grid("sma", {"period": [5]})
+
+
+def test_sweep_ranks_portfolio_metrics_like_universe_backtest():
+    bar_store.set_fetcher(_bars)
+    symbols = ["AAA", "BBB", "CCC"]
+    result = optimizer.sweep("sma", {"fast": [10, 20], "slow": [50, 80]}, symbols, "2018-01-01", "2021-01-01",
+                             workers=1)
+    assert result["combinations"] == 4
+    sharpes = [row["metrics"]["sharpe"] for row in result["results"]]
+    assert sharpes == sorted(sharpes, reverse=True)
+    for row in result["results"]:
+        ref = backtest.universe_backtest(symbols, "2018-01-01", "2021-01-01", **row["params"])
+        assert row["metrics"] == ref["portfolio"]["metrics"], row["params"]
+        assert row["trades"] == sum(s["trades"] for s in ref["symbols"].values())
+
+
+def test_process_pool_matches_in_process_evaluation(monkeypatch):
+    bar_store.set_fetcher(_bars)
+    matrix = optimizer.ohlc_matrix(["AAA", "BBB"], "2018-01-01", "2021-01-01")
+    combos = optimizer.expand_grid("haco", {"length_up": [10, 20], "length_down": [15, 34]})
+    daily, trades = optimizer.evaluate(matrix, "haco", combos, workers=1)
+    monkeypatch.setattr(optimizer, "OPTIMIZER_POOL_MIN", 1)
+    pooled, pooled_trades = optimizer.evaluate(matrix, "haco", combos, workers=2)
+    assert np.array_equal(daily, pooled)
+    assert np.array_equal(trades, pooled_trades)
+
+
+def test_walk_forward_scores_training_pick_on_next_window():
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    rng = np.random.default_rng(3)
+    daily = rng.normal(0, 0.01, (3, len(dates)))
+    daily[1, :100] += 0.01  # best in the first block only
+    combos = [{"fast": 5, "slow": 20}, {"fast": 10, "slow": 20}, {"fast": 15, "slow": 20}]
+    wf = optimizer.walk_forward(dates, daily, combos, 2)
+    first = wf["folds"][0]
+    assert first["params"] == combos[1]
+    assert first["train"]["bars"] == first["test"]["bars"] == 100
+    assert first["test"]["start"] == dates[100].strftime("%Y-%m-%d")
+    assert first["test_metrics"] == optimizer._round_metrics(
+        optimizer.window_metrics(dates[100:200], daily[1:2, 100:200]), 0)
+    anchored = optimizer.walk_forward(dates, daily, combos, 2, anchored=True)
+    assert anchored["folds"][1]["train"]["bars"] == 200
+
+
+def test_cancelled_evaluation_stops_in_process_and_pooled(monkeypatch):
+    bar_store.set_fetcher(_bars)
+    matrix = optimizer.ohlc_matrix(["AAA", "BBB"], "2018-01-01", "2021-01-01")
+    combos = optimizer.expand_grid("sma", {"fast": [5, 10], "slow": [20, 40]})
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(optimizer.SweepCancelled):
+        optimizer.evaluate(matrix, "sma", combos, workers=1, cancel=cancel)
+    monkeypatch.setattr(optimizer, "OPTIMIZER_POOL_MIN", 1)
+    with pytest.raises(optimizer.SweepCancelled):
+        optimizer.evaluate(matrix, "sma", combos, workers=2, cancel=cancel)
+
+
+def _wait(client, job_id):
+    for _ in range(200):
+        body = client.get(f"/api/backtest/sweep/{job_id}").json()
+        if body["status"] not in ("queued", "running"):
+            return body
+        time.sleep(0.05)
+    raise AssertionError("sweep did not finish")
+
+
+def test_sweep_endpoint():
+    bar_store.set_fetcher(_bars)
+    client = TestClient(app)
+    res = client.post("/api/backtest/sweep", json={
+        "strategy": "haco", "symbols": "aaa,bbb", "start": "2018-01-01", "end": "2021-01-01",
+        "grid": {"lengthUp": [20, 34], "lengthDown": [34]}, "top": 1, "folds": 2,
+    })
+    assert res.status_code == 202
+    assert res.json()["combinations"] == 2
+    job = _wait(client, res.json()["id"])
+    assert job["status"] == "done"
+    body = job["result"]
+    assert body["symbols"] == ["AAA", "BBB"] and body["combinations"] == 2
+    assert len(body["results"]) == 1 and len(body["walk_forward"]["folds"]) == 2
+    assert client.get("/api/backtest/sweep/nope").status_code == 404
+    assert client.post("/api/backtest/sweep", json={"symbols": ["AAA"], "sort": "alpha"}).status_code == 400
+    assert client.post("/api/backtest/sweep", json={"symbols": ["AAA"], "grid": {"fast": [50], "slow": [20]}}).status_code == 400
+
+
+def test_sweep_queue_limits_and_cancels_jobs(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_sweep(**params):
+        started.set()
+        release.wait(5)
+        if params["cancel"].is_set():
+            raise optimizer.SweepCancelled()
+        return {"ok": True}
+
+    monkeypatch.setattr(optimizer, "sweep", slow_sweep)
+    queue = optimizer.SweepQueue(max_jobs=2)
+    running = queue.submit("sma", {}, ["AAA"])
+    queued = queue.submit("sma", {}, ["AAA"])
+    assert started.wait(5)
+    with pytest.raises(RuntimeError):
+        queue.submit("sma", {}, ["AAA"])
+    assert queue.cancel(queued.id).status == "cancelled"
+    queue.cancel(running.id)
+    release.set()
+    for _ in range(100):
+        if not running.active:
+            break
+        time.sleep(0.02)
+    assert running.status == "cancelled"
+    assert queue.stats()["cancelled"] == 2
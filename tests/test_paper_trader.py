@@ -0,0 +1,94 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from macmarket.paper_trader import PaperTrader
+
+
+class _DictPaperTrader:
+    """The original dict-backed PaperTrader, used as the parity oracle."""
+
+    def __init__(self, initial_capital=100000.0):
+        self.cash = initial_capital
+        self.positions = {}
+        self.history = []
+
+    def _record(self, date, **fields):
+        self.history.append({"date": pd.to_datetime(date).date(), **fields})
+
+    def target_weights(self, weights, prices, date):
+        equity = self.portfolio_value(prices)
+        for sym, target_w in weights.items():
+            price = prices.get(sym)
+            if price is None or price <= 0:
+                continue
+            delta = equity * target_w / price - self.positions.get(sym, 0.0)
+            if abs(delta) < 1e-8:
+                continue
+            self.cash -= delta * price
+            self.positions[sym] = self.positions.get(sym, 0.0) + delta
+            self._record(date, symbol=sym, action="buy" if delta > 0 else "sell", quantity=abs(delta),
+                         price=float(price))
+        self._record(date, equity=self.portfolio_value(prices))
+
+    def portfolio_value(self, prices):
+        return float(self.cash + sum(q * prices[s] for s, q in self.positions.items() if prices.get(s) is not None))
+
+    def finalize(self, prices, date):
+        equity = self.portfolio_value(prices)
+        self._record(date, equity=equity)
+        return equity
+
+
+def test_dict_api_matches_original_trader():
+    rng = np.random.default_rng(4)
+    symbols = [f"S{i}" for i in range(12)]
+    new, old = PaperTrader(50000.0), _DictPaperTrader(50000.0)
+    day = datetime.date(2024, 1, 2)
+    for step in range(40):
+        picks = rng.choice(symbols, rng.integers(0, 6), replace=False)
+        weights = {s: float(w) for s, w in zip(picks, rng.normal(0, 0.3, len(picks)))}
+        prices = {s: float(p) for s, p in zip(symbols, rng.uniform(5, 200, len(symbols)))}
+        prices[symbols[step % 12]] = None  # a symbol without a quote
+        new.target_weights(weights, prices, day)
+        old.target_weights(weights, prices, day)
+        assert np.isclose(new.portfolio_value(prices), old.portfolio_value(prices))
+        day += datetime.timedelta(days=7)
+    assert np.isclose(new.finalize(prices, day), old.finalize(prices, day))
+    assert new.positions.keys() == old.positions.keys()
+    assert np.allclose([new.positions[s] for s in old.positions], list(old.positions.values()))
+
+    hist, ref = new.history_df(), pd.DataFrame(old.history)
+    assert len(hist) == len(ref)
+    assert list(hist["date"]) == list(ref["date"])
+    assert list(hist["symbol"].fillna("")) == list(ref["symbol"].fillna(""))
+    assert list(hist["action"].fillna("")) == list(ref["action"].fillna(""))
+    for col in ("quantity", "price", "equity"):
+        assert np.allclose(hist[col], ref[col], equal_nan=True), col
+    assert [row.keys() for row in new.history] == [row.keys() for row in old.history]
+
+
+def test_rebalance_applies_a_weight_vector():
+    pt = PaperTrader(10000.0, symbols=["A", "B", "C"])
+    pt.rebalance(np.array([0.5, -0.25, 0.1]), np.array([10.0, 20.0, np.nan]), "2024-01-02")
+    assert np.allclose(pt.quantities, [500.0, -125.0, 0.0])
+    assert pt.positions == {"A": 500.0, "B": -125.0}
+    assert np.isclose(pt.value(np.array([11.0, 20.0, 5.0])), 10500.0)
+    pt.rebalance(np.zeros(3), np.array([11.0, 18.0, 5.0]), "2024-01-09")
+    assert np.allclose(pt.quantities, 0.0) and np.isclose(pt.cash, 10000.0 + 500 + 250)
+    hist = pt.history_df()
+    assert list(hist["action"].dropna()) == ["buy", "sell", "sell", "buy"]
+    assert hist["equity"].notna().sum() == 2
+
+
+def test_positions_and_history_reject_writes():
+    pt = PaperTrader(1000.0)
+    pt.target_weights({"A": 1.0}, {"A": 10.0}, "2024-01-02")
+    with pytest.raises(TypeError):
+        pt.positions["A"] = 0.0
+    with pytest.raises(AttributeError):
+        pt.history.append({})
+    with pytest.raises(TypeError):
+        pt.history[0]["price"] = 1.0
@@ -0,0 +1,130 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from macmarket import portfolio_backtest as pb
+from macmarket.paper_trader import PaperTrader
+from macmarket.strategy_tester import CongressLongShortTester
+from services import bar_store
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD"]
+
+
+def _prices(n=800, seed=0):
+    idx = pd.bdate_range("2021-01-04", periods=n)
+    rng = np.random.default_rng(seed)
+    px = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, len(SYMBOLS))), axis=0)),
+                      index=idx, columns=SYMBOLS)
+    px.loc[: idx[100], "DDD"] = np.nan  # lists later
+    return px
+
+
+def _events(prices, n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, (prices.index[-1] - prices.index[0]).days, n)
+    return pd.DataFrame({
+        "date": [(prices.index[0] + pd.Timedelta(days=int(d))).date() for d in days],
+        "symbol": rng.choice(SYMBOLS + ["ZZZ"], n),
+        "size": rng.choice([8000.0, 32500.0, 75000.0], n),
+        "signal": rng.choice([1, -1], n),
+    })
+
+
+def _reference_weights(events, date, lookback):
+    lo = date - datetime.timedelta(days=lookback)
+    subset = events[(events["date"] > lo) & (events["date"] <= date) & events["symbol"].isin(SYMBOLS)]
+    longs = subset[subset["signal"] == 1].groupby("symbol")["size"].sum()
+    shorts = subset[subset["signal"] == -1].groupby("symbol")["size"].sum()
+    total = longs.sum() + shorts.sum()
+    return {s: (longs.get(s, 0.0) - shorts.get(s, 0.0)) / total for s in SYMBOLS} if total else {}
+
+
+def test_window_weights_match_per_rebalance_filtering():
+    prices = _prices()
+    events = _events(prices)
+    schedule = pb.rebalance_schedule(datetime.date(2021, 1, 8), datetime.date(2023, 12, 1), 5)
+    weights = pb.window_weights(events, schedule, SYMBOLS, 12)
+    for r, date in enumerate(schedule):
+        ref = _reference_weights(events, date, 12)
+        assert np.allclose(weights[r], [ref.get(s, 0.0) for s in SYMBOLS]), date
+
+
+def test_equity_and_trades_match_paper_trader_loop():
+    prices = _prices()
+    events = _events(prices)
+    schedule = pb.rebalance_schedule(datetime.date(2021, 1, 8), datetime.date(2023, 12, 1), 7)
+    weights = pb.window_weights(events, schedule, SYMBOLS, 7)
+    result = pb.backtest_weights(prices, schedule, weights, initial_capital=50000.0)
+
+    pt = PaperTrader(50000.0)
+    marks = []
+    for r, date in enumerate(schedule):
+        row = prices.loc[: pd.Timestamp(date)].iloc[-1]
+        price_map = {s: float(row[s]) for s in SYMBOLS if not np.isnan(row[s])}
+        pt.target_weights({s: weights[r][i] for i, s in enumerate(SYMBOLS) if s in price_map}, price_map, date)
+        marks.append(pt.portfolio_value(price_map))
+    final = pt.portfolio_value(prices.iloc[-1].dropna().to_dict())
+
+    assert np.allclose(result.rebalance_equity, marks)
+    assert np.isclose(result.equity[-1], final)
+    ref_trades = pt.history_df().dropna(subset=["symbol"])
+    assert len(result.trades) == len(ref_trades)
+    assert np.allclose(result.trades["quantity"], ref_trades["quantity"])
+
+
+def test_costs_are_charged_on_traded_notional():
+    prices = _prices(200)
+    schedule = [prices.index[10].date(), prices.index[60].date()]
+    weights = np.array([[0.5, -0.5, 0.0, 0.0], [0.0, -0.5, 0.5, 0.0]])
+    free = pb.backtest_weights(prices, schedule, weights)
+    paid = pb.backtest_weights(prices, schedule, weights, commission=0.001, slippage=0.002)
+    assert np.isclose(paid.trades["cost"].sum(), 0.003 * (free.trades["quantity"] * free.trades["price"]).sum(),
+                      rtol=1e-3)
+    assert paid.equity[-1] < free.equity[-1]
+    assert np.isclose(paid.rebalance_equity[0], 100000.0 * (1 - 0.003))
+
+
+def test_congress_tester_runs_on_the_engine(monkeypatch, tmp_path):
+    prices = _prices(300)
+    events = _events(prices, 80)
+    tester = CongressLongShortTester()
+    tester.output_csv = tmp_path / "out.csv"
+    monkeypatch.setattr(tester, "_fetch_trades", lambda start, end: events)
+    bar_store.set_fetcher(lambda symbols, interval, start, end: {
+        s: pd.DataFrame({"Close": prices[s].dropna(), "Volume": 1e6}) for s in symbols if s in prices
+    })
+    metrics = tester.run_backtest(start=prices.index[20].date(), end=prices.index[-1].date())
+    assert set(metrics) == {"total_return", "cagr", "max_drawdown", "sharpe"}
+    history = pd.read_csv(tester.output_csv)
+    assert {"symbol", "action", "quantity", "price", "equity"} <= set(history.columns)
+
+
+def test_congress_tester_survives_a_failed_price_load(monkeypatch, tmp_path):
+    prices = _prices(300)
+    tester = CongressLongShortTester()
+    tester.output_csv = tmp_path / "out.csv"
+    monkeypatch.setattr(tester, "_fetch_trades", lambda start, end: _events(prices, 80))
+
+    def broken(*args, **kwargs):
+        raise OSError("bar store unavailable")
+
+    monkeypatch.setattr(pb, "get_bars_many", broken)
+    assert pb.price_frame(["AAA"], prices.index[0].date(), prices.index[-1].date()).empty
+    assert tester.run_backtest(start=prices.index[20].date(), end=prices.index[-1].date()) == {}
+
+
+def test_rebalance_schedule():
+    assert pb.rebalance_schedule(datetime.date(2024, 1, 1), datetime.date(2024, 1, 15), 7) == [
+        datetime.date(2024, 1, 1), datetime.date(2024, 1, 8)]
+    with pytest.raises(ValueError):
+        pb.rebalance_schedule(datetime.date(2024, 1, 1), datetime.date(2024, 1, 15), 0)
+
+
+def test_metrics_use_equity_relative_to_capital():
+    prices = _prices(300)
+    schedule = [prices.index[0].date()]
+    result = pb.backtest_weights(prices, schedule, np.array([[1.0, 0.0, 0.0, 0.0]]), initial_capital=25000.0)
+    expected = prices["AAA"].iloc[-1] / prices["AAA"].iloc[0] - 1
+    assert result.metrics()["total_return"] == round(expected, 4)
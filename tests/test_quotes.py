@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from backend.app import quotes
+
+
+@pytest.fixture(autouse=True)
+def _fresh_quotes(monkeypatch):
+    quotes._CACHE.clear()
+    monkeypatch.setattr(quotes, "QUOTE_BACKGROUND", False)
+    monkeypatch.setattr(quotes, "_STATS", dict.fromkeys(quotes._STATS, 0))
+    yield
+    quotes._CACHE.clear()
+
+
+def _fake_download(calls, closes):
+    def download(symbols, **kwargs):
+        calls.append(list(symbols))
+        idx = pd.date_range("2024-01-01", periods=2, freq="D")
+        cols = {(s, "Close"): closes[s] for s in symbols if s in closes}
+        frame = pd.DataFrame(cols, index=idx)
+        frame.columns = pd.MultiIndex.from_tuples(list(cols))
+        return frame
+    return download
+
+
+def test_quotes_are_batched_and_shared(monkeypatch):
+    calls = []
+    monkeypatch.setattr(quotes.yf, "download", _fake_download(calls, {"AAPL": [100.0, 110.0], "MSFT": [50.0, 45.0]}))
+
+    got = quotes.fetch_quotes(["aapl", "MSFT", "NOPE"])
+    assert calls == [["AAPL", "MSFT", "NOPE"]]
+    assert got["AAPL"]["price"] == 110.0 and got["AAPL"]["change_percent"] == pytest.approx(10.0)
+    assert got["MSFT"]["change_percent"] == pytest.approx(-10.0)
+    assert got["NOPE"]["price"] is None
+
+    # prices and /api/ticker read the same entries: no further upstream calls
+    hits = quotes._CACHE.hits
+    assert quotes.fetch_latest_prices(["AAPL", "MSFT"]) == {"AAPL": 110.0, "MSFT": 45.0}
+    resp = TestClient(app_module.app).get("/api/ticker?symbols=AAPL,MSFT")
+    assert resp.json()["data"][1] == {"symbol": "MSFT", "price": 45.0, "change_percent": pytest.approx(-10.0)}
+    assert len(calls) == 1
+    stats = quotes.quote_stats()
+    assert stats["batches"] == 1 and stats["hits"] - hits == 4
+
+
+def test_stale_quotes_served_then_refreshed(monkeypatch):
+    calls = []
+    closes = {"SPY": [400.0, 404.0]}
+    monkeypatch.setattr(quotes.yf, "download", _fake_download(calls, closes))
+    quotes.fetch_quotes(["SPY"])
+
+    monkeypatch.setattr(quotes, "_TTL", 0)
+    closes["SPY"] = [404.0, 408.0]
+    # the stale value is returned while one refresh batch updates the cache
+    assert quotes.fetch_latest_price("SPY") == 404.0
+    assert calls == [["SPY"], ["SPY"]]
+    assert quotes._CACHE.get("SPY")["price"] == 408.0
+    assert quotes.quote_stats()["stale_served"] == 1
+
+
+def test_concurrent_misses_fetch_each_symbol_once(monkeypatch):
+    import threading
+
+    calls = []
+    started, release = threading.Event(), threading.Event()
+    fake = _fake_download(calls, {"AAPL": [100.0, 110.0], "MSFT": [50.0, 45.0]})
+
+    def download(symbols, **kwargs):
+        frame = fake(symbols, **kwargs)
+        if symbols == ["AAPL"]:
+            started.set()
+            release.wait(5)
+        return frame
+
+    monkeypatch.setattr(quotes.yf, "download", download)
+    first = threading.Thread(target=quotes.fetch_quotes, args=(["AAPL"],))
+    first.start()
+    assert started.wait(5)
+
+    got = {}
+    second = threading.Thread(target=lambda: got.update(quotes.fetch_quotes(["AAPL", "MSFT"])))
+    second.start()
+    # MSFT does not queue behind the AAPL batch; AAPL is not fetched twice
+    for _ in range(500):
+        if ["MSFT"] in calls:
+            break
+        threading.Event().wait(0.01)
+    assert calls == [["AAPL"], ["MSFT"]] and not got
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert got["AAPL"]["price"] == 110.0 and got["MSFT"]["price"] == 45.0
+    assert len(calls) == 2 and quotes._FLIGHTS == {}
+    assert quotes.quote_stats()["batches"] == 2
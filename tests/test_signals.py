@@ -18,3 +18,51 @@ def test_generate_recommendations_quiver(monkeypatch):
     assert "political" in recs[0]["reason"]
     assert "lobby" in recs[0]["reason"]
     assert recs[0]["probability"] > 0.5
+
+
+def test_recommendations_coalesce_upstream_calls(monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from services import bar_store
+
+    calls = {"risk": 0, "political": 0, "lobby": 0, "prices": 0, "news": [], "bars": []}
+
+    def fetcher(symbols, interval, start, end):
+        calls["bars"].append(tuple(symbols))
+        idx = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=70, freq="D")
+        close = 100 + np.cumsum(np.sin(np.arange(len(idx)) / 5))
+        frame = pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1e6},
+            index=idx,
+        )
+        return {sym: frame for sym in symbols}
+
+    def counted(name, value):
+        def fn(syms):
+            calls[name] += 1
+            return value(syms)
+        return fn
+
+    bar_store.set_fetcher(fetcher)
+    signals._RECOMMENDATIONS.clear()
+    monkeypatch.setattr(signals, "get_risk_factors", counted("risk", lambda syms: {}))
+    monkeypatch.setattr(signals, "get_political_moves", counted("political", lambda syms: {}))
+    monkeypatch.setattr(signals, "get_lobby_disclosures", counted("lobby", lambda syms: {}))
+    monkeypatch.setattr(signals, "fetch_latest_prices", counted("prices", lambda syms: {s: 100.0 for s in syms}))
+    monkeypatch.setattr(
+        signals, "news_sentiment_signal", lambda s: calls["news"].append(s) or {"score": 0.5}
+    )
+
+    journal = ["RA", "RB", "RC", "RD", "RE"] * 10  # 50 entries, 5 symbols
+    recs = signals.recommend_symbols(journal)
+
+    assert list(recs) == ["RA", "RB", "RC", "RD", "RE"]
+    assert calls["bars"] == [("RA", "RB", "RC", "RD", "RE")]  # MA + exits share one load
+    assert (calls["risk"], calls["political"], calls["lobby"], calls["prices"]) == (1, 1, 1, 1)
+    assert sorted(calls["news"]) == ["RA", "RB", "RC", "RD", "RE"]
+    assert all(r["exit_date"] for r in recs.values())
+
+    # the same day is served from the (symbol, day) cache
+    again = signals.generate_recommendations(journal)
+    assert len(again) == 3 and calls["risk"] == 1 and len(calls["news"]) == 5
+    signals._RECOMMENDATIONS.clear()
@@ -1,14 +1,16 @@
 import pandas as pd
 
 from backend.app import signals
+from services import bar_store
 
 
-def test_compute_signals_structure(monkeypatch):
-    def fake_download(*args, **kwargs):
-        # returning empty frame triggers deterministic fallback
-        return pd.DataFrame()
+def _no_bars(symbols, interval, start, end):
+    return {}
+
 
-    monkeypatch.setattr("backend.app.signals.yf.download", fake_download)
+def test_compute_signals_structure(monkeypatch):
+    # no bars from the store triggers the deterministic fallback
+    bar_store.set_fetcher(_no_bars)
 
     payload = signals.compute_signals("SPY", mode="swing")
 
@@ -37,9 +39,134 @@ def test_compute_signals_structure(monkeypatch):
 
 
 def test_compute_signals_unknown_mode(monkeypatch):
-    monkeypatch.setattr("backend.app.signals.yf.download", lambda *a, **k: pd.DataFrame())
+    bar_store.set_fetcher(_no_bars)
 
     payload = signals.compute_signals("QQQ", mode="unknown")
 
     assert payload["mode"] == "swing"
     assert payload["symbol"] == "QQQ"
+
+
+def test_compute_signals_reads_history_once(monkeypatch):
+    import numpy as np
+
+    calls = []
+
+    def fetcher(symbols, interval, start, end):
+        calls.append((tuple(symbols), interval))
+        idx = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=260, freq="D")
+        close = 50 + np.cumsum(np.sin(np.arange(len(idx)) / 7))
+        frame = pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1e6},
+            index=idx,
+        )
+        return {sym: frame for sym in symbols}
+
+    bar_store.set_fetcher(fetcher)
+
+    payload = signals.compute_signals("ZZZ", mode="swing")
+
+    assert [c for c in calls if "ZZZ" in c[0]] == [(("ZZZ",), "1d")]
+    assert payload["exits"]["levels"] is not None
+    # the route's MA crossover is served from the bars loaded above
+    assert signals.technical_indicator_signal("ZZZ")["signal"] in {"bullish", "bearish"}
+    assert [c for c in calls if "ZZZ" in c[0]] == [(("ZZZ",), "1d")]
+    assert set(payload["timings"]) >= {"load", "components", "panels", "watchlist", "total"}
+
+
+def test_batch_readiness_matches_single_symbol_scores(monkeypatch):
+    import numpy as np
+
+    calls = []
+    gaps = {"BA2": [("Close", -8)], "BA3": [("Close", -14)], "BA4": [("Volume", -5)], "BA6": [("Close", 40)]}
+
+    def fetcher(symbols, interval, start, end):
+        calls.append(tuple(symbols))
+        out = {}
+        for i, sym in enumerate(symbols):
+            if sym == "GONE":
+                continue
+            rng = np.random.default_rng(i)
+            n = 260 - (i % 3) * 90
+            idx = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=n, freq="D")
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+            frame = pd.DataFrame(
+                {
+                    "Open": close * (1 + rng.normal(0, 0.005, n)),
+                    "High": close * 1.01,
+                    "Low": close * 0.99,
+                    "Close": close,
+                    "Volume": rng.integers(100_000, 1_000_000, n).astype(float),
+                },
+                index=idx,
+            )
+            # holes inside the volatility, momentum and volume windows
+            for column, row in gaps.get(sym, ()):
+                frame.iloc[row, frame.columns.get_loc(column)] = np.nan
+            out[sym] = frame
+        return out
+
+    bar_store.set_fetcher(fetcher)
+    symbols = ["BA1", "BA2", "BA3", "BA4", "BA5", "BA6", "GONE"]
+
+    batch = signals._batch_readiness(symbols, "swing")
+
+    assert calls[0] == tuple(symbols)  # one multi-ticker read for the universe
+    signals._compute_readiness_only.cache_clear()
+    assert batch == {sym: signals._compute_readiness_only(sym, "swing") for sym in symbols}
+
+
+def test_ranked_watchlist_served_from_snapshot(monkeypatch):
+    from backend.app.rankings import RankingService
+
+    computed = []
+
+    def compute(mode, limit=10):
+        computed.append(mode)
+        return [{"symbol": "AAA", "score": 70.0}]
+
+    service = RankingService(compute, stale_after=60, background=False)
+    monkeypatch.setattr(signals, "watchlist_rankings", service)
+    bar_store.set_fetcher(_no_bars)
+
+    cold = signals.compute_signals("SPY", mode="swing")
+    assert cold["ranked_watchlist"] == [] and cold["ranked_watchlist_age"] is None
+    assert computed == []  # never scored on the request path
+
+    service.refresh("swing")
+    warm = signals.compute_signals("SPY", mode="swing")
+    assert warm["ranked_watchlist"] == [{"symbol": "AAA", "score": 70.0}]
+    assert 0 <= warm["ranked_watchlist_age"] < 60
+
+    service.background = True
+    service._snapshots["swing"].computed_at -= 120
+    monkeypatch.setattr(service, "refresh_async", lambda mode: computed.append(("async", mode)))
+    stale = signals.compute_signals("SPY", mode="swing")
+    assert stale["ranked_watchlist"] == [{"symbol": "AAA", "score": 70.0}]
+    assert computed[-1] == ("async", "swing")
+
+
+def test_scheduled_refresh_skips_modes_already_refreshing():
+    import threading
+
+    from backend.app.rankings import RankingService
+
+    computed, started, release = [], threading.Event(), threading.Event()
+
+    def compute(mode, limit=10):
+        computed.append(mode)
+        if mode == "swing":
+            started.set()
+            release.wait(5)
+        return [{"symbol": mode.upper(), "score": 50.0}]
+
+    service = RankingService(compute, stale_after=60, background=True)
+    assert service.refresh_async("swing")
+    assert started.wait(5)
+    service.refresh_all(["swing", "day"])
+    assert computed == ["swing", "day"]
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "rankings-swing":
+            thread.join(5)
+    assert service.status()["swing"]["refreshing"] is False
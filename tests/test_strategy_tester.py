@@ -0,0 +1,141 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from macmarket import strategy_tester as st
+from services import bar_store
+
+IDX = pd.bdate_range("2023-01-02", periods=400)
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+def _feeds(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def days(k):
+        return [(IDX[0] + pd.Timedelta(days=int(d))).strftime("%Y-%m-%d") for d in rng.integers(0, 560, k)]
+
+    return {
+        "congress": [{"Ticker": t, "TransactionDate": d, "Transaction": a, "Range": "$1,001 - $15,000"}
+                     for t, d, a in zip(rng.choice(SYMBOLS, n), days(n), rng.choice(["Purchase", "Sale"], n))],
+        "lobbying": [{"Ticker": t, "Date": d, "Amount": float(a)}
+                     for t, d, a in zip(rng.choice(SYMBOLS, n), days(n), rng.integers(10_000, 500_000, n))],
+        "whales": [{"ticker": t, "date": d, "action": a, "value": 1e6}
+                   for t, d, a in zip(rng.choice(SYMBOLS, n), days(n), rng.choice(["buy", "sell"], n))],
+    }
+
+
+@pytest.fixture
+def quiver(monkeypatch, tmp_path):
+    feeds, fetched, reads = _feeds(), [], []
+    monkeypatch.setattr(st, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(st, "HISTORY_FILE", tmp_path / "history.json")
+
+    def fetch(feed, token=None):
+        fetched.append(feed)
+        return feeds[feed]
+
+    def bars(symbols, interval, start, end):
+        reads.append(tuple(symbols))
+        rng = np.random.default_rng(len(reads))
+        return {s: pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(IDX)))), "Volume": 1e6},
+                                index=IDX) for s in symbols}
+
+    monkeypatch.setattr(st, "fetch_feed", fetch)
+    bar_store.set_fetcher(bars)
+    return fetched, reads
+
+
+def test_event_table_normalizes_feeds():
+    feeds = _feeds(10)
+    congress = st.event_table(feeds["congress"])
+    assert list(congress.columns) == st.EVENT_COLUMNS
+    assert set(congress["signal"]) <= {1, -1} and (congress["size"] == 8000.5).all()
+    assert (st.event_table(feeds["lobbying"], default_signal=1)["signal"] == 1).all()
+    whales = st.event_table(feeds["whales"])
+    assert isinstance(whales["date"].iloc[0], datetime.date) and set(whales["symbol"]) <= set(SYMBOLS)
+    assert st.event_table([]).empty and st.event_table([{"foo": 1}]).empty
+
+
+def test_weighting_rules():
+    events = pd.DataFrame({
+        "date": [datetime.date(2024, 1, d) for d in (2, 3, 4, 5)],
+        "symbol": ["A", "B", "A", "C"],
+        "size": [100.0, 300.0, 50.0, 200.0],
+        "signal": [1, 1, -1, -1],
+    })
+    schedule, symbols = [datetime.date(2024, 1, 5)], ["A", "B", "C"]
+    net_long = st.EventStrategy("x", "congress", "net_long", 30).weights(events, schedule, symbols)
+    assert np.allclose(net_long, [[50 / 350, 300 / 350, 0.0]])
+    count = st.EventStrategy("x", "whales", "net_count", 30).weights(events, schedule, symbols)
+    assert np.allclose(count, [[0.0, 0.5, -0.5]])
+    spend = st.EventStrategy("x", "lobbying", "spend", 30, top_n=2).weights(events, schedule, symbols)
+    assert np.allclose(spend, [[0.0, 0.6, 0.4]])
+    long_short = st.EventStrategy("x", "congress", "long_short", 30).weights(events, schedule, symbols)
+    assert np.allclose(long_short, [[50 / 650, 300 / 650, -200 / 650]])
+
+
+def test_batch_shares_feeds_and_one_price_read(quiver):
+    fetched, reads = quiver
+    results = st.run_strategies(start=datetime.date(2023, 3, 1), end=datetime.date(2024, 6, 1))
+    assert set(results) == {"congress_long_short", "political_alpha", "lobby_power", "whale_watcher"}
+    for name, metrics in results.items():
+        assert set(metrics) == {"total_return", "cagr", "max_drawdown", "sharpe"}, name
+    assert sorted(fetched) == ["congress", "lobbying", "whales"]
+    assert len(reads) == 1 and sorted(reads[0]) == SYMBOLS
+    # a batch of one gives the same numbers
+    alone = st.run_strategies(["lobby_power"], start=datetime.date(2023, 3, 1), end=datetime.date(2024, 6, 1))
+    assert alone["lobby_power"] == results["lobby_power"]
+
+
+def test_batch_reports_feed_errors_per_strategy(quiver, monkeypatch):
+    def broken(feed, token=None):
+        if feed == "whales":
+            raise RuntimeError("401 Unauthorized")
+        return _feeds()[feed]
+
+    monkeypatch.setattr(st, "fetch_feed", broken)
+    results = st.run_strategies(["whale_watcher", "political_alpha"], end=datetime.date(2024, 6, 1))
+    assert results["whale_watcher"] == {"error": "401 Unauthorized"}
+    assert "sharpe" in results["political_alpha"]
+    with pytest.raises(ValueError):
+        st.run_strategies(["nope"])
+
+
+def test_run_endpoint_batch(quiver):
+    client = TestClient(app)
+    res = client.post("/strategy-test/run", json={"strategies": "all", "user_id": 7,
+                                                  "start": "2023-03-01", "end": "2024-06-01"})
+    assert res.status_code == 200
+    assert set(res.json()["results"]) == set(st.list_strategies())
+    assert set(client.get("/strategy-test/history?user_id=7").json()) == set(st.list_strategies())
+    assert client.post("/strategy-test/run", json={"strategies": ["nope"], "user_id": 7}).status_code == 400
+
+
+def test_single_run_keeps_its_rebalance_plus_lookback_window(monkeypatch):
+    calls = []
+
+    def batch(names, start=None, end=None):
+        calls.append((names, start, end))
+        return {names[0]: {"sharpe": 1.0}}
+
+    monkeypatch.setattr(st, "run_strategies", batch)
+    assert st.run_strategy("congress_long_short") == {"sharpe": 1.0}
+    spec = st.strategy_specs()["congress_long_short"]
+    (names, start, end), = calls
+    assert names == ["congress_long_short"] and end == datetime.date.today()
+    assert (end - start).days == spec.rebalance_days + spec.lookback_days
+    with pytest.raises(ValueError):
+        st.run_strategy("nope")
+
+
+def test_run_endpoint_single_strategy_errors(quiver, monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(st, "run_strategy", lambda s: {"error": "401 Unauthorized"})
+    res = client.post("/strategy-test/run", json={"strategy": "whale_watcher", "user_id": 7})
+    assert res.status_code == 502
+    assert client.get("/strategy-test/history?user_id=7").json() in ({}, [])
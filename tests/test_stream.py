@@ -0,0 +1,79 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from api import stream
+
+
+def _drain(sub):
+    out = []
+    while not sub.queue.empty():
+        out.append(sub.queue.get_nowait())
+    return out
+
+
+def test_hub_polls_union_once_and_sends_only_changes():
+    calls = []
+    prices = {"AAPL": 100.0, "MSFT": 50.0, "SPY": 400.0}
+    haco = {"AAPL": True, "MSFT": False, "SPY": True}
+
+    def quotes(symbols):
+        calls.append(list(symbols))
+        return {s: {"price": prices[s], "change_percent": 0.0} for s in symbols}
+
+    async def scenario():
+        hub = stream.QuoteHub(quotes=quotes, haco=lambda syms: {s: haco[s] for s in syms}, haco_interval=0)
+        a = hub.subscribe(["aapl", "MSFT"], start=False)
+        b = hub.subscribe(["AAPL", "SPY"], start=False)
+
+        await hub.poll_once()
+        assert calls == [["AAPL", "MSFT", "SPY"]]  # one upstream call for the union
+        first_a = _drain(a)
+        assert [q["symbol"] for q in first_a[0]["data"]] == ["AAPL", "MSFT"]
+        assert {m["symbol"] for m in first_a[1:]} == {"AAPL", "MSFT"}
+        assert not any(m["flip"] for m in first_a[1:])
+        _drain(b)
+
+        prices["SPY"] = 401.0
+        haco["AAPL"] = False
+        await hub.poll_once()
+        assert _drain(a) == [{"type": "haco", "symbol": "AAPL", "state": False, "flip": True}]
+        assert _drain(b) == [
+            {"type": "quotes", "data": [{"symbol": "SPY", "price": 401.0, "change_percent": 0.0}]},
+            {"type": "haco", "symbol": "AAPL", "state": False, "flip": True},
+        ]
+
+        # a late subscriber gets the current snapshot without another poll
+        c = hub.subscribe(["SPY"], start=False)
+        assert _drain(c)[0]["data"][0]["price"] == 401.0
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_websocket_clients_share_poller_and_receive_alerts(monkeypatch):
+    calls = []
+
+    def quotes(symbols):
+        calls.append(list(symbols))
+        return {s: {"price": 10.0, "change_percent": 1.0} for s in symbols}
+
+    monkeypatch.setattr(stream, "hub", stream.QuoteHub(quotes=quotes, haco=None, interval=0.05))
+    # one portal (event loop) for every connection, as under uvicorn
+    with TestClient(app_module.app) as client, \
+            client.websocket_connect("/ws/quotes?symbols=AAPL") as ws1, \
+            client.websocket_connect("/ws/quotes?symbols=AAPL,MSFT") as ws2:
+        seen = set()
+        while seen != {"AAPL", "MSFT"}:
+            seen |= {q["symbol"] for q in ws2.receive_json()["data"]}
+        assert ws1.receive_json()["data"][0]["symbol"] == "AAPL"
+
+        client.post("/api/signals/alert", json={"ticker": "TSLA", "price": 5})
+        assert ws1.receive_json() == {"type": "alert", "alert": app_module.LATEST_ALERT}
+        assert ws2.receive_json()["alert"]["ticker"] == "TSLA"
+
+        stats = client.get("/api/metrics/stream").json()
+        assert stats["subscribers"] == 2 and stats["symbols"] == 2
+    # never more symbols per poll than the distinct subscribed set
+    assert all(set(c) <= {"AAPL", "MSFT"} for c in calls)
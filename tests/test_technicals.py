@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from backend.app import signals
+from backend.app.technicals import panel_from_frames
+
+
+def _frame(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    idx = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=n, freq="D")
+    return pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.005, n)),
+            "High": close * (1 + np.abs(rng.normal(0, 0.01, n))),
+            "Low": close * (1 - np.abs(rng.normal(0, 0.01, n))),
+            "Close": close,
+            "Volume": rng.integers(100_000, 1_000_000, n).astype(float),
+        },
+        index=idx,
+    )
+
+
+def _pandas_reference(frame):
+    """The per-symbol pandas formulas the panel replaced."""
+    h, l, c = frame["High"], frame["Low"], frame["Close"]
+    delta = c.diff()
+    up = delta.clip(lower=0.0).ewm(span=14, adjust=False).mean()
+    down = (-delta.clip(upper=0.0)).ewm(span=14, adjust=False).mean()
+    rsi = 100 - 100 / (1 + up / down.replace(0.0, np.nan))
+
+    up_move, down_move = h.diff(), -l.diff()
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0.0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0.0), 0.0)
+    tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+    smooth = dict(alpha=1 / 14, adjust=False, min_periods=14)
+    atr_w = tr.ewm(**smooth).mean()
+    plus_di = 100 * plus_dm.ewm(**smooth).mean() / atr_w
+    minus_di = 100 * minus_dm.ewm(**smooth).mean() / atr_w
+    adx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).ewm(**smooth).mean()
+    return {
+        "rsi": rsi.iloc[-1],
+        "rsi_prev": rsi.iloc[-2],
+        "adx": adx.iloc[-1],
+        "atr": tr.rolling(14).mean().iloc[-1],
+        "support": l.rolling(20).min().iloc[-1],
+        "resistance": h.rolling(20).max().iloc[-1],
+        "ema50": c.ewm(span=50, adjust=False).mean().iloc[-1],
+        "ema200": c.ewm(span=200, adjust=False).mean().iloc[-1],
+        "volume_mult": frame["Volume"].iloc[-1] / frame["Volume"].rolling(20).mean().iloc[-1],
+    }
+
+
+def test_panel_matches_pandas_formulas_for_ragged_histories():
+    frames = {"AAA": _frame(260, 1), "BBB": _frame(90, 2), "CCC": _frame(150, 3)}
+    panel = panel_from_frames(frames)
+    for sym, frame in frames.items():
+        row = panel.row(sym)
+        assert row["bars"] == len(frame)
+        for key, expected in _pandas_reference(frame).items():
+            assert np.isclose(row[key], expected, rtol=1e-9, atol=1e-9), (sym, key)
+        # padding other rows does not change a symbol's readings
+        alone = panel_from_frames({sym: frame}).row(sym)
+        assert all(np.isclose(alone[k], row[k], rtol=1e-12) for k in alone if k != "symbol")
+
+
+def test_short_history_falls_back_like_the_scalar_helpers():
+    row = panel_from_frames({"NEW": _frame(12, 4)}).row("NEW")
+    assert row["adx"] == 0.0
+    assert row["rsi_prev"] == row["rsi"]
+    assert np.isnan(row["support"])
+    exits, reason = signals._exit_levels_from_row(row, "buy", 100.0)
+    assert exits is None and reason == "Not enough history for exits"
+
+
+def test_watchlist_panels_match_compute_signals_from_one_read():
+    from services import bar_store
+
+    frames = {"WA1": _frame(260, 5), "WA2": _frame(200, 6), "WA3": _frame(260, 7)}
+    calls = []
+
+    def fetcher(symbols, interval, start, end):
+        calls.append(tuple(symbols))
+        return {s: frames[s] for s in symbols if s in frames}
+
+    bar_store.set_fetcher(fetcher)
+    out = signals.watchlist_panels(["WA1", "WA2", "WA3", "GONE"], "swing")
+
+    assert calls == [("WA1", "WA2", "WA3", "GONE")]
+    assert out["symbols"]["GONE"] == {"error": "no_data"}
+    for sym in frames:
+        single = signals.compute_signals(sym, mode="swing")
+        got = out["symbols"][sym]
+        assert got["readiness"] == single["readiness"]["score"]
+        assert got["panels"] == single["panels"]
@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.app import upstream as upstream_mod
+from backend.app.upstream import UpstreamClients
+
+
+class ScriptedAdapter(HTTPAdapter):
+    """Answers with the queued status codes, one per request."""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        resp = requests.Response()
+        resp.status_code = self.statuses.pop(0)
+        resp.url = request.url
+        resp._content = b"{}"
+        return resp
+
+
+def test_sync_get_reuses_session_and_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(upstream_mod, "backoff_delay", lambda attempt: 0)
+    client = UpstreamClients(retries=2)
+    adapter = ScriptedAdapter([503, 429, 200, 404])
+    client.session().mount("https://", adapter)
+
+    assert client.get("https://api.example.com/a").status_code == 200
+    assert client.get("https://api.example.com/b").status_code == 404  # not retried
+    assert adapter.sent == 4
+    assert client.session() is client.session()
+    host = client.stats()["hosts"]["api.example.com"]
+    assert host["requests"] == 4 and host["retries"] == 2 and host["errors"] == 1
+
+    # non-idempotent requests are sent once
+    adapter.statuses = [503]
+    assert client.post("https://api.example.com/c").status_code == 503
+    assert adapter.sent == 5
+
+
+def test_async_client_is_pooled_per_loop_and_limits_hosts(monkeypatch):
+    monkeypatch.setattr(upstream_mod, "backoff_delay", lambda attempt: 0)
+    active = {"now": 0, "peak": 0}
+    failures = {"n": 1}
+
+    async def handler(request):
+        if failures["n"]:
+            failures["n"] -= 1
+            raise httpx.ConnectError("boom", request=request)
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(200, json={"ok": True})
+
+    client = UpstreamClients(max_per_host=2, transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        first = client.async_client()
+        responses = await asyncio.gather(*(client.aget("https://news.example.com/x") for _ in range(6)))
+        assert all(r.status_code == 200 for r in responses)
+        assert client.async_client() is first
+        await client.aclose()
+        assert client.stats()["open_loops"] == 0
+
+    asyncio.run(scenario())
+    assert active["peak"] <= 2
+    host = client.stats()["hosts"]["news.example.com"]
+    assert host["requests"] == 7 and host["retries"] == 1 and host["errors"] == 1